@@ -1,51 +1,150 @@
-from flask import Flask, request, jsonify, send_from_directory, redirect, url_for, session
+from flask import Blueprint, Flask, Response, current_app, has_app_context, request, jsonify, send_from_directory, redirect, url_for, session
 from flask_cors import CORS
+from werkzeug.local import LocalProxy
 from dto.catalogue_dto import catalogue
-from service.catalogue_service import catalogueService
-from service.authentication_service import AuthenticationService
-import os
-
-from flasgger import Swagger
+from service.app_services import AppServices
+from service.catalogue_service import DEFAULT_PAGE_SIZE, CATALOGUE_COLUMNS, FILTER_KEYS
+from service.change_feed import ChangesExpired, format_token, parse_token
+from exception.exception import validationerror
+from util.export import EXPORT_FORMATS
+from util.http_cache import conditional_response
+from util.stats import summarize_counts
+from util.compression import compression_from_config
+from util.serializer import dumps, provider_from_config
+from util.validators import catalogue_validator, parse_date
+from util import db_router, metrics
+from config.settings import get_config, get_section, load_config
+from datetime import date
+import time
 
 from config.logger_config import logger
 
 
 
-app = Flask(__name__, static_folder="frontend", static_url_path="")
-logger.info("🚀 Starting the Flask application...")
-app.secret_key = "supersecretkey"  # Required for session
-# ✅ Enable CORS with support for cookies/session
-CORS(app, supports_credentials=True)
+MAX_IDS_PER_REQUEST = 1000
+# Session key with the time until which the session's reads go to the primary (see util/db_router.py)
+PRIMARY_UNTIL_KEY = "db_primary_until"
 
-swagger = Swagger(app, template={
+SWAGGER_TEMPLATE = {
     "swagger": "2.0",
     "info": {
         "title": "Catalogue Management API",
         "description": "API for managing catalogues with login authentication.",
         "version": "1.0.0"
     }
-})
-# Initialize services
-service = catalogueService()
-auth_service = AuthenticationService()
+}
+
+api = Blueprint("api", __name__)
+
+
+def create_app(config=None) -> Flask:
+    """
+    Build the Flask app.
+
+    Services are created on first use (see :class:`AppServices`), so this
+    touches neither the database nor the frontend files.
+
+    :param config: A ConfigParser, or ``{section: {key: value}}`` overrides
+        applied on top of config.ini. Defaults to config.ini as is.
+    """
+    if config is None:
+        config = get_config()
+    elif isinstance(config, dict):
+        config = load_config(config)
+
+    app = Flask(__name__, static_folder="frontend", static_url_path="")
+    app.secret_key = "supersecretkey"  # Required for session
+    # ✅ Enable CORS with support for cookies/session
+    CORS(app, supports_credentials=True)
+    app.json = provider_from_config(app, get_section("serialization", config))
+    app.extensions["catalogue"] = AppServices(config, app.static_folder)
+    app.register_blueprint(api)
+    # Flask's own static route has the same rule and is matched first
+    app.view_functions["static"] = serve_static
+
+    swagger_settings = get_section("swagger", config)
+    if swagger_settings.getboolean("enabled", True):
+        # imported here: flasgger and jsonschema are about a quarter of the import time
+        from flasgger import Swagger
+        # specs are parsed from the docstrings on the first /apispec_1.json request
+        Swagger(app, template=SWAGGER_TEMPLATE)
+
+    metrics.set_enabled(get_section("metrics", config).getboolean("enabled", True))
+    metrics.instrument_app(app)
+    # registered after the metrics hook so it runs first and metrics see encoded sizes
+    app.extensions["compression"] = compression_from_config(app, get_section("compression", config))
+    logger.info("🚀 Flask application created")
+    return app
+
+
+def _services() -> AppServices:
+    # outside a request (scripts, tests) the module-level app's services are used
+    return (current_app if has_app_context() else app).extensions["catalogue"]
+
+
+service = LocalProxy(lambda: _services().catalogue)
+auth_service = LocalProxy(lambda: _services().auth)
+search_index = LocalProxy(lambda: _services().search_index)
+effective_index = LocalProxy(lambda: _services().effective_index)
+status_scheduler = LocalProxy(lambda: _services().status_scheduler)
+assets = LocalProxy(lambda: _services().assets)
+bulk_settings = LocalProxy(lambda: _services().settings("bulk"))
+search_settings = LocalProxy(lambda: _services().settings("search"))
+effective_settings = LocalProxy(lambda: _services().settings("effective_index"))
+catalogue_stats = LocalProxy(lambda: _services().stats)
+stats_settings = LocalProxy(lambda: _services().settings("stats"))
+change_feed = LocalProxy(lambda: _services().changes)
+change_settings = LocalProxy(lambda: _services().settings("changes"))
+
+
+def _version(version_info):
+    # the data version an ETag is made from; cached reads behind it must be at least that current
+    return version_info[0] if version_info is not None else None
+
+
+@api.app_errorhandler(validationerror)
+def handle_validation_error(error):
+    return jsonify({"error": str(error)}), 400
+
+
+@api.before_app_request
+def open_read_scope():
+    db_router.begin_scope(session.get(PRIMARY_UNTIL_KEY, 0.0))
+
+
+@api.after_app_request
+def remember_primary_reads(response):
+    # after a write the session keeps reading from the primary, on any worker, until the window ends
+    scope = db_router.current_scope()
+    if scope is not None and scope.primary_until > session.get(PRIMARY_UNTIL_KEY, 0.0):
+        session[PRIMARY_UNTIL_KEY] = scope.primary_until
+    return response
+
+
+@api.teardown_app_request
+def close_read_scope(error=None):
+    db_router.end_scope()
 
 # ✅ Serve index page only if logged in
-@app.route("/")
+@api.route("/")
 def serve_index():
     if 'username' not in session:
         logger.warning("🔐 Unauthorized access attempt to index page.")
         return redirect("/login.html")
     logger.info("🏠Serving index page for user: %s", session["username"])
-    return send_from_directory(app.static_folder, "index.html")
+    return serve_static("index.html")
 
-# ✅ Serve login page and other static files
-@app.route("/<path:filename>")
+# ✅ Serve login page and other static files, precompressed from memory when possible
+@api.route("/<path:filename>")
 def serve_static(filename):
-    logger.info(f"📄Serving static file: {filename}")
-    return send_from_directory(app.static_folder, filename)
+    response = assets.respond(filename, request) if assets else None
+    if response is not None:
+        return response
+    logger.debug("📄Serving static file: %s", filename)
+    return send_from_directory(current_app.static_folder, filename)
 
 # ✅ Handle login POST request
-@app.route("/login", methods=["POST"])
+@api.route("/login", methods=["POST"])
 def login():
     """
     Login User
@@ -74,16 +173,16 @@ def login():
     username = data.get("username")
     password = data.get("password")
 
-    logger.info(f"Login attempt for user: {username}")
-    if auth_service.validate_user(username, password):
+    logger.info("Login attempt for user: %s", username)
+    if auth_service.validate_user(username, password, request.remote_addr):
         session["username"] = username
-        logger.info(f"User {username} logged in successfully.")
+        logger.info("User %s logged in successfully.", username)
         return jsonify({"message": "Login successful"})
-    logger.warning(f"Invalid login attempt for user: {username}")
+    logger.warning("Invalid login attempt for user: %s", username)
     return jsonify({"error": "Invalid credentials"}), 401
 
 # ✅ Logout clears session
-@app.route("/logout", methods=["POST"])
+@api.route("/logout", methods=["POST"])
 def logout():
     """
     Logout User
@@ -95,33 +194,525 @@ def logout():
         description: Logout successful
     """
     user=session.pop("username", None)
-    logger.info(f"User {user} logged out successfully.")
+    logger.info("User %s logged out successfully.", user)
     return jsonify({"message": "Logged out"})
 
+# ✅ Metrics for Prometheus scraping
+@api.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Application Metrics
+    ---
+    tags:
+      - Monitoring
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Request, query and connection pool metrics in Prometheus text format
+    """
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 # -------------------------
 # ✅ CRUD Operations (protected)
 # -------------------------
 
-@app.route("/catalogues", methods=["GET"])
+@api.route("/catalogues", methods=["GET"])
 def get_all_catalogues():
     """
     Get All Catalogues
     ---
     tags:
       - Catalogue
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        required: false
+        description: >-
+          Comma-separated catalogue ids to fetch in one call. Results keep the
+          requested order; unknown ids come back as {"catalogue_id", "not_found": true}.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size. When given, one page is returned instead of the whole table.
+      - name: after
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor taken from the previous page's next_cursor.
+      - name: sort
+        in: query
+        type: string
+        required: false
+        enum: [catalogue_id, catalogue_name, effective_from, effective_to, status]
+        description: Defaults to catalogue_name with a name filter, effective_from with a
+          date filter, and catalogue_id otherwise.
+      - name: order
+        in: query
+        type: string
+        required: false
+        enum: [asc, desc]
+      - name: status
+        in: query
+        type: string
+        required: false
+        enum: [active, inactive, upcoming, expired]
+      - name: effective_on
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Only catalogues effective on this date.
+      - name: from
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Only catalogues still effective on or after this date.
+      - name: to
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Only catalogues already effective on or before this date.
+      - name: name
+        in: query
+        type: string
+        required: false
+        description: Catalogue name prefix.
     responses:
       200:
-        description: List of all catalogues
+        description: List of all catalogues, or one page with its next_cursor
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Invalid paging parameters
       401:
         description: Unauthorized
     """
     if 'username' in session:
         logger.warning("Unauthorized access attempt to get all catalogues.")
         return jsonify({"error": "Unauthorized"}), 401
+    args = request.args
+    if "ids" in args:
+        try:
+            ids = [int(part) for part in args["ids"].split(",") if part.strip()]
+        except ValueError:
+            raise validationerror("ids must be a comma-separated list of integers")
+        if not ids:
+            raise validationerror("ids must not be empty")
+        if len(ids) > MAX_IDS_PER_REQUEST:
+            raise validationerror(f"At most {MAX_IDS_PER_REQUEST} ids per request")
+        logger.info("Fetching %s catalogues by ID.", len(ids))
+
+        version_info = service.get_data_version()
+
+        def build():
+            rows = service.get_catalogues_by_ids(ids, _version(version_info))
+            return jsonify({"items": [
+                row if row is not None else {"catalogue_id": catalogue_id, "not_found": True}
+                for catalogue_id, row in zip(ids, rows)
+            ]})
+
+        return conditional_response(version_info, request.full_path, build)
+    if any(key in args for key in ("limit", "after", "sort", "order") + FILTER_KEYS):
+        try:
+            limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise validationerror("limit must be an integer")
+        order = args.get("order", "asc").lower()
+        if order not in ("asc", "desc"):
+            raise validationerror("order must be 'asc' or 'desc'")
+        filters = {key: args[key] for key in FILTER_KEYS if args.get(key)}
+        for key in ("effective_on", "from", "to"):
+            if key in filters:
+                filters[key] = parse_date(filters[key], key)
+        logger.info("Fetching catalogue page (limit=%s, filters=%s).", limit, filters)
+        return conditional_response(service.get_data_version(), request.full_path, lambda: jsonify(
+            service.get_catalogues_page(
+                limit=limit,
+                after=args.get("after"),
+                sort_by=args.get("sort"),
+                descending=order == "desc",
+                filters=filters
+            )
+        ))
     logger.info("Fetching all catalogues.")
-    return jsonify(service.get_all_catalogues())
+    version_info = service.get_data_version()
+    return conditional_response(version_info, request.full_path,
+                                lambda: jsonify(service.get_all_catalogues(_version(version_info))))
+
+@api.route("/catalogues/export", methods=["GET"])
+def export_catalogues():
+    """
+    Export All Catalogues
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [ndjson, json, csv]
+        default: ndjson
+    produces:
+      - application/x-ndjson
+      - application/json
+      - text/csv
+    responses:
+      200:
+        description: Every catalogue, streamed in the requested format
+      400:
+        description: Unknown format
+      401:
+        description: Unauthorized
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to export catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise validationerror(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    encode, mimetype, extension = EXPORT_FORMATS[fmt]
+    logger.info("Exporting catalogues as %s.", fmt)
+    stream = service.iter_catalogue_chunks(replica=True)
+    response = Response(encode(stream, CATALOGUE_COLUMNS), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=catalogues.{extension}"
+    response.call_on_close(stream.close)
+    return response
+
+def _search_limit(default):
+    try:
+        limit = int(request.args.get("limit", default))
+    except ValueError:
+        raise validationerror("limit must be an integer")
+    max_results = search_settings.getint("max_results", 100)
+    if not 1 <= limit <= max_results:
+        raise validationerror(f"limit must be between 1 and {max_results}")
+    return limit
+
+def _caught_up_search_index():
+    """The search index, brought up to the data version; returns the version too."""
+    # writes by other workers, the importer or plain SQL reach the index only through the change log
+    version = _version(service.get_data_version())
+    search_index.catch_up(version)
+    return search_index, version
+
+@api.route("/catalogues/search", methods=["GET"])
+def search_catalogues():
+    """
+    Search Catalogues
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to look for in catalogue names and descriptions. Catalogues
+          matching any word are returned, best match first; name matches rank higher.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 20
+    responses:
+      200:
+        description: Matching catalogues with their relevance score
+      400:
+        description: Missing query or invalid limit
+      401:
+        description: Unauthorized
+      503:
+        description: Search is disabled
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to search catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    if not search_settings.getboolean("enabled", True):
+        return jsonify({"error": "Search is disabled"}), 503
+    query = request.args.get("q", "").strip()
+    if not query:
+        raise validationerror("q is required")
+    limit = _search_limit(20)
+    logger.debug("Searching catalogues for %r (limit=%s).", query, limit)
+    index, version = _caught_up_search_index()
+    hits = index.search(query, limit)
+    rows = service.get_catalogues_by_ids([catalogue_id for catalogue_id, _ in hits], version)
+    items = [dict(row.to_dict(), score=score) for (_, score), row in zip(hits, rows) if row is not None]
+    return jsonify({"query": query, "items": items})
+
+@api.route("/catalogues/suggest", methods=["GET"])
+def suggest_catalogues():
+    """
+    Suggest Catalogue Names
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: prefix
+        in: query
+        type: string
+        required: true
+        description: Start of a catalogue name, matched case-insensitively.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 10
+    responses:
+      200:
+        description: Catalogue ids and names starting with the prefix, in name order
+      400:
+        description: Missing prefix or invalid limit
+      401:
+        description: Unauthorized
+      503:
+        description: Search is disabled
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to suggest catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    if not search_settings.getboolean("enabled", True):
+        return jsonify({"error": "Search is disabled"}), 503
+    prefix = request.args.get("prefix", "")
+    if not prefix.strip():
+        raise validationerror("prefix is required")
+    limit = _search_limit(search_settings.getint("suggest_limit", 10))
+    return jsonify({"prefix": prefix, "suggestions": _caught_up_search_index()[0].suggest(prefix, limit)})
+
+@api.route("/catalogues/active", methods=["GET"])
+def get_active_catalogues():
+    """
+    Get Catalogues Effective on a Date
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: "on"
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Catalogues effective on this date (effective_from <= on <= effective_to).
+          Defaults to today.
+      - name: from
+        in: query
+        type: string
+        format: date
+        required: false
+        description: With to, catalogues effective on any day of the window instead.
+      - name: to
+        in: query
+        type: string
+        format: date
+        required: false
+      - name: limit
+        in: query
+        type: integer
+        required: false
+      - name: after
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor taken from the previous page's next_cursor.
+    responses:
+      200:
+        description: One page of matching catalogues in catalogue_id order, with the total count
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Invalid dates or paging parameters
+      401:
+        description: Unauthorized
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to get active catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    args = request.args
+    if "from" in args or "to" in args:
+        if "on" in args:
+            raise validationerror("Use either on or from/to, not both")
+        if not args.get("from") or not args.get("to"):
+            raise validationerror("from and to must be given together")
+        low, high = parse_date(args["from"], "from"), parse_date(args["to"], "to")
+        if low > high:
+            raise validationerror("from must not be after to")
+        filters = {"from": low, "to": high}
+    else:
+        low = high = parse_date(args["on"], "on") if args.get("on") else date.today()
+        filters = {"effective_on": low}
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise validationerror("limit must be an integer")
+    logger.debug("Fetching catalogues effective %s..%s (limit=%s).", low, high, limit)
+
+    version_info = service.get_data_version()
+
+    def build():
+        # the index only answers once it reflects the version the ETag is made from
+        if effective_settings.getboolean("enabled", True) and version_info is not None \
+                and effective_index.catch_up(version_info[0]):
+            return jsonify(service.get_indexed_page(
+                lambda after_id, fetch: effective_index.page(low, high, fetch, after_id),
+                limit=limit, after=args.get("after"), version=version_info[0]))
+        return jsonify(service.get_catalogues_page(limit=limit, after=args.get("after"),
+                                                   sort_by="catalogue_id", filters=filters))
+
+    # the resolved dates are part of the variant, so "today" changes the ETag at midnight
+    return conditional_response(version_info, f"{request.full_path}|{low}|{high}", build)
+
+@api.route("/catalogues/stats", methods=["GET"])
+def get_catalogue_stats():
+    """
+    Get Catalogue Statistics
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: within_days
+        in: query
+        type: integer
+        required: false
+        description: Window, from today, of the upcoming and expiring counts. Defaults to 30.
+    responses:
+      200:
+        description: >-
+          Counts per status, catalogues starting (upcoming) or ending (expiring)
+          within the window, and counts by effective_from month
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Invalid within_days
+      401:
+        description: Unauthorized
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to get catalogue stats.")
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        within_days = int(request.args.get("within_days", stats_settings.getint("within_days", 30)))
+    except ValueError:
+        raise validationerror("within_days must be an integer")
+    max_days = stats_settings.getint("max_within_days", 366)
+    if not 0 <= within_days <= max_days:
+        raise validationerror(f"within_days must be between 0 and {max_days}")
+    today = date.today()
+
+    def build():
+        if not stats_settings.getboolean("enabled", True):
+            return jsonify(summarize_counts(service.get_catalogue_counts(), today, within_days))
+        return jsonify(catalogue_stats.summary(today, within_days))
+
+    return conditional_response(service.get_data_version(), f"{request.full_path}|{today}", build)
+
+def _resync_response(head):
+    return jsonify({"error": "Change token is older than the change log; read the catalogues again",
+                    "resync": True, "next": format_token(head)}), 410
+
+def _change_stream(feed, since, limit, keepalive, duration):
+    """Server-Sent Events: one ``change`` event per change, its token as the event id."""
+    yield f"retry: {int(keepalive * 1000)}\n\n"
+    deadline = time.monotonic() + duration
+    while not feed.closed:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        try:
+            page = feed.wait(since, limit, min(keepalive, remaining))
+        except ChangesExpired as e:
+            yield f"event: resync\ndata: {dumps({'resync': True, 'next': format_token(e.head)})}\n\n"
+            return
+        if not page["changes"]:
+            yield ": keep-alive\n\n"
+            continue
+        for change in page["changes"]:
+            yield f"id: {change['token']}\nevent: change\ndata: {dumps(change)}\n\n"
+        since = parse_token(page["next"])
+
+@api.route("/catalogues/changes", methods=["GET"])
+def get_catalogue_changes():
+    """
+    Get Catalogue Changes
+    ---
+    tags:
+      - Catalogue
+    description: >-
+      Incremental sync. Call without since to get the current token, read
+      the catalogues in full, then call with since=next to receive each
+      catalogue written after that token once, with its current row
+      (catalogue is null once deleted). Send Accept text/event-stream to
+      receive the changes as Server-Sent Events instead; an EventSource
+      resumes with Last-Event-ID when it reconnects.
+    parameters:
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: Token from a previous response's next (or an event id).
+      - name: limit
+        in: query
+        type: integer
+        required: false
+      - name: wait
+        in: query
+        type: integer
+        required: false
+        description: Seconds to wait for a change when there is none yet (long-poll). Defaults to 0.
+    responses:
+      200:
+        description: The changes after since, the token to continue from (next) and whether more are waiting
+      400:
+        description: Invalid token or parameters
+      401:
+        description: Unauthorized
+      410:
+        description: >-
+          The token is older than the change log's retention; read the
+          catalogues in full and continue from the next token in the body
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to get catalogue changes.")
+        return jsonify({"error": "Unauthorized"}), 401
+    args = request.args
+    try:
+        limit = int(args.get("limit", change_settings.getint("default_limit", 500)))
+        wait = float(args.get("wait", 0))
+    except ValueError:
+        raise validationerror("limit and wait must be numbers")
+    max_limit, max_wait = change_settings.getint("max_limit", 1000), change_settings.getfloat("max_wait", 30.0)
+    if not 1 <= limit <= max_limit:
+        raise validationerror(f"limit must be between 1 and {max_limit}")
+    if not 0 <= wait <= max_wait:
+        raise validationerror(f"wait must be between 0 and {max_wait:g}")
+    token = args.get("since") or request.headers.get("Last-Event-ID")
+    stream = request.accept_mimetypes.best_match(["application/json", "text/event-stream"]) == "text/event-stream"
+    feed = change_feed._get_current_object()
+    if token is None:
+        if not stream:
+            return jsonify({"changes": [], "next": feed.head(), "more": False})
+        token = feed.head()
+    since = parse_token(token)
+    if stream:
+        events = _change_stream(feed, since, limit, change_settings.getfloat("keepalive", 15.0),
+                                change_settings.getfloat("stream_seconds", 300.0))
+        response = Response(events, mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        # ask proxies not to buffer the stream
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+    try:
+        page = feed.wait(since, limit, wait) if wait else feed.read(since, limit)
+    except ChangesExpired as e:
+        return _resync_response(e.head)
+    return jsonify(page)
 
-@app.route("/catalogues/<int:catalogue_id>", methods=["GET"])
+@api.route("/catalogues/<int:catalogue_id>", methods=["GET"])
 def get_catalogue_by_id(catalogue_id):
     """
     Get Catalogue by ID
@@ -136,22 +727,30 @@ def get_catalogue_by_id(catalogue_id):
     responses:
       200:
         description: Catalogue data
+      304:
+        description: Not modified since the ETag in If-None-Match
       401:
         description: Unauthorized
       404:
         description: Not found
     """
     if 'username' in session:
-        logger.warning(f"Unauthorized access attempt to get catalogue with ID: {catalogue_id}")
+        logger.warning("Unauthorized access attempt to get catalogue with ID: %s", catalogue_id)
         return jsonify({"error": "Unauthorized"}), 401
-    logger.info(f"Fetching catalogue with ID: {catalogue_id}")
-    result = service.get_catalogue_by_id(catalogue_id)
-    if result:
-        return jsonify(result)
-    logger.error(f"Catalogue with ID {catalogue_id} not found.")
-    return jsonify({"error": "Catalogue not found"}), 404
+    logger.debug("Fetching catalogue with ID: %s", catalogue_id)
+
+    version_info = service.get_data_version()
+
+    def build():
+        result = service.get_catalogue_by_id(catalogue_id, _version(version_info))
+        if result:
+            return jsonify(result)
+        logger.error("Catalogue with ID %s not found.", catalogue_id)
+        return jsonify({"error": "Catalogue not found"}), 404
+
+    return conditional_response(version_info, request.path, build)
 
-@app.route("/catalogues", methods=["POST"])
+@api.route("/catalogues", methods=["POST"])
 def create_catalogue():
     """
     Create a Catalogue
@@ -178,10 +777,12 @@ def create_catalogue():
               example: 2025-07-31
             status:
               type: string
-              enum: [Active, Inactive]
+              enum: [active, inactive, upcoming, expired]
     responses:
       201:
         description: Catalogue created
+      400:
+        description: Invalid payload; the error lists every problem
       401:
         description: Unauthorized
     """
@@ -189,12 +790,199 @@ def create_catalogue():
         logger.warning("Unauthorized access attempt to create catalogue.")
         return jsonify({"error": "Unauthorized"}), 401
     data = request.get_json()
-    logger.info("Creating a new catalogue with data: %s", data)
-    c = catalogue(**data)
+    logger.info("Creating a new catalogue.")
+    logger.debug("Create payload: %s", data)
+    c = catalogue(**catalogue_validator.validate(data))
     service.create_catalogue(c)
     return jsonify({"message": "Catalogue created"}), 201
 
-@app.route("/catalogues/<int:catalogue_id>", methods=["PUT"])
+# -------------------------
+# ✅ Bulk operations (protected)
+# -------------------------
+
+def _bulk_payload(key):
+    """Return ``(items, atomic)`` from a bulk request body."""
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        raise validationerror(f"'{key}' must be a non-empty list")
+    if len(items) > bulk_settings.getint("max_items", 50000):
+        raise validationerror(f"At most {bulk_settings.getint('max_items', 50000)} items per request")
+    mode = data.get("mode", "atomic")
+    if mode not in ("atomic", "best_effort"):
+        raise validationerror("mode must be 'atomic' or 'best_effort'")
+    return items, mode == "atomic"
+
+def _bulk_response(total, valid_indices, results, errors, atomic):
+    """Merge service results with payload errors into one per-item list."""
+    merged = [None] * total
+    for index, message in errors.items():
+        merged[index] = {"status": "error", "error": message}
+    if atomic and errors:
+        for index in valid_indices:
+            merged[index] = {"status": "rolled_back"}
+    else:
+        for index, result in zip(valid_indices, results):
+            merged[index] = result
+    for index, result in enumerate(merged):
+        result["index"] = index
+    failed = sum(1 for r in merged if r["status"] in ("error", "rolled_back", "not_found"))
+    committed = not any(r["status"] == "rolled_back" for r in merged) and not (atomic and errors)
+    body = {"results": merged, "succeeded": total - failed, "failed": failed, "committed": committed}
+    status = 200 if not failed else (207 if committed else 400)
+    return jsonify(body), status
+
+@api.route("/catalogues/bulk", methods=["POST"])
+def bulk_create_catalogues():
+    """
+    Create Catalogues in Bulk
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          properties:
+            items:
+              type: array
+              items:
+                type: object
+            mode:
+              type: string
+              enum: [atomic, best_effort]
+              default: atomic
+    responses:
+      200:
+        description: Every item was created
+      207:
+        description: Some items failed; see per-item results
+      400:
+        description: Invalid payload, or an atomic request was rolled back
+      401:
+        description: Unauthorized
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to bulk create catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    items, atomic = _bulk_payload("items")
+    valid, errors = catalogue_validator.validate_many(items)
+    indices = [index for index, _ in valid]
+    dtos = [catalogue(**clean) for _, clean in valid]
+    logger.info("Bulk creating %s catalogues (atomic=%s).", len(items), atomic)
+    results = []
+    if dtos and not (atomic and errors):
+        results = service.bulk_create_catalogues(dtos, atomic=atomic,
+                                                 batch_size=bulk_settings.getint("batch_size", 1000))
+    return _bulk_response(len(items), indices, results, errors, atomic)
+
+@api.route("/catalogues/bulk", methods=["PUT"])
+def bulk_update_catalogues():
+    """
+    Update Catalogues in Bulk
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          properties:
+            items:
+              type: array
+              description: Catalogue objects, each including its catalogue_id
+              items:
+                type: object
+            mode:
+              type: string
+              enum: [atomic, best_effort]
+              default: atomic
+    responses:
+      200:
+        description: Every item was updated
+      207:
+        description: Some items failed or were not found; see per-item results
+      400:
+        description: Invalid payload, or an atomic request was rolled back
+      401:
+        description: Unauthorized
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to bulk update catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    items, atomic = _bulk_payload("items")
+    ids, fields, errors = [], [], {}
+    for index, item in enumerate(items):
+        catalogue_id = item.get("catalogue_id") if isinstance(item, dict) else None
+        ids.append(catalogue_id)
+        if isinstance(catalogue_id, int) and not isinstance(catalogue_id, bool):
+            fields.append({key: value for key, value in item.items() if key != "catalogue_id"})
+            continue
+        errors[index] = "catalogue_id must be an integer" if isinstance(item, dict) else "item must be an object"
+        fields.append(None)
+    valid, invalid = catalogue_validator.validate_many(fields)
+    errors.update((index, message) for index, message in invalid.items() if index not in errors)
+    indices = [index for index, _ in valid]
+    updates = [(ids[index], catalogue(**clean)) for index, clean in valid]
+    logger.info("Bulk updating %s catalogues (atomic=%s).", len(items), atomic)
+    results = []
+    if updates and not (atomic and errors):
+        results = service.bulk_update_catalogues(updates, atomic=atomic,
+                                                 batch_size=bulk_settings.getint("batch_size", 1000))
+    return _bulk_response(len(items), indices, results, errors, atomic)
+
+@api.route("/catalogues/bulk", methods=["DELETE"])
+def bulk_delete_catalogues():
+    """
+    Delete Catalogues in Bulk
+    ---
+    tags:
+      - Catalogue
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          properties:
+            ids:
+              type: array
+              items:
+                type: integer
+            mode:
+              type: string
+              enum: [atomic, best_effort]
+              default: atomic
+    responses:
+      200:
+        description: Every id was deleted
+      207:
+        description: Some ids failed or were not found; see per-item results
+      400:
+        description: Invalid payload, or an atomic request was rolled back
+      401:
+        description: Unauthorized
+    """
+    if 'username' in session:
+        logger.warning("Unauthorized access attempt to bulk delete catalogues.")
+        return jsonify({"error": "Unauthorized"}), 401
+    ids, atomic = _bulk_payload("ids")
+    valid, indices, errors = [], [], {}
+    for index, catalogue_id in enumerate(ids):
+        if isinstance(catalogue_id, int) and not isinstance(catalogue_id, bool):
+            valid.append(catalogue_id)
+            indices.append(index)
+        else:
+            errors[index] = "id must be an integer"
+    logger.info("Bulk deleting %s catalogues (atomic=%s).", len(ids), atomic)
+    results = []
+    if valid and not (atomic and errors):
+        results = service.bulk_delete_catalogues(valid, atomic=atomic,
+                                                 batch_size=bulk_settings.getint("batch_size", 1000))
+    return _bulk_response(len(ids), indices, results, errors, atomic)
+
+@api.route("/catalogues/<int:catalogue_id>", methods=["PUT"])
 def update_catalogue(catalogue_id):
     """
     Update a Catalogue
@@ -223,22 +1011,26 @@ def update_catalogue(catalogue_id):
               format: date
             status:
               type: string
+              enum: [active, inactive, upcoming, expired]
     responses:
       200:
         description: Catalogue updated
+      400:
+        description: Invalid payload; the error lists every problem
       401:
         description: Unauthorized
     """
     if 'username' in session:
-        logger.warning(f"Unauthorized access attempt to update catalogue with ID: {catalogue_id}")
+        logger.warning("Unauthorized access attempt to update catalogue with ID: %s", catalogue_id)
         return jsonify({"error": "Unauthorized"}), 401
     data = request.get_json()
-    logger.info(f"Updating catalogue with ID: {catalogue_id} with data: {data}")
-    c = catalogue(**data)
+    logger.info("Updating catalogue with ID: %s", catalogue_id)
+    logger.debug("Update payload for catalogue %s: %s", catalogue_id, data)
+    c = catalogue(**catalogue_validator.validate(data))
     service.update_catalogue_by_id(catalogue_id, c)
     return jsonify({"message": "Catalogue updated"})
 
-@app.route("/catalogues/<int:catalogue_id>", methods=["DELETE"])
+@api.route("/catalogues/<int:catalogue_id>", methods=["DELETE"])
 def delete_catalogue(catalogue_id):
     """
     Delete a Catalogue
@@ -259,21 +1051,18 @@ def delete_catalogue(catalogue_id):
         description: Catalogue not found
     """
     if 'username' in session:
-        logger.warning(f"Unauthorized access attempt to delete catalogue with ID: {catalogue_id}")
+        logger.warning("Unauthorized access attempt to delete catalogue with ID: %s", catalogue_id)
         return jsonify({"error": "Unauthorized"}), 401
-    logger.info(f"Deleting catalogue with ID: {catalogue_id}")
+    logger.info("Deleting catalogue with ID: %s", catalogue_id)
     if service.delete_catalogue_by_id(catalogue_id):
         return jsonify({"message": "Catalogue deleted"})
-    logger.error(f"Catalogue with ID {catalogue_id} not found for deletion.")
+    logger.error("Catalogue with ID %s not found for deletion.", catalogue_id)
     return jsonify({"error": "Catalogue not found"}), 404
 
-if __name__ == '__main__':
-    logger.info("Starting the Flask server...")
-    app.run(debug=True, host='127.0.0.1', port=5000)
-
-
-
-
-
-
+app = create_app()
+compressor = app.extensions["compression"]
 
+if __name__ == '__main__':
+    from launcher import main
+    # hand over this module's app: "from app import app" would import and build it a second time
+    main(app=app)
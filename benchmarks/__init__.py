@@ -0,0 +1,3 @@
+"""
+Benchmarks that run against a local SQLite stand-in for MySQL.
+"""
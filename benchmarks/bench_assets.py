@@ -0,0 +1,93 @@
+"""
+Benchmark first and repeat page loads of the frontend.
+
+Plays a browser with an HTTP cache against the app's test client: load a
+page, then every stylesheet and script it references, honouring
+``Cache-Control`` (immutable files are reused without a request, others
+are revalidated with ``If-None-Match``). Runs with the asset pipeline and
+with plain ``send_from_directory`` serving, and reports requests and
+bytes transferred for the first and the repeat load of each page.
+
+Usage::
+
+    python -m benchmarks.bench_assets
+"""
+
+import argparse
+import json
+import re
+
+REFERENCE = re.compile(r'\b(?:href|src)=["\']([^"\'?#]+\.(?:css|js))["\']')
+HEADERS = {"Accept-Encoding": "gzip, br"}
+
+
+class Browser:
+    """The parts of a browser cache that decide whether to send a request."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.cache = {}
+
+    def get(self, path: str, stats: dict) -> bytes:
+        cached = self.cache.get(path)
+        if cached is not None and "immutable" in cached["cache_control"]:
+            return cached["body"]
+        headers = dict(HEADERS)
+        if cached is not None and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        response = self.client.get(path, headers=headers)
+        stats["requests"] += 1
+        stats["bytes"] += len(response.data)
+        if response.status_code == 304:
+            return cached["body"]
+        body = response.get_data()
+        if response.headers.get("Content-Encoding") == "gzip":
+            import gzip
+            body = gzip.decompress(body)
+        elif response.headers.get("Content-Encoding") == "br":
+            import brotli
+            body = brotli.decompress(body)
+        self.cache[path] = {"body": body, "etag": response.headers.get("ETag"),
+                            "cache_control": response.headers.get("Cache-Control", "")}
+        response.close()
+        return body
+
+    def load(self, page: str) -> dict:
+        stats = {"requests": 0, "bytes": 0}
+        html = self.get(page, stats).decode("utf-8")
+        for reference in REFERENCE.findall(html):
+            self.get("/" + reference.lstrip("/"), stats)
+        return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", default=["/login.html", "/index.html"])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    import app as app_module
+
+    pipeline = app_module.assets
+    results = []
+    print(f"{'serving':>9} {'page':>12} {'first req':>10} {'first B':>8} {'repeat req':>11} {'repeat B':>9}")
+    for serving, assets in (("pipeline", pipeline), ("plain", None)):
+        app_module.assets = assets
+        browser = Browser(app_module.app.test_client())
+        for page in args.pages:
+            first, repeat = browser.load(page), browser.load(page)
+            results.append({"serving": serving, "page": page, "first": first, "repeat": repeat})
+            print(f"{serving:>9} {page:>12} {first['requests']:>10} {first['bytes']:>8} "
+                  f"{repeat['requests']:>11} {repeat['bytes']:>9}")
+    app_module.assets = pipeline
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
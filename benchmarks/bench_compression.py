@@ -0,0 +1,94 @@
+"""
+Benchmark response compression levels against bytes sent.
+
+Seeds the SQLite stand-in, then fetches one ``GET /catalogues`` page and
+the streamed NDJSON export with compression off and at each gzip level
+(and brotli quality, when the package is installed), reporting bytes on
+the wire, ratio and the compressor's CPU time per response.
+
+Usage::
+
+    python -m benchmarks.bench_compression --rows 20000 --levels 1 6 9
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+PATHS = {"list": "/catalogues?limit=1000", "ndjson": "/catalogues/export?format=ndjson"}
+
+
+def fetch(client, path: str, encoding: str | None) -> tuple[int, float]:
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    start = time.perf_counter()
+    response = client.get(path, headers=headers, buffered=False)
+    size = sum(len(block) for block in response.response)
+    response.close()
+    return size, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 6, 9])
+    parser.add_argument("--qualities", type=int, nargs="+", default=[1, 4, 6])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.stand_in import connection_factory, create_database, seed_catalogues
+    from util import compression, metrics
+    from util.db_connection import configure_pool
+
+    db_path = create_database(os.path.join(tempfile.mkdtemp(), "catalogue.sqlite3"))
+    seed_catalogues(db_path, args.rows)
+    configure_pool(connection_factory(db_path), min_size=1, max_size=2)
+
+    import app as app_module
+    compressor, client = app_module.compressor, app_module.app.test_client()
+    metrics.set_enabled(True)
+
+    runs = [("identity", None)] + [("gzip", level) for level in args.levels]
+    if compression.brotli is not None:
+        runs += [("br", quality) for quality in args.qualities]
+
+    def compress_cpu() -> float:
+        # sum slot of every COMPRESSION_CPU series
+        return sum(row[-2] for row in metrics.COMPRESSION_CPU.collect().values())
+
+    results = []
+    print(f"{'path':>7} {'encoding':>9} {'level':>6} {'bytes':>10} {'ratio':>6} {'cpu ms':>8} {'total ms':>9}")
+    for name, path in PATHS.items():
+        plain = None
+        for encoding, level in runs:
+            if encoding == "gzip":
+                compressor.gzip_level = level
+            elif encoding == "br":
+                compressor.brotli_quality = level
+            header = None if encoding == "identity" else encoding
+            cpu_before = compress_cpu()
+            timings = []
+            for _ in range(args.repeat):
+                size, elapsed = fetch(client, path, header)
+                timings.append(elapsed)
+            cpu = (compress_cpu() - cpu_before) / args.repeat
+            plain = plain or size
+            row = {"path": name, "encoding": encoding, "level": level, "bytes": size,
+                   "ratio": round(plain / size, 2), "cpu_ms": round(cpu * 1000, 1),
+                   "total_ms": round(min(timings) * 1000, 1)}
+            results.append(row)
+            print(f"{name:>7} {encoding:>9} {str(level or '-'):>6} {size:>10} {row['ratio']:>6} "
+                  f"{row['cpu_ms']:>8} {row['total_ms']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark peak RSS and time-to-first-byte of catalogue exports.
+
+Compares the streamed ``/catalogues/export`` formats with the buffered
+``GET /catalogues`` list at several table sizes, against the SQLite stand-in.
+Each measurement runs in a fresh subprocess so peak RSS is not shared.
+
+Usage::
+
+    python -m benchmarks.bench_export --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    "list": "/catalogues",
+    "ndjson": "/catalogues/export?format=ndjson",
+    "json": "/catalogues/export?format=json",
+    "csv": "/catalogues/export?format=csv",
+}
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(db_path: str, mode: str) -> dict:
+    """Run one request in this process and report timings and RSS."""
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.stand_in import connection_factory
+    from util.db_connection import configure_pool
+    configure_pool(connection_factory(db_path), min_size=1, max_size=2)
+
+    from app import app
+    client = app.test_client()
+    baseline = _rss_mb()
+
+    start = time.perf_counter()
+    response = client.get(MODES[mode], buffered=False)
+    body = iter(response.response)
+    first = next(body, b"")
+    ttfb = time.perf_counter() - start
+    size = len(first)
+    for block in body:
+        size += len(block)
+    total = time.perf_counter() - start
+    response.close()
+    return {
+        "mode": mode,
+        "status": response.status_code,
+        "ttfb_ms": round(ttfb * 1000, 2),
+        "total_ms": round(total * 1000, 2),
+        "bytes": size,
+        "rss_baseline_mb": round(baseline, 1),
+        "rss_peak_mb": round(_rss_mb(), 1),
+        "rss_growth_mb": round(_rss_mb() - baseline, 1),
+    }
+
+
+def _run_child(db_path: str, mode: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_export", "--child", db_path, mode],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument("--list-max-rows", type=int, default=1_000_000,
+                        help="skip the buffered list above this many rows")
+    parser.add_argument("--output", help="also write results as JSON to this file")
+    parser.add_argument("--child", nargs=2, metavar=("DB", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        return
+
+    from benchmarks.stand_in import create_database, seed_catalogues
+
+    results = []
+    print(f"{'rows':>9} {'mode':>7} {'ttfb ms':>9} {'total ms':>9} {'MB out':>8} {'RSS +MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            db_path = create_database(os.path.join(tmp, f"catalogue-{rows}.sqlite3"))
+            seed_catalogues(db_path, rows)
+            for mode in args.modes:
+                if mode == "list" and rows > args.list_max_rows:
+                    continue
+                result = _run_child(db_path, mode)
+                result["rows"] = rows
+                results.append(result)
+                print(f"{rows:>9} {mode:>7} {result['ttfb_ms']:>9} {result['total_ms']:>9} "
+                      f"{result['bytes'] / 1e6:>8.1f} {result['rss_growth_mb']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
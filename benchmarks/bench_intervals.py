@@ -0,0 +1,123 @@
+"""
+Benchmark "catalogues effective on D" through the interval index and SQL.
+
+Seeds the SQLite stand-in (with the filter indexes from migrations/), builds
+the EffectiveDateIndex through catalogueService, then times for random
+dates:
+
+* ``index_ids``: every matching id listed from the tree;
+* ``index_count`` / ``sql_count``: the number of matches, from the tree or
+  as ``SELECT COUNT(*)`` with the GET /catalogues date filter;
+* ``index_page`` / ``sql_page``: the first page of rows in catalogue_id
+  order, as served by /catalogues/active with and without the index;
+* ``sql_page_by_date``: the first page sorted by effective_from, the
+  order GET /catalogues picks so the index supplies it.
+
+Usage::
+
+    python -m benchmarks.bench_intervals --rows 1000000 --queries 200
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_load import percentile
+
+
+def _timed(fn, days) -> list[float]:
+    latencies = []
+    for day in days:
+        start = time.perf_counter()
+        fn(day)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.stand_in import connection_factory, create_database, seed_catalogues
+    from service.catalogue_service import CATALOGUE_COLUMNS, catalogueService
+    from util.db_connection import configure_pool, get_connection
+    from util.intervals import EffectiveDateIndex
+
+    rng = random.Random(args.seed)
+    # seeded windows start in 2024-2025 and last up to a year
+    days = [date(2024, 1, 1) + timedelta(days=rng.randrange(0, 1095)) for _ in range(args.queries)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+        seed_catalogues(db_path, args.rows, args.seed)
+        db = sqlite3.connect(db_path)
+        db.execute("ANALYZE")
+        db.commit()
+        db.close()
+        configure_pool(connection_factory(db_path), min_size=1, max_size=2)
+        service = catalogueService()
+        index = EffectiveDateIndex(service.iter_catalogue_chunks, CATALOGUE_COLUMNS)
+
+        start = time.perf_counter()
+        index.build()
+        build_seconds = time.perf_counter() - start
+
+        def sql_count(day):
+            conn = get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT COUNT(*) FROM catalogue WHERE effective_from <= %s AND effective_to >= %s",
+                               (day, day))
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+                conn.close()
+
+        operations = {
+            "index_ids": lambda day: len(index.effective_on(day)),
+            "index_count": lambda day: index.count(day, day),
+            "sql_count": sql_count,
+            "index_page": lambda day: service.get_indexed_page(
+                lambda after_id, fetch: index.page(day, day, fetch, after_id), limit=args.limit),
+            "sql_page": lambda day: service.get_catalogues_page(limit=args.limit, sort_by="catalogue_id",
+                                                                filters={"effective_on": day}),
+            "sql_page_by_date": lambda day: service.get_catalogues_page(limit=args.limit,
+                                                                        filters={"effective_on": day}),
+        }
+        matches = sum(len(index.effective_on(day)) for day in days) / len(days)
+        for name, operation in operations.items():
+            latencies = _timed(operation, days)
+            results.append({
+                "operation": name,
+                "p50_ms": round(percentile(latencies, 0.50), 3),
+                "p95_ms": round(percentile(latencies, 0.95), 3),
+                "p99_ms": round(percentile(latencies, 0.99), 3),
+            })
+
+    print(f"rows={args.rows} build={build_seconds:.1f}s mean matches per date={matches:.0f}")
+    print(f"{'operation':>17} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(f"{result['operation']:>17} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"rows": args.rows, "build_seconds": round(build_seconds, 2),
+                       "mean_matches": round(matches), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
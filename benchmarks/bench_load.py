@@ -0,0 +1,289 @@
+"""
+Load test every endpoint through a real WSGI server.
+
+Seeds a SQLite stand-in database, starts ``app`` under werkzeug's threaded
+server in a subprocess and drives each scenario at the requested
+concurrency levels from keep-alive HTTP clients. Each measurement is
+repeated ``--repeat`` times and the median of each figure is kept.
+Throughput, p50/p95/p99 latency and error counts are printed and can be
+written to JSON; with ``--compare`` the run fails when it regresses
+against a baseline file. Latencies depend on the machine, so only
+compare against a baseline written with ``--output`` on the same runner
+(e.g. earlier in the same CI job, from the base branch). p95 gets its own,
+wider tolerance, as tail latency varies more between runs than
+throughput. Everything runs on localhost, so it works in CI without
+network access.
+
+Usage::
+
+    python -m benchmarks.bench_load --rows 10000 --concurrency 1 8 --output baseline.json
+    python -m benchmarks.bench_load --compare baseline.json --threshold 0.2 --p95-threshold 0.5
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+USERS = [("bench%d" % i, "secret%d" % i) for i in range(50)]
+
+BODY = {
+    "catalogue_name": "Load",
+    "catalogue_description": "Created by the load benchmark",
+    "effective_from": "2025-01-01",
+    "effective_to": "2025-12-31",
+    "status": "active",
+}
+
+
+class Scenario:
+    """One endpoint under test; ``request`` returns ``(method, path, body)``."""
+
+    def __init__(self, name: str, request) -> None:
+        self.name = name
+        self.request = request
+
+
+def build_scenarios(rows: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    # GET/PUT use the lower half; each DELETE removes a different row from the top
+    delete_ids = itertools.count(rows, -1)
+
+    def random_id():
+        with rng_lock:
+            return rng.randint(1, max(1, rows // 2))
+
+    def login():
+        username, password = USERS[random_id() % len(USERS)]
+        return "POST", "/login", {"username": username, "password": password}
+
+    return {scenario.name: scenario for scenario in (
+        Scenario("login", login),
+        Scenario("list", lambda: ("GET", "/catalogues", None)),
+        Scenario("page", lambda: ("GET", "/catalogues?limit=20", None)),
+        Scenario("get", lambda: ("GET", f"/catalogues/{random_id()}", None)),
+        Scenario("create", lambda: ("POST", "/catalogues", BODY)),
+        Scenario("update", lambda: ("PUT", f"/catalogues/{random_id()}", BODY)),
+        Scenario("delete", lambda: ("DELETE", f"/catalogues/{next(delete_ids)}", None)),
+    )}
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_scenario(port: int, scenario: Scenario, concurrency: int, requests: int) -> dict:
+    """Send ``requests`` requests from ``concurrency`` keep-alive clients."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = itertools.count(requests, -1)
+
+    def worker():
+        nonlocal errors
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed = [], 0
+        while next(remaining) > 0:
+            method, path, body = scenario.request()
+            headers = {}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers["Content-Type"] = "application/json"
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                status = 0
+            local.append(time.perf_counter() - start)
+            if status == 0 or status >= 400:
+                failed += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def combine(runs: list[dict]) -> dict:
+    """Merge repeated runs of one scenario: the median of each figure and the most errors of any run."""
+    merged = dict(runs[0])
+    merged["throughput_rps"] = round(statistics.median(run["throughput_rps"] for run in runs), 1)
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        merged[key] = round(statistics.median(run[key] for run in runs), 3)
+    merged["errors"] = max(run["errors"] for run in runs)
+    return merged
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float,
+            p95_threshold: float | None = None) -> list[str]:
+    """
+    Return a message for every scenario that got worse than ``baseline``.
+
+    A regression is throughput falling by more than ``threshold``, p95
+    latency rising by more than ``p95_threshold`` (both fractions; the
+    latter defaults to ``threshold``), or errors appearing where there
+    were none.
+    """
+    p95_threshold = threshold if p95_threshold is None else p95_threshold
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+        label = f"{result['scenario']} @ {result['concurrency']}"
+        if result["throughput_rps"] < old["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{label}: throughput {old['throughput_rps']} -> {result['throughput_rps']} req/s")
+        if result["p95_ms"] > old["p95_ms"] * (1 + p95_threshold):
+            regressions.append(f"{label}: p95 {old['p95_ms']} -> {result['p95_ms']} ms")
+        if result["errors"] and not old["errors"]:
+            regressions.append(f"{label}: {result['errors']} errors")
+    return regressions
+
+
+def serve(db_path: str, pool_size: int) -> None:
+    """Run the app on a free port and print the port once it is listening."""
+    import logging
+    logging.disable(logging.INFO)
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from benchmarks.stand_in import connection_factory
+    from util.db_connection import configure_pool
+    configure_pool(connection_factory(db_path), min_size=1, max_size=pool_size)
+
+    from app import app
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+
+def start_server(db_path: str, pool_size: int) -> tuple[subprocess.Popen, int]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_load", "--serve", db_path, str(pool_size)],
+        stdout=subprocess.PIPE, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    line = process.stdout.readline()
+    if not line.strip().isdigit():
+        process.kill()
+        raise RuntimeError("benchmark server failed to start")
+    return process, int(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="catalogues seeded before the run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario and concurrency")
+    parser.add_argument("--list-requests", type=int, default=20,
+                        help="requests for the unpaged GET /catalogues, which returns every row")
+    parser.add_argument("--scenarios", nargs="+", default=None, help="subset of scenarios to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per scenario and concurrency; the median of each figure is reported")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="fail if results regress against this JSON file, written by --output on this runner")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative throughput drop before --compare reports a regression")
+    parser.add_argument("--p95-threshold", type=float, default=0.5,
+                        help="allowed relative p95 latency rise before --compare reports a regression")
+    parser.add_argument("--serve", nargs=2, metavar=("DB", "POOL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve[0], int(args.serve[1]))
+        return
+
+    from benchmarks.stand_in import create_database, seed_catalogues, seed_users
+
+    scenarios = build_scenarios(args.rows, args.seed)
+    names = args.scenarios or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    results = []
+    print(f"{'scenario':>8} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+        seed_catalogues(db_path, args.rows, seed=args.seed)
+        seed_users(db_path, USERS)
+        process, port = start_server(db_path, max(args.concurrency))
+        try:
+            for name in names:
+                requests = args.list_requests if name == "list" else args.requests
+                for concurrency in args.concurrency:
+                    result = combine([run_scenario(port, scenarios[name], concurrency, requests)
+                                      for _ in range(args.repeat)])
+                    results.append(result)
+                    print(f"{name:>8} {concurrency:>5} {result['throughput_rps']:>9} {result['p50_ms']:>8} "
+                          f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['errors']:>7}")
+        finally:
+            process.terminate()
+            process.wait()
+
+    report = {"rows": args.rows, "requests": args.requests, "seed": args.seed, "repeat": args.repeat,
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        differing = [key for key in ("rows", "requests", "seed", "repeat") if baseline.get(key) != report[key]]
+        if differing:
+            print(f"Warning: {args.compare} was recorded with different {', '.join(differing)}")
+        regressions = compare(results, baseline["results"], args.threshold, args.p95_threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} "
+              f"(throughput {args.threshold:.0%}, p95 {args.p95_threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark request latency under different logging setups.
+
+Compares logging disabled, the queue-based pipeline from
+``config.logger_config`` and the old synchronous file + console handlers at
+DEBUG, by driving catalogue reads through the Flask test client against the
+SQLite stand-in from several threads.
+
+Usage::
+
+    python -m benchmarks.bench_logging --requests 2000 --threads 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+SETUPS = ("off", "queue", "sync")
+
+
+def _use_sync_handlers(log_dir: str) -> None:
+    from config.logger_config import shutdown_logging
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+        handlers=[logging.FileHandler(os.path.join(log_dir, "sync.log")), logging.StreamHandler(sys.stderr)],
+        force=True
+    )
+    for name in ("ECommerceLogger", "service", "util", "config"):
+        logging.getLogger(name).setLevel(logging.DEBUG)
+
+
+def _use_queue_pipeline(log_dir: str) -> None:
+    from config import logger_config
+    ini = os.path.join(log_dir, "logging.ini")
+    with open(logger_config.LOGGING_INI) as src, open(ini, "w") as dst:
+        dst.write(src.read().replace("path = logs/ecommerce.log", f"path = {log_dir}/queue.log"))
+    logger_config.setup_logging(ini)
+
+
+def measure(db_path: str, setup: str, requests: int, threads: int) -> dict:
+    """Run ``requests`` GETs spread over ``threads`` workers and report latency."""
+    from benchmarks.stand_in import connection_factory
+    from util.db_connection import configure_pool
+    configure_pool(connection_factory(db_path), min_size=threads, max_size=threads)
+
+    from app import app, service
+    service.cache.enabled = False
+    log_dir = tempfile.mkdtemp(prefix="bench-logging-")
+    if setup == "off":
+        logging.disable(logging.CRITICAL)
+    elif setup == "sync":
+        _use_sync_handlers(log_dir)
+    else:
+        _use_queue_pipeline(log_dir)
+
+    paths = ["/catalogues/%d" % (i % 500 + 1) for i in range(requests)]
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        client = app.test_client()
+        local = []
+        for path in chunk:
+            start = time.perf_counter()
+            client.get(path)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(paths[i::threads],)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    from config.logger_config import shutdown_logging
+    shutdown_logging()
+
+    latencies.sort()
+    return {
+        "setup": setup,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--setups", nargs="+", choices=SETUPS, default=list(SETUPS))
+    parser.add_argument("--output", help="also write results as JSON to this file")
+    parser.add_argument("--child", nargs=2, metavar=("DB", "SETUP"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = measure(args.child[0], args.child[1], args.requests, args.threads)
+        sys.stdout.write(json.dumps(result) + "\n")
+        return
+
+    import subprocess
+    from benchmarks.stand_in import create_database, seed_catalogues
+
+    results = []
+    print(f"{'setup':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+        seed_catalogues(db_path, 500)
+        for setup in args.setups:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_logging", "--child", db_path, setup,
+                 "--requests", str(args.requests), "--threads", str(args.threads)],
+                check=True, capture_output=True, text=True,
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{setup:>6} {result['rps']:>9} {result['p50_ms']:>8} {result['p99_ms']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark ``POST /login`` under concurrency.
+
+Runs the app under werkzeug's threaded server (see ``bench_load``) with
+users seeded as legacy plaintext passwords, then drives three phases:
+
+* ``first``: every user logs in once, paying for the hash upgrade;
+* ``repeat``: the same users log in again and hit the verified cache;
+* ``stuffing``: wrong passwords for a few users, which the negative cache
+  and per-user throttling should keep away from the database.
+
+For each phase the number of user lookups that reached the database is
+read from ``/metrics``.
+
+Usage::
+
+    python -m benchmarks.bench_login --users 200 --concurrency 1 8
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+
+from benchmarks.bench_load import Scenario, run_scenario, start_server
+
+USER_LOOKUP = 'db_query_duration_seconds_count{statement="users.select_by_username"}'
+
+
+def user_lookups(port: int) -> int:
+    """Read how many user lookups the server has run so far."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", "/metrics")
+        body = conn.getresponse().read().decode()
+    finally:
+        conn.close()
+    for line in body.splitlines():
+        if line.startswith(USER_LOOKUP):
+            return int(float(line.rsplit(" ", 1)[1]))
+    return 0
+
+
+def build_phases(users: list[tuple[str, str]], targets: int, seed: int) -> list[Scenario]:
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    order = itertools.cycle(users)
+
+    def first():
+        username, password = next(order)
+        return "POST", "/login", {"username": username, "password": password}
+
+    def repeat():
+        with lock:
+            username, password = rng.choice(users)
+        return "POST", "/login", {"username": username, "password": password}
+
+    def stuffing():
+        with lock:
+            username, _ = rng.choice(users[:targets])
+            guess = "guess%d" % rng.randrange(1_000_000)
+        return "POST", "/login", {"username": username, "password": guess}
+
+    return [Scenario("first", first), Scenario("repeat", repeat), Scenario("stuffing", stuffing)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="users seeded, each logging in once in 'first'")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=500, help="requests per repeat/stuffing run")
+    parser.add_argument("--targets", type=int, default=5, help="users attacked in the stuffing phase")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    from benchmarks.stand_in import create_database, seed_users
+
+    users = [("user%d" % i, "password%d" % i) for i in range(args.users * len(args.concurrency))]
+    results = []
+    print(f"{'phase':>8} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'db lookups':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+        seed_users(db_path, users)
+        process, port = start_server(db_path, max(args.concurrency))
+        try:
+            for index, concurrency in enumerate(args.concurrency):
+                # a fresh slice of users per level so 'first' really is a first login
+                batch = users[index * args.users:(index + 1) * args.users]
+                for phase in build_phases(batch, args.targets, args.seed):
+                    requests = len(batch) if phase.name == "first" else args.requests
+                    before = user_lookups(port)
+                    result = run_scenario(port, phase, concurrency, requests)
+                    result["db_lookups"] = user_lookups(port) - before
+                    results.append(result)
+                    print(f"{phase.name:>8} {concurrency:>5} {result['throughput_rps']:>9} {result['p50_ms']:>8} "
+                          f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['db_lookups']:>11}")
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"users": args.users, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
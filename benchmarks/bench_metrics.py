@@ -0,0 +1,128 @@
+"""
+Benchmark the request-time overhead of util.metrics instrumentation.
+
+Drives catalogue reads through the Flask test client against the SQLite
+stand-in, alternating rounds with metrics enabled and disabled in the same
+process so both see the same warm caches. Recording metrics costs CPU, so
+the overhead is the extra thread CPU time per request over the wall time
+of a request without metrics, taken as the median over round pairs. Wall
+time alone varies by a few percent between identical rounds here (sleeps,
+scheduling), more than the difference being measured; ``wall_overhead_pct``
+reports it anyway.
+
+The stand-in answers queries in-process, so requests are far cheaper than
+against a networked MySQL; ``--db-latency-ms`` adds a simulated round trip
+to every statement to show the overhead at realistic request times.
+
+Usage::
+
+    python -m benchmarks.bench_metrics --rounds 100 --requests 200
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+PATHS = ("/catalogues/{id}", "/catalogues?limit=20", "/catalogues?ids={id},{next}")
+
+
+class _SlowCursor:
+    """Cursor proxy sleeping before each statement, like a network round trip."""
+
+    def __init__(self, cursor, delay: float) -> None:
+        self._cursor = cursor
+        self._delay = delay
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, operation, params=()):
+        time.sleep(self._delay)
+        return self._cursor.execute(operation, params)
+
+
+class _SlowConnection:
+    def __init__(self, conn, delay: float) -> None:
+        self._conn = conn
+        self._delay = delay
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return _SlowCursor(self._conn.cursor(*args, **kwargs), self._delay)
+
+
+def run_round(client, requests: int) -> tuple[float, float]:
+    """Return mean wall and thread CPU seconds per request for one round."""
+    start, cpu = time.perf_counter(), time.thread_time()
+    for i in range(requests):
+        catalogue_id = i % 500 + 1
+        path = PATHS[i % len(PATHS)].format(id=catalogue_id, next=catalogue_id % 500 + 1)
+        client.get(path).close()
+    return (time.perf_counter() - start) / requests, (time.thread_time() - cpu) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=100, help="pairs of on/off rounds")
+    parser.add_argument("--requests", type=int, default=200, help="requests per round")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="simulated round trip added to every statement")
+    parser.add_argument("--output", help="also write results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    from benchmarks.stand_in import connection_factory, create_database, seed_catalogues
+    from util import metrics
+    from util.db_connection import configure_pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+        seed_catalogues(db_path, 500)
+        factory = connection_factory(db_path)
+        if args.db_latency_ms:
+            delay = args.db_latency_ms / 1000
+            factory = lambda connect=factory: _SlowConnection(connect(), delay)
+        configure_pool(factory, min_size=1, max_size=2)
+
+        from app import app, service
+        service.cache.enabled = False
+        client = app.test_client()
+        run_round(client, args.requests)
+
+        samples = {True: [], False: []}
+        for i in range(args.rounds):
+            for enabled in ((True, False) if i % 2 else (False, True)):
+                metrics.set_enabled(enabled)
+                samples[enabled].append(run_round(client, args.requests))
+        metrics.set_enabled(True)
+
+    pairs = list(zip(samples[True], samples[False]))
+    on = statistics.median(wall for wall, _ in samples[True])
+    off = statistics.median(wall for wall, _ in samples[False])
+    result = {
+        "requests_per_round": args.requests,
+        "rounds": args.rounds,
+        "db_latency_ms": args.db_latency_ms,
+        "disabled_us": round(off * 1e6, 1),
+        "enabled_us": round(on * 1e6, 1),
+        "cpu_added_us": round(statistics.median(a[1] - b[1] for a, b in pairs) * 1e6, 1),
+        "overhead_pct": round(statistics.median((a[1] - b[1]) / b[0] for a, b in pairs) * 100, 2),
+        "wall_overhead_pct": round((statistics.median(a[0] / b[0] for a, b in pairs) - 1) * 100, 2),
+    }
+    print(f"metrics off: {result['disabled_us']} us/request")
+    print(f"metrics on:  {result['enabled_us']} us/request")
+    print(f"CPU added:   {result['cpu_added_us']} us/request")
+    print(f"overhead:    {result['overhead_pct']}% (wall clock alone: {result['wall_overhead_pct']}%)")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
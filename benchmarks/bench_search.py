@@ -0,0 +1,127 @@
+"""
+Benchmark catalogue search and autocomplete against the in-memory index.
+
+Seeds the SQLite stand-in with catalogues named from a small vocabulary
+(the default seed names are all "Catalogue N", which makes every query
+match everything), builds the index through catalogueService, then times
+``suggest`` for random name prefixes of 1-6 characters and ``search`` for
+one- and two-word queries.
+
+Usage::
+
+    python -m benchmarks.bench_search --rows 1000000 --queries 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.bench_load import percentile
+
+WORDS = (
+    "summer winter spring autumn sale clearance outlet garden kitchen toys books music sports "
+    "outdoor travel fashion shoes jewelry beauty health office school tools auto pets baby "
+    "grocery organic fresh frozen bakery dairy electronics phones laptops cameras gaming "
+    "furniture lighting bedding bath holiday festive premium budget classic modern vintage"
+).split()
+
+
+def seed_named_catalogues(path: str, rows: int, seed: int, batch: int = 10000) -> None:
+    rng = random.Random(seed)
+    db = sqlite3.connect(path)
+    query = ("INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, "
+             "effective_to, status) VALUES (?, ?, ?, ?, ?)")
+    for start in range(0, rows, batch):
+        values = []
+        for i in range(start, min(start + batch, rows)):
+            name = " ".join(rng.sample(WORDS, rng.randint(1, 3))).title() + f" {i}"
+            description = " ".join(rng.choices(WORDS, k=rng.randint(4, 10)))
+            values.append((name, description, "2025-01-01", "2025-12-31", "active"))
+        db.executemany(query, values)
+    db.commit()
+    db.close()
+
+
+def _timed(fn, arguments) -> list[float]:
+    latencies = []
+    for argument in arguments:
+        start = time.perf_counter()
+        fn(argument)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def _summary(name: str, latencies: list[float]) -> dict:
+    return {
+        "operation": name,
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.stand_in import connection_factory, create_database
+    from service.catalogue_service import CATALOGUE_COLUMNS, catalogueService
+    from util.db_connection import configure_pool
+    from util.search import CatalogueSearch
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+        seed_named_catalogues(db_path, args.rows, args.seed)
+        configure_pool(connection_factory(db_path), min_size=1, max_size=2)
+        service = catalogueService()
+        search = CatalogueSearch(service.iter_catalogue_chunks, CATALOGUE_COLUMNS)
+
+        start = time.perf_counter()
+        search.build()
+        build_seconds = time.perf_counter() - start
+
+        db = sqlite3.connect(db_path)
+        names = [row[0] for row in db.execute(
+            "SELECT catalogue_name FROM catalogue ORDER BY random() LIMIT ?", (args.queries,))]
+        db.close()
+
+    prefixes = [name[:rng.randint(1, 6)] for name in names]
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(args.queries)]
+    results = [
+        _summary("suggest", _timed(lambda prefix: search.suggest(prefix, args.limit), prefixes)),
+        _summary("search", _timed(lambda query: search.search(query, args.limit), queries)),
+    ]
+    # ru_maxrss is kilobytes on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"rows={args.rows} build={build_seconds:.1f}s peak_rss={rss_mb:.0f}MB")
+    print(f"{'operation':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for result in results:
+        print(f"{result['operation']:>10} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+              f"{result['p99_ms']:>8} {result['max_ms']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"rows": args.rows, "build_seconds": round(build_seconds, 2),
+                       "peak_rss_mb": round(rss_mb), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
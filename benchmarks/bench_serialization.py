@@ -0,0 +1,108 @@
+"""
+Benchmark turning catalogue rows into a JSON response body.
+
+Reads ``--rows`` catalogues from the SQLite stand-in once, then times each
+path from fetched rows to JSON text and measures its peak traced memory:
+
+- ``dict_rows``: the old read path; rows as dicts (what a dictionary
+  cursor builds) encoded with Flask's default provider.
+- ``dict_dto``: rows loaded into ``__dict__``-based objects and converted
+  back to dicts for Flask's default provider.
+- ``slot_dto``: rows loaded with ``catalogue.from_row`` and written with
+  the row encoder.
+- ``tuple_rows``: tuple rows written with the row encoder, per backend
+  (what ``GET /catalogues`` does now).
+
+Usage::
+
+    python -m benchmarks.bench_serialization --rows 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+class DictCatalogue:
+    """The DTO as it was before ``__slots__``."""
+
+    def __init__(self, catalogue_id, catalogue_name, catalogue_description, effective_from, effective_to, status):
+        self.catalogue_id = catalogue_id
+        self.catalogue_name = catalogue_name
+        self.catalogue_description = catalogue_description
+        self.effective_from = effective_from
+        self.effective_to = effective_to
+        self.status = status
+
+
+def measure(run, repeat: int) -> tuple[float, int, int]:
+    """Return (best seconds, peak traced bytes, output length) for ``run()``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = run()
+        timings.append(time.perf_counter() - start)
+        del body
+    tracemalloc.start()
+    body = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+
+    from benchmarks.stand_in import connection_factory, create_database, seed_catalogues
+    from dto.catalogue_dto import COLUMNS, CatalogueRows, catalogue, encoder
+    from util import serializer
+
+    db_path = create_database(os.path.join(tempfile.mkdtemp(), "catalogue.sqlite3"))
+    seed_catalogues(db_path, args.rows)
+    conn = connection_factory(db_path)()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM catalogue ORDER BY catalogue_id")
+    rows = cursor.fetchall()
+    conn.close()
+
+    flask_dumps = DefaultJSONProvider(Flask(__name__)).dumps
+    runs = {
+        "dict_rows": lambda: flask_dumps([dict(zip(COLUMNS, row)) for row in rows]),
+        "dict_dto": lambda: flask_dumps([vars(DictCatalogue(*row)) for row in rows]),
+        "slot_dto": lambda: "[" + ",".join([item.to_json() for item in map(catalogue.from_row, rows)]) + "]",
+    }
+    backends = ["json"] + (["orjson"] if serializer.orjson is not None else [])
+
+    results = []
+    print(f"{'path':>18} {'ms':>9} {'ms/100k':>9} {'peak MB':>8} {'bytes':>11}")
+    for name, run in list(runs.items()) + [(f"tuple_rows[{backend}]", backend) for backend in backends]:
+        if run in backends:
+            serializer.set_backend(run)
+            run = lambda: serializer.dumps({"items": CatalogueRows(rows), "next_cursor": None})
+        seconds, peak, size = measure(run, args.repeat)
+        row = {"path": name, "ms": round(seconds * 1000, 1),
+               "ms_per_100k": round(seconds * 1000 * 100000 / len(rows), 1),
+               "peak_mb": round(peak / 2 ** 20, 1), "bytes": size}
+        results.append(row)
+        print(f"{name:>18} {row['ms']:>9} {row['ms_per_100k']:>9} {row['peak_mb']:>8} {size:>11}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
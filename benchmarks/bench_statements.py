@@ -0,0 +1,127 @@
+"""
+Benchmark text queries against server-side prepared statements.
+
+Runs the registered point lookups (``catalogue.select_by_id``,
+``users.select_by_username`` and ``catalogue_version.select``) on one
+pooled connection, first through a registry with plain cursors
+(``text``) and then through one with prepared cursors (``prepared``),
+and reports p50/p95 latency per statement with the registry's
+prepare/execute counts.
+
+By default the SQLite stand-in is seeded with ``--rows`` catalogues. It
+caches compiled statements itself and ignores ``prepared=True``, so
+there the two modes only show the registry's own overhead; pass
+``--mysql`` to run against the database in config.ini, which must
+already hold at least ``--rows`` catalogues and the ``bench*`` users.
+
+Usage::
+
+    python -m benchmarks.bench_statements --rows 1000000 --queries 20000
+    python -m benchmarks.bench_statements --mysql --rows 1000000 --output statements.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_load import percentile
+
+LOOKUPS = ("catalogue.select_by_id", "users.select_by_username", "catalogue_version.select")
+USERS = [("bench%d" % i, "secret%d" % i) for i in range(1000)]
+
+
+def params_for(name: str, rng: random.Random, rows: int) -> tuple:
+    if name == "catalogue.select_by_id":
+        return (rng.randrange(1, rows + 1),)
+    if name == "users.select_by_username":
+        return (rng.choice(USERS)[0],)
+    return ()
+
+
+def run(mode: str, rows: int, queries: int, seed: int) -> dict:
+    import service.authentication_service  # noqa: F401  registers the users statements
+    import service.catalogue_service  # noqa: F401  registers the catalogue statements
+    from util import db_connection
+    from util.statements import STATEMENTS, StatementRegistry
+
+    registry = StatementRegistry(prepare=mode == "prepared")
+    for name in LOOKUPS:
+        statement = STATEMENTS[name]
+        registry.register(name, statement.sql, statement.columns)
+
+    rng = random.Random(seed)
+    latencies = {name: [] for name in LOOKUPS}
+    conn = db_connection.get_connection()
+    try:
+        for _ in range(queries):
+            name = rng.choice(LOOKUPS)
+            params = params_for(name, rng, rows)
+            start = time.perf_counter()
+            registry.fetch_all(conn, name, params)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+    finally:
+        # statement cursors live as long as the pooled connection; drop it so the next mode starts clean
+        conn.invalidate()
+
+    stats = registry.stats()
+    results = []
+    for name in LOOKUPS:
+        samples = sorted(latencies[name])
+        results.append({
+            "mode": mode,
+            "statement": name,
+            "queries": len(samples),
+            "p50_ms": round(percentile(samples, 0.50), 4),
+            "p95_ms": round(percentile(samples, 0.95), 4),
+            "prepares": stats[name]["prepares"],
+            "executes": stats[name]["executes"],
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mysql", action="store_true", help="use the database in config.ini")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.stand_in import connection_factory, create_database, seed_catalogues, seed_users
+    from util import db_connection
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.mysql:
+            db_connection.configure_pool(min_size=0, max_size=1)
+        else:
+            db_path = create_database(os.path.join(tmp, "catalogue.sqlite3"))
+            seed_catalogues(db_path, args.rows)
+            seed_users(db_path, USERS)
+            db_connection.configure_pool(connection_factory(db_path), min_size=0, max_size=1)
+        print(f"{'mode':>9} {'statement':>26} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8} {'prepares':>9} {'executes':>9}")
+        try:
+            for mode in ("text", "prepared"):
+                for result in run(mode, args.rows, args.queries, args.seed):
+                    results.append(result)
+                    print(f"{mode:>9} {result['statement']:>26} {result['queries']:>8} {result['p50_ms']:>8} "
+                          f"{result['p95_ms']:>8} {result['prepares']:>9} {result['executes']:>9}")
+        finally:
+            db_connection.get_pool().close()
+            db_connection._pool = None
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"rows": args.rows, "queries": args.queries, "mysql": args.mysql, "results": results},
+                      fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark read latency while the status job runs.
+
+Seeds the SQLite stand-in, then for each configuration copies the
+database and keeps reader threads calling ``get_catalogue_by_id`` (no
+cache) while the job either idles (``idle``), runs in ``--chunk-size``
+chunks (``chunked``), or moves every row in one transaction
+(``single``). Reports the job's duration and rows changed with read
+p50/p99/max for each run.
+
+Usage::
+
+    python -m benchmarks.bench_status_job --rows 200000 --readers 2
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+
+from benchmarks.bench_load import percentile
+
+# Seeded windows start in 2024-2025, so this date sends plenty of rows each way
+TODAY = date(2025, 6, 1)
+
+
+def run(db_path: str, mode: str, rows: int, readers: int, chunk_size: int, pause: float, idle_seconds: float):
+    from benchmarks.stand_in import connection_factory
+    from service.catalogue_service import catalogueService
+    from util import db_connection
+
+    pool = db_connection.configure_pool(connection_factory(db_path), min_size=0, max_size=readers + 2)
+    service = catalogueService()
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+
+    def read(samples, seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            service.get_catalogue_by_id(rng.randrange(1, rows + 1))
+            samples.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=read, args=(samples, i)) for i, samples in enumerate(latencies)]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    changed = {}
+    if mode == "idle":
+        time.sleep(idle_seconds)
+    else:
+        size = chunk_size if mode == "chunked" else rows
+        changed = service.apply_status_transitions(TODAY, chunk_size=size, pause=pause if mode == "chunked" else 0)
+    job_seconds = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    pool.close()
+    db_connection._pool = None
+
+    samples = sorted(value for values in latencies for value in values)
+    return {
+        "mode": mode,
+        "job_seconds": round(job_seconds, 2),
+        "rows_changed": sum(changed.values()),
+        "reads": len(samples),
+        "p50_ms": round(percentile(samples, 0.50), 3),
+        "p99_ms": round(percentile(samples, 0.99), 3),
+        "max_ms": round(samples[-1], 3) if samples else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--pause", type=float, default=0.05)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.stand_in import create_database, seed_catalogues
+
+    results = []
+    print(f"{'mode':>8} {'job s':>7} {'changed':>8} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = create_database(os.path.join(tmp, "seeded.sqlite3"))
+        seed_catalogues(seeded, args.rows)
+        for mode in ("idle", "chunked", "single"):
+            db_path = os.path.join(tmp, f"{mode}.sqlite3")
+            shutil.copy(seeded, db_path)
+            result = run(db_path, mode, args.rows, args.readers, args.chunk_size, args.pause, args.idle_seconds)
+            results.append(result)
+            print(f"{mode:>8} {result['job_seconds']:>7} {result['rows_changed']:>8} {result['reads']:>7} "
+                  f"{result['p50_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"rows": args.rows, "readers": args.readers, "chunk_size": args.chunk_size,
+                       "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
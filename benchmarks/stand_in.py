@@ -0,0 +1,243 @@
+"""
+SQLite stand-in for the MySQL database, used by benchmarks and tests.
+
+:class:`StandInConnection` mimics the parts of the mysql-connector API the
+services use (``cursor(dictionary=..., buffered=...)``, ``%s`` parameters,
+``fetchmany``, ``rowcount``, ``lastrowid``, ``commit``/``rollback``,
+``is_connected``), so it can be handed to
+:func:`util.db_connection.configure_pool` as the connection factory.
+"""
+
+import glob
+import os
+import random
+import re
+import sqlite3
+import tempfile
+from datetime import date, datetime, timedelta
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalogue (
+    catalogue_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    catalogue_name VARCHAR(100) NOT NULL,
+    catalogue_description VARCHAR(255),
+    effective_from DATE NOT NULL,
+    effective_to DATE NOT NULL,
+    status VARCHAR(20) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL
+);
+"""
+
+STATUSES = ("active", "inactive", "upcoming", "expired")
+
+_PLACEHOLDER = re.compile(r"%s")
+# UTC_TIMESTAMP() +/- INTERVAL n SECOND, after placeholders became ?
+_INTERVAL = re.compile(r"UTC_TIMESTAMP\(\) ([+-]) INTERVAL (\S+) SECOND")
+# CREATE TABLE with INDEX lines, which SQLite only accepts as separate statements
+_TABLE = re.compile(r"CREATE TABLE IF NOT EXISTS (\w+) \((.*?)\n\);", re.S)
+_INLINE_INDEX = re.compile(r",\s*INDEX (\w+) (\([^)]*\))")
+_translated = {}
+
+
+def _split_indexes(match: re.Match) -> str:
+    table, body = match.groups()
+    indexes = "".join(f"\nCREATE INDEX IF NOT EXISTS {name} ON {table} {columns};"
+                      for name, columns in _INLINE_INDEX.findall(body))
+    return f"CREATE TABLE IF NOT EXISTS {table} ({_INLINE_INDEX.sub('', body)}\n);{indexes}"
+
+
+def translate(query: str) -> str:
+    """Rewrite a MySQL-style query for SQLite."""
+    cached = _translated.get(query)
+    if cached is None:
+        cached = _PLACEHOLDER.sub("?", query)
+        cached = _INTERVAL.sub(r"DATETIME('now', '\1' || \2 || ' seconds')", cached)
+        cached = _TABLE.sub(_split_indexes, cached)
+        cached = (cached.replace("CURDATE()", "DATE('now')")
+                  .replace("UTC_TIMESTAMP()", "DATETIME('now')")
+                  .replace("NOW()", "DATETIME('now')")
+                  # SQLite locks the whole database on write instead of rows
+                  .replace(" FOR UPDATE", "")
+                  .replace("INSERT IGNORE", "INSERT OR IGNORE")
+                  # only an INTEGER PRIMARY KEY can be AUTOINCREMENT
+                  .replace("BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT"))
+        _translated[query] = cached
+    return cached
+
+
+class StandInCursor:
+    """Cursor with the mysql-connector surface the services rely on."""
+
+    def __init__(self, connection: "StandInConnection", dictionary: bool = False) -> None:
+        self._connection = connection
+        self._cursor = connection._db.cursor()
+        self._dictionary = dictionary
+        self._first_rowid = None
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        # MySQL reports the first id of a multi-row INSERT, SQLite the last.
+        if self._first_rowid is not None:
+            return self._first_rowid
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self) -> tuple:
+        return tuple(col[0] for col in self._cursor.description or ())
+
+    def execute(self, query: str, params=()) -> None:
+        self._connection.statements += 1
+        self._cursor.execute(translate(query), tuple(params or ()))
+        self._first_rowid = None
+        if self._cursor.rowcount > 1 and query.lstrip().upper().startswith("INSERT"):
+            self._first_rowid = self._cursor.lastrowid - self._cursor.rowcount + 1
+
+    def executemany(self, query: str, seq_params) -> None:
+        self._connection.statements += 1
+        self._cursor.executemany(translate(query), [tuple(p) for p in seq_params])
+
+    def _shape(self, rows):
+        if not self._dictionary:
+            return rows
+        names = self.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchmany(self, size: int = 1):
+        return self._shape(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._shape(self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class StandInConnection:
+    """A SQLite connection dressed up as a mysql-connector connection."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   check_same_thread=False, timeout=30)
+        # Let LIKE 'prefix%' use an index, as it does on MySQL
+        self._db.execute("PRAGMA case_sensitive_like = ON")
+        self._open = True
+        self.statements = 0
+
+    def cursor(self, dictionary: bool = False, buffered: bool | None = None,
+               prepared: bool | None = None, **kwargs) -> StandInCursor:
+        return StandInCursor(self, dictionary=dictionary)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._open and self._db.in_transaction
+
+    def start_transaction(self) -> None:
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def rollback(self) -> None:
+        self._db.rollback()
+
+    def is_connected(self) -> bool:
+        return self._open
+
+    def ping(self, reconnect: bool = False) -> None:
+        if not self._open:
+            raise sqlite3.ProgrammingError("Connection is closed")
+
+    def close(self) -> None:
+        if self._open:
+            self._open = False
+            self._db.close()
+
+
+def connection_factory(path: str):
+    """Return a zero-argument factory suitable for ``configure_pool``."""
+    return lambda: StandInConnection(path)
+
+
+def create_database(path: str | None = None) -> str:
+    """Create the schema in a new SQLite file and return its path."""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="catalogue-", suffix=".sqlite3")
+        os.close(fd)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    apply_migrations(db)
+    db.commit()
+    db.close()
+    return path
+
+
+def apply_migrations(db: sqlite3.Connection) -> None:
+    """Run the shipped migrations/*.sql files in order."""
+    for migration in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+        with open(migration) as fh:
+            db.executescript(translate(fh.read()))
+
+
+def seed_catalogues(path: str, rows: int, seed: int = 42, batch: int = 10000) -> None:
+    """Insert ``rows`` deterministic pseudo-random catalogues."""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    db = sqlite3.connect(path)
+    query = ("INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, "
+             "effective_to, status) VALUES (?, ?, ?, ?, ?)")
+    done = 0
+    while done < rows:
+        count = min(batch, rows - done)
+        values = []
+        for i in range(done, done + count):
+            begin = start + timedelta(days=rng.randrange(0, 730))
+            end = begin + timedelta(days=rng.randrange(1, 365))
+            values.append((
+                f"Catalogue {i}",
+                f"Seeded catalogue number {i} for benchmarks",
+                begin.isoformat(),
+                end.isoformat(),
+                rng.choice(STATUSES),
+            ))
+        db.executemany(query, values)
+        done += count
+    db.commit()
+    db.close()
+
+
+def seed_users(path: str, users: list[tuple[str, str]]) -> None:
+    """Insert ``(username, password)`` rows into the users table."""
+    db = sqlite3.connect(path)
+    db.executemany("INSERT INTO users (username, password) VALUES (?, ?)", users)
+    db.commit()
+    db.close()
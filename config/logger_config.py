@@ -1,21 +1,222 @@
+"""
+Non-blocking logging setup driven by config/logging.ini.
+
+Request threads hand records to a bounded queue through
+:class:`BoundedQueueHandler`; a :class:`logging.handlers.QueueListener`
+thread formats them and writes to the rotating file and console handlers.
+"""
+
+import atexit
+import configparser
+import itertools
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
 
-# Ensure the logs directory exists
-log_dir = os.path.join(os.path.dirname(__file__), '../logs')
-os.makedirs(log_dir, exist_ok=True)
+LOGGING_INI = os.path.join(os.path.dirname(__file__), 'logging.ini')
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-log_file_path = os.path.join(log_dir, 'ecommerce.log')
+DROP_POLICIES = ('drop_newest', 'drop_oldest', 'block')
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file_path),
-        logging.StreamHandler()
-    ]
-)
 
-logger = logging.getLogger("ECommerceLogger")
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a bounded queue with an explicit policy when it is full.
+
+    Records are queued as they are; message formatting happens on the
+    listener thread, so ``%``-style arguments are never rendered by the
+    request thread.
+
+    :param log_queue: A bounded :class:`queue.Queue`.
+    :param drop_policy: ``drop_newest`` discards the incoming record,
+        ``drop_oldest`` discards the oldest queued one, and ``block`` waits
+        up to ``block_timeout`` seconds before discarding.
+    """
+
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = 'drop_newest',
+                 block_timeout: float = 0.05) -> None:
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {', '.join(DROP_POLICIES)}")
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.drop_policy == 'block':
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.drop_policy == 'drop_oldest':
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        with self._dropped_lock:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records, per logger.
+
+    Rates are looked up by logger name, falling back to parent names and
+    then to ``default``. Sampling is deterministic (every Nth record).
+    """
+
+    def __init__(self, rates: dict[str, float], default: float = 1.0) -> None:
+        super().__init__()
+        self.rates = rates
+        self.default = default
+        self._every = {}
+        self._counters = {}
+
+    def _interval(self, name: str) -> int:
+        every = self._every.get(name)
+        if every is None:
+            rate, lookup = self.default, name
+            while lookup:
+                if lookup in self.rates:
+                    rate = self.rates[lookup]
+                    break
+                lookup = lookup.rpartition('.')[0]
+            every = 0 if rate <= 0 else max(1, round(1 / rate))
+            self._every[name] = every
+            self._counters[name] = itertools.count()
+        return every
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        every = self._interval(record.name)
+        if every == 1:
+            return True
+        if every == 0:
+            return False
+        return next(self._counters[record.name]) % every == 0
+
+
+def _read_settings(path: str) -> configparser.ConfigParser:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str  # keep logger names as written
+    parser.read(path)
+    for section in ('queue', 'levels', 'file', 'console', 'sampling', 'format'):
+        if not parser.has_section(section):
+            parser.add_section(section)
+    return parser
+
+
+def _file_handler(settings: configparser.SectionProxy) -> logging.Handler:
+    path = settings.get('path', 'logs/ecommerce.log')
+    if not os.path.isabs(path):
+        path = os.path.join(BASE_DIR, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if settings.get('rotation', 'size') == 'time':
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path,
+            when=settings.get('when', 'midnight'),
+            interval=settings.getint('interval', 1),
+            backupCount=settings.getint('backup_count', 5),
+            encoding='utf-8'
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=settings.getint('max_bytes', 10 * 1024 * 1024),
+            backupCount=settings.getint('backup_count', 5),
+            encoding='utf-8'
+        )
+    handler.setLevel(settings.get('level', 'DEBUG').upper())
+    return handler
 
 
+_listener = None
+queue_handler = None
+
+
+def setup_logging(path: str = LOGGING_INI) -> BoundedQueueHandler:
+    """
+    Install the queue-based pipeline on the root logger.
+
+    Calling it again replaces the previous pipeline.
+    """
+    global _listener, queue_handler
+    settings = _read_settings(path)
+    formatter = logging.Formatter(
+        settings['format'].get('format', '%(asctime)s - %(levelname)s - %(name)s - %(message)s'),
+        settings['format'].get('datefmt', None)
+    )
+
+    targets = []
+    if settings['file'].getboolean('enabled', True):
+        targets.append(_file_handler(settings['file']))
+    if settings['console'].getboolean('enabled', True):
+        console = logging.StreamHandler(sys.stdout)
+        console.setLevel(settings['console'].get('level', 'INFO').upper())
+        targets.append(console)
+    for handler in targets:
+        handler.setFormatter(formatter)
+
+    sampling = dict(settings['sampling'])
+    default_rate = float(sampling.pop('default', 1.0))
+    handler = BoundedQueueHandler(
+        queue.Queue(maxsize=settings['queue'].getint('max_size', 10000)),
+        drop_policy=settings['queue'].get('drop_policy', 'drop_newest'),
+        block_timeout=settings['queue'].getfloat('block_timeout', 0.05)
+    )
+    handler.addFilter(SamplingFilter({k: float(v) for k, v in sampling.items()}, default_rate))
+
+    shutdown_logging()
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        if isinstance(old, BoundedQueueHandler):
+            root.removeHandler(old)
+    root.addHandler(handler)
+    for name, level in settings['levels'].items():
+        logging.getLogger(None if name == 'root' else name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(handler.queue, *targets, respect_handler_level=True)
+    _listener.start()
+    queue_handler = handler
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for target in _listener.handlers:
+            target.close()
+        _listener = None
+
+
+def restart_after_fork() -> BoundedQueueHandler:
+    """
+    Start a fresh pipeline in a forked child process.
+
+    The parent's listener thread did not survive the fork and its queue
+    may have been locked at that moment, so both are abandoned, not stopped.
+    """
+    global _listener
+    _listener = None
+    return setup_logging()
+
+
+atexit.register(shutdown_logging)
+
+setup_logging()
+
+logger = logging.getLogger("ECommerceLogger")
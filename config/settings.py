@@ -0,0 +1,54 @@
+"""
+Application settings loaded from config/config.ini.
+"""
+
+import configparser
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.ini')
+
+_config = None
+
+
+def get_config() -> configparser.ConfigParser:
+    """
+    Return the parsed config.ini, reading it on first use.
+    """
+    global _config
+    if _config is None:
+        parser = configparser.ConfigParser()
+        read = parser.read(CONFIG_PATH)
+        if not read:
+            logger.warning("Config file not found at %s, using defaults", CONFIG_PATH)
+        _config = parser
+    return _config
+
+
+def load_config(overrides=None) -> configparser.ConfigParser:
+    """
+    Return a copy of config.ini with ``overrides`` applied.
+
+    :param overrides: ``{section: {key: value}}``; values are stored as strings.
+    """
+    parser = configparser.ConfigParser()
+    parser.read_dict(get_config())
+    if overrides:
+        parser.read_dict({section: {key: str(value) for key, value in values.items()}
+                          for section, values in overrides.items()})
+    return parser
+
+
+def get_section(name: str, config: configparser.ConfigParser | None = None) -> configparser.SectionProxy:
+    """
+    Return a config section by name. A missing section is returned empty so
+    callers can rely on ``fallback=`` values.
+
+    :param config: Parser to read from; defaults to config.ini.
+    """
+    config = config if config is not None else get_config()
+    if not config.has_section(name):
+        config.add_section(name)
+    return config[name]
@@ -2,6 +2,17 @@
 Data Transfer object (DTO) for catalogue entity
 """
 
+from datetime import date
+
+from util.cache import register_cached_type
+from util.serializer import RowEncoder, register_record
+from util.validators import VALID_STATUSES
+
+# Column order of catalogue rows read by the service (and of to_row()).
+COLUMNS = ("catalogue_id", "catalogue_name", "catalogue_description",
+           "effective_from", "effective_to", "status")
+
+
 class catalogue:
     """
     Represents a catalogue item.
@@ -11,21 +22,94 @@ class catalogue:
     :param catalogue_description: Description of the catalogue.
     :type catalogue_description: str
     :param effective_from: Start date of the catalogue's validity.
-    :type effective_from: str
+    :type effective_from: date | str
     :param effective_to: End date of the catalogue's validity.
-    :type effective_to: str
+    :type effective_to: date | str
     :param status: Status of the catalogue (e.g., active, inactive).
     :type status: str
+    :param catalogue_id: Database id; None until the catalogue is stored.
+    :type catalogue_id: int | None
     """
 
+    __slots__ = COLUMNS
+
+    catalogue_id: int | None
+    catalogue_name: str
+    catalogue_description: str | None
+    effective_from: date | str
+    effective_to: date | str
+    status: str
 
-    def __init__(self,catalogue_name:str, catalogue_description:str, effective_from:str, effective_to:str, status:str) ->None:
-        self.catalogue_name =catalogue_name
+    def __init__(self, catalogue_name: str, catalogue_description: str, effective_from: date | str,
+                 effective_to: date | str, status: str, catalogue_id: int | None = None) -> None:
+        self.catalogue_id = catalogue_id
+        self.catalogue_name = catalogue_name
         self.catalogue_description = catalogue_description
         self.effective_from = effective_from
-        self.effective_to= effective_to
+        self.effective_to = effective_to
         self.status = status
 
+    @classmethod
+    def from_row(cls, row: tuple) -> "catalogue":
+        """Build a catalogue from a database row in COLUMNS order."""
+        item = object.__new__(cls)
+        (item.catalogue_id, item.catalogue_name, item.catalogue_description,
+         item.effective_from, item.effective_to, item.status) = row
+        return item
+
+    def to_row(self) -> tuple:
+        return (self.catalogue_id, self.catalogue_name, self.catalogue_description,
+                self.effective_from, self.effective_to, self.status)
+
+    def to_dict(self) -> dict:
+        return dict(zip(COLUMNS, self.to_row()))
+
+    def to_json(self) -> str:
+        return encoder.encode(self.to_row())
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"catalogue({', '.join(f'{name}={value!r}' for name, value in zip(COLUMNS, self.to_row()))})"
+
+
+class CatalogueRows(list):
+    """
+    List of catalogue rows as plain tuples in COLUMNS order.
+
+    Encoded to JSON straight from the tuples; :meth:`records` gives
+    :class:`catalogue` objects for code that wants attributes.
+    """
+
+    __slots__ = ()
+
+    def records(self):
+        return map(catalogue.from_row, self)
+
+
+encoder = RowEncoder(
+    COLUMNS,
+    {"catalogue_id": "int", "catalogue_name": "str", "catalogue_description": "str",
+     "effective_from": "date", "effective_to": "date", "status": "enum"},
+    {"status": VALID_STATUSES},
+)
+register_record(catalogue, catalogue.to_json)
+register_record(CatalogueRows, encoder.encode_many)
+
 
+def _row_from_json(values: list) -> tuple:
+    row = list(values)
+    for i in (3, 4):
+        if isinstance(row[i], str):
+            row[i] = date.fromisoformat(row[i])
+    return tuple(row)
 
 
+register_cached_type(catalogue, "catalogue", catalogue.to_row, lambda row: catalogue.from_row(_row_from_json(row)))
+register_cached_type(CatalogueRows, "catalogue_rows", list,
+                     lambda rows: CatalogueRows(_row_from_json(row) for row in rows))
@@ -1,16 +1,52 @@
 const apiUrl = "http://localhost:5000/catalogues";
-let allCatalogues = [];
+let allCatalogues = []; // rows of the page currently shown
 let currentPage = 1;
 const rowsPerPage = 5;
+let pageCursors = [null]; // cursor that loads each visited page
+let nextCursor = null;
+let statusFilter = null; // applied on the server
 let isEditMode = false;
 let editCatalogueId = null;
+let changeSource = null; // Server-Sent Events from /catalogues/changes
 
 function initCatalogueView() {
-  getAllCatalogues();
+  watchChanges();
   showSection("all_catalogues");
 }
 
-function showSection(id) {
+// Keep the rows on screen current from the change feed instead of reloading after every write
+function watchChanges() {
+  if (changeSource) return;
+  // the browser resumes from the last event id by itself when the connection drops
+  changeSource = new EventSource(`${apiUrl}/changes`, { withCredentials: true });
+  changeSource.addEventListener("change", (e) => applyChange(JSON.parse(e.data)));
+  changeSource.addEventListener("resync", () => {
+    // missed too much: start a new stream, then reload the page shown
+    changeSource.close();
+    changeSource = null;
+    watchChanges();
+    loadPage(pageCursors[currentPage - 1]);
+  });
+}
+
+function applyChange(change) {
+  const row = change.catalogue; // null once deleted
+  const visible = row && (!statusFilter || row.status === statusFilter);
+  const index = allCatalogues.findIndex((c) => c.catalogue_id === change.catalogue_id);
+  if (index >= 0) {
+    if (visible) allCatalogues[index] = row;
+    else allCatalogues.splice(index, 1);
+  } else if (visible && change.action === "created" && currentPage === 1) {
+    // newest first, so a new catalogue belongs at the top of the first page
+    allCatalogues.unshift(row);
+    if (allCatalogues.length > rowsPerPage) allCatalogues.pop();
+  } else {
+    return;
+  }
+  renderTable();
+}
+
+function showSection(id, reload = true) {
   document.querySelectorAll(".section").forEach((s) => (s.style.display = "none"));
   document.getElementById(id).style.display = "flex";
 
@@ -18,7 +54,7 @@ function showSection(id) {
     resetForm();
   }
 
-  if (id === "all_catalogues") getAllCatalogues();
+  if (id === "all_catalogues" && reload) getAllCatalogues();
 }
 
 function formatDate(dateStr) {
@@ -60,7 +96,7 @@ function createCatalogue() {
   }).then((res) => {
     if (res.ok) {
       alert("✅ Catalogue Created");
-      initCatalogueView();
+      showSection("all_catalogues", false);
     } else {
       alert("❌ Failed to create catalogue");
     }
@@ -84,8 +120,7 @@ function updateCatalogue() {
   }).then((res) => {
     if (res.ok) {
       alert("✏️ Catalogue Updated");
-      initCatalogueView();
-      showSection("all_catalogues");
+      showSection("all_catalogues", false);
     } else {
       alert("❌ Failed to update catalogue");
     }
@@ -93,7 +128,19 @@ function updateCatalogue() {
 }
 
 function getAllCatalogues() {
-  fetch(apiUrl, {
+  statusFilter = null;
+  currentPage = 1;
+  pageCursors = [null];
+  loadPage(null);
+}
+
+function loadPage(cursor) {
+  // Newest first, one page per request
+  const params = new URLSearchParams({ limit: rowsPerPage, sort: "catalogue_id", order: "desc" });
+  if (cursor) params.set("after", cursor);
+  if (statusFilter) params.set("status", statusFilter);
+
+  fetch(`${apiUrl}?${params}`, {
     method: "GET",
     credentials: "include"
   })
@@ -102,8 +149,8 @@ function getAllCatalogues() {
       return res.json();
     })
     .then((data) => {
-      allCatalogues = data.reverse(); // Show newest first
-      currentPage = 1;
+      allCatalogues = data.items;
+      nextCursor = data.next_cursor;
       renderTable();
     })
     .catch((err) => {
@@ -112,22 +159,30 @@ function getAllCatalogues() {
 }
 
 function searchById() {
-  const id = document.getElementById("get_id").value;
-  if (!id) {
+  const input = document.getElementById("get_id").value.trim();
+  if (!input) {
     alert("❗Please enter a valid ID");
     return;
   }
 
-  fetch(`${apiUrl}/${id}`, { credentials: "include" })
+  // One request for any number of comma-separated IDs
+  fetch(`${apiUrl}?ids=${encodeURIComponent(input)}`, { credentials: "include" })
     .then((res) => res.json())
     .then((data) => {
       if (data.error) {
+        alert("❌ " + data.error);
+        return;
+      }
+
+      const found = data.items.filter((c) => !c.not_found);
+      if (found.length === 0) {
         alert("❌ Catalogue not found!");
         return;
       }
 
-      allCatalogues = [data];
+      allCatalogues = found;
       currentPage = 1;
+      nextCursor = null;
       renderTable();
     })
     .catch(() => {
@@ -136,20 +191,17 @@ function searchById() {
 }
 
 function filterCataloguesByStatus(status) {
-  const filtered = allCatalogues.filter((c) => c.status === status);
+  statusFilter = status.toLowerCase();
   currentPage = 1;
-  renderTable(filtered);
+  pageCursors = [null];
+  loadPage(null);
 }
 
 function renderTable(data = allCatalogues) {
   const tbody = document.getElementById("all_data");
   tbody.innerHTML = "";
 
-  const start = (currentPage - 1) * rowsPerPage;
-  const end = start + rowsPerPage;
-  const pageItems = data.slice(start, end);
-
-  pageItems.forEach((c) => {
+  data.forEach((c) => {
     const row = document.createElement("tr");
     row.innerHTML = `
       <td>${c.catalogue_id}</td>
@@ -167,7 +219,7 @@ function renderTable(data = allCatalogues) {
   });
 
   document.getElementById("page_info").textContent =
-    `Page ${currentPage} of ${Math.ceil(data.length / rowsPerPage)}`;
+    nextCursor ? `Page ${currentPage}` : `Page ${currentPage} (last)`;
 }
 
 function editCatalogue(id) {
@@ -191,16 +243,17 @@ function editCatalogue(id) {
 }
 
 function nextPage() {
-  if (currentPage < Math.ceil(allCatalogues.length / rowsPerPage)) {
+  if (nextCursor) {
+    pageCursors[currentPage] = nextCursor;
     currentPage++;
-    renderTable();
+    loadPage(nextCursor);
   }
 }
 
 function prevPage() {
   if (currentPage > 1) {
     currentPage--;
-    renderTable();
+    loadPage(pageCursors[currentPage - 1]);
   }
 }
 
@@ -211,7 +264,6 @@ function deleteById(id) {
       credentials: "include"
     }).then(() => {
       alert("🗑️ Catalogue Deleted");
-      initCatalogueView();
     });
   }
 }
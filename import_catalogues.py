@@ -0,0 +1,370 @@
+"""
+Bulk importer for supplier catalogue files.
+
+Streams a CSV (with a header row) or NDJSON file, validates it with
+``catalogue_validator`` and inserts the valid rows through
+:class:`catalogueService`. A reader thread parses and validates batches
+of ``commit_every`` rows into a bounded queue; the main thread writes each
+batch in one transaction, then records the position in a checkpoint
+file. Running the same command again after an interruption resumes after
+the last committed batch (and after a finished import, imports nothing);
+``--restart`` starts over. A crash between a commit and its checkpoint
+write can repeat that one batch on resume.
+
+Rows are loaded with multi-row INSERTs, or with ``LOAD DATA LOCAL
+INFILE`` when ``[mysql] local_infile`` is enabled (``method=auto``). Only
+the importer's own connection allows LOCAL INFILE; the web pool never does.
+Rejected rows are written with their line number and errors to the
+``--rejects`` file, and so are rows LOAD DATA stored with a warning (a
+value MySQL truncated or replaced), marked ``"loaded": true``. Files written by ``GET /catalogues/export`` can be
+imported as they are; their ``catalogue_id`` column is ignored.
+
+Defaults come from the [import] and [bulk] sections of config.ini.
+
+Usage::
+
+    python import_catalogues.py supplier.csv
+    python import_catalogues.py supplier.ndjson --commit-every 50000 --rejects rejected.ndjson
+"""
+
+import argparse
+import csv
+import json
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from config.logger_config import logger
+from config.settings import get_section
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import catalogueService
+from util import serializer
+from util.db_connection import open_connection
+from util.validators import catalogue_validator
+
+FORMATS = ("csv", "ndjson")
+METHODS = ("auto", "insert", "load_data")
+# columns of an export file that the importer drops instead of rejecting
+IGNORED_COLUMNS = ("catalogue_id",)
+# MySQL LOAD DATA escapes for the default FIELDS/LINES settings
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+# row number in a LOAD DATA warning, e.g. "Data truncated for column 'status' at row 12"
+_WARNING_ROW = re.compile(r"\bat row (\d+)")
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path}; pass --format")
+
+
+def read_records(path: str, fmt: str):
+    """
+    Yield ``(line, record)`` for every data row of the file.
+
+    ``record`` is a dict, or the reason the row could not be parsed as a str.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            for record in reader:
+                if None in record:
+                    yield reader.line_num, "row has more fields than the header"
+                else:
+                    yield reader.line_num, record
+            return
+        loads = serializer.loads
+        for line, text in enumerate(fh, 1):
+            if not text.strip():
+                continue
+            try:
+                yield line, loads(text)
+            except ValueError as e:
+                yield line, f"invalid JSON: {e}"
+
+
+def read_batches(records, size: int, skip: int = 0):
+    """
+    Group records into validated batches.
+
+    :param skip: Records to pass over first (already imported).
+    :return: Generator of ``(position, dtos, lines, rejects)``;
+        ``position`` counts the records consumed once this batch is written,
+        ``lines`` are the source lines of ``dtos`` and ``rejects`` is a list
+        of ``{"line", "error"}`` dicts.
+    """
+    position = 0
+    lines, items = [], []
+    for line, record in records:
+        position += 1
+        if position <= skip:
+            continue
+        if isinstance(record, dict):
+            for column in IGNORED_COLUMNS:
+                record.pop(column, None)
+        lines.append(line)
+        items.append(record)
+        if len(items) == size:
+            yield _validate(position, lines, items)
+            lines, items = [], []
+    if items:
+        yield _validate(position, lines, items)
+
+
+def _validate(position, lines, items):
+    valid, errors = catalogue_validator.validate_many(
+        [item if isinstance(item, dict) else None for item in items])
+    rejects = [{"line": lines[index], "error": items[index] if isinstance(items[index], str) else message}
+               for index, message in errors.items()]
+    return position, [catalogue(**clean) for _, clean in valid], [lines[index] for index, _ in valid], rejects
+
+
+def warning_errors(warnings, rows: int) -> list:
+    """
+    Assign ``SHOW WARNINGS`` rows of a LOAD DATA to the rows of its file.
+
+    :return: One entry per row: None, or its warnings as one message.
+        Warnings that name no row are logged instead.
+    """
+    errors = [None] * rows
+    for level, code, message in warnings:
+        match = _WARNING_ROW.search(message)
+        index = int(match.group(1)) - 1 if match else -1
+        if not 0 <= index < rows:
+            logger.warning("LOAD DATA %s %s: %s", level, code, message)
+            continue
+        text = f"{level} {code}: {message}"
+        errors[index] = text if errors[index] is None else f"{errors[index]}; {text}"
+    return errors
+
+
+def write_tsv(path: str, dtos) -> None:
+    """Write DTOs as a LOAD DATA file (tab-separated, ``\\N`` for NULL)."""
+    def field(value):
+        return "\\N" if value is None else str(value).translate(_TSV_ESCAPES)
+
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for item in dtos:
+            fh.write("\t".join((field(item.catalogue_name), field(item.catalogue_description),
+                                field(item.effective_from), field(item.effective_to),
+                                field(item.status))) + "\n")
+
+
+class Checkpoint:
+    """
+    Progress of one import, kept in a JSON file next to the source.
+
+    The source's size and modification time are recorded so a checkpoint
+    is never applied to a different file.
+    """
+
+    def __init__(self, path: str, source: str) -> None:
+        self.path = path
+        stat = os.stat(source)
+        self.source = {"path": os.path.abspath(source), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        self.position = self.imported = self.rejected = 0
+
+    def load(self) -> bool:
+        """Read saved progress; False when there is none for this source."""
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                saved = json.load(fh)
+        except FileNotFoundError:
+            return False
+        if saved.get("source") != self.source:
+            raise ValueError(f"{self.path} belongs to another version of the file; use --restart")
+        self.position, self.imported, self.rejected = saved["position"], saved["imported"], saved["rejected"]
+        return True
+
+    def save(self) -> None:
+        data = {"source": self.source, "position": self.position,
+                "imported": self.imported, "rejected": self.rejected}
+        temp = f"{self.path}.tmp"
+        with open(temp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(temp, self.path)
+
+
+class Importer:
+    """
+    Runs one import; see the module docstring.
+
+    :param service: Service the rows are written through.
+    :param commit_every: Rows per transaction and checkpoint.
+    :param batch_size: Rows per INSERT statement.
+    :param queue_size: Validated batches buffered between the threads.
+    :param method: ``insert``, ``load_data`` or ``auto`` (``load_data``
+        when ``[mysql] local_infile`` is on). ``load_data`` falls back to
+        ``insert`` if the server refuses it.
+    """
+
+    def __init__(self, service: catalogueService, commit_every: int = 10000, batch_size: int = 1000,
+                 queue_size: int = 4, method: str = "insert") -> None:
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {', '.join(METHODS)}")
+        if method == "auto":
+            method = "load_data" if get_section("mysql").getboolean("local_infile", False) else "insert"
+        self.service = service
+        self.commit_every = commit_every
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.method = method
+        self._stop = threading.Event()
+        self._load_conn = None
+
+    def _put(self, out: queue.Queue, item) -> bool:
+        # gives up once the writer has stopped, so a full queue cannot hang the reader
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, batches, out: queue.Queue) -> None:
+        try:
+            for batch in batches:
+                if not self._put(out, batch):
+                    return
+            self._put(out, None)
+        except BaseException as e:
+            self._put(out, e)
+
+    def _write(self, dtos) -> tuple[int, list]:
+        """
+        Insert one batch.
+
+        :return: ``(rows inserted cleanly, errors)``; ``errors`` is empty, or
+            has one entry per row: None, the reason the database refused it,
+            or a ``{"error", "loaded"}`` dict for a row LOAD DATA stored with a warning.
+        """
+        if not dtos:
+            return 0, []
+        if self.method == "load_data":
+            with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False) as fh:
+                temp = fh.name
+            try:
+                write_tsv(temp, dtos)
+                if self._load_conn is None:
+                    self._load_conn = open_connection(allow_local_infile=True)
+                loaded, warnings = self.service.load_catalogues_file(temp, self._load_conn)
+                if not warnings:
+                    return loaded, []
+                errors = [None if error is None else {"error": error, "loaded": True}
+                          for error in warning_errors(warnings, len(dtos))]
+                return loaded - sum(error is not None for error in errors), errors
+            except Exception as e:
+                logger.warning("LOAD DATA unavailable (%s); importing with INSERT", e)
+                self.method = "insert"
+                self._close_load_connection()
+            finally:
+                os.remove(temp)
+        results = self.service.bulk_create_catalogues(dtos, atomic=True, batch_size=self.batch_size)
+        if all(result["status"] == "created" for result in results):
+            return len(results), []
+        # isolate the rows the database refuses; the others are still imported
+        results = self.service.bulk_create_catalogues(dtos, atomic=False, batch_size=self.batch_size)
+        errors = [None if result["status"] == "created" else result.get("error", result["status"])
+                  for result in results]
+        return sum(error is None for error in errors), errors
+
+    def run(self, source: str, fmt: str, checkpoint: Checkpoint, rejects=None) -> dict:
+        """
+        Import ``source`` from the checkpoint's position.
+
+        :param rejects: Text file receiving one JSON line per rejected row.
+        :return: Totals: ``read``, ``imported``, ``rejected``, ``seconds``
+            and ``rows_per_second`` for this run, plus the overall
+            ``position``.
+        """
+        self._stop.clear()
+        skip, imported_before, rejected_before = checkpoint.position, checkpoint.imported, checkpoint.rejected
+        if skip:
+            logger.info("Resuming %s after %s rows", source, skip)
+        batches = read_batches(read_records(source, fmt), self.commit_every, skip)
+        pending = queue.Queue(maxsize=self.queue_size)
+        reader = threading.Thread(target=self._produce, args=(batches, pending), name="import-reader", daemon=True)
+        started = time.perf_counter()
+        reader.start()
+        try:
+            while True:
+                batch = pending.get()
+                if batch is None:
+                    break
+                if isinstance(batch, BaseException):
+                    raise batch
+                position, dtos, lines, rejected = batch
+                inserted, errors = self._write(dtos)
+                rejected.extend({"line": line, **error} if isinstance(error, dict) else {"line": line, "error": error}
+                                for line, error in zip(lines, errors) if error is not None)
+                if rejects is not None and rejected:
+                    rejects.writelines(json.dumps(row) + "\n" for row in rejected)
+                    rejects.flush()
+                checkpoint.position = position
+                checkpoint.imported += inserted
+                checkpoint.rejected += len(rejected)
+                checkpoint.save()
+                elapsed = time.perf_counter() - started
+                logger.info("Imported %s rows (%s rejected), %.0f rows/s",
+                            checkpoint.imported, checkpoint.rejected, (position - skip) / max(elapsed, 1e-9))
+        finally:
+            self._stop.set()
+            reader.join()
+            self._close_load_connection()
+        elapsed = time.perf_counter() - started
+        read = checkpoint.position - skip
+        return {"read": read, "imported": checkpoint.imported - imported_before,
+                "rejected": checkpoint.rejected - rejected_before, "position": checkpoint.position,
+                "seconds": round(elapsed, 3), "rows_per_second": round(read / max(elapsed, 1e-9))}
+
+    def _close_load_connection(self) -> None:
+        conn, self._load_conn = self._load_conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                logger.debug("Ignoring error while closing the LOAD DATA connection", exc_info=True)
+
+
+def main(argv=None) -> int:
+    settings = get_section("import")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--commit-every", type=int, default=settings.getint("commit_every", 10000))
+    parser.add_argument("--batch-size", type=int, default=get_section("bulk").getint("batch_size", 1000))
+    parser.add_argument("--queue-size", type=int, default=settings.getint("queue_size", 4))
+    parser.add_argument("--method", choices=METHODS, default=settings.get("method", "auto"))
+    parser.add_argument("--checkpoint", help="progress file; defaults to <source>.checkpoint")
+    parser.add_argument("--rejects", help="append rejected rows to this NDJSON file")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and start from the top")
+    args = parser.parse_args(argv)
+
+    serializer.set_backend("auto")
+    checkpoint = Checkpoint(args.checkpoint or f"{args.source}.checkpoint", args.source)
+    if not args.restart:
+        checkpoint.load()
+    importer = Importer(catalogueService(), args.commit_every, args.batch_size, args.queue_size, args.method)
+    rejects = open(args.rejects, "a", encoding="utf-8") if args.rejects else None
+    try:
+        summary = importer.run(args.source, args.format or detect_format(args.source), checkpoint, rejects)
+    finally:
+        if rejects is not None:
+            rejects.close()
+    print(f"Imported {summary['imported']} of {summary['read']} rows in {summary['seconds']}s "
+          f"({summary['rows_per_second']} rows/s); {summary['rejected']} rejected")
+    return 0 if not summary["rejected"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
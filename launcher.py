@@ -0,0 +1,255 @@
+"""
+Production launcher for the catalogue API.
+
+``threaded`` mode (the default) serves from this process alone.
+``prefork`` mode binds the socket in a master process, forks ``workers``
+processes that each serve it with werkzeug's threaded server, and replaces
+any worker that dies. Each worker keeps its own search index, effective
+date index, stats and read cache, updated only by the writes it serves
+itself, so with more than one worker a request can see another worker's
+stale copy; use it only where that is acceptable.
+With ``preload`` the app is built before forking, so workers share it
+and start at once; without it every worker imports the app itself, which
+lets a restart pick up new code.
+
+Signals to the master (or the single process in threaded mode):
+
+- ``SIGTERM`` / ``SIGINT``: stop accepting, let in-flight requests finish
+  for up to ``graceful_timeout`` seconds, then exit.
+- ``SIGHUP`` (prefork only): graceful restart; a new set of workers is
+  started and then the old ones are stopped as above.
+
+Defaults come from the [server] section of config.ini.
+
+Usage::
+
+    python launcher.py --port 8000
+    python launcher.py --mode prefork --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from config.logger_config import logger, restart_after_fork, shutdown_logging
+from config.settings import get_section
+from util import db_connection
+
+MODES = ("prefork", "threaded")
+# a worker that exits sooner than this after starting is not respawned at once
+MIN_WORKER_LIFETIME = 1.0
+
+
+def load_app(warm: bool = False, app=None):
+    """
+    Import the app; with ``warm``, also build the services that need no database.
+
+    :param app: An app already built, e.g. by ``python app.py``, used instead of importing it again.
+    """
+    if app is None:
+        from app import app
+    if warm:
+        app.extensions["catalogue"].warm()
+    return app
+
+
+def bind(host: str, port: int, backlog: int = 128) -> socket.socket:
+    """Open the listening socket the server (or every worker) accepts on."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    listener.set_inheritable(True)
+    return listener
+
+
+def serve(app, listener: socket.socket, graceful_timeout: float) -> None:
+    """
+    Serve ``app`` on ``listener`` until SIGTERM or SIGINT, then drain.
+
+    Request threads are joined on shutdown; if they take longer than
+    ``graceful_timeout`` the process exits anyway.
+    """
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    # join request threads in server_close instead of abandoning them
+    server.daemon_threads = False
+
+    def stop(signum, frame):
+        logger.info("Worker %s stopping (signal %s)", os.getpid(), signum)
+        watchdog = threading.Timer(graceful_timeout, os._exit, (1,))
+        watchdog.daemon = True
+        watchdog.start()
+        # shutdown() waits for serve_forever, which runs on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    services = app.extensions["catalogue"]
+    services.start_background()
+    logger.info("Worker %s serving on %s:%s", os.getpid(), host, port)
+    try:
+        server.serve_forever()
+    finally:
+        services.stop_background(graceful_timeout)
+        server.server_close()
+
+
+class Master:
+    """
+    Forks and supervises prefork workers.
+
+    :param listener: Bound socket the workers inherit.
+    :param workers: Number of worker processes.
+    :param app: Preloaded app, or None for workers to import it themselves.
+    :param graceful_timeout: Seconds a stopping worker gets before SIGKILL.
+    """
+
+    def __init__(self, listener: socket.socket, workers: int, app=None, graceful_timeout: float = 30.0) -> None:
+        self.listener = listener
+        self.workers = workers
+        self.app = app
+        self.graceful_timeout = graceful_timeout
+        self.generation = 0
+        self._children = {}  # pid -> (generation, started)
+        self._stopping = {}  # pid -> kill deadline
+        self._restart = False
+        self._shutdown = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = (self.generation, time.monotonic())
+            return pid
+        code = 0
+        try:
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            restart_after_fork()
+            db_connection.discard_pool()
+            serve(self.app or load_app(), self.listener, self.graceful_timeout)
+        except BaseException:
+            logger.exception("Worker %s failed", os.getpid())
+            code = 1
+        finally:
+            shutdown_logging()
+            os._exit(code)
+
+    def _stop_workers(self, pids) -> None:
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            if pid not in self._stopping:
+                self._stopping[pid] = deadline
+                self._signal(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid: int, signum) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation, started = self._children.pop(pid, (None, 0.0))
+            expected = self._stopping.pop(pid, None) is not None
+            if not expected and not self._shutdown:
+                logger.warning("Worker %s exited unexpectedly (status %s)", pid, status)
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self._stopping.items()):
+            if now >= deadline:
+                logger.warning("Worker %s did not stop within %ss; killing it", pid, self.graceful_timeout)
+                self._signal(pid, signal.SIGKILL)
+                self._stopping[pid] = float("inf")
+
+    def run(self) -> int:
+        def on_stop(signum, frame):
+            self._shutdown = True
+
+        def on_restart(signum, frame):
+            self._restart = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_restart)
+        logger.info("Master %s starting %s workers", os.getpid(), self.workers)
+
+        while not self._shutdown:
+            if self._restart:
+                self._restart = False
+                self.generation += 1
+                logger.info("Graceful restart: starting generation %s", self.generation)
+            current = [pid for pid, (generation, _) in self._children.items() if generation == self.generation]
+            for _ in range(self.workers - len(current)):
+                self.spawn()
+            # old workers are only told to stop once their replacements exist
+            self._stop_workers([pid for pid, (generation, _) in self._children.items()
+                                if generation != self.generation])
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.1)
+
+        logger.info("Master %s stopping %s workers", os.getpid(), len(self._children))
+        self._stop_workers(list(self._children))
+        while self._children:
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.05)
+        self.listener.close()
+        return 0
+
+
+def main(argv=None, app=None) -> int:
+    """
+    Parse the command line and serve.
+
+    :param app: The app to serve; by default it is imported from app.py.
+    """
+    settings = get_section("server")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=settings.getint("port", 5000))
+    parser.add_argument("--mode", choices=MODES, default=settings.get("mode", "threaded"))
+    parser.add_argument("--workers", type=int, default=settings.getint("workers", 0),
+                        help="worker processes in prefork mode; 0 means one per CPU")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction,
+                        default=settings.getboolean("preload", True))
+    parser.add_argument("--graceful-timeout", type=float, default=settings.getfloat("graceful_timeout", 30.0))
+    parser.add_argument("--backlog", type=int, default=settings.getint("backlog", 128))
+    args = parser.parse_args(argv)
+
+    mode = args.mode
+    if mode == "prefork" and not hasattr(os, "fork"):
+        logger.warning("prefork mode needs os.fork; falling back to threaded")
+        mode = "threaded"
+    listener = bind(args.host, args.port, args.backlog)
+
+    if mode == "threaded":
+        serve(load_app(warm=True, app=app), listener, args.graceful_timeout)
+        return 0
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1:
+        logger.warning("prefork with %s workers: each keeps its own search index, stats and read cache, "
+                       "which miss writes served by the other workers", workers)
+    app = load_app(warm=True, app=app) if args.preload else None
+    return Master(listener, workers, app, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+-- Per-table change counter. catalogueService bumps it in the same
+-- transaction as every write; GET /catalogues uses it for ETag and
+-- Last-Modified without reading the catalogue table.
+CREATE TABLE IF NOT EXISTS catalogue_version (
+    table_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+
+INSERT IGNORE INTO catalogue_version (table_name, version, updated_at)
+VALUES ('catalogue', 0, UTC_TIMESTAMP());
@@ -0,0 +1,9 @@
+-- Indexes behind the GET /catalogues filters.
+-- status alone, paged by catalogue_id
+CREATE INDEX idx_catalogue_status ON catalogue (status, catalogue_id);
+-- status combined with an effective date or window
+CREATE INDEX idx_catalogue_status_effective ON catalogue (status, effective_from, effective_to);
+-- effective date or window alone
+CREATE INDEX idx_catalogue_effective ON catalogue (effective_from, effective_to);
+-- name prefix (LIKE 'abc%')
+CREATE INDEX idx_catalogue_name ON catalogue (catalogue_name);
@@ -0,0 +1,11 @@
+-- Leases for background jobs that must run on one worker at a time.
+-- A worker takes a job by moving expires_at forward while it is in the
+-- past or already its own; see util/lease.py.
+CREATE TABLE IF NOT EXISTS job_lease (
+    job_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    owner VARCHAR(128) NOT NULL,
+    expires_at DATETIME NOT NULL
+);
+
+INSERT IGNORE INTO job_lease (job_name, owner, expires_at)
+VALUES ('catalogue_status', '', UTC_TIMESTAMP());
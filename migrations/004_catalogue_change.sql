@@ -0,0 +1,30 @@
+-- Append-only log of catalogue writes, read by GET /catalogues/changes.
+-- catalogueService adds one row per changed catalogue right after bumping
+-- catalogue_version, in the same transaction. The version row lock is held
+-- from then until commit, so change_id values are handed out in commit
+-- order and a reader never sees a lower id appear after a higher one.
+-- Indexes are declared with the table so the migration can run again:
+-- idx_catalogue_change_catalogue finds a catalogue's earlier entries for
+-- compaction, idx_catalogue_change_time the entries retention removes.
+CREATE TABLE IF NOT EXISTS catalogue_change (
+    change_id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    catalogue_id INT NOT NULL,
+    action VARCHAR(10) NOT NULL,
+    changed_at DATETIME NOT NULL,
+    INDEX idx_catalogue_change_catalogue (catalogue_id, change_id),
+    INDEX idx_catalogue_change_time (changed_at)
+);
+
+-- Highest change_id removed by retention. A client whose token is below
+-- it may have missed changes and has to resync from a full read.
+CREATE TABLE IF NOT EXISTS catalogue_change_horizon (
+    log_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    pruned_through BIGINT NOT NULL DEFAULT 0,
+    pruned_at DATETIME NOT NULL
+);
+
+INSERT IGNORE INTO catalogue_change_horizon (log_name, pruned_through, pruned_at)
+VALUES ('catalogue', 0, UTC_TIMESTAMP());
+
+INSERT IGNORE INTO job_lease (job_name, owner, expires_at)
+VALUES ('catalogue_change_compaction', '', UTC_TIMESTAMP());
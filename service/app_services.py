@@ -0,0 +1,135 @@
+# service/app_services.py
+
+import threading
+
+from config.settings import get_section
+from service.authentication_service import auth_service_from_config
+from service.catalogue_service import catalogueService, CATALOGUE_COLUMNS
+from service.change_feed import ChangeFeed, change_feed_from_config
+from service.status_scheduler import status_scheduler_from_config
+from util.assets import pipeline_from_config
+from util.cache import MISSING, cache_from_config
+from util.intervals import EffectiveDateIndex
+from util.search import CatalogueSearch
+from util.stats import CatalogueStats, stats_from_config
+
+
+class AppServices:
+    """
+    The services one app instance uses, each built on first use.
+
+    Creating the app therefore opens no database connection and reads no
+    frontend files; the first request that needs a service pays for it.
+    :meth:`start_background` starts the index builds and the status job,
+    and is called by the launcher in each worker once it is serving.
+
+    :param config: ConfigParser the services read their sections from.
+    :param static_folder: Directory the asset pipeline serves.
+    """
+
+    def __init__(self, config, static_folder: str) -> None:
+        self.config = config
+        self.static_folder = static_folder
+        self._built = {}
+        # re-entrant: the status job is built from the catalogue service
+        self._lock = threading.RLock()
+
+    def settings(self, name: str):
+        return get_section(name, self.config)
+
+    def _get(self, name: str, build):
+        value = self._built.get(name, MISSING)
+        if value is MISSING:
+            with self._lock:
+                value = self._built.get(name, MISSING)
+                if value is MISSING:
+                    value = self._built[name] = build()
+        return value
+
+    @property
+    def catalogue(self) -> catalogueService:
+        return self._get("catalogue", self._build_catalogue)
+
+    @property
+    def auth(self):
+        return self._get("auth", lambda: auth_service_from_config(self.settings("auth")))
+
+    @property
+    def search_index(self) -> CatalogueSearch:
+        self.catalogue
+        return self._built["search_index"]
+
+    @property
+    def effective_index(self) -> EffectiveDateIndex:
+        self.catalogue
+        return self._built["effective_index"]
+
+    @property
+    def stats(self) -> CatalogueStats:
+        self.catalogue
+        return self._built["stats"]
+
+    @property
+    def changes(self) -> ChangeFeed:
+        self.catalogue
+        return self._built["changes"]
+
+    @property
+    def status_scheduler(self):
+        return self._get("status_scheduler",
+                         lambda: status_scheduler_from_config(self.catalogue, self.settings("status_job")))
+
+    @property
+    def assets(self):
+        return self._get("assets", lambda: pipeline_from_config(self.static_folder, self.settings("assets")))
+
+    def _build_catalogue(self) -> catalogueService:
+        cache_settings = self.settings("cache")
+        service = catalogueService(
+            cache=cache_from_config(cache_settings),
+            cache_list=cache_settings.getboolean("cache_list", False)
+        )
+        search, effective, stats = self.settings("search"), self.settings("effective_index"), self.settings("stats")
+        self._built["search_index"] = CatalogueSearch(
+            service.iter_catalogue_chunks, CATALOGUE_COLUMNS, name_weight=search.getfloat("name_weight", 3.0),
+            changes=service.get_changes)
+        self._built["effective_index"] = EffectiveDateIndex(
+            service.iter_catalogue_chunks, CATALOGUE_COLUMNS, max_delta=effective.getint("max_delta", 4096),
+            changes=service.get_changes)
+        self._built["stats"] = stats_from_config(service, CATALOGUE_COLUMNS, stats)
+        self._built["changes"] = change_feed_from_config(service, self.settings("changes"))
+        if search.getboolean("enabled", True):
+            service.add_listener(self._built["search_index"].apply)
+        if effective.getboolean("enabled", True):
+            service.add_listener(self._built["effective_index"].apply)
+        if stats.getboolean("enabled", True):
+            service.add_listener(self._built["stats"].apply)
+        service.add_listener(self._built["changes"].notify)
+        return service
+
+    def warm(self) -> None:
+        """Build what needs no database: the asset pipeline and the services themselves."""
+        self.assets
+        self.auth
+        self.catalogue
+
+    def start_background(self) -> None:
+        """Start the configured index builds, stats reconciliation, change log compaction and the status job."""
+        for section, index, thread in (("search", self.search_index, "search-index"),
+                                       ("effective_index", self.effective_index, "effective-index")):
+            settings = self.settings(section)
+            if settings.getboolean("enabled", True) and settings.getboolean("build_on_startup", True):
+                threading.Thread(target=index.ensure_ready, name=thread, daemon=True).start()
+        if self.settings("stats").getboolean("enabled", True):
+            self.stats.start()
+        if self.settings("changes").getboolean("compaction_enabled", True):
+            self.changes.start()
+        if self.settings("status_job").getboolean("enabled", True):
+            self.status_scheduler.start()
+
+    def stop_background(self, timeout: float | None = None) -> None:
+        """Stop the background jobs that were started and end open change streams."""
+        for name in ("status_scheduler", "stats", "changes"):
+            job = self._built.get(name)
+            if job is not None:
+                job.stop(timeout)
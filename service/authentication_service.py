@@ -1,38 +1,164 @@
 # service/authentication_service.py
 
+import hashlib
+import hmac
 import logging
-import mysql.connector
+import os
+import threading
+import time
+
+from util.cache import LRUCache, MISSING, SingleFlight
+from util.db_connection import get_connection
+from util.passwords import DEFAULT_ITERATIONS, hash_password, verify_password
+from util.statements import STATEMENTS
 
 logger = logging.getLogger(__name__)
 
+STATEMENTS.register("users.select_by_username", "SELECT id, password FROM users WHERE username = %s",
+                    ("id", "password"))
+STATEMENTS.register("users.update_password", "UPDATE users SET password = %s WHERE id = %s")
+
+
 class AuthenticationService:
-    def __init__(self):
-        try:
-            self.conn = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="Shaa@9846",
-                database="catalogue_dbms"
-            )
-            self.cursor = self.conn.cursor(dictionary=True)
-            logger.info("Database connection for AuthenticationService established successfully.")
-        except mysql.connector.Error as err:
-            logger.exception("Error connecting to the database in AuthenticationService")
-            raise
+    """
+    Validates login credentials against the users table.
 
-    def validate_user(self, username, password):
-        logger.debug(f"Validating user with username: {username}")
-        try:
-            query = "SELECT * FROM users WHERE username = %s AND password = %s"
-            self.cursor.execute(query, (username, password))
-            result = self.cursor.fetchone()
-            if result:
-                logger.info(f"User '{username}' authenticated successfully.")
-                return True
+    Each call borrows its own pooled connection. Recent results are kept in
+    small TTL caches keyed by an HMAC of the credentials (the key is random
+    per process, so cached entries reveal nothing about the passwords):
+    a repeated good login skips the hash and the database, and a repeated
+    bad one is refused straight away.
+
+    Failures are counted per user and client. After ``max_failures`` of
+    them, that client's logins as that user are refused without a query
+    until ``failure_window`` seconds after the first failure; more failures
+    do not extend the window. Credentials verified within ``cache_ttl`` are
+    accepted before the count is looked at, so failures cannot lock out a
+    user who just logged in, and other clients are not affected at all.
+
+    :param hash_iterations: PBKDF2 cost for new and upgraded hashes.
+    :param cache_size: Entries kept in each of the verification caches.
+    :param cache_ttl: Seconds a successful verification is reused.
+    :param negative_cache_ttl: Seconds a failed verification is reused.
+    :param max_failures: Failed attempts allowed per user and client in the window.
+    :param failure_window: Seconds from the first failure before the count resets.
+    """
+
+    def __init__(self, hash_iterations: int = DEFAULT_ITERATIONS, cache_size: int = 10000,
+                 cache_ttl: float = 60.0, negative_cache_ttl: float = 30.0,
+                 max_failures: int = 5, failure_window: float = 300.0) -> None:
+        self.hash_iterations = hash_iterations
+        self.max_failures = max_failures
+        self._key = os.urandom(32)
+        self._verified = LRUCache(max_entries=cache_size, ttl=cache_ttl)
+        self._rejected = LRUCache(max_entries=cache_size, ttl=negative_cache_ttl)
+        self.failure_window = failure_window
+        # (username, client) -> (failures, monotonic time of the first); expires with its window
+        self._failures = LRUCache(max_entries=cache_size, ttl=failure_window)
+        self._failures_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.throttled = 0
+
+    def _digest(self, username: str, password: str) -> str:
+        message = f"{username}\0{password}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).hexdigest()
+
+    def _is_throttled(self, source: tuple) -> bool:
+        entry = self._failures.get(source)
+        return entry is not MISSING and entry[0] >= self.max_failures
+
+    def _record_failure(self, source: tuple) -> None:
+        now = time.monotonic()
+        with self._failures_lock:
+            entry = self._failures.get(source)
+            if entry is MISSING:
+                self._failures.set(source, (1, now))
+                return
+            failures, first = entry
+            # keep the expiry of the first failure, so a slow stream of failures cannot extend the lock
+            remaining = first + self.failure_window - now
+            if remaining > 0:
+                self._failures.set(source, (failures + 1, first), ttl=remaining)
             else:
-                logger.warning(f"Failed login attempt for username: {username}")
+                self._failures.set(source, (1, now))
+
+    def validate_user(self, username, password, client: str | None = None):
+        """
+        Check a username and password.
+
+        :param client: Where the attempt comes from, e.g. the remote address;
+            failures are counted per user and client.
+        """
+        logger.debug("Validating user with username: %s", username)
+        if not username or not password:
+            return False
+        key = self._digest(username, password)
+        if self._verified.get(key) is not MISSING:
+            logger.info("User '%s' authenticated successfully (cached).", username)
+            return True
+        source = (username, client)
+        if self._is_throttled(source):
+            with self._failures_lock:
+                self.throttled += 1
+            logger.warning("Too many failed logins for username %s from %s", username, client)
+            return False
+
+        if self._rejected.get(key) is not MISSING:
+            self._record_failure(source)
+            logger.warning("Failed login attempt for username: %s", username)
+            return False
+
+        valid = self._flight.do(key, lambda: self._check_credentials(username, password))
+        if valid is None:
+            return False
+        if valid:
+            self._verified.set(key, True)
+            self._failures.delete(source)
+            logger.info("User '%s' authenticated successfully.", username)
+        else:
+            self._rejected.set(key, True)
+            self._record_failure(source)
+            logger.warning("Failed login attempt for username: %s", username)
+        return valid
+
+    def _check_credentials(self, username, password):
+        """Verify against the database; None when it could not be reached."""
+        conn = get_connection()
+        if conn is None:
+            logger.error("No database connection; refusing login for %s", username)
+            return None
+        try:
+            row = STATEMENTS.fetch_one(conn, "users.select_by_username", (username,))
+            if row is None:
                 return False
+            user_id, stored = row
+            valid, needs_rehash = verify_password(password, stored, self.hash_iterations)
+            if needs_rehash:
+                STATEMENTS.execute(conn, "users.update_password",
+                                   (hash_password(password, self.hash_iterations), user_id))
+                conn.commit()
+                logger.info("Upgraded stored password hash for user id %s", user_id)
+            return valid
         except Exception as e:
-            logger.exception(f"Exception occurred while validating user: {username}")
+            logger.exception("Exception occurred while validating user: %s", username)
             raise
+        finally:
+            conn.close()
+
+    def clear_cache(self) -> None:
+        """Forget cached verifications and failure counts."""
+        self._verified.clear()
+        self._rejected.clear()
+        self._failures.clear()
+
 
+def auth_service_from_config(settings) -> AuthenticationService:
+    """Build the service from an [auth] config section."""
+    return AuthenticationService(
+        hash_iterations=settings.getint("hash_iterations", DEFAULT_ITERATIONS),
+        cache_size=settings.getint("cache_size", 10000),
+        cache_ttl=settings.getfloat("cache_ttl", 60.0),
+        negative_cache_ttl=settings.getfloat("negative_cache_ttl", 30.0),
+        max_failures=settings.getint("max_failures", 5),
+        failure_window=settings.getfloat("failure_window", 300.0),
+    )
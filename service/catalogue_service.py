@@ -4,144 +4,1132 @@ Interacts with the database using SQL queries.
 """
 
 import logging
-from dto.catalogue_dto import catalogue  # ensure this import exists
-from util.db_connection import get_connection  # assuming this path is correct
+import time
+from datetime import date, datetime
+from dto.catalogue_dto import COLUMNS, CatalogueRows, catalogue
+from util.db_connection import get_connection, get_read_connection, record_write  # assuming this path is correct
+from util.pagination import encode_cursor, decode_cursor
+from util.cache import ReadThroughCache
+from util.statements import STATEMENTS
+from exception.exception import validationerror
+from util.validators import VALID_STATUSES
 
 logger = logging.getLogger(__name__)
 
+# Filters accepted by get_catalogues_page; see filter_clauses.
+FILTER_KEYS = ("status", "effective_on", "from", "to", "name")
+# Columns clients may sort a page by; catalogue_id is always the tie-breaker.
+SORT_COLUMNS = ("catalogue_id", "catalogue_name", "effective_from", "effective_to", "status")
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+# Column order of the tuples read by every query (and yielded by iter_catalogue_chunks).
+CATALOGUE_COLUMNS = COLUMNS
+SELECT_COLUMNS = ", ".join(CATALOGUE_COLUMNS)
+EXPORT_CHUNK_SIZE = 1000
+LIST_CACHE_KEY = "catalogue:all"
+BULK_BATCH_SIZE = 1000
+# Ids per IN (...) list when fetching several catalogues at once.
+IDS_CHUNK_SIZE = 500
+# Rows moved per transaction by apply_status_transitions.
+STATUS_CHUNK_SIZE = 100
+# Entries per INSERT into catalogue_change, and removed per transaction by
+# compact_changes / prune_changes.
+CHANGE_LOG_CHUNK_SIZE = 1000
+# (from, to, condition on the run date) for the automatic lifecycle;
+# "inactive" is only ever set by hand.
+STATUS_TRANSITIONS = (
+    ("upcoming", "expired", "effective_to < %s"),
+    ("upcoming", "active", "effective_from <= %s AND effective_to >= %s"),
+    ("active", "expired", "effective_to < %s"),
+)
+BUMP_VERSION_QUERY = """
+UPDATE catalogue_version
+SET version = version + 1, updated_at = UTC_TIMESTAMP()
+WHERE table_name = 'catalogue'
+"""
+
+# Fixed-text statements, prepared once per pooled connection (see util/statements.py).
+STATEMENTS.register("catalogue.select_by_id",
+                    f"SELECT {SELECT_COLUMNS} FROM catalogue WHERE catalogue_id = %s", CATALOGUE_COLUMNS)
+STATEMENTS.register("catalogue.select_all", f"SELECT {SELECT_COLUMNS} FROM catalogue", CATALOGUE_COLUMNS)
+STATEMENTS.register("catalogue.insert", """
+INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, effective_to, status)
+VALUES (%s, %s, %s, %s, %s)
+""")
+STATEMENTS.register("catalogue.update_by_id", """
+UPDATE catalogue
+SET catalogue_name = %s,
+    catalogue_description = %s,
+    effective_from = %s,
+    effective_to = %s,
+    status = %s
+WHERE catalogue_id = %s
+""")
+STATEMENTS.register("catalogue.delete_by_id", "DELETE FROM catalogue WHERE catalogue_id = %s")
+STATEMENTS.register("catalogue_version.select",
+                    "SELECT version, updated_at FROM catalogue_version WHERE table_name = 'catalogue'",
+                    ("version", "updated_at"))
+STATEMENTS.register("catalogue_version.bump", BUMP_VERSION_QUERY)
+STATEMENTS.register("catalogue_change.insert",
+                    "INSERT INTO catalogue_change (catalogue_id, action, changed_at) VALUES (%s, %s, UTC_TIMESTAMP())")
+
+
+def _cache_key(catalogue_id) -> str:
+    return f"catalogue:{catalogue_id}"
+
+class _ChunkStream:
+    """
+    Iterator over ``fetchmany`` chunks that owns its connection.
+
+    The connection is returned to the pool once every row has been read.
+    If the consumer stops early, unread rows are still on the wire, so the
+    connection is dropped instead of being reused.
+    """
+
+    def __init__(self, conn, cursor, chunk_size: int) -> None:
+        self._conn = conn
+        self._cursor = cursor
+        self._chunk_size = chunk_size
+        self.rows = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> list[tuple]:
+        if self._conn is None:
+            raise StopIteration
+        try:
+            rows = self._cursor.fetchmany(self._chunk_size)
+        except Exception:
+            logger.exception("Error reading catalogue export after %s rows", self.rows)
+            self.close()
+            raise
+        if not rows:
+            logger.info("Catalogue export finished: %s rows", self.rows)
+            self._cursor.close()
+            self._conn.close()
+            self._conn = None
+            raise StopIteration
+        self.rows += len(rows)
+        return rows
+
+    def close(self) -> None:
+        """Release the connection if the stream was not read to the end."""
+        if self._conn is not None:
+            logger.warning("Catalogue export stopped after %s rows", self.rows)
+            self._conn.invalidate()
+            self._conn = None
+
+
 class catalogueService:
-    """Service class providing methods to manage catalogue"""
+    """
+    Service class providing methods to manage catalogue
+
+    :param cache: Optional read-through cache for single-record reads.
+    :param cache_list: Also cache the result of get_all_catalogues.
+    """
+
+    def __init__(self, cache: ReadThroughCache | None = None, cache_list: bool = False) -> None:
+        self.cache = cache
+        self.cache_list = cache_list
+        self._listeners = []
+
+    def add_listener(self, listener) -> None:
+        """
+        Call ``listener(action, records)`` after every committed write.
+
+        ``action`` is ``created``, ``updated`` or ``deleted``; ``records`` is
+        a list of dicts keyed by CATALOGUE_COLUMNS (only ``catalogue_id`` for
+        deletes). Listeners run on the writing thread, so keep them cheap.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, action: str, records: list[dict]) -> None:
+        if not records:
+            return
+        for listener in self._listeners:
+            try:
+                listener(action, records)
+            except Exception:
+                logger.exception("Catalogue listener failed for %s of %s rows", action, len(records))
+
+    @staticmethod
+    def _record(catalogue_id: int, item: catalogue) -> dict:
+        return {
+            "catalogue_id": catalogue_id,
+            "catalogue_name": item.catalogue_name,
+            "catalogue_description": item.catalogue_description,
+            "effective_from": item.effective_from,
+            "effective_to": item.effective_to,
+            "status": item.status,
+        }
+
+    @staticmethod
+    def _bump_version(conn, action: str, catalogue_ids) -> None:
+        """
+        Bump the data version and append the write to ``catalogue_change``.
+
+        Call once per transaction, right before the commit. The log entries
+        are added while the version row is locked, so their change_id
+        values follow commit order (see migrations/004_catalogue_change.sql).
+        The current request's reads then stay on the primary for a while
+        (see util/db_router.py).
+        """
+        record_write()
+        STATEMENTS.execute(conn, "catalogue_version.bump")
+        catalogue_ids = list(catalogue_ids)
+        if len(catalogue_ids) == 1:
+            STATEMENTS.execute(conn, "catalogue_change.insert", (catalogue_ids[0], action))
+            return
+        if not catalogue_ids:
+            return
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(catalogue_ids), CHANGE_LOG_CHUNK_SIZE):
+                chunk = catalogue_ids[start:start + CHANGE_LOG_CHUNK_SIZE]
+                placeholders = ", ".join(["(%s, %s, UTC_TIMESTAMP())"] * len(chunk))
+                params = []
+                for catalogue_id in chunk:
+                    params.extend((catalogue_id, action))
+                cursor.execute(
+                    f"INSERT INTO catalogue_change (catalogue_id, action, changed_at) VALUES {placeholders}", params)
+        finally:
+            cursor.close()
+
+    def _invalidate(self, *catalogue_ids) -> None:
+        """Drop cached reads affected by a write."""
+        if self.cache is None:
+            return
+        keys = [_cache_key(catalogue_id) for catalogue_id in catalogue_ids if catalogue_id is not None]
+        self.cache.invalidate(LIST_CACHE_KEY, *keys)
 
     def create_catalogue(self, catalogue: catalogue) -> int:
         """
         Insert a new catalogue into the database.
         """
-        logger.debug(f"Attempting to create catalogue: {catalogue}")
+        logger.debug("Attempting to create catalogue: %s", catalogue)
         try:
             conn = get_connection()
-            cursor = conn.cursor()
-
-            query = """
-            INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, effective_to, status)
-            VALUES (%s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(query, (
+            cursor = STATEMENTS.execute(conn, "catalogue.insert", (
                 catalogue.catalogue_name,
                 catalogue.catalogue_description,
                 catalogue.effective_from,
                 catalogue.effective_to,
                 catalogue.status
             ))
-            conn.commit()
             row_count = cursor.rowcount
-            logger.info(f"Catalogue created successfully. Rows inserted: {row_count}")
+            new_id = cursor.lastrowid
+            self._bump_version(conn, "created", [new_id])
+            conn.commit()
+            self._invalidate(new_id)
+            self._notify("created", [self._record(new_id, catalogue)])
+            logger.info("Catalogue created successfully. Rows inserted: %s", row_count)
             return row_count
         except Exception as e:
             logger.exception("Failed to create catalogue")
             raise
+        finally:
+            conn.close()
+
+    def get_data_version(self) -> tuple[int, datetime | None] | None:
+        """
+        Return ``(version, updated_at)`` of the catalogue table.
+
+        The version changes on every committed write, so it can stand in for
+        the content of any catalogue read. Returns None if the counter row
+        is missing (migrations/001_catalogue_version.sql not applied).
+        """
+        try:
+            conn = get_read_connection()
+            row = STATEMENTS.fetch_one(conn, "catalogue_version.select")
+            return (row[0], row[1]) if row else None
+        except Exception as e:
+            logger.exception("Error reading catalogue data version")
+            raise
+        finally:
+            conn.close()
+
+    def get_catalogue_counts(self) -> dict:
+        """
+        Count catalogues with ``GROUP BY`` queries in one transaction.
+
+        :return: ``{"version": int | None, "by_status": {status: n},
+            "starts": {effective_from: n}, "ends": {effective_to: n}}``
+        """
+        logger.debug("Counting catalogues")
+        try:
+            conn = get_read_connection()
+            cursor = conn.cursor()
+            conn.start_transaction()
+            cursor.execute("SELECT version FROM catalogue_version WHERE table_name = 'catalogue'")
+            row = cursor.fetchone()
+            counts = {"version": row[0] if row else None}
+            for key, column in (("by_status", "status"), ("starts", "effective_from"), ("ends", "effective_to")):
+                cursor.execute(f"SELECT {column}, COUNT(*) FROM catalogue GROUP BY {column}")
+                counts[key] = dict(cursor.fetchall())
+            conn.commit()
+            return counts
+        except Exception as e:
+            logger.exception("Error counting catalogues")
+            raise
         finally:
             cursor.close()
             conn.close()
 
-    def get_catalogue_by_id(self, catalogue_id: int) -> dict | None:
+    # -------------------------
+    # Change log
+    # -------------------------
+
+    def get_changes(self, since: int, limit: int) -> dict:
         """
-        Fetch a single catalogue record by ID.
+        Read the change log entries after ``since`` in one transaction.
+
+        Each entry comes with the catalogue's current row, so a client
+        always gets the latest state however many entries it skips.
+
+        :param since: change_id the client has seen up to.
+        :param limit: Most entries to return.
+        :return: ``{"entries": [(change_id, catalogue_id, action, row | None)],
+            "head": int, "pruned_through": int, "version": int | None}``;
+            ``row`` is a tuple in CATALOGUE_COLUMNS order, None when the
+            catalogue no longer exists, ``head`` is the highest change_id
+            written so far and ``version`` the data version as of ``head``.
         """
-        logger.debug(f"Fetching catalogue by ID: {catalogue_id}")
+        logger.debug("Reading catalogue changes after %s (limit=%s)", since, limit)
+        columns = ", ".join(f"t.{column}" for column in CATALOGUE_COLUMNS)
         try:
             conn = get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM catalogue WHERE catalogue_id = %s", (catalogue_id,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Catalogue found: {result}")
-            else:
-                logger.warning(f"No catalogue found with ID: {catalogue_id}")
-            return result
+            cursor = conn.cursor()
+            conn.start_transaction()
+            cursor.execute("SELECT pruned_through FROM catalogue_change_horizon WHERE log_name = 'catalogue'")
+            row = cursor.fetchone()
+            pruned_through = row[0] if row else 0
+            cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM catalogue_change")
+            head = max(cursor.fetchone()[0], pruned_through)
+            cursor.execute("SELECT version FROM catalogue_version WHERE table_name = 'catalogue'")
+            row = cursor.fetchone()
+            version = row[0] if row else None
+            cursor.execute(
+                f"SELECT c.change_id, c.catalogue_id, c.action, {columns} FROM catalogue_change c "
+                f"LEFT JOIN catalogue t ON t.catalogue_id = c.catalogue_id "
+                f"WHERE c.change_id > %s ORDER BY c.change_id LIMIT %s",
+                (since, limit)
+            )
+            entries = [(row[0], row[1], row[2], row[3:] if row[3] is not None else None)
+                       for row in cursor.fetchall()]
+            conn.commit()
+            return {"entries": entries, "head": head, "pruned_through": pruned_through, "version": version}
         except Exception as e:
-            logger.exception(f"Error fetching catalogue with ID {catalogue_id}")
+            logger.exception("Error reading catalogue changes after %s", since)
             raise
         finally:
             cursor.close()
             conn.close()
 
-    def get_all_catalogues(self) -> list[dict]:
+    def compact_changes(self, chunk_size: int = CHANGE_LOG_CHUNK_SIZE, should_continue=None) -> int:
+        """
+        Delete change log entries followed by a later entry for the same catalogue.
+
+        Readers get a catalogue's current row with its latest entry, so the
+        earlier ones carry nothing; no token expires because of them.
+        Runs in short transactions of up to ``chunk_size`` entries.
+
+        :param should_continue: Called between chunks; stops the run when it returns False.
+        :return: Entries deleted.
         """
-        Fetch all catalogue records from the database.
+        logger.debug("Compacting the catalogue change log in chunks of %s", chunk_size)
+        removed, after = 0, 0
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            while True:
+                cursor.execute(
+                    "SELECT c.change_id FROM catalogue_change c WHERE c.change_id > %s AND EXISTS ("
+                    "SELECT 1 FROM catalogue_change n "
+                    "WHERE n.catalogue_id = c.catalogue_id AND n.change_id > c.change_id) "
+                    "ORDER BY c.change_id LIMIT %s",
+                    (after, chunk_size)
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    conn.commit()
+                    break
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"DELETE FROM catalogue_change WHERE change_id IN ({placeholders})", ids)
+                conn.commit()
+                removed += len(ids)
+                after = ids[-1]
+                if len(ids) < chunk_size or (should_continue is not None and not should_continue()):
+                    break
+            logger.info("Catalogue change log compacted: %s entries removed", removed)
+            return removed
+        except Exception as e:
+            conn.rollback()
+            logger.exception("Change log compaction failed after %s entries", removed)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def prune_changes(self, older_than: datetime, chunk_size: int = CHANGE_LOG_CHUNK_SIZE,
+                      should_continue=None) -> int:
+        """
+        Delete change log entries written before ``older_than`` (UTC).
+
+        Entries go oldest first, up to the newest one past the cutoff, and
+        catalogue_change_horizon records that change_id before any is
+        deleted, so a reader never misses them silently: tokens below it
+        are refused and the client resyncs.
+
+        :param should_continue: Called between chunks; stops the run when it returns False.
+        :return: Entries deleted.
+        """
+        logger.debug("Pruning catalogue changes older than %s", older_than)
+        removed = 0
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT MAX(change_id) FROM catalogue_change WHERE changed_at < %s", (older_than,))
+            cutoff = cursor.fetchone()[0]
+            if cutoff is None:
+                conn.commit()
+                return 0
+            cursor.execute(
+                "UPDATE catalogue_change_horizon SET pruned_through = %s, pruned_at = UTC_TIMESTAMP() "
+                "WHERE log_name = 'catalogue' AND pruned_through < %s",
+                (cutoff, cutoff)
+            )
+            conn.commit()
+            while True:
+                cursor.execute("SELECT change_id FROM catalogue_change WHERE change_id <= %s "
+                               "ORDER BY change_id LIMIT %s", (cutoff, chunk_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    conn.commit()
+                    break
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"DELETE FROM catalogue_change WHERE change_id IN ({placeholders})", ids)
+                conn.commit()
+                removed += len(ids)
+                if len(ids) < chunk_size or (should_continue is not None and not should_continue()):
+                    break
+            logger.info("Catalogue change log pruned through %s: %s entries removed", cutoff, removed)
+            return removed
+        except Exception as e:
+            conn.rollback()
+            logger.exception("Change log retention failed after %s entries", removed)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_catalogue_by_id(self, catalogue_id: int, version: int | None = None) -> catalogue | None:
+        """
+        Fetch a single catalogue record by ID, through the cache when set.
+
+        :param version: Data version the response's ETag is made from; a
+            cached row loaded at an older version is not used.
+        """
+        if self.cache is None:
+            return self._load_catalogue_by_id(catalogue_id)
+        return self.cache.get_or_load(_cache_key(catalogue_id),
+                                      lambda: self._load_catalogue_by_id(catalogue_id, replica=False),
+                                      version=version)
+
+    @staticmethod
+    def _read_connection(replica: bool):
+        # cache loads pass replica=False: a lagging replica could put back a row that
+        # a write has just invalidated, and it would be served for a whole TTL
+        return get_read_connection() if replica else get_connection()
+
+    def _load_catalogue_by_id(self, catalogue_id: int, replica: bool = True) -> catalogue | None:
+        logger.debug("Fetching catalogue by ID: %s", catalogue_id)
+        try:
+            conn = self._read_connection(replica)
+            row = STATEMENTS.fetch_one(conn, "catalogue.select_by_id", (catalogue_id,))
+            if row:
+                logger.debug("Catalogue found with ID: %s", catalogue_id)
+                return catalogue.from_row(row)
+            logger.warning("No catalogue found with ID: %s", catalogue_id)
+            return None
+        except Exception as e:
+            logger.exception("Error fetching catalogue with ID %s", catalogue_id)
+            raise
+        finally:
+            conn.close()
+
+    def get_catalogues_by_ids(self, catalogue_ids: list[int],
+                              version: int | None = None) -> list[catalogue | None]:
+        """
+        Fetch several catalogues with ``WHERE catalogue_id IN (...)`` queries.
+
+        Ids already in the cache are served from it; the rest are read in
+        chunks of IDS_CHUNK_SIZE over one connection.
+
+        :param version: As for :meth:`get_catalogue_by_id`.
+
+        :return: One entry per requested id, in request order; None where no
+            catalogue exists.
+        """
+        unique = list(dict.fromkeys(catalogue_ids))
+        if self.cache is None:
+            rows = self._load_catalogues_by_ids(unique)
+        else:
+            ids_by_key = {_cache_key(i): i for i in unique}
+
+            def load(keys):
+                loaded = self._load_catalogues_by_ids([ids_by_key[key] for key in keys], replica=False)
+                return {_cache_key(catalogue_id): row for catalogue_id, row in loaded.items()}
+
+            cached = self.cache.get_many_or_load(list(ids_by_key), load, version=version)
+            rows = {catalogue_id: cached.get(key) for key, catalogue_id in ids_by_key.items()}
+        return [rows.get(catalogue_id) for catalogue_id in catalogue_ids]
+
+    def _load_catalogues_by_ids(self, catalogue_ids: list[int], replica: bool = True) -> dict[int, catalogue]:
+        if not catalogue_ids:
+            return {}
+        logger.debug("Fetching %s catalogues by ID", len(catalogue_ids))
+        rows = {}
+        try:
+            conn = self._read_connection(replica)
+            cursor = conn.cursor()
+            for start in range(0, len(catalogue_ids), IDS_CHUNK_SIZE):
+                chunk = catalogue_ids[start:start + IDS_CHUNK_SIZE]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"SELECT {SELECT_COLUMNS} FROM catalogue WHERE catalogue_id IN ({placeholders})",
+                               chunk)
+                for row in cursor.fetchall():
+                    rows[row[0]] = catalogue.from_row(row)
+            logger.debug("Fetched %s of %s requested catalogues", len(rows), len(catalogue_ids))
+            return rows
+        except Exception as e:
+            logger.exception("Error fetching catalogues by ID")
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_all_catalogues(self, version: int | None = None) -> CatalogueRows:
+        """
+        Fetch all catalogue records from the database, as tuples in CATALOGUE_COLUMNS order.
+
+        The result is cached only when the service was built with ``cache_list``.
+
+        :param version: As for :meth:`get_catalogue_by_id`.
         """
+        if self.cache is not None and self.cache_list:
+            return self.cache.get_or_load(LIST_CACHE_KEY, lambda: self._load_all_catalogues(replica=False),
+                                          version=version)
+        return self._load_all_catalogues()
+
+    def _load_all_catalogues(self, replica: bool = True) -> CatalogueRows:
         logger.debug("Fetching all catalogues")
         try:
-            conn = get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM catalogue")
-            result = cursor.fetchall()
-            logger.info(f"Total catalogues fetched: {len(result)}")
+            conn = self._read_connection(replica)
+            result = CatalogueRows(STATEMENTS.fetch_all(conn, "catalogue.select_all"))
+            logger.debug("Total catalogues fetched: %s", len(result))
             return result
         except Exception as e:
             logger.exception("Error fetching all catalogues")
             raise
+        finally:
+            conn.close()
+
+    def get_catalogues_page(self, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None,
+                            sort_by: str | None = None, descending: bool = False,
+                            filters: dict | None = None) -> dict:
+        """
+        Fetch one page of catalogues using keyset (seek) pagination.
+
+        Rows are ordered by ``sort_by`` with ``catalogue_id`` as tie-breaker,
+        and the page starts right after the row encoded in ``after``.
+
+        :param limit: Maximum number of rows to return (capped at MAX_PAGE_SIZE).
+        :param after: Cursor from a previous page's ``next_cursor``.
+        :param sort_by: Column to order by; one of SORT_COLUMNS. Defaults to
+            the column of the most selective filter so an index supplies the order.
+        :param descending: Order from highest to lowest.
+        :param filters: Optional filters; see :meth:`filter_clauses`.
+        :return: ``{"items": CatalogueRows, "next_cursor": str | None, "limit": int}``
+        """
+        if limit < 1:
+            raise validationerror("limit must be a positive integer")
+        limit = min(limit, MAX_PAGE_SIZE)
+        query, params, sort_by = self.page_query(limit + 1, after, sort_by, descending, filters)
+
+        logger.debug("Fetching catalogue page: limit=%s sort=%s desc=%s after=%s filters=%s",
+                     limit, sort_by, descending, after, filters)
+        try:
+            conn = get_read_connection()
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            rows = CatalogueRows(cursor.fetchall())
+        except Exception as e:
+            logger.exception("Error fetching catalogue page")
+            raise
         finally:
             cursor.close()
             conn.close()
 
+        next_cursor = None
+        if len(rows) > limit:
+            del rows[limit:]
+            last = rows[-1]
+            next_cursor = encode_cursor({"s": sort_by, "d": descending,
+                                         "v": last[CATALOGUE_COLUMNS.index(sort_by)], "id": last[0]})
+        logger.debug("Catalogue page fetched: %s rows, more=%s", len(rows), next_cursor is not None)
+        return {"items": rows, "next_cursor": next_cursor, "limit": limit}
+
+    def get_indexed_page(self, find, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None,
+                         version: int | None = None) -> dict:
+        """
+        Fetch one page, in catalogue_id order, of ids matched by an in-memory index.
+
+        Only the page's rows are read, through :meth:`get_catalogues_by_ids`
+        and its cache. Cursors are compatible with
+        ``get_catalogues_page(sort_by="catalogue_id")``.
+
+        :param find: ``find(after_id, fetch)`` returning the lowest ``fetch``
+            matching ids above ``after_id`` (None for the first page) in
+            ascending order, and the total number of matches.
+        :param version: Passed on to :meth:`get_catalogues_by_ids`.
+        :return: ``{"items": [...], "next_cursor": str | None, "limit": int,
+            "count": int}``.
+        """
+        if limit < 1:
+            raise validationerror("limit must be a positive integer")
+        limit = min(limit, MAX_PAGE_SIZE)
+        after_id = None
+        if after:
+            cursor_data = decode_cursor(after)
+            if cursor_data.get("s") != "catalogue_id" or cursor_data.get("d") or "id" not in cursor_data:
+                raise validationerror("Cursor does not match the requested sort order")
+            after_id = cursor_data["id"]
+        page, count = find(after_id, limit + 1)
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor({"s": "catalogue_id", "d": False, "v": page[-1], "id": page[-1]})
+        rows = [row for row in self.get_catalogues_by_ids(page, version) if row is not None]
+        return {"items": rows, "next_cursor": next_cursor, "limit": limit, "count": count}
+
+    def page_query(self, fetch: int, after: str | None = None, sort_by: str | None = None,
+                   descending: bool = False, filters: dict | None = None) -> tuple[str, list, str]:
+        """
+        Build the SQL for one page without running it.
+
+        :return: ``(query, params, sort_by)`` with the sort column resolved.
+        """
+        filters = filters or {}
+        if sort_by is None:
+            if filters.get("name"):
+                sort_by = "catalogue_name"
+            elif any(filters.get(key) for key in ("effective_on", "from", "to")):
+                sort_by = "effective_from"
+            else:
+                sort_by = "catalogue_id"
+        if sort_by not in SORT_COLUMNS:
+            raise validationerror(f"Cannot sort by {sort_by!r}; use one of {', '.join(SORT_COLUMNS)}")
+
+        clauses, params = self.filter_clauses(filters)
+        if after:
+            cursor_data = decode_cursor(after)
+            if cursor_data.get("s") != sort_by or cursor_data.get("d") != descending or "id" not in cursor_data:
+                raise validationerror("Cursor does not match the requested sort order")
+            op = "<" if descending else ">"
+            if sort_by == "catalogue_id":
+                clauses.append(f"catalogue_id {op} %s")
+                params.append(cursor_data["id"])
+            else:
+                clauses.append(f"({sort_by} {op} %s OR ({sort_by} = %s AND catalogue_id {op} %s))")
+                params.extend([cursor_data["v"], cursor_data["v"], cursor_data["id"]])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        order = f"catalogue_id {direction}" if sort_by == "catalogue_id" \
+            else f"{sort_by} {direction}, catalogue_id {direction}"
+        params.append(fetch)
+        return f"SELECT {SELECT_COLUMNS} FROM catalogue {where} ORDER BY {order} LIMIT %s", params, sort_by
+
+    @staticmethod
+    def filter_clauses(filters: dict) -> tuple[list[str], list]:
+        """
+        Turn filter values into parameterized WHERE clauses.
+
+        Supported keys: ``status``; ``effective_on`` (a date the catalogue is
+        effective on); ``from``/``to`` (catalogues overlapping that window);
+        ``name`` (catalogue_name prefix). Each maps onto an index from
+        migrations/002_catalogue_filter_indexes.sql.
+        """
+        clauses, params = [], []
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            raise validationerror(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        status = filters.get("status")
+        if status:
+            if status.lower() not in VALID_STATUSES:
+                raise validationerror(f"status must be one of: {', '.join(VALID_STATUSES)}")
+            clauses.append("status = %s")
+            params.append(status.lower())
+        for key in ("effective_on", "from", "to"):
+            if filters.get(key) and not isinstance(filters[key], date):
+                raise validationerror(f"{key} must be a date")
+        if filters.get("effective_on"):
+            clauses.append("effective_from <= %s AND effective_to >= %s")
+            params.extend([filters["effective_on"], filters["effective_on"]])
+        if filters.get("from") and filters.get("to") and filters["from"] > filters["to"]:
+            raise validationerror("from must not be after to")
+        if filters.get("to"):
+            clauses.append("effective_from <= %s")
+            params.append(filters["to"])
+        if filters.get("from"):
+            clauses.append("effective_to >= %s")
+            params.append(filters["from"])
+        name = filters.get("name")
+        if name:
+            escaped = name.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+            clauses.append("catalogue_name LIKE %s ESCAPE '!'")
+            params.append(escaped + "%")
+        return clauses, params
+
+    def iter_catalogue_chunks(self, chunk_size: int = EXPORT_CHUNK_SIZE, replica: bool = False):
+        """
+        Stream every catalogue row in chunks from an unbuffered cursor.
+
+        The query runs before this method returns, so connection errors are
+        raised to the caller; rows are then read ``chunk_size`` at a time as
+        the returned generator is consumed. Rows are tuples in
+        CATALOGUE_COLUMNS order.
+
+        :param replica: Let a replica serve the rows. Left off for the
+            index and stats builds, which must see every write their
+            listeners will be told about.
+        """
+        logger.debug("Starting catalogue export in chunks of %s", chunk_size)
+        conn = cursor = None
+        try:
+            conn = self._read_connection(replica)
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(
+                f"SELECT {SELECT_COLUMNS} FROM catalogue ORDER BY catalogue_id"
+            )
+        except Exception as e:
+            logger.exception("Error starting catalogue export")
+            if cursor is not None:
+                cursor.close()
+            if conn is not None:
+                conn.close()
+            raise
+        return _ChunkStream(conn, cursor, chunk_size)
+
     def delete_catalogue_by_id(self, catalogue_id: int) -> bool:
         """
         Delete a catalogue record by its ID.
         """
-        logger.debug(f"Deleting catalogue with ID: {catalogue_id}")
+        logger.debug("Deleting catalogue with ID: %s", catalogue_id)
         try:
             conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM catalogue WHERE catalogue_id = %s", (catalogue_id,))
+            success = STATEMENTS.execute(conn, "catalogue.delete_by_id", (catalogue_id,)).rowcount > 0
+            if success:
+                self._bump_version(conn, "deleted", [catalogue_id])
             conn.commit()
-            success = cursor.rowcount > 0
+            self._invalidate(catalogue_id)
             if success:
-                logger.info(f"Catalogue with ID {catalogue_id} deleted successfully")
+                self._notify("deleted", [{"catalogue_id": catalogue_id}])
+                logger.info("Catalogue with ID %s deleted successfully", catalogue_id)
             else:
-                logger.warning(f"No catalogue found to delete with ID: {catalogue_id}")
+                logger.warning("No catalogue found to delete with ID: %s", catalogue_id)
             return success
         except Exception as e:
-            logger.exception(f"Error deleting catalogue with ID {catalogue_id}")
+            logger.exception("Error deleting catalogue with ID %s", catalogue_id)
             raise
         finally:
-            cursor.close()
             conn.close()
 
     def update_catalogue_by_id(self, catalogue_id: int, catalogue: catalogue) -> int:
         """
         Update an existing catalogue by its ID.
         """
-        logger.debug(f"Updating catalogue ID {catalogue_id} with data: {catalogue}")
+        logger.debug("Updating catalogue ID %s with data: %s", catalogue_id, catalogue)
         try:
             conn = get_connection()
-            cursor = conn.cursor()
-
-            query = """
-            UPDATE catalogue
-            SET catalogue_name = %s,
-                catalogue_description = %s,
-                effective_from = %s,
-                effective_to = %s,
-                status = %s
-            WHERE catalogue_id = %s
-            """
-
-            cursor.execute(query, (
+            row_count = STATEMENTS.execute(conn, "catalogue.update_by_id", (
                 catalogue.catalogue_name,
                 catalogue.catalogue_description,
                 catalogue.effective_from,
                 catalogue.effective_to,
                 catalogue.status,
                 catalogue_id
-            ))
+            )).rowcount
+            if row_count:
+                self._bump_version(conn, "updated", [catalogue_id])
             conn.commit()
-            row_count = cursor.rowcount
-            logger.info(f"Catalogue ID {catalogue_id} updated. Rows affected: {row_count}")
+            self._invalidate(catalogue_id)
+            if row_count:
+                self._notify("updated", [self._record(catalogue_id, catalogue)])
+            logger.info("Catalogue ID %s updated. Rows affected: %s", catalogue_id, row_count)
             return row_count
         except Exception as e:
-            logger.exception(f"Error updating catalogue with ID {catalogue_id}")
+            logger.exception("Error updating catalogue with ID %s", catalogue_id)
             raise
         finally:
+            conn.close()
+
+    # -------------------------
+    # Bulk operations
+    # -------------------------
+
+    def bulk_create_catalogues(self, catalogues: list[catalogue], atomic: bool = True,
+                               batch_size: int = BULK_BATCH_SIZE) -> list[dict]:
+        """
+        Insert many catalogues with multi-row INSERT statements.
+
+        :param catalogues: Catalogues to insert.
+        :param atomic: All-or-nothing when True; otherwise each batch is
+            committed on its own and rows of a failing batch are retried one
+            by one so only the bad rows are rejected.
+        :param batch_size: Rows per INSERT statement.
+        :return: One result per input, in order: ``{"status": "created",
+            "catalogue_id": ...}``, ``{"status": "error", "error": ...}`` or
+            ``{"status": "rolled_back"}``.
+        """
+        logger.debug("Bulk creating %s catalogues (atomic=%s)", len(catalogues), atomic)
+        results = [None] * len(catalogues)
+        created = []
+        # records of rows inserted but not yet committed, and of committed ones
+        pending, committed = [], []
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            for start in range(0, len(catalogues), batch_size):
+                batch = catalogues[start:start + batch_size]
+                try:
+                    first_id = self._insert_many(cursor, batch)
+                    if not atomic:
+                        self._bump_version(conn, "created", range(first_id, first_id + len(batch)))
+                        conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    if atomic:
+                        logger.warning("Bulk create rolled back at batch starting %s: %s", start, e)
+                        return self._rolled_back(len(catalogues), range(start, start + len(batch)), e)
+                    logger.warning("Bulk create batch starting %s failed, retrying rows singly: %s", start, e)
+                    for offset, item in enumerate(batch):
+                        result = results[start + offset] = self._insert_one(conn, cursor, item)
+                        if result["status"] == "created":
+                            created.append(result["catalogue_id"])
+                            committed.append(self._record(result["catalogue_id"], item))
+                    continue
+                for offset, item in enumerate(batch):
+                    results[start + offset] = {"status": "created", "catalogue_id": first_id + offset}
+                    created.append(first_id + offset)
+                    (pending if atomic else committed).append(self._record(first_id + offset, item))
+            if atomic and catalogues:
+                self._bump_version(conn, "created", [record["catalogue_id"] for record in pending])
+                conn.commit()
+                committed.extend(pending)
+            logger.info("Bulk create finished: %s of %s rows created", len(created), len(catalogues))
+            return results
+        except Exception as e:
+            logger.exception("Bulk create failed")
+            raise
+        finally:
+            self._invalidate(*created)
+            self._notify("created", committed)
             cursor.close()
             conn.close()
+
+    def _insert_many(self, cursor, batch: list[catalogue]) -> int:
+        """Insert a batch with one statement and return the first new id."""
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))
+        params = []
+        for item in batch:
+            params.extend((item.catalogue_name, item.catalogue_description,
+                           item.effective_from, item.effective_to, item.status))
+        cursor.execute(
+            "INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, "
+            f"effective_to, status) VALUES {placeholders}",
+            params
+        )
+        # Multi-row VALUES get consecutive ids; lastrowid is the first one.
+        return cursor.lastrowid
+
+    def load_catalogues_file(self, path: str, conn=None) -> tuple[int, list[tuple]]:
+        """
+        Insert the rows of a tab-separated file with ``LOAD DATA LOCAL INFILE``.
+
+        Columns are those of :meth:`_insert_many`, escaped the MySQL way
+        (``\\N`` is NULL). Needs ``local_infile`` on the server and a
+        connection opened with ``allow_local_infile``, which pooled
+        connections are not (see :func:`util.db_connection.open_connection`).
+        Listeners are not called, as the statement does not report the new
+        ids; the change log gets every id above the highest one seen before
+        the load (which may repeat a concurrent insert).
+
+        :param conn: Connection to load through; it is left open. Defaults
+            to a pooled one.
+        :return: ``(rows inserted, warnings)``; ``warnings`` are the
+            ``(level, code, message)`` rows of ``SHOW WARNINGS`` after the
+            load, e.g. for values MySQL truncated or replaced. At most the
+            server's ``max_error_count`` are kept.
+        """
+        logger.debug("Loading catalogues from %s", path)
+        pooled = conn is None
+        try:
+            if pooled:
+                conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(catalogue_id), 0) FROM catalogue")
+            last_id = cursor.fetchone()[0]
+            cursor.execute(
+                "LOAD DATA LOCAL INFILE %s INTO TABLE catalogue "
+                "(catalogue_name, catalogue_description, effective_from, effective_to, status)",
+                (path,)
+            )
+            loaded = cursor.rowcount
+            # warnings describe the last statement, so read them before anything else runs
+            cursor.execute("SHOW WARNINGS")
+            warnings = [tuple(row) for row in cursor.fetchall()]
+            self._bump_version(conn, "created", [])
+            cursor.execute(
+                "INSERT INTO catalogue_change (catalogue_id, action, changed_at) "
+                "SELECT catalogue_id, 'created', UTC_TIMESTAMP() FROM catalogue WHERE catalogue_id > %s "
+                "ORDER BY catalogue_id",
+                (last_id,)
+            )
+            conn.commit()
+            logger.info("Loaded %s catalogues from %s with %s warnings", loaded, path, len(warnings))
+            return loaded, warnings
+        except Exception as e:
+            conn.rollback()
+            logger.warning("LOAD DATA from %s failed: %s", path, e)
+            raise
+        finally:
+            self._invalidate()
+            cursor.close()
+            if pooled:
+                conn.close()
+
+    def _insert_one(self, conn, cursor, item: catalogue) -> dict:
+        try:
+            new_id = self._insert_many(cursor, [item])
+            self._bump_version(conn, "created", [new_id])
+            conn.commit()
+            return {"status": "created", "catalogue_id": new_id}
+        except Exception as e:
+            conn.rollback()
+            return {"status": "error", "error": str(e)}
+
+    def bulk_update_catalogues(self, updates: list[tuple[int, catalogue]], atomic: bool = True,
+                               batch_size: int = BULK_BATCH_SIZE) -> list[dict]:
+        """
+        Update many catalogues with ``executemany`` per batch.
+
+        :param updates: ``(catalogue_id, catalogue)`` pairs.
+        :param atomic: All-or-nothing when True; otherwise one commit per batch.
+        :param batch_size: Rows per ``executemany`` call.
+        :return: One result per input: ``updated``, ``not_found``, ``error``
+            or ``rolled_back``.
+        """
+        logger.debug("Bulk updating %s catalogues (atomic=%s)", len(updates), atomic)
+        query = """
+        UPDATE catalogue
+        SET catalogue_name = %s,
+            catalogue_description = %s,
+            effective_from = %s,
+            effective_to = %s,
+            status = %s
+        WHERE catalogue_id = %s
+        """
+        results = [None] * len(updates)
+        touched = []
+        pending, committed = [], []
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            for start in range(0, len(updates), batch_size):
+                batch = updates[start:start + batch_size]
+                ids = [catalogue_id for catalogue_id, _ in batch]
+                try:
+                    existing = self._existing_ids(cursor, ids)
+                    cursor.executemany(query, [
+                        (item.catalogue_name, item.catalogue_description, item.effective_from,
+                         item.effective_to, item.status, catalogue_id)
+                        for catalogue_id, item in batch
+                    ])
+                    if not atomic:
+                        self._bump_version(conn, "updated", [i for i in ids if i in existing])
+                        conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    if atomic:
+                        logger.warning("Bulk update rolled back at batch starting %s: %s", start, e)
+                        return self._rolled_back(len(updates), range(start, start + len(batch)), e)
+                    logger.warning("Bulk update batch starting %s failed: %s", start, e)
+                    for offset in range(len(batch)):
+                        results[start + offset] = {"status": "error", "error": str(e)}
+                    continue
+                touched.extend(ids)
+                for offset, (catalogue_id, item) in enumerate(batch):
+                    results[start + offset] = {
+                        "status": "updated" if catalogue_id in existing else "not_found",
+                        "catalogue_id": catalogue_id
+                    }
+                    if catalogue_id in existing:
+                        (pending if atomic else committed).append(self._record(catalogue_id, item))
+            if atomic and updates:
+                self._bump_version(conn, "updated", [record["catalogue_id"] for record in pending])
+                conn.commit()
+                committed.extend(pending)
+            logger.info("Bulk update finished for %s rows", len(updates))
+            return results
+        except Exception as e:
+            logger.exception("Bulk update failed")
+            raise
+        finally:
+            self._invalidate(*touched)
+            self._notify("updated", committed)
+            cursor.close()
+            conn.close()
+
+    def bulk_delete_catalogues(self, catalogue_ids: list[int], atomic: bool = True,
+                               batch_size: int = BULK_BATCH_SIZE) -> list[dict]:
+        """
+        Delete many catalogues with one ``IN (...)`` statement per batch.
+
+        :param catalogue_ids: Ids to delete.
+        :param atomic: All-or-nothing when True; otherwise one commit per batch.
+        :param batch_size: Ids per DELETE statement.
+        :return: One result per input: ``deleted``, ``not_found``, ``error``
+            or ``rolled_back``.
+        """
+        logger.debug("Bulk deleting %s catalogues (atomic=%s)", len(catalogue_ids), atomic)
+        results = [None] * len(catalogue_ids)
+        touched = []
+        pending, committed = [], []
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            for start in range(0, len(catalogue_ids), batch_size):
+                batch = catalogue_ids[start:start + batch_size]
+                try:
+                    existing = self._existing_ids(cursor, batch)
+                    placeholders = ", ".join(["%s"] * len(batch))
+                    cursor.execute(f"DELETE FROM catalogue WHERE catalogue_id IN ({placeholders})", batch)
+                    if not atomic:
+                        self._bump_version(conn, "deleted", [i for i in batch if i in existing])
+                        conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    if atomic:
+                        logger.warning("Bulk delete rolled back at batch starting %s: %s", start, e)
+                        return self._rolled_back(len(catalogue_ids), range(start, start + len(batch)), e)
+                    logger.warning("Bulk delete batch starting %s failed: %s", start, e)
+                    for offset in range(len(batch)):
+                        results[start + offset] = {"status": "error", "error": str(e)}
+                    continue
+                touched.extend(batch)
+                for offset, catalogue_id in enumerate(batch):
+                    results[start + offset] = {
+                        "status": "deleted" if catalogue_id in existing else "not_found",
+                        "catalogue_id": catalogue_id
+                    }
+                    if catalogue_id in existing:
+                        (pending if atomic else committed).append({"catalogue_id": catalogue_id})
+            if atomic and catalogue_ids:
+                self._bump_version(conn, "deleted", [record["catalogue_id"] for record in pending])
+                conn.commit()
+                committed.extend(pending)
+            logger.info("Bulk delete finished for %s ids", len(catalogue_ids))
+            return results
+        except Exception as e:
+            logger.exception("Bulk delete failed")
+            raise
+        finally:
+            self._invalidate(*touched)
+            self._notify("deleted", committed)
+            cursor.close()
+            conn.close()
+
+    def apply_status_transitions(self, today: date | None = None, chunk_size: int = STATUS_CHUNK_SIZE,
+                                 pause: float = 0.0, should_continue=None) -> dict[str, int]:
+        """
+        Move catalogues along the status lifecycle as their dates pass.
+
+        Each transition in STATUS_TRANSITIONS runs as a series of short
+        transactions: lock up to ``chunk_size`` matching rows, update them
+        with one ``UPDATE ... WHERE catalogue_id IN (...)``, bump the version
+        and commit. Locks are therefore held for one chunk at a time.
+
+        :param today: The date to compare effective dates with; defaults to today.
+        :param pause: Seconds to sleep between chunks, to leave room for other writers.
+        :param should_continue: Called between chunks; the run stops early
+            when it returns False (e.g. the job's lease was lost).
+        :return: Rows changed per ``"from->to"`` transition.
+        """
+        today = today or date.today()
+        changed = {f"{old}->{new}": 0 for old, new, _ in STATUS_TRANSITIONS}
+        columns = ", ".join(CATALOGUE_COLUMNS)
+        logger.debug("Applying status transitions for %s in chunks of %s", today, chunk_size)
+        conn = cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor(dictionary=True)
+            for old, new, condition in STATUS_TRANSITIONS:
+                params = [today] * condition.count("%s")
+                while True:
+                    cursor.execute(
+                        f"SELECT {columns} FROM catalogue WHERE status = %s AND {condition} "
+                        f"ORDER BY catalogue_id LIMIT %s FOR UPDATE",
+                        [old, *params, chunk_size]
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        conn.commit()
+                        break
+                    ids = [row["catalogue_id"] for row in rows]
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    cursor.execute(
+                        f"UPDATE catalogue SET status = %s "
+                        f"WHERE catalogue_id IN ({placeholders}) AND status = %s AND {condition}",
+                        [new, *ids, old, *params]
+                    )
+                    updated = cursor.rowcount
+                    self._bump_version(conn, "updated", ids)
+                    conn.commit()
+                    changed[f"{old}->{new}"] += updated
+                    self._invalidate(*ids)
+                    self._notify("updated", [dict(row, status=new) for row in rows])
+                    if len(rows) < chunk_size or not updated:
+                        break
+                    if should_continue is not None and not should_continue():
+                        logger.warning("Status transitions stopped early after %s", changed)
+                        return changed
+                    if pause:
+                        time.sleep(pause)
+            logger.info("Status transitions for %s applied: %s", today, changed)
+            return changed
+        except Exception as e:
+            if conn is not None:
+                conn.rollback()
+            logger.exception("Status transitions failed after %s", changed)
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if conn is not None:
+                conn.close()
+
+    def _existing_ids(self, cursor, catalogue_ids: list[int]) -> set[int]:
+        placeholders = ", ".join(["%s"] * len(catalogue_ids))
+        cursor.execute(f"SELECT catalogue_id FROM catalogue WHERE catalogue_id IN ({placeholders})",
+                       list(catalogue_ids))
+        return {row[0] for row in cursor.fetchall()}
+
+    @staticmethod
+    def _rolled_back(total: int, failed: range, error: Exception) -> list[dict]:
+        """Results for an atomic bulk call that was rolled back."""
+        results = [{"status": "rolled_back"} for _ in range(total)]
+        for index in failed:
+            results[index] = {"status": "error", "error": str(error)}
+        return results
@@ -0,0 +1,296 @@
+# service/change_feed.py
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from dto.catalogue_dto import catalogue
+from exception.exception import validationerror
+from util import metrics
+from util.lease import Lease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "catalogue_change_compaction"
+
+
+class ChangesExpired(Exception):
+    """
+    The token is older than the change log's retention (or newer than its head).
+
+    The client must read the catalogues in full again and continue from
+    ``head``, taken before that read so nothing written meanwhile is lost.
+    """
+
+    def __init__(self, head: int) -> None:
+        super().__init__("Change token is no longer available; resync")
+        self.head = head
+
+
+def format_token(change_id: int) -> str:
+    return str(change_id)
+
+
+def parse_token(token: str) -> int:
+    """
+    Read a token given out by the feed.
+
+    Tokens are change_id values written as decimal strings; they increase
+    with every write, but clients should treat them as opaque.
+
+    :raises validationerror: If the token is malformed.
+    """
+    if not token.isdigit():
+        raise validationerror(f"Invalid change token: {token!r}")
+    return int(token)
+
+
+class ChangeFeed:
+    """
+    Incremental sync over the catalogue_change log.
+
+    :meth:`read` returns the changes after a token, one per catalogue with
+    its current row, and the token to continue from. :meth:`wait` is the
+    long-poll form: it returns as soon as there is a change, or empty
+    after the timeout.
+
+    Waiters do not query the log themselves. While any are waiting, one
+    poller thread per process reads the new entries every ``poll_interval``
+    into an in-memory tail of up to ``tail_size`` entries and wakes them all;
+    each then builds its page from the tail. Writes made through this
+    process's catalogueService make the poller read at once (the feed is
+    one of its listeners); writes by other processes are picked up within
+    ``poll_interval``. A waiter whose token is not covered by the tail falls
+    back to :meth:`read`.
+
+    Every ``interval`` seconds a daemon thread takes the
+    ``catalogue_change_compaction`` lease and compacts the log, then
+    deletes entries older than ``retention``.
+
+    :param service: The catalogueService the log is read through.
+    :param poll_interval: Seconds between reads of the log while waiting.
+    :param tail_size: Most recent entries the poller keeps for waiters.
+    :param retention: Seconds entries are kept.
+    :param interval: Seconds between compaction runs.
+    :param chunk_size: Entries deleted per transaction.
+    :param lease_seconds: How long the compaction lease lasts without renewal.
+    """
+
+    def __init__(self, service, poll_interval: float = 1.0, retention: float = 7 * 86400.0,
+                 interval: float = 3600.0, chunk_size: int = 1000, lease_seconds: float = 300.0,
+                 tail_size: int = 1000) -> None:
+        self.service = service
+        self.poll_interval = poll_interval
+        self.tail_size = max(1, tail_size)
+        self.retention = retention
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.lease = Lease(LEASE_NAME, duration=lease_seconds)
+        self.last_result = None
+        self._changed = threading.Condition()
+        # guarded by _changed: entries after _tail_from up to _tail_head, None until the poller has started
+        self._tail = []
+        self._tail_from = None
+        self._tail_head = 0
+        self._waiters = 0
+        self._poller = None
+        self._poke = threading.Event()
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def notify(self, action: str, records: list[dict]) -> None:
+        """catalogueService listener: have the poller read the new entries now."""
+        self._poke.set()
+
+    def head(self) -> str:
+        """The token of the latest change, for a client about to read everything."""
+        return format_token(self.service.get_changes(0, 0)["head"])
+
+    def read(self, since: int, limit: int) -> dict:
+        """
+        Changes after ``since``.
+
+        :return: ``{"changes": [{"catalogue_id", "action", "catalogue",
+            "token"}], "next": str, "more": bool}``. ``catalogue`` is the
+            current row, None once the catalogue is deleted (its action is
+            then ``deleted``); a catalogue changed several times appears
+            once. ``token`` is the token just after that change.
+        :raises ChangesExpired: If entries after ``since`` were removed by retention.
+        """
+        page = self.service.get_changes(since, limit + 1)
+        if since < page["pruned_through"] or since > page["head"]:
+            if metrics.ENABLED:
+                metrics.CHANGE_FEED_RESYNCS.inc()
+            raise ChangesExpired(page["head"])
+        return self._page(page["entries"], since, limit)
+
+    @staticmethod
+    def _page(entries: list, since: int, limit: int) -> dict:
+        more = len(entries) > limit
+        del entries[limit:]
+        latest = {}
+        for change_id, catalogue_id, action, row in entries:
+            latest.pop(catalogue_id, None)
+            latest[catalogue_id] = (change_id, action, row)
+        changes = [{
+            "catalogue_id": catalogue_id,
+            "action": action if row is not None else "deleted",
+            "catalogue": catalogue.from_row(row) if row is not None else None,
+            "token": format_token(change_id),
+        } for catalogue_id, (change_id, action, row) in latest.items()]
+        return {"changes": changes, "next": format_token(entries[-1][0] if entries else since), "more": more}
+
+    def wait(self, since: int, limit: int, timeout: float) -> dict:
+        """:meth:`read`, waiting up to ``timeout`` seconds for a change."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            self._waiters += 1
+            if self._poller is None and not self._closed:
+                self._poller = threading.Thread(target=self._poll_loop, name="change-feed-poller", daemon=True)
+                self._poller.start()
+        try:
+            while True:
+                with self._changed:
+                    page = self._from_tail(since, limit)
+                    if page is not None:
+                        remaining = deadline - time.monotonic()
+                        if page["changes"] or remaining <= 0 or self._closed:
+                            return page
+                        self._changed.wait(remaining)
+                        continue
+                # not in the tail yet (the poller is starting) or any more (the client is behind it)
+                page = self.read(since, limit)
+                remaining = deadline - time.monotonic()
+                if page["changes"] or remaining <= 0 or self._closed:
+                    return page
+                with self._changed:
+                    if not self._closed:
+                        self._changed.wait(min(remaining, self.poll_interval))
+        finally:
+            with self._changed:
+                self._waiters -= 1
+
+    def _from_tail(self, since: int, limit: int) -> dict | None:
+        """The page after ``since`` from the tail, None if the tail does not cover it."""
+        if self._tail_from is None or not self._tail_from <= since <= self._tail_head:
+            return None
+        # change_id values are consecutive only until compaction, so search rather than index
+        start = next((i for i, entry in enumerate(self._tail) if entry[0] > since), len(self._tail))
+        return self._page(self._tail[start:start + limit + 1], since, limit)
+
+    def _poll_loop(self) -> None:
+        """Poller thread: read new log entries into the tail while anyone waits."""
+        try:
+            head = self.service.get_changes(0, 0)["head"]
+            with self._changed:
+                self._tail, self._tail_from, self._tail_head = [], head, head
+                self._changed.notify_all()
+            idle = False
+            while True:
+                self._poke.wait(self.poll_interval)
+                self._poke.clear()
+                with self._changed:
+                    if self._closed or not self._waiters and idle:
+                        self._stop_polling()
+                        return
+                    idle = not self._waiters
+                    after = self._tail_head
+                entries = self.service.get_changes(after, self.tail_size)["entries"]
+                if not entries:
+                    continue
+                with self._changed:
+                    self._tail.extend(entries)
+                    self._tail_head = entries[-1][0]
+                    dropped = len(self._tail) - self.tail_size
+                    if dropped > 0:
+                        self._tail_from = self._tail[dropped - 1][0]
+                        del self._tail[:dropped]
+                    self._changed.notify_all()
+                if len(entries) == self.tail_size:
+                    self._poke.set()
+        except Exception:
+            logger.exception("Change feed poller failed; waiters read the log themselves")
+            with self._changed:
+                self._stop_polling()
+
+    def _stop_polling(self) -> None:
+        # called with _changed held; the next waiter starts a new poller
+        self._poller = None
+        self._tail, self._tail_from = [], None
+        self._changed.notify_all()
+
+    def close(self) -> None:
+        """Wake every waiter and end open streams, e.g. before a worker stops."""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._poke.set()
+
+    def run_once(self, now: datetime | None = None) -> dict | None:
+        """
+        Compact and apply retention if this worker gets the lease.
+
+        :return: Entries removed per reason, or None when another worker
+            holds the lease.
+        """
+        if not self.lease.acquire():
+            logger.debug("Change log compaction skipped; lease %s is held elsewhere", LEASE_NAME)
+            return None
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        started = time.perf_counter()
+        try:
+            removed = {
+                "compacted": self.service.compact_changes(self.chunk_size, should_continue=self.lease.keep_alive),
+                "expired": self.service.prune_changes(now - timedelta(seconds=self.retention), self.chunk_size,
+                                                      should_continue=self.lease.keep_alive),
+            }
+        finally:
+            self.lease.release()
+        if metrics.ENABLED:
+            for reason, count in removed.items():
+                if count:
+                    metrics.CHANGE_LOG_REMOVED.inc((reason,), count)
+        self.last_result = {"removed": removed, "seconds": round(time.perf_counter() - started, 3)}
+        logger.info("Change log compaction removed %s", removed)
+        return removed
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="change-log-compaction", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self.close()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.lease.release()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Change log compaction failed")
+
+
+def change_feed_from_config(service, settings) -> ChangeFeed:
+    """Build the feed from a [changes] config section."""
+    return ChangeFeed(
+        service,
+        poll_interval=settings.getfloat("poll_interval", 1.0),
+        retention=settings.getfloat("retention_hours", 168.0) * 3600,
+        interval=settings.getfloat("compact_interval", 3600.0),
+        chunk_size=settings.getint("chunk_size", 1000),
+        lease_seconds=settings.getfloat("lease_seconds", 300.0),
+        tail_size=settings.getint("tail_size", 1000),
+    )
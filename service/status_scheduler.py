@@ -0,0 +1,109 @@
+# service/status_scheduler.py
+
+import logging
+import threading
+import time
+
+from util import metrics
+from util.lease import Lease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "catalogue_status"
+
+
+class StatusScheduler:
+    """
+    Runs ``catalogueService.apply_status_transitions`` on a timer.
+
+    Every ``interval`` seconds a daemon thread takes the ``catalogue_status``
+    lease and, if no other worker holds it, applies the transitions for
+    today. The lease is renewed between chunks; a run that loses it stops.
+
+    :param service: The catalogueService to run the transitions on.
+    :param interval: Seconds between runs.
+    :param chunk_size: Rows per transaction.
+    :param pause: Seconds to sleep between chunks.
+    :param lease_seconds: How long a lease lasts without renewal.
+    """
+
+    def __init__(self, service, interval: float = 300.0, chunk_size: int = 100,
+                 pause: float = 0.05, lease_seconds: float = 120.0) -> None:
+        self.service = service
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.lease = Lease(LEASE_NAME, duration=lease_seconds)
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self, today=None) -> dict | None:
+        """
+        Apply one round of transitions if this worker gets the lease.
+
+        :return: Rows changed per transition, or None when another worker
+            holds the lease.
+        """
+        if not self.lease.acquire():
+            self._count_run("skipped")
+            logger.debug("Status job skipped; lease %s is held elsewhere", LEASE_NAME)
+            return None
+        started = time.perf_counter()
+        try:
+            changed = self.service.apply_status_transitions(
+                today, chunk_size=self.chunk_size, pause=self.pause, should_continue=self.lease.keep_alive
+            )
+        except Exception:
+            self._count_run("failed")
+            raise
+        finally:
+            self.lease.release()
+        self._count_run("completed", changed)
+        self.last_result = {"changed": changed, "seconds": round(time.perf_counter() - started, 3)}
+        logger.info("Status job changed %s rows in %.2fs", sum(changed.values()), self.last_result["seconds"])
+        return changed
+
+    @staticmethod
+    def _count_run(outcome: str, changed: dict | None = None) -> None:
+        if not metrics.ENABLED:
+            return
+        metrics.STATUS_JOB_RUNS.inc((outcome,))
+        for transition, count in (changed or {}).items():
+            if count:
+                metrics.STATUS_TRANSITIONS.inc((transition,), count)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="status-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Status scheduler started (every %ss)", self.interval)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # let another worker take over without waiting for expiry
+        self.lease.release()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Status job failed")
+            self._stop.wait(self.interval)
+
+
+def status_scheduler_from_config(service, settings) -> StatusScheduler:
+    """Build the scheduler from a [status_job] config section."""
+    return StatusScheduler(
+        service,
+        interval=settings.getfloat("interval", 300.0),
+        chunk_size=settings.getint("chunk_size", 100),
+        pause=settings.getfloat("pause", 0.05),
+        lease_seconds=settings.getfloat("lease_seconds", 120.0),
+    )
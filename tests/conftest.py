@@ -0,0 +1,17 @@
+import os
+
+import pytest
+from benchmarks.stand_in import connection_factory, create_database
+from util import db_connection
+
+
+@pytest.fixture
+def stand_in_db(tmp_path):
+    """Point the shared connection pool at a fresh SQLite stand-in database."""
+    path = create_database(os.path.join(tmp_path, "catalogue.sqlite3"))
+    previous = db_connection._pool
+    db_connection._pool = None
+    pool = db_connection.configure_pool(connection_factory(path), min_size=0, max_size=4)
+    yield path
+    pool.close()
+    db_connection._pool = previous
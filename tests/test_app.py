@@ -1,4 +1,6 @@
 import pytest
+from datetime import datetime
+from unittest.mock import patch
 from app import app
 
 @pytest.fixture
@@ -25,14 +27,50 @@ def test_logout_without_login(client):
     response = client.post("/logout")
     assert response.status_code == 200                                           
     assert b"Logged out" in response.data
-                                                                                                                   
 
+def test_catalogue_page_rejects_bad_limit(client):
+    response = client.get("/catalogues?limit=abc")
+    assert response.status_code == 400
 
+@patch("app.service.get_data_version", return_value=(1, None))
+@patch("app.service.get_catalogues_page")
+def test_catalogue_page_passes_cursor(mock_page, mock_version, client):
+    mock_page.return_value = {"items": [], "next_cursor": None, "limit": 5}
+    response = client.get("/catalogues?limit=5&after=abc&order=desc")
+    assert response.status_code == 200
+    assert response.get_json()["next_cursor"] is None
+    mock_page.assert_called_once_with(limit=5, after="abc", sort_by=None, descending=True, filters={})
 
+@patch("app.service.get_data_version", return_value=(3, datetime(2025, 7, 1, 12, 0, 0)))
+@patch("app.service.get_all_catalogues", return_value=[])
+def test_catalogue_list_answers_304_without_querying(mock_all, mock_version, client):
+    first = client.get("/catalogues")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"] == "Tue, 01 Jul 2025 12:00:00 GMT"
 
+    second = client.get("/catalogues", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert mock_all.call_count == 1
 
+    mock_version.return_value = (4, datetime(2025, 7, 2))
+    third = client.get("/catalogues", headers={"If-None-Match": etag})
+    assert third.status_code == 200
 
+@patch("app.service.get_data_version", return_value=(3, None))
+@patch("app.service.get_catalogue_by_id", return_value=None)
+def test_missing_catalogue_has_no_etag(mock_get, mock_version, client):
+    response = client.get("/catalogues/9")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
 
-
-
-                                                                                                                            
+@patch("app.service.get_data_version", return_value=(1, None))
+@patch("app.service.get_catalogues_page")
+def test_catalogue_filters_are_parsed(mock_page, mock_version, client):
+    mock_page.return_value = {"items": [], "next_cursor": None, "limit": 20}
+    response = client.get("/catalogues?status=Active&effective_on=2025-07-01")
+    assert response.status_code == 200
+    filters = mock_page.call_args.kwargs["filters"]
+    assert filters == {"status": "Active", "effective_on": datetime(2025, 7, 1).date()}
+    assert client.get("/catalogues?effective_on=07/01/2025").status_code == 400
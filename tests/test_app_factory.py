@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from app import create_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# cold `import app` plus create_app(), measured in a fresh interpreter
+IMPORT_BUDGET_MS = 1000
+
+MEASURE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+from util import db_connection
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_ms": (created - imported) * 1000,
+                  "pool_opened": db_connection._pool is not None}))
+"""
+
+
+def test_cold_start_stays_within_budget_and_opens_no_connection():
+    output = subprocess.run([sys.executable, "-c", MEASURE], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert not result["pool_opened"]
+    assert result["import_ms"] + result["create_ms"] < IMPORT_BUDGET_MS, result
+
+
+def test_services_are_built_on_first_use():
+    app = create_app({"assets": {"enabled": "false"}, "swagger": {"enabled": "false"}})
+    services = app.extensions["catalogue"]
+    assert services._built == {}
+    assert "flasgger.apidocs" not in app.view_functions
+    with app.test_client() as client:
+        page = client.get("/login.html", headers={"Accept-Encoding": "gzip"})
+    assert page.status_code == 200
+    # served from disk: the pipeline is disabled in this app's config only
+    assert "immutable" not in page.headers.get("Cache-Control", "")
+    assert services._built == {"assets": None}
+    assert services.search_index is services.search_index
+    assert "catalogue" in services._built
+
+
+def test_api_docs_parse():
+    app = create_app({"swagger": {"enabled": "true"}})
+    with app.test_client() as client:
+        spec = client.get("/apispec_1.json")
+    assert spec.status_code == 200
+    assert "/catalogues" in spec.get_json()["paths"]
@@ -0,0 +1,83 @@
+import gzip
+import re
+
+import pytest
+from app import app, assets
+from flask import Flask
+from util.assets import IMMUTABLE, AssetPipeline
+
+CSS = b"body { color: black; }\n" * 40
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    (tmp_path / "style.css").write_bytes(CSS)
+    (tmp_path / "page.html").write_text('<link rel="stylesheet" href="style.css"><img src="logo.png">')
+    pipeline = AssetPipeline(str(tmp_path), hashed=["style.css", "missing.js"], pages=["page.html"])
+    pipeline.build()
+    return pipeline
+
+
+def respond(pipeline, name, **headers):
+    with Flask(__name__).test_request_context(headers=headers):
+        from flask import request
+        return pipeline.respond(name, request)
+
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_pages_reference_hashed_names(pipeline):
+    hashed = pipeline.urls["style.css"]
+    assert re.fullmatch(r"style\.[0-9a-f]{12}\.css", hashed)
+    page = respond(pipeline, "page.html").get_data(as_text=True)
+    assert f'href="{hashed}"' in page
+    assert 'src="logo.png"' in page
+    assert "missing.js" not in pipeline.urls
+
+
+def test_encoding_follows_accept_encoding(pipeline):
+    hashed = pipeline.urls["style.css"]
+    plain = respond(pipeline, hashed)
+    assert plain.get_data() == CSS
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Cache-Control"] == IMMUTABLE
+    assert plain.headers["Vary"] == "Accept-Encoding"
+
+    packed = respond(pipeline, hashed, **{"Accept-Encoding": "gzip, deflate"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.get_data()) == CSS
+    assert packed.headers["ETag"] != plain.headers["ETag"]
+    assert respond(pipeline, hashed, **{"Accept-Encoding": "gzip;q=0"}).get_data() == CSS
+
+
+def test_matching_etag_gets_not_modified(pipeline):
+    first = respond(pipeline, "page.html", **{"Accept-Encoding": "gzip"})
+    assert first.headers["Cache-Control"] == "no-cache"
+    again = respond(pipeline, "page.html", **{"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert respond(pipeline, "unknown.css") is None
+
+
+def test_brotli_is_preferred_when_installed(pipeline):
+    brotli = pytest.importorskip("brotli")
+    response = respond(pipeline, "style.css", **{"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == CSS
+
+
+def test_app_serves_frontend_from_the_pipeline(client):
+    if assets is None:
+        pytest.skip("asset pipeline disabled in config")
+    page = client.get("/login.html", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["Content-Encoding"] == "gzip"
+    hashed = assets.urls["login.css"]
+    assert hashed.encode() in gzip.decompress(page.data)
+    stylesheet = client.get("/" + hashed)
+    assert stylesheet.status_code == 200
+    assert stylesheet.headers["Cache-Control"] == IMMUTABLE
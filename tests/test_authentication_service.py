@@ -0,0 +1,116 @@
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from benchmarks.stand_in import seed_users
+from service.authentication_service import AuthenticationService
+from util.passwords import hash_password, is_hashed, verify_password
+
+
+def stored_password(path, username):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()[0]
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def service(stand_in_db):
+    seed_users(stand_in_db, [("alice", "wonderland"), ("bob", hash_password("builder", 1000))])
+    return AuthenticationService(hash_iterations=1000, max_failures=3)
+
+
+def test_hash_round_trip_and_rehash_flag():
+    stored = hash_password("secret", 1000)
+    assert is_hashed(stored)
+    assert verify_password("secret", stored, 1000) == (True, False)
+    assert verify_password("secret", stored, 2000) == (True, True)
+    assert verify_password("wrong", stored, 2000) == (False, False)
+    assert hash_password("secret", 1000) != stored
+
+
+def test_plaintext_password_is_upgraded_on_login(service, stand_in_db):
+    assert service.validate_user("alice", "wonderland") is True
+    stored = stored_password(stand_in_db, "alice")
+    assert is_hashed(stored)
+    assert AuthenticationService(hash_iterations=1000).validate_user("alice", "wonderland") is True
+
+
+def test_hashed_password_is_verified(service):
+    assert service.validate_user("bob", "builder") is True
+    assert service.validate_user("bob", "wrong") is False
+    assert service.validate_user("nobody", "builder") is False
+
+
+def test_repeated_results_skip_the_database(service):
+    assert service.validate_user("bob", "builder") is True
+    assert service.validate_user("bob", "wrong") is False
+    with patch("service.authentication_service.get_connection") as mock_conn:
+        assert service.validate_user("bob", "builder") is True
+        assert service.validate_user("bob", "wrong") is False
+        mock_conn.assert_not_called()
+
+
+def test_user_is_throttled_after_repeated_failures(service):
+    for attempt in range(3):
+        assert service.validate_user("bob", f"guess{attempt}") is False
+    with patch("service.authentication_service.get_connection") as mock_conn:
+        assert service.validate_user("bob", "builder") is False
+        mock_conn.assert_not_called()
+    assert service.throttled == 1
+    assert service.validate_user("alice", "wonderland") is True
+
+
+def test_failures_from_one_client_do_not_lock_out_others(service):
+    assert service.validate_user("bob", "builder", "10.0.0.1") is True
+    for attempt in range(5):
+        assert service.validate_user("bob", f"guess{attempt}", "10.0.0.9") is False
+    assert service.validate_user("bob", "builder", "10.0.0.9") is True
+    service._verified.clear()
+    assert service.validate_user("bob", "builder", "10.0.0.9") is False
+    assert service.validate_user("bob", "builder", "10.0.0.2") is True
+
+
+def test_failure_window_starts_at_the_first_failure(service, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    service = AuthenticationService(hash_iterations=1000, max_failures=3, failure_window=100,
+                                    negative_cache_ttl=0)
+    for attempt in range(3):
+        service.validate_user("bob", f"guess{attempt}")
+        now[0] += 30
+    # the last failure was at 1060; the lock still ends 100s after the first
+    assert service.validate_user("bob", "builder") is False
+    now[0] = 1101.0
+    assert service.validate_user("bob", "builder") is True
+
+
+def test_success_resets_failure_count(service):
+    for attempt in range(2):
+        service.validate_user("bob", f"guess{attempt}")
+    assert service.validate_user("bob", "builder") is True
+    for attempt in range(2):
+        service.validate_user("bob", f"again{attempt}")
+    assert service.validate_user("bob", "builder") is True
+
+
+def test_concurrent_logins_share_one_verification(service):
+    results = []
+    with patch("service.authentication_service.verify_password", wraps=verify_password) as mock_verify:
+        threads = [threading.Thread(target=lambda: results.append(service.validate_user("bob", "builder")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert results == [True] * 8
+    assert 1 <= mock_verify.call_count < 8
+
+
+def test_unreachable_database_refuses_without_caching(service):
+    with patch("service.authentication_service.get_connection", return_value=None):
+        assert service.validate_user("bob", "builder") is False
+    assert service.validate_user("bob", "builder") is True
@@ -0,0 +1,44 @@
+from benchmarks.bench_load import combine, compare, percentile
+
+
+def result(scenario="get", concurrency=1, rps=100.0, p95=10.0, errors=0):
+    return {"scenario": scenario, "concurrency": concurrency, "throughput_rps": rps,
+            "p95_ms": p95, "errors": errors}
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_flags_slower_runs_only():
+    baseline = [result(), result("create", 8, rps=50.0, p95=20.0)]
+    assert compare([result(rps=90.0, p95=11.0)], baseline, 0.2) == []
+    messages = compare([result(rps=70.0), result("create", 8, rps=50.0, p95=30.0, errors=2)], baseline, 0.2)
+    assert messages == [
+        "get @ 1: throughput 100.0 -> 70.0 req/s",
+        "create @ 8: p95 20.0 -> 30.0 ms",
+        "create @ 8: 2 errors",
+    ]
+
+
+def test_compare_ignores_scenarios_missing_from_baseline():
+    assert compare([result("delete", 4, rps=1.0)], [result()], 0.2) == []
+
+
+def test_p95_has_its_own_tolerance():
+    baseline = [result(p95=20.0)]
+    assert compare([result(p95=28.0)], baseline, 0.2, p95_threshold=0.5) == []
+    assert compare([result(p95=31.0)], baseline, 0.2, p95_threshold=0.5) == ["get @ 1: p95 20.0 -> 31.0 ms"]
+
+
+def test_repeated_runs_keep_the_median_and_any_errors():
+    runs = [result(rps=90.0, p95=100.0), result(rps=100.0, p95=2.0, errors=1), result(rps=110.0, p95=3.0)]
+    for run in runs:
+        run.update(p50_ms=1.0, p99_ms=200.0)
+    merged = combine(runs)
+    assert (merged["throughput_rps"], merged["p95_ms"], merged["errors"]) == (100.0, 3.0, 1)
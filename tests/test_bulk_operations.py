@@ -0,0 +1,168 @@
+import sqlite3
+
+import pytest
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import catalogueService
+from util.cache import LRUCache, ReadThroughCache
+
+
+def make(name, status="active"):
+    return catalogue(
+        catalogue_name=name,
+        catalogue_description="Bulk",
+        effective_from="2025-01-01",
+        effective_to="2025-12-31",
+        status=status
+    )
+
+
+def count_rows(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT COUNT(*) FROM catalogue").fetchone()[0]
+    finally:
+        db.close()
+
+
+def version(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT version FROM catalogue_version").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_bulk_create_returns_ids_in_order(stand_in_db):
+    service = catalogueService()
+    results = service.bulk_create_catalogues([make(f"C{i}") for i in range(7)], batch_size=3)
+    assert [r["status"] for r in results] == ["created"] * 7
+    assert [r["catalogue_id"] for r in results] == list(range(1, 8))
+    assert service.get_catalogue_by_id(5).catalogue_name == "C4"
+    assert version(stand_in_db) == 1
+
+
+def test_bulk_create_atomic_rolls_back_everything(stand_in_db):
+    service = catalogueService()
+    items = [make(f"C{i}") for i in range(5)]
+    items[3].catalogue_name = None  # violates NOT NULL
+    results = service.bulk_create_catalogues(items, atomic=True, batch_size=2)
+    assert count_rows(stand_in_db) == 0
+    assert results[3]["status"] == "error"
+    assert results[0]["status"] == "rolled_back"
+
+
+def test_bulk_create_best_effort_rejects_only_bad_rows(stand_in_db):
+    service = catalogueService()
+    items = [make(f"C{i}") for i in range(5)]
+    items[3].catalogue_name = None
+    results = service.bulk_create_catalogues(items, atomic=False, batch_size=2)
+    assert [r["status"] for r in results] == ["created", "created", "created", "error", "created"]
+    assert count_rows(stand_in_db) == 4
+    assert version(stand_in_db) == 3
+
+
+def test_bulk_update_reports_missing_ids(stand_in_db):
+    service = catalogueService()
+    service.bulk_create_catalogues([make("A"), make("B")])
+    results = service.bulk_update_catalogues([(1, make("A2", "inactive")), (99, make("X"))])
+    assert [r["status"] for r in results] == ["updated", "not_found"]
+    assert service.get_catalogue_by_id(1).status == "inactive"
+
+
+def test_bulk_delete_invalidates_cache(stand_in_db):
+    service = catalogueService(cache=ReadThroughCache(LRUCache()))
+    service.bulk_create_catalogues([make("A"), make("B"), make("C")])
+    assert service.get_catalogue_by_id(2) is not None
+    results = service.bulk_delete_catalogues([2, 3, 42], batch_size=2)
+    assert [r["status"] for r in results] == ["deleted", "deleted", "not_found"]
+    assert service.get_catalogue_by_id(2) is None
+    assert count_rows(stand_in_db) == 1
+
+
+@pytest.fixture
+def client(stand_in_db):
+    from app import app
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_bulk_endpoint_best_effort_reports_per_item(client):
+    response = client.post("/catalogues/bulk", json={
+        "mode": "best_effort",
+        "items": [
+            {"catalogue_name": "A", "catalogue_description": "d", "effective_from": "2025-01-01",
+             "effective_to": "2025-02-01", "status": "active"},
+            {"catalogue_name": "B"},
+        ]
+    })
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body["results"][0]["status"] == "created"
+    assert body["results"][1]["status"] == "error"
+    assert body["succeeded"] == 1
+
+
+def test_bulk_endpoint_atomic_rejects_bad_payload(client, stand_in_db):
+    response = client.post("/catalogues/bulk", json={"items": [{"catalogue_name": "B"}]})
+    assert response.status_code == 400
+    assert count_rows(stand_in_db) == 0
+
+
+def test_bulk_delete_endpoint(client):
+    client.post("/catalogues/bulk", json={"items": [
+        {"catalogue_name": "A", "catalogue_description": "d", "effective_from": "2025-01-01",
+         "effective_to": "2025-02-01", "status": "active"}
+    ]})
+    response = client.delete("/catalogues/bulk", json={"ids": [1]})
+    assert response.status_code == 200
+    assert response.get_json()["results"] == [{"status": "deleted", "catalogue_id": 1, "index": 0}]
+
+
+def test_bulk_delete_endpoint_rejects_booleans(client, stand_in_db):
+    client.post("/catalogues/bulk", json={"items": [
+        {"catalogue_name": "A", "catalogue_description": "d", "effective_from": "2025-01-01",
+         "effective_to": "2025-02-01", "status": "active"}
+    ]})
+    response = client.delete("/catalogues/bulk", json={"ids": [True]})
+    assert response.status_code == 400
+    assert count_rows(stand_in_db) == 1
+    response = client.delete("/catalogues/bulk", json={"mode": "best_effort", "ids": [True, 1]})
+    assert response.status_code == 207
+    assert [result["status"] for result in response.get_json()["results"]] == ["error", "deleted"]
+
+
+def test_get_catalogues_by_ids_keeps_request_order(stand_in_db):
+    service = catalogueService()
+    service.bulk_create_catalogues([make(f"C{i}") for i in range(5)])
+    rows = service.get_catalogues_by_ids([4, 99, 2, 4])
+    assert [r and r.catalogue_id for r in rows] == [4, None, 2, 4]
+
+
+def test_get_catalogues_by_ids_fills_from_cache(stand_in_db, monkeypatch):
+    service = catalogueService(cache=ReadThroughCache(LRUCache()))
+    service.bulk_create_catalogues([make(f"C{i}") for i in range(3)])
+    service.get_catalogue_by_id(1)
+    loaded = []
+    original = service._load_catalogues_by_ids
+    monkeypatch.setattr(service, "_load_catalogues_by_ids",
+                        lambda ids, **options: loaded.append(ids) or original(ids, **options))
+    monkeypatch.setattr("service.catalogue_service.IDS_CHUNK_SIZE", 1)
+    rows = service.get_catalogues_by_ids([1, 2, 3])
+    assert [r.catalogue_id for r in rows] == [1, 2, 3]
+    assert loaded == [[2, 3]]
+    assert service.get_catalogues_by_ids([3])[0].catalogue_name == "C2"
+    assert loaded == [[2, 3]]
+
+
+def test_ids_endpoint_marks_missing(client):
+    client.post("/catalogues/bulk", json={"items": [
+        {"catalogue_name": "A", "catalogue_description": "d", "effective_from": "2025-01-01",
+         "effective_to": "2025-02-01", "status": "active"}
+    ]})
+    response = client.get("/catalogues?ids=7,1")
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert items[0] == {"catalogue_id": 7, "not_found": True}
+    assert items[1]["catalogue_name"] == "A"
+    assert client.get("/catalogues?ids=1,x").status_code == 400
@@ -0,0 +1,216 @@
+import pickle
+import threading
+import time
+from datetime import date
+
+import pytest
+from dto.catalogue_dto import CatalogueRows, catalogue
+from util.cache import MISSING, LRUCache, ReadThroughCache, RemoteCacheBackend, SingleFlight
+
+
+class FakeRedis:
+    """In-process stand-in for a redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_lru_entries_expire():
+    cache = LRUCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_caches_none():
+    cache = LRUCache()
+    cache.set("a", None)
+    assert cache.get("a") is None
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(5)]
+    threads[0].start()
+    started.wait(1)
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(1)
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_read_through_loads_once_and_invalidates():
+    cache = ReadThroughCache(LRUCache())
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load("k", loader) == 1
+    assert cache.get_or_load("k", loader) == 1
+    cache.invalidate("k")
+    assert cache.get_or_load("k", loader) == 2
+
+
+def test_load_overlapping_invalidation_is_not_stored():
+    cache = ReadThroughCache(LRUCache())
+
+    def stale_loader():
+        cache.invalidate("k")
+        return "stale"
+
+    assert cache.get_or_load("k", stale_loader) == "stale"
+    assert cache.get_or_load("k", lambda: "fresh") == "fresh"
+
+
+def test_entries_are_reloaded_for_a_newer_data_version():
+    cache = ReadThroughCache(LRUCache())
+    assert cache.get_or_load("k", lambda: "v1", version=1) == "v1"
+    assert cache.get_or_load("k", lambda: "other", version=1) == "v1"
+    assert cache.get_or_load("k", lambda: "v2", version=2) == "v2"
+    assert cache.get_many_or_load(["k", "j"], lambda keys: {key: "v3" for key in keys}, version=3) == \
+        {"k": "v3", "j": "v3"}
+    assert cache.get_many_or_load(["k"], lambda keys: {}, version=2) == {"k": "v2"}
+
+
+def test_newer_version_replaces_the_older_entry():
+    backend = LRUCache()
+    cache = ReadThroughCache(backend)
+    cache.get_or_load("list", lambda: "v1", version=1)
+    cache.get_or_load("list", lambda: "v2", version=2)
+    assert backend.stats()["entries"] == 1
+    assert cache.get_or_load("list", lambda: "v1 again", version=1) == "v1 again"
+    assert cache.get_or_load("list", lambda: "other", version=2) == "v2"
+
+
+def test_disabled_cache_always_loads():
+    cache = ReadThroughCache(LRUCache(), enabled=False)
+    assert cache.get_or_load("k", lambda: 1) == 1
+    assert cache.get_or_load("k", lambda: 2) == 2
+
+
+def test_remote_backend_round_trip_and_clear():
+    backend = RemoteCacheBackend(FakeRedis(), prefix="test")
+    backend.set("k", {"catalogue_id": 1})
+    assert backend.get("k") == {"catalogue_id": 1}
+    backend.clear()
+    assert backend.get("k") is MISSING
+    backend.set("k", 2)
+    backend.delete("k")
+    assert backend.get("k") is MISSING
+    assert backend.stats()["hits"] == 1
+
+
+def test_remote_backend_outage_is_counted_not_raised():
+    class Down(FakeRedis):
+        def get(self, key):
+            raise ConnectionError("cache server is down")
+
+        incr = get
+
+    backend = RemoteCacheBackend(Down(), prefix="test")
+    cache = ReadThroughCache(backend)
+    # a committed write invalidates after the fact, so this must not fail the request
+    cache.invalidate("k")
+    cache.clear()
+    assert cache.get_or_load("k", lambda: 1) == 1
+    assert backend.stats()["errors"] == 4
+
+
+def test_remote_backend_stores_records_as_json():
+    client = FakeRedis()
+    backend = RemoteCacheBackend(client, prefix="test")
+    item = catalogue("A", "multi\nline", date(2025, 1, 1), date(2025, 2, 1), "active", catalogue_id=3)
+    backend.set("one", item)
+    backend.set("rows", CatalogueRows([item.to_row()]))
+    assert client.data["test:0:one"].startswith(b'{"t":"catalogue"')
+    assert backend.get("one") == item
+    assert backend.get("rows") == [item.to_row()] and isinstance(backend.get("rows"), CatalogueRows)
+
+
+def test_remote_backend_never_unpickles():
+    class Boom:
+        def __reduce__(self):
+            return (exec, ("raise SystemExit('unpickled')",))
+
+    client = FakeRedis()
+    backend = RemoteCacheBackend(client, prefix="test")
+    client.set("test:0:k", pickle.dumps(Boom()))
+    assert backend.get("k") is MISSING
+    assert backend.stats()["errors"] == 1
+
+
+def test_catalogue_endpoint_does_not_serve_rows_cached_before_a_newer_version(stand_in_db):
+    import sqlite3
+
+    from app import app, service
+    from benchmarks.stand_in import seed_catalogues
+    seed_catalogues(stand_in_db, 3)
+    # earlier tests' databases counted versions from the same start
+    service.cache.clear()
+    with app.test_client() as client:
+        first = client.get("/catalogues/1")
+        # renamed by another worker: this process's cache is never invalidated
+        db = sqlite3.connect(stand_in_db)
+        db.execute("UPDATE catalogue SET catalogue_name = 'Renamed' WHERE catalogue_id = 1")
+        db.execute("UPDATE catalogue_version SET version = version + 1 WHERE table_name = 'catalogue'")
+        db.commit()
+        db.close()
+        second = client.get("/catalogues/1", headers={"If-None-Match": first.headers["ETag"]})
+    service.cache.clear()
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json()["catalogue_name"] == "Renamed"
@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import date
+
+import pytest
+from benchmarks.stand_in import StandInConnection, seed_catalogues, translate
+from exception.exception import validationerror
+from service.catalogue_service import catalogueService
+
+FILTERS = [
+    ({"status": "active"}, "idx_catalogue_status"),
+    ({"effective_on": date(2024, 6, 1)}, "idx_catalogue_effective"),
+    ({"from": date(2024, 6, 1), "to": date(2024, 6, 30)}, "idx_catalogue_effective"),
+    ({"status": "upcoming", "effective_on": date(2024, 6, 1)}, "idx_catalogue_status_effective"),
+    ({"name": "Catalogue 12"}, "idx_catalogue_name"),
+]
+
+
+@pytest.fixture
+def seeded(stand_in_db):
+    seed_catalogues(stand_in_db, 5000)
+    db = sqlite3.connect(stand_in_db)
+    db.execute("ANALYZE")
+    db.commit()
+    db.close()
+    return stand_in_db
+
+
+def query_plan(path, query, params):
+    conn = StandInConnection(path)
+    try:
+        return [row[-1] for row in conn._db.execute("EXPLAIN QUERY PLAN " + translate(query), params)]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("filters,index", FILTERS)
+def test_filters_are_served_by_an_index(seeded, filters, index):
+    service = catalogueService()
+    query, params, _ = service.page_query(21, filters=filters)
+    plan = query_plan(seeded, query, params)
+    assert any(f"USING INDEX {index}" in step or f"USING COVERING INDEX {index}" in step for step in plan), plan
+    assert not any(step.startswith("SCAN catalogue") for step in plan), plan
+
+
+@pytest.mark.parametrize("filters,index", FILTERS)
+def test_next_pages_are_served_by_an_index(seeded, filters, index):
+    service = catalogueService()
+    first = service.get_catalogues_page(limit=5, filters=filters)
+    query, params, _ = service.page_query(6, after=first["next_cursor"], filters=filters)
+    plan = query_plan(seeded, query, params)
+    assert not any(step.startswith("SCAN catalogue") for step in plan), plan
+
+
+def matches(row, filters):
+    if "status" in filters and row.status != filters["status"]:
+        return False
+    if "effective_on" in filters and not row.effective_from <= filters["effective_on"] <= row.effective_to:
+        return False
+    if "from" in filters and row.effective_to < filters["from"]:
+        return False
+    if "to" in filters and row.effective_from > filters["to"]:
+        return False
+    if "name" in filters and not row.catalogue_name.startswith(filters["name"]):
+        return False
+    return True
+
+
+@pytest.mark.parametrize("filters,index", FILTERS)
+def test_paging_through_filters_returns_every_match(seeded, filters, index):
+    service = catalogueService()
+    expected = sorted(r.catalogue_id for r in service.get_all_catalogues().records() if matches(r, filters))
+    seen, cursor = [], None
+    while True:
+        page = service.get_catalogues_page(limit=250, after=cursor, filters=filters)
+        seen.extend(r[0] for r in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == expected
+    assert len(seen) == len(set(seen))
+
+
+def test_name_prefix_escapes_wildcards(stand_in_db):
+    _, params = catalogueService.filter_clauses({"name": "50%_off!"})
+    assert params == ["50!%!_off!!%"]
+
+
+def test_invalid_filters_are_rejected():
+    with pytest.raises(validationerror):
+        catalogueService.filter_clauses({"status": "deleted"})
+    with pytest.raises(validationerror):
+        catalogueService.filter_clauses({"from": date(2025, 2, 1), "to": date(2025, 1, 1)})
+    with pytest.raises(validationerror):
+        catalogueService.filter_clauses({"colour": "red"})
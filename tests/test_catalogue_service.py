@@ -2,14 +2,21 @@ import pytest
 from unittest.mock import patch, MagicMock
 from service.catalogue_service import catalogueService
 from dto.catalogue_dto import catalogue
+from exception.exception import validationerror
+from util.cache import LRUCache, ReadThroughCache
 
 @pytest.fixture
 def mock_conn_cursor():
     mock_cursor = MagicMock()
     mock_conn = MagicMock()
     mock_conn.cursor.return_value = mock_cursor
+    # prepared statements keep their cursors here, as on a pooled connection
+    mock_conn.statement_cursors = {}
     return mock_conn, mock_cursor
 
+def row(catalogue_id, name="Test Product"):
+    return (catalogue_id, name, "Test Description", "2025-01-01", "2025-12-31", "active")
+
 @pytest.fixture
 def sample_catalogue():
     return catalogue(
@@ -29,24 +36,27 @@ def test_create_catalogue(mock_get_conn, mock_conn_cursor, sample_catalogue):
     service = catalogueService()
     result = service.create_catalogue(sample_catalogue)
     assert result == 1
-    mock_cursor.execute.assert_called_once()
+    assert "INSERT INTO catalogue" in mock_cursor.execute.call_args_list[0][0][0]
+    assert "catalogue_version" in mock_cursor.execute.call_args_list[1][0][0]
+    mock_conn.commit.assert_called_once()
 
-@patch("service.catalogue_service.get_connection")
+@patch("service.catalogue_service.get_read_connection")
 def test_get_catalogue_by_id_found(mock_get_conn, mock_conn_cursor):
     mock_conn, mock_cursor = mock_conn_cursor
     mock_get_conn.return_value = mock_conn
-    expected_result = {"catalogue_id": 1, "catalogue_name": "Test Product"}
-    mock_cursor.fetchone.return_value = expected_result
+    mock_cursor.fetchall.return_value = [row(1)]
 
     service = catalogueService()
     result = service.get_catalogue_by_id(1)
-    assert result == expected_result
+    assert result == catalogue.from_row(row(1))
+    assert result.catalogue_name == "Test Product"
+    assert "SELECT *" not in mock_cursor.execute.call_args[0][0]
 
-@patch("service.catalogue_service.get_connection")
+@patch("service.catalogue_service.get_read_connection")
 def test_get_all_catalogues(mock_get_conn, mock_conn_cursor):
     mock_conn, mock_cursor = mock_conn_cursor
     mock_get_conn.return_value = mock_conn
-    expected_list = [{"catalogue_id": 1}, {"catalogue_id": 2}]
+    expected_list = [row(1), row(2)]
     mock_cursor.fetchall.return_value = expected_list
 
     service = catalogueService()
@@ -72,3 +82,118 @@ def test_update_catalogue_by_id(mock_get_conn, mock_conn_cursor, sample_catalogu
     service = catalogueService()
     result = service.update_catalogue_by_id(1, sample_catalogue)
     assert result == 1
+
+@patch("service.catalogue_service.get_read_connection")
+def test_get_catalogues_page_returns_next_cursor(mock_get_conn, mock_conn_cursor):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchall.return_value = [row(i) for i in (1, 2, 3)]
+
+    service = catalogueService()
+    page = service.get_catalogues_page(limit=2)
+    assert page["items"] == [row(1), row(2)]
+    assert page["next_cursor"] is not None
+    query, params = mock_cursor.execute.call_args[0]
+    assert "OFFSET" not in query
+    assert params == (3,)
+
+@patch("service.catalogue_service.get_read_connection")
+def test_get_catalogues_page_seeks_after_cursor(mock_get_conn, mock_conn_cursor):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchall.return_value = [
+        row(7, "B"),
+        row(4, "C"),
+    ]
+
+    service = catalogueService()
+    first = service.get_catalogues_page(limit=1, sort_by="catalogue_name")
+    mock_cursor.fetchall.return_value = [row(4, "C")]
+    second = service.get_catalogues_page(limit=1, after=first["next_cursor"], sort_by="catalogue_name")
+
+    query, params = mock_cursor.execute.call_args[0]
+    assert "catalogue_name > %s OR (catalogue_name = %s AND catalogue_id > %s)" in query
+    assert params == ("B", "B", 7, 2)
+    assert second["next_cursor"] is None
+
+def test_get_catalogues_page_rejects_bad_input():
+    service = catalogueService()
+    with pytest.raises(validationerror):
+        service.get_catalogues_page(sort_by="password")
+    with pytest.raises(validationerror):
+        service.get_catalogues_page(after="not-a-cursor")
+
+@patch("service.catalogue_service.get_connection")
+def test_iter_catalogue_chunks_releases_connection_when_done(mock_get_conn, mock_conn_cursor):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    service = catalogueService()
+    chunks = list(service.iter_catalogue_chunks(chunk_size=2))
+    assert chunks == [[(1,), (2,)], [(3,)]]
+    mock_conn.cursor.assert_called_once_with(buffered=False)
+    mock_conn.close.assert_called_once()
+    mock_conn.invalidate.assert_not_called()
+
+@patch("service.catalogue_service.get_connection")
+def test_iter_catalogue_chunks_drops_connection_when_abandoned(mock_get_conn, mock_conn_cursor):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchmany.return_value = [(1,)]
+
+    service = catalogueService()
+    stream = service.iter_catalogue_chunks()
+    next(stream)
+    stream.close()
+    mock_conn.invalidate.assert_called_once()
+    mock_conn.close.assert_not_called()
+
+@patch("service.catalogue_service.get_connection")
+def test_get_catalogue_by_id_is_cached_until_update(mock_get_conn, mock_conn_cursor, sample_catalogue):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchall.return_value = [row(1)]
+    mock_cursor.rowcount = 1
+
+    service = catalogueService(cache=ReadThroughCache(LRUCache()))
+    service.get_catalogue_by_id(1)
+    service.get_catalogue_by_id(1)
+    assert mock_cursor.execute.call_count == 1
+
+    service.update_catalogue_by_id(1, sample_catalogue)
+    mock_cursor.execute.reset_mock()
+    service.get_catalogue_by_id(1)
+    assert mock_cursor.execute.call_count == 1
+
+@patch("service.catalogue_service.get_connection")
+def test_create_invalidates_cached_miss(mock_get_conn, mock_conn_cursor, sample_catalogue):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchall.return_value = []
+    mock_cursor.lastrowid = 5
+
+    service = catalogueService(cache=ReadThroughCache(LRUCache()))
+    assert service.get_catalogue_by_id(5) is None
+    service.create_catalogue(sample_catalogue)
+    mock_cursor.fetchall.return_value = [row(5)]
+    assert service.get_catalogue_by_id(5).catalogue_id == 5
+
+@patch("service.catalogue_service.get_read_connection")
+def test_get_data_version(mock_get_conn, mock_conn_cursor):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.fetchall.return_value = [(7, None)]
+
+    service = catalogueService()
+    assert service.get_data_version() == (7, None)
+
+@patch("service.catalogue_service.get_connection")
+def test_delete_of_missing_row_does_not_bump_version(mock_get_conn, mock_conn_cursor):
+    mock_conn, mock_cursor = mock_conn_cursor
+    mock_get_conn.return_value = mock_conn
+    mock_cursor.rowcount = 0
+
+    service = catalogueService()
+    assert service.delete_catalogue_by_id(1) is False
+    mock_cursor.execute.assert_called_once()
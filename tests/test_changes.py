@@ -0,0 +1,201 @@
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from app import app
+from benchmarks.stand_in import seed_catalogues
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import catalogueService
+from service.change_feed import ChangeFeed, ChangesExpired
+
+
+def item(name, status="active"):
+    return catalogue(name, None, date(2025, 1, 1), date(2025, 12, 31), status)
+
+
+def log(db_path):
+    db = sqlite3.connect(db_path)
+    try:
+        return db.execute("SELECT catalogue_id, action FROM catalogue_change ORDER BY change_id").fetchall()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def feed(stand_in_db):
+    seed_catalogues(stand_in_db, 10)
+    service = catalogueService()
+    feed = ChangeFeed(service, poll_interval=0.05)
+    service.add_listener(feed.notify)
+    return feed
+
+
+def test_every_write_is_logged(feed, stand_in_db):
+    service = feed.service
+    service.create_catalogue(item("New"))
+    service.update_catalogue_by_id(3, item("Renamed"))
+    service.update_catalogue_by_id(99, item("Missing"))
+    service.delete_catalogue_by_id(4)
+    service.bulk_create_catalogues([item("B1"), item("B2")], atomic=False, batch_size=1)
+    service.bulk_update_catalogues([(5, item("U5")), (98, item("U98"))])
+    service.bulk_delete_catalogues([6, 97])
+    before = {row.catalogue_id: row.status for row in service.get_all_catalogues().records()}
+    service.apply_status_transitions(date(2030, 1, 1))
+    after = {row.catalogue_id: row.status for row in service.get_all_catalogues().records()}
+    entries = log(stand_in_db)
+    assert entries[:7] == [(11, "created"), (3, "updated"), (4, "deleted"), (12, "created"), (13, "created"),
+                           (5, "updated"), (6, "deleted")]
+    moved = {catalogue_id for catalogue_id in after if after[catalogue_id] != before[catalogue_id]}
+    assert moved and sorted(entries[7:]) == [(catalogue_id, "updated") for catalogue_id in sorted(moved)]
+
+
+def test_rolled_back_writes_are_not_logged(feed, stand_in_db):
+    results = feed.service.bulk_create_catalogues([item("Good"), catalogue(None, None, "2025-01-01",
+                                                                            "2025-02-01", "active")])
+    assert [result["status"] for result in results] == ["error", "error"]
+    assert log(stand_in_db) == []
+
+
+def test_read_returns_each_catalogue_once_with_its_current_row(feed):
+    service = feed.service
+    start = feed.read(0, 100)
+    assert start == {"changes": [], "next": "0", "more": False}
+    service.update_catalogue_by_id(1, item("First"))
+    service.update_catalogue_by_id(2, item("Second"))
+    service.update_catalogue_by_id(1, item("First again"))
+    service.delete_catalogue_by_id(2)
+
+    page = feed.read(0, 100)
+    assert [(c["catalogue_id"], c["action"], c["catalogue"] and c["catalogue"].catalogue_name)
+            for c in page["changes"]] == [(1, "updated", "First again"), (2, "deleted", None)]
+    assert page["next"] == "4" and not page["more"]
+
+    first = feed.read(0, 2)
+    assert first["more"] and first["next"] == "2"
+    rest = feed.read(int(first["next"]), 2)
+    assert [c["catalogue_id"] for c in rest["changes"]] == [1, 2] and not rest["more"]
+    assert feed.read(4, 100)["changes"] == []
+
+
+def test_compaction_keeps_tokens_valid(feed, stand_in_db):
+    service = feed.service
+    for round_ in range(3):
+        for catalogue_id in (1, 2, 3):
+            service.update_catalogue_by_id(catalogue_id, item(f"R{round_}"))
+    before = feed.read(2, 100)
+    assert service.compact_changes(chunk_size=2) == 6
+    assert log(stand_in_db) == [(1, "updated"), (2, "updated"), (3, "updated")]
+    assert feed.read(2, 100) == before
+    assert feed.read(0, 100)["next"] == "9"
+
+
+def test_tokens_past_retention_must_resync(feed, stand_in_db):
+    service = feed.service
+    service.update_catalogue_by_id(1, item("Old"))
+    service.update_catalogue_by_id(2, item("Old"))
+    db = sqlite3.connect(stand_in_db)
+    db.execute("UPDATE catalogue_change SET changed_at = '2000-01-01 00:00:00' WHERE change_id = 1")
+    db.commit()
+    db.close()
+    service.update_catalogue_by_id(3, item("New"))
+
+    assert service.prune_changes(datetime(2001, 1, 1)) == 1
+    assert feed.head() == "3"
+    with pytest.raises(ChangesExpired) as expired:
+        feed.read(0, 100)
+    assert expired.value.head == 3
+    assert [c["catalogue_id"] for c in feed.read(1, 100)["changes"]] == [2, 3]
+    # a token from a newer log (e.g. before a restore) is refused too
+    with pytest.raises(ChangesExpired):
+        feed.read(50, 100)
+
+
+def test_run_once_compacts_and_prunes_under_the_lease(feed, stand_in_db):
+    service = feed.service
+    service.update_catalogue_by_id(1, item("A"))
+    service.update_catalogue_by_id(1, item("B"))
+    service.update_catalogue_by_id(2, item("C"))
+    assert feed.run_once(datetime.utcnow()) == {"compacted": 1, "expired": 0}
+    feed.retention = 0
+    assert feed.run_once(datetime.utcnow() + timedelta(seconds=5)) == {"compacted": 0, "expired": 2}
+    assert log(stand_in_db) == []
+    assert feed.read(3, 10)["changes"] == []
+
+
+def test_wait_returns_as_soon_as_a_write_commits(feed):
+    feed.poll_interval = 10  # only the listener can wake the waiter in time
+    writer = threading.Timer(0.2, feed.service.update_catalogue_by_id, (7, item("Late")))
+    writer.start()
+    started = time.monotonic()
+    page = feed.wait(0, 100, timeout=5)
+    writer.join()
+    assert time.monotonic() - started < 2
+    assert [c["catalogue_id"] for c in page["changes"]] == [7]
+    assert feed.wait(1, 100, timeout=0.1)["changes"] == []
+
+
+def test_waiters_share_one_poller(feed, monkeypatch):
+    service = feed.service
+    reads = []
+    get_changes = service.get_changes
+    monkeypatch.setattr(service, "get_changes", lambda *args: reads.append(args) or get_changes(*args))
+    pages = []
+    waiters = [threading.Thread(target=lambda: pages.append(feed.wait(0, 100, timeout=5))) for _ in range(20)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.5)
+    idle_reads = len(reads)
+    service.update_catalogue_by_id(8, item("Shared"))
+    for waiter in waiters:
+        waiter.join()
+    assert [[c["catalogue_id"] for c in page["changes"]] for page in pages] == [[8]] * 20
+    # 0.5s at poll_interval=0.05 is about 10 polls, not 10 per waiter
+    assert idle_reads < 40
+    assert len(reads) - idle_reads <= 2
+
+
+@pytest.fixture
+def client(stand_in_db):
+    seed_catalogues(stand_in_db, 5)
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_changes_endpoint(client):
+    start = client.get("/catalogues/changes").get_json()
+    assert start == {"changes": [], "next": "0", "more": False}
+    client.put("/catalogues/2", json={"catalogue_name": "Two", "effective_from": "2025-01-01",
+                                      "effective_to": "2025-02-01", "status": "active"})
+    client.delete("/catalogues/3")
+    body = client.get(f"/catalogues/changes?since={start['next']}&wait=1").get_json()
+    assert [(c["catalogue_id"], c["action"]) for c in body["changes"]] == [(2, "updated"), (3, "deleted")]
+    assert body["changes"][0]["catalogue"]["catalogue_name"] == "Two"
+    assert body["next"] == "2"
+    assert client.get("/catalogues/changes?since=2").get_json()["changes"] == []
+    assert client.get("/catalogues/changes?since=abc").status_code == 400
+    assert client.get("/catalogues/changes?since=0&wait=600").status_code == 400
+
+    gone = client.get("/catalogues/changes?since=9")
+    assert gone.status_code == 410
+    assert gone.get_json()["resync"] and gone.get_json()["next"] == "2"
+
+
+def test_changes_as_server_sent_events(client):
+    client.delete("/catalogues/4")
+    response = client.get("/catalogues/changes", buffered=False,
+                          headers={"Accept": "text/event-stream", "Last-Event-ID": "0"})
+    assert response.mimetype == "text/event-stream"
+    events = response.iter_encoded()
+    assert next(events).startswith(b"retry: ")
+    assert next(events) == b'id: 1\nevent: change\ndata: {"catalogue_id":4,"action":"deleted","catalogue":null,' \
+                           b'"token":"1"}\n\n'
+    response.close()
+
+    response = client.get("/catalogues/changes?since=7", buffered=False, headers={"Accept": "text/event-stream"})
+    events = response.iter_encoded()
+    next(events)
+    assert next(events).startswith(b"event: resync\n")
+    response.close()
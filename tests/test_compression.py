@@ -0,0 +1,102 @@
+import gzip
+import json
+import zlib
+
+import pytest
+from app import app as catalogue_app
+from benchmarks.stand_in import seed_catalogues
+from flask import Flask, Response, jsonify
+from util import metrics
+from util.compression import ResponseCompressor, no_compression
+
+ROWS = [{"catalogue_id": i, "catalogue_name": f"Catalogue {i}", "status": "active"} for i in range(200)]
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route("/big")
+    def big():
+        response = jsonify(ROWS)
+        response.set_etag("v1")
+        return response
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        def rows():
+            for row in ROWS:
+                yield json.dumps(row) + "\n"
+        return Response(rows(), mimetype="application/x-ndjson")
+
+    @app.route("/raw")
+    @no_compression
+    def raw():
+        return jsonify(ROWS)
+
+    @app.route("/encoded")
+    def encoded():
+        response = Response(gzip.compress(b"x" * 5000), mimetype="text/plain")
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    ResponseCompressor(min_size=512, use_brotli=False).init_app(app)
+    with app.test_client() as client:
+        yield client
+
+
+def test_large_json_is_gzipped_with_a_distinct_etag(client):
+    response = client.get("/big", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == ROWS
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert response.headers["ETag"] == '"v1-gzip"'
+    plain = client.get("/big")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] == '"v1"'
+
+
+def test_small_opted_out_and_encoded_responses_are_left_alone(client):
+    assert "Content-Encoding" not in client.get("/small", headers=GZIP).headers
+    assert "Content-Encoding" not in client.get("/raw", headers=GZIP).headers
+    assert client.get("/big", headers={"Accept-Encoding": "gzip;q=0, identity"}).get_json() == ROWS
+    encoded = client.get("/encoded", headers=GZIP)
+    assert gzip.decompress(encoded.data) == b"x" * 5000
+
+
+def test_streamed_body_is_compressed_incrementally(client):
+    response = client.get("/stream", headers=GZIP, buffered=False)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    body = iter(response.response)
+    # each source chunk is flushed, so the first row decodes on its own
+    assert json.loads(decoder.decompress(next(body))) == ROWS[0]
+    rest = decoder.decompress(b"".join(body))
+    response.close()
+    assert [json.loads(line) for line in rest.decode().splitlines()] == ROWS[1:]
+
+
+def test_compression_is_reported_to_metrics(client):
+    before = metrics.COMPRESSION_BYTES.collect().get(("gzip", "in"), 0)
+    response = client.get("/stream", headers=GZIP)
+    response.close()
+    assert metrics.COMPRESSION_BYTES.collect()[("gzip", "in")] > before
+    ratios = metrics.COMPRESSION_RATIO.collect()
+    assert ratios[("/stream", "gzip")][-1] >= 1
+
+
+def test_compressed_etag_revalidates_catalogue_list(stand_in_db):
+    seed_catalogues(stand_in_db, 100)
+    with catalogue_app.test_client() as client:
+        first = client.get("/catalogues", headers=GZIP)
+        assert first.headers["Content-Encoding"] == "gzip"
+        assert first.headers["ETag"].endswith('-gzip"')
+        again = client.get("/catalogues", headers={**GZIP, "If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+from exception.exception import databaseconnectionerror
+from util.connection_pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.alive
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def cursor(self, **kwargs):
+        return ("cursor", kwargs)
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+@pytest.fixture
+def factory(opened):
+    def make():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+    return make
+
+
+def test_close_returns_connection_for_reuse(factory, opened):
+    pool = ConnectionPool(factory, min_size=0, max_size=2)
+    conn = pool.acquire()
+    conn.close()
+    again = pool.acquire()
+    assert again.raw is opened[0]
+    assert len(opened) == 1
+    assert not opened[0].closed
+
+
+def test_min_size_is_opened_on_first_use(factory, opened):
+    pool = ConnectionPool(factory, min_size=3, max_size=5)
+    assert opened == []
+    pool.acquire().close()
+    assert len(opened) == 3
+    assert pool.stats()["idle"] == 3
+
+
+def test_overflow_connections_are_closed_on_return(factory, opened):
+    pool = ConnectionPool(factory, min_size=0, max_size=1, max_overflow=1)
+    first, second = pool.acquire(), pool.acquire()
+    assert pool.stats()["overflow"] == 1
+    first.close()
+    second.close()
+    stats = pool.stats()
+    assert stats["size"] == 1
+    assert stats["idle"] == 1
+    assert sum(c.closed for c in opened) == 1
+
+
+def test_borrow_times_out_when_exhausted(factory):
+    pool = ConnectionPool(factory, min_size=0, max_size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(databaseconnectionerror):
+        pool.acquire()
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 1
+    assert stats["wait_time"] > 0
+    held.close()
+
+
+def test_waiter_gets_released_connection(factory):
+    pool = ConnectionPool(factory, min_size=0, max_size=1, timeout=2)
+    held = pool.acquire()
+    raw = held.raw
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    held.close()
+    waiter.join(1)
+    assert len(got) == 1
+    assert got[0].raw is raw
+
+
+def test_dead_connection_is_replaced_on_borrow(factory, opened):
+    pool = ConnectionPool(factory, min_size=0, max_size=2, ping_interval=0)
+    pool.acquire().close()
+    opened[0].alive = False
+    conn = pool.acquire()
+    assert conn.raw is opened[1]
+    assert opened[0].closed
+    assert pool.stats()["failed_health_checks"] == 1
+
+
+def test_old_connections_are_recycled(factory, opened):
+    pool = ConnectionPool(factory, min_size=0, max_size=2, recycle=0.01)
+    pool.acquire().close()
+    time.sleep(0.02)
+    conn = pool.acquire()
+    assert conn.raw is opened[1]
+    assert opened[0].closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_idle_connections_above_min_size_are_closed(factory, opened):
+    pool = ConnectionPool(factory, min_size=0, max_size=2, idle_timeout=0.01)
+    pool.acquire().close()
+    time.sleep(0.02)
+    pool.acquire()
+    assert opened[0].closed
+
+
+def test_open_transaction_is_rolled_back_on_return(factory, opened):
+    pool = ConnectionPool(factory, min_size=0, max_size=1)
+    conn = pool.acquire()
+    conn.raw.in_transaction = True
+    conn.close()
+    assert opened[0].rollbacks == 1
+
+
+def test_failed_connect_frees_the_slot(opened):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("connect failed")
+        return FakeConnection()
+
+    pool = ConnectionPool(flaky, min_size=0, max_size=1, timeout=0.05)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert pool.acquire() is not None
+    assert pool.stats()["in_use"] == 1
+
+
+def test_close_twice_is_harmless(factory):
+    pool = ConnectionPool(factory, min_size=0, max_size=1)
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    assert pool.stats()["idle"] == 1
+
+
+def test_cursor_wrapper_is_applied(factory):
+    pool = ConnectionPool(factory, min_size=0, max_size=1, cursor_wrapper=lambda cursor: ("wrapped", cursor))
+    conn = pool.acquire()
+    assert conn.cursor(dictionary=True) == ("wrapped", ("cursor", {"dictionary": True}))
+    conn.close()
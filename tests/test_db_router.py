@@ -0,0 +1,179 @@
+import os
+import shutil
+import sqlite3
+import time
+from datetime import date
+
+import pytest
+from app import PRIMARY_UNTIL_KEY, app
+from benchmarks.stand_in import connection_factory, seed_catalogues
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import catalogueService
+from util import db_connection, db_router
+
+
+def replicate(primary, path, marker):
+    """Copy the primary into a replica that then stops replicating, and mark its row 1."""
+    shutil.copy(primary, path)
+    db = sqlite3.connect(path)
+    db.execute("UPDATE catalogue SET catalogue_name = ? WHERE catalogue_id = 1", (marker,))
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.fixture
+def replicas(stand_in_db, tmp_path):
+    """Primary with 10 rows and two lagging replicas whose row 1 is named after them."""
+    seed_catalogues(stand_in_db, 10)
+    paths = {name: replicate(stand_in_db, os.path.join(tmp_path, f"{name}.sqlite3"), name)
+             for name in ("replica-a", "replica-b")}
+    yield paths
+    if db_connection._router is not None:
+        db_connection._router.close()
+    db_connection._router = None
+
+
+def configure(paths, **options):
+    return db_connection.configure_replicas(
+        {name: connection_factory(path) for name, path in paths.items()}, **options)
+
+
+def name_of_first(service):
+    return service.get_catalogues_page(limit=1)["items"][0][1]
+
+
+@pytest.fixture
+def scope():
+    yield db_router.begin_scope()
+    db_router.end_scope()
+
+
+def test_reads_outside_a_scope_use_the_primary(replicas):
+    configure(replicas)
+    assert name_of_first(catalogueService()) not in replicas
+
+
+def test_scope_reads_from_one_replica_until_it_writes(replicas, scope):
+    configure({"replica-a": replicas["replica-a"]}, sticky_seconds=60)
+    service = catalogueService()
+    assert name_of_first(service) == "replica-a"
+    assert service.get_data_version()[0] == 0
+
+    service.update_catalogue_by_id(2, catalogue("Edited", None, date(2025, 1, 1), date(2025, 2, 1), "active"))
+    assert name_of_first(service) != "replica-a"
+    assert service.get_data_version()[0] == 1
+    primary_until = db_router.end_scope()
+    assert time.time() + 50 < primary_until
+
+    # the next request of the same session carries the window; another session does not
+    db_router.begin_scope(primary_until)
+    assert service.get_catalogue_by_id(2).catalogue_name == "Edited"
+    db_router.begin_scope()
+    assert service.get_catalogue_by_id(2).catalogue_name != "Edited"
+
+
+def test_reads_are_balanced_and_keep_to_their_replica(replicas):
+    router = configure(replicas)
+    service = catalogueService()
+    seen = []
+    for _ in range(4):
+        db_router.begin_scope()
+        first = name_of_first(service)
+        assert name_of_first(service) == first
+        seen.append(first)
+        db_router.end_scope()
+    assert sorted(seen) == ["replica-a", "replica-a", "replica-b", "replica-b"]
+
+    # the replica with a connection out is passed over
+    held = router.pools[0].acquire()
+    try:
+        for _ in range(2):
+            db_router.begin_scope()
+            assert name_of_first(service) == "replica-b"
+            db_router.end_scope()
+    finally:
+        held.close()
+
+
+def test_failing_replica_is_ejected_then_tried_again(replicas, scope):
+    down = True
+    factory = connection_factory(replicas["replica-a"])
+
+    def connect():
+        if down:
+            raise OSError("replica unreachable")
+        return factory()
+
+    router = db_connection.configure_replicas({"replica-a": connect}, eject_after=2, eject_seconds=0.5)
+    service = catalogueService()
+    for _ in range(2):
+        assert name_of_first(service) not in replicas
+    health = router.stats()[0]
+    assert health["failures"] >= 2 and health["ejected_for"] > 0
+
+    down = False
+    assert name_of_first(service) not in replicas  # still ejected
+    time.sleep(0.6)
+    assert name_of_first(service) == "replica-a"
+    assert router.stats()[0]["failures"] == 0
+
+
+def test_lagging_replica_is_left_out_until_it_catches_up(replicas, scope):
+    router = configure({"replica-a": replicas["replica-a"]}, max_lag_seconds=0.2, lag_check_interval=0,
+                       sticky_seconds=0.1)
+    assert router.sticky_seconds == 0.2
+    service = catalogueService()
+    router.check_lag()
+    assert name_of_first(service) == "replica-a"
+
+    # the replica has stopped replicating: a write on the primary never reaches it
+    with db_connection.get_connection() as conn:
+        conn.cursor().execute("UPDATE catalogue_version SET version = version + 1")
+        conn.commit()
+    router.check_lag()
+    assert router.stats()[0]["lagging"] is False  # behind, but not for long yet
+    time.sleep(0.3)
+    router.check_lag()
+    health = router.stats()[0]
+    assert health["lagging"] is True and health["lag"] >= 0.2
+    db_router.begin_scope()
+    assert name_of_first(service) not in replicas
+
+    db = sqlite3.connect(replicas["replica-a"])
+    db.execute("UPDATE catalogue_version SET version = version + 1")
+    db.commit()
+    db.close()
+    router.check_lag()
+    assert router.stats()[0]["lagging"] is False and router.stats()[0]["lag"] == 0
+    db_router.begin_scope()
+    assert name_of_first(service) == "replica-a"
+
+
+def test_without_replicas_scoped_reads_use_the_primary(replicas, scope):
+    db_connection.configure_replicas({})
+    assert name_of_first(catalogueService()) not in replicas
+
+
+@pytest.fixture
+def clients(replicas):
+    configure({"replica-a": replicas["replica-a"]})
+    app.testing = True
+    with app.test_client() as writer, app.test_client() as reader:
+        yield writer, reader
+
+
+def test_session_sees_its_own_edits(clients):
+    writer, reader = clients
+    first_page = "/catalogues?limit=3"
+    assert writer.get(first_page).get_json()["items"][0]["catalogue_name"] == "replica-a"
+
+    response = writer.put("/catalogues/2", json={"catalogue_name": "Edited", "effective_from": "2025-01-01",
+                                                 "effective_to": "2025-02-01", "status": "active"})
+    assert response.status_code == 200
+    with writer.session_transaction() as session:
+        assert session[PRIMARY_UNTIL_KEY] > time.time()
+
+    names = [item["catalogue_name"] for item in writer.get(first_page).get_json()["items"]]
+    assert names[0] != "replica-a" and names[1] == "Edited"
+    assert reader.get(first_page).get_json()["items"][1]["catalogue_name"] != "Edited"
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+from datetime import date
+
+from util.export import encode_csv, encode_json_array, encode_ndjson
+
+COLUMNS = ("catalogue_id", "catalogue_name", "effective_from")
+CHUNKS = [
+    [(1, "Summer", date(2025, 7, 1)), (2, "Winter", date(2025, 12, 1))],
+    [],
+    [(3, "Spring, \"new\"", date(2026, 3, 1))],
+]
+
+
+def test_ndjson_yields_one_object_per_line():
+    body = b"".join(encode_ndjson(iter(CHUNKS), COLUMNS)).decode()
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert [r["catalogue_id"] for r in rows] == [1, 2, 3]
+    assert rows[0]["effective_from"] == "2025-07-01"
+
+
+def test_json_array_is_valid_across_chunks():
+    body = b"".join(encode_json_array(iter(CHUNKS), COLUMNS))
+    rows = json.loads(body)
+    assert len(rows) == 3
+    assert rows[2]["catalogue_name"] == "Spring, \"new\""
+
+
+def test_json_array_of_nothing():
+    assert json.loads(b"".join(encode_json_array(iter([]), COLUMNS))) == []
+
+
+def test_csv_has_header_and_quotes_values():
+    body = b"".join(encode_csv(iter(CHUNKS), COLUMNS)).decode()
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == list(COLUMNS)
+    assert rows[3] == ["3", "Spring, \"new\"", "2026-03-01"]
+
+
+def test_encoders_yield_per_chunk():
+    blocks = list(encode_ndjson(iter(CHUNKS), COLUMNS))
+    assert len(blocks) == 2
@@ -0,0 +1,143 @@
+import csv
+import json
+import sqlite3
+
+import import_catalogues
+import pytest
+from import_catalogues import Checkpoint, Importer, main, warning_errors
+from service.catalogue_service import catalogueService
+
+HEADER = ["catalogue_name", "catalogue_description", "effective_from", "effective_to", "status"]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def good(i):
+    return [f"Supplier {i}", "Imported", "2025-01-01", "2025-12-31", "active"]
+
+
+def names(db_path):
+    db = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in db.execute("SELECT catalogue_name FROM catalogue ORDER BY catalogue_id")]
+    finally:
+        db.close()
+
+
+def test_csv_import_reports_rejected_rows(stand_in_db, tmp_path, capsys):
+    rows = [good(i) for i in range(25)]
+    rows[3] = ["", "No name", "2025-01-01", "2025-12-31", "active"]
+    rows[17] = ["Backwards", "", "2025-12-31", "2025-01-01", "active"]
+    rows[20] = ["Multi-line", "First line\nSecond line", "2025-01-01", "2025-12-31", "active"]
+    source = write_csv(tmp_path / "supplier.csv", rows)
+    rejects = tmp_path / "rejects.ndjson"
+
+    assert main([source, "--commit-every", "10", "--rejects", str(rejects)]) == 2
+    assert len(names(stand_in_db)) == 23
+    rejected = [json.loads(line) for line in rejects.read_text().splitlines()]
+    # line numbers count the header
+    assert [(row["line"], row["error"]) for row in rejected] == [
+        (5, "catalogue_name must not be empty"),
+        (19, "effective_from must not be after effective_to"),
+    ]
+    assert "Imported 23 of 25 rows" in capsys.readouterr().out
+    assert json.loads((tmp_path / "supplier.csv.checkpoint").read_text())["position"] == 25
+
+    # a finished import is not repeated
+    main([source, "--commit-every", "10"])
+    assert len(names(stand_in_db)) == 23
+
+
+def test_interrupted_import_resumes_after_last_commit(stand_in_db, tmp_path):
+    source = write_csv(tmp_path / "supplier.csv", [good(i) for i in range(50)])
+    service = catalogueService()
+    original = service.bulk_create_catalogues
+    calls = []
+
+    def flaky(dtos, **kwargs):
+        calls.append(len(dtos))
+        if len(calls) == 3:
+            raise ConnectionError("lost the database")
+        return original(dtos, **kwargs)
+
+    service.bulk_create_catalogues = flaky
+    checkpoint = Checkpoint(str(tmp_path / "progress.json"), source)
+    with pytest.raises(ConnectionError):
+        Importer(service, commit_every=20, queue_size=1).run(source, "csv", checkpoint)
+    assert len(names(stand_in_db)) == 40
+
+    resumed = Checkpoint(str(tmp_path / "progress.json"), source)
+    assert resumed.load() and resumed.position == 40
+    summary = Importer(catalogueService(), commit_every=20).run(source, "csv", resumed)
+    assert summary["read"] == 10 and summary["imported"] == 10
+    assert names(stand_in_db) == [f"Supplier {i}" for i in range(50)]
+
+
+def test_ndjson_export_round_trip_and_load_data_fallback(stand_in_db, tmp_path):
+    source = tmp_path / "export.ndjson"
+    lines = [json.dumps(dict(zip(["catalogue_id"] + HEADER, [i] + good(i)))) for i in range(5)]
+    lines.insert(2, "{not json")
+    source.write_text("\n".join(lines) + "\n")
+    checkpoint = Checkpoint(str(tmp_path / "progress.json"), str(source))
+
+    # the stand-in has no LOAD DATA, so the importer switches to INSERT
+    importer = Importer(catalogueService(), commit_every=4, method="load_data")
+    summary = importer.run(str(source), "ndjson", checkpoint)
+    assert importer.method == "insert"
+    assert (summary["imported"], summary["rejected"]) == (5, 1)
+    assert names(stand_in_db) == [f"Supplier {i}" for i in range(5)]
+
+
+def test_load_data_warnings_go_to_the_rejects_file(tmp_path, monkeypatch):
+    opened = []
+
+    class Connection:
+        def __init__(self, **options):
+            self.options, self.closed = options, False
+            opened.append(self)
+
+        def close(self):
+            self.closed = True
+
+    class Service:
+        def load_catalogues_file(self, path, conn):
+            assert conn.options == {"allow_local_infile": True}
+            with open(path) as fh:
+                loaded = len(fh.readlines())
+            return loaded, [("Warning", 1265, "Data truncated for column 'status' at row 2"),
+                            ("Note", 1592, "Unsafe statement")]
+
+    monkeypatch.setattr(import_catalogues, "open_connection", Connection)
+    source = write_csv(tmp_path / "supplier.csv", [good(i) for i in range(5)])
+    checkpoint = Checkpoint(str(tmp_path / "progress.json"), source)
+    rejects = tmp_path / "rejects.ndjson"
+    with open(rejects, "w") as out:
+        summary = Importer(Service(), commit_every=3, method="load_data").run(source, "csv", checkpoint, out)
+    assert (summary["imported"], summary["rejected"]) == (3, 2)
+    # one connection for the whole run, closed at the end
+    assert len(opened) == 1 and opened[0].closed
+    assert [json.loads(line) for line in rejects.read_text().splitlines()] == [
+        {"line": line, "error": "Warning 1265: Data truncated for column 'status' at row 2", "loaded": True}
+        for line in (3, 6)
+    ]
+
+
+def test_warning_errors_combine_warnings_of_a_row():
+    assert warning_errors([("Warning", 1, "first at row 1"), ("Warning", 2, "second at row 1"),
+                           ("Warning", 3, "outside at row 9")], 2) == [
+        "Warning 1: first at row 1; Warning 2: second at row 1", None]
+
+
+def test_checkpoint_of_another_file_is_refused(tmp_path):
+    source = write_csv(tmp_path / "supplier.csv", [good(0)])
+    checkpoint = Checkpoint(str(tmp_path / "progress.json"), source)
+    checkpoint.save()
+    write_csv(tmp_path / "supplier.csv", [good(0), good(1)])
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmp_path / "progress.json"), source).load()
@@ -0,0 +1,209 @@
+import random
+import sqlite3
+import time
+from datetime import date
+
+import pytest
+from app import app, effective_index, service
+from benchmarks.stand_in import seed_catalogues
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import CATALOGUE_COLUMNS
+from util.intervals import EffectiveDateIndex, IntervalTree
+
+ROWS = [
+    (1, "A", "", "2025-01-01", "2025-01-31", "active"),
+    (2, "B", "", date(2025, 1, 15), date(2025, 2, 15), "active"),
+    (3, "C", "", "2025-03-01", "2025-03-01", "active"),
+    (4, "D", "", None, "2025-12-31", "active"),
+]
+
+
+@pytest.fixture
+def client(stand_in_db):
+    seed_catalogues(stand_in_db, 300)
+    effective_index.reset()
+    if service.cache is not None:
+        service.cache.clear()
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+    effective_index.reset()
+
+
+def index_of(rows, max_delta=4096):
+    return EffectiveDateIndex(lambda: iter([rows]), CATALOGUE_COLUMNS, max_delta=max_delta)
+
+
+def record(catalogue_id, effective_from, effective_to):
+    return {"catalogue_id": catalogue_id, "effective_from": effective_from, "effective_to": effective_to}
+
+
+def test_tree_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for i in range(2000):
+        start = rng.randrange(0, 1000)
+        intervals.append((i, start, start + rng.randrange(0, 200)))
+    tree = IntervalTree(intervals)
+    assert len(tree) == 2000
+    for _ in range(200):
+        low = rng.randrange(-50, 1250)
+        high = low + rng.choice([0, 0, rng.randrange(0, 100)])
+        expected = {i for i, start, end in intervals if start <= high and end >= low}
+        found = tree.overlapping(low, high)
+        assert len(found) == len(expected)
+        assert set(found) == expected
+    assert IntervalTree([]).overlapping(0, 10) == []
+
+
+def test_point_and_range_queries_use_closed_bounds():
+    index = index_of(ROWS)
+    assert sorted(index.effective_on(date(2025, 1, 15))) == [1, 2]
+    assert sorted(index.effective_on(date(2025, 1, 31))) == [1, 2]
+    assert index.effective_on(date(2025, 3, 1)) == [3]
+    assert index.effective_on(date(2025, 6, 1)) == []
+    assert sorted(index.overlapping(date(2025, 2, 15), date(2025, 3, 1))) == [2, 3]
+    assert len(index) == 3
+
+
+def test_writes_are_visible_before_and_after_rebuild():
+    index = index_of(ROWS)
+    index.ensure_ready()
+    index.apply("updated", [record(1, "2025-06-01", "2025-06-30")])
+    index.apply("created", [record(5, "2025-01-20", "2025-01-20")])
+    index.apply("deleted", [{"catalogue_id": 2}])
+    index.apply("updated", [record(3, None, None)])
+    assert index.effective_on(date(2025, 1, 20)) == [5]
+    assert index.effective_on(date(2025, 6, 15)) == [1]
+    assert index.effective_on(date(2025, 3, 1)) == []
+    index.rebuild()
+    assert index.rebuilds == 1
+    assert index.effective_on(date(2025, 1, 20)) == [5]
+    assert index.effective_on(date(2025, 6, 15)) == [1]
+    assert len(index) == 2
+
+
+def test_count_and_page_agree_with_listing():
+    rng = random.Random(3)
+    rows = []
+    for i in range(1, 501):
+        start = date(2025, 1, 1).toordinal() + rng.randrange(0, 300)
+        rows.append((i, "", "", date.fromordinal(start), date.fromordinal(start + rng.randrange(0, 60)), ""))
+    index = index_of(rows)
+    index.ensure_ready()
+    index.apply("deleted", [{"catalogue_id": i} for i in range(1, 500, 7)])
+    index.apply("updated", [record(i, "2025-03-01", "2025-03-31") for i in range(2, 500, 11)])
+    for day, high in [(date(2025, 3, 10), date(2025, 3, 10)), (date(2025, 1, 1), date(2025, 12, 31)),
+                      (date(2025, 12, 30), date(2026, 1, 5))]:
+        expected = sorted(index.overlapping(day, high))
+        assert index.count(day, high) == len(expected)
+        for fetch in (1, 5, 1000):
+            assert index.page(day, high, fetch) == (expected[:fetch], len(expected))
+            if expected:
+                assert index.page(day, high, fetch, expected[0])[0] == expected[1:fetch + 1]
+
+
+def test_full_delta_rebuilds_in_background():
+    index = index_of(ROWS, max_delta=3)
+    index.ensure_ready()
+    index.apply("created", [record(i, "2026-01-01", "2026-01-31") for i in range(10, 13)])
+    deadline = time.monotonic() + 5
+    while index.rebuilds == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.rebuilds == 1
+    assert sorted(index.effective_on(date(2026, 1, 15))) == [10, 11, 12]
+
+
+def test_writes_during_rebuild_are_kept():
+    index = index_of(ROWS)
+    index.ensure_ready()
+    build_tree = index._tree_from
+
+    def tree_from(intervals):
+        # committed after the rebuild took its snapshot
+        index.apply("updated", [record(1, "2027-01-01", "2027-01-01")])
+        return build_tree(intervals)
+
+    index._tree_from = tree_from
+    index.rebuild()
+    assert index.effective_on(date(2025, 1, 10)) == []
+    assert index.effective_on(date(2027, 1, 1)) == [1]
+
+
+def test_active_endpoint_matches_sql_filter(client):
+    day = date(2024, 9, 1)
+    expected = []
+    after = None
+    while True:
+        page = service.get_catalogues_page(limit=500, after=after, sort_by="catalogue_id",
+                                           filters={"effective_on": day})
+        expected.extend(row[0] for row in page["items"])
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert expected
+
+    found, url = [], "/catalogues/active?on=2024-09-01&limit=7"
+    while url:
+        body = client.get(url).get_json()
+        assert body["count"] == len(expected)
+        found.extend(row["catalogue_id"] for row in body["items"])
+        url = body["next_cursor"] and f"/catalogues/active?on=2024-09-01&limit=7&after={body['next_cursor']}"
+    assert found == expected
+
+
+def test_active_endpoint_follows_writes_and_ranges(client):
+    service.create_catalogue(catalogue("Far future", "", "2031-05-01", "2031-05-31", "upcoming"))
+    body = client.get("/catalogues/active?from=2031-04-01&to=2031-05-01").get_json()
+    assert [row["catalogue_name"] for row in body["items"]] == ["Far future"]
+    catalogue_id = body["items"][0]["catalogue_id"]
+    service.update_catalogue_by_id(catalogue_id, catalogue("Far future", "", "2031-06-01", "2031-06-30",
+                                                           "upcoming"))
+    assert client.get("/catalogues/active?on=2031-05-10").get_json()["count"] == 0
+    assert client.get("/catalogues/active?on=2031-06-10").get_json()["count"] == 1
+
+
+def write_elsewhere(path, sql, params=(), logged=True):
+    """Commit a write the way another worker or the importer would: no listener hears of it."""
+    db = sqlite3.connect(path)
+    catalogue_id = db.execute(sql, params).lastrowid or params[-1]
+    db.execute("UPDATE catalogue_version SET version = version + 1 WHERE table_name = 'catalogue'")
+    if logged:
+        db.execute("INSERT INTO catalogue_change (catalogue_id, action, changed_at) "
+                   "VALUES (?, 'updated', datetime('now'))", (catalogue_id,))
+    db.commit()
+    db.close()
+    return catalogue_id
+
+
+def test_active_endpoint_catches_up_with_writes_from_other_processes(client, stand_in_db):
+    url = "/catalogues/active?on=2031-05-10"
+    first = client.get(url)
+    assert first.get_json()["count"] == 0
+    catalogue_id = write_elsewhere(
+        stand_in_db, "INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, "
+        "effective_to, status) VALUES (?, '', '2031-05-01', '2031-05-31', 'upcoming')", ("Imported",))
+    second = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert [row["catalogue_name"] for row in second.get_json()["items"]] == ["Imported"]
+    # a write that bumps the version but is not logged makes the index rebuild
+    write_elsewhere(stand_in_db, "UPDATE catalogue SET effective_from = '2032-01-01', "
+                    "effective_to = '2032-01-31' WHERE catalogue_id = ?", (catalogue_id,), logged=False)
+    assert client.get(url).get_json()["count"] == 0
+    assert client.get("/catalogues/active?on=2032-01-10").get_json()["count"] == 1
+
+
+def test_active_endpoint_uses_sql_until_the_index_catches_up(client, stand_in_db, monkeypatch):
+    assert client.get("/catalogues/active?on=2031-05-10").get_json()["count"] == 0
+    write_elsewhere(stand_in_db, "INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, "
+                    "effective_to, status) VALUES (?, '', '2031-05-01', '2031-05-31', 'upcoming')", ("Imported",))
+    monkeypatch.setattr(effective_index._get_current_object(), "catch_up", lambda version: False)
+    items = client.get("/catalogues/active?on=2031-05-10").get_json()["items"]
+    assert [row["catalogue_name"] for row in items] == ["Imported"]
+
+
+def test_active_endpoint_rejects_bad_parameters(client):
+    assert client.get("/catalogues/active?on=soon").status_code == 400
+    assert client.get("/catalogues/active?from=2025-01-01").status_code == 400
+    assert client.get("/catalogues/active?from=2025-02-01&to=2025-01-01").status_code == 400
+    assert client.get("/catalogues/active?on=2025-01-01&from=2025-01-01&to=2025-01-02").status_code == 400
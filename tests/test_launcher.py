@@ -0,0 +1,104 @@
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork") or not os.path.isdir("/proc"),
+                                reason="prefork workers need os.fork and /proc")
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def children(pid: int) -> set[int]:
+    found = set()
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/status") as fh:
+                    status = dict(line.split(":", 1) for line in fh if ":" in line)
+            except OSError:
+                continue
+            # some kernels list threads here too; keep whole processes only
+            if int(status["PPid"]) == pid and status["Tgid"].strip() == entry:
+                found.add(int(entry))
+    return found
+
+
+def get(port: int, path: str = "/login.html") -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def wait_for(condition, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = condition()
+        except OSError:
+            result = None
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+@pytest.fixture
+def launch():
+    processes = []
+
+    def start(*args):
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "launcher.py", "--port", str(port), "--graceful-timeout", "5", *args],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        processes.append(process)
+        wait_for(lambda: get(port) == 200)
+        return process, port
+
+    yield start
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+@pytest.mark.parametrize("preload", ["--preload", "--no-preload"])
+def test_prefork_restarts_gracefully_and_stops(launch, preload):
+    master, port = launch("--mode", "prefork", "--workers", "2", preload)
+    first = wait_for(lambda: len(children(master.pid)) == 2 and children(master.pid))
+
+    master.send_signal(signal.SIGHUP)
+    second = wait_for(lambda: (found := children(master.pid)) and not found & first and len(found) == 2 and found)
+    assert get(port) == 200
+
+    os.kill(next(iter(second)), signal.SIGKILL)
+    wait_for(lambda: len(children(master.pid) - second) == 1)
+    assert get(port) == 200
+
+    master.send_signal(signal.SIGTERM)
+    assert master.wait(timeout=15) == 0
+
+
+def test_threaded_mode_stops_on_sigterm(launch):
+    process, port = launch("--mode", "threaded")
+    assert get(port, "/") in (200, 302)
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=15) == 0
@@ -0,0 +1,60 @@
+import logging
+import queue
+
+import pytest
+from config.logger_config import BoundedQueueHandler, SamplingFilter
+
+
+def _record(name="service.catalogue_service", level=logging.DEBUG, msg="row %s", args=(1,)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def records():
+    return [_record(args=(i,)) for i in range(3)]
+
+
+def drain(handler):
+    return [handler.queue.get_nowait() for _ in range(handler.queue.qsize())]
+
+
+@pytest.mark.parametrize("policy, kept", [("drop_newest", slice(None, 2)), ("drop_oldest", slice(1, None))])
+def test_full_queue_drops_by_policy(records, policy, kept):
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), drop_policy=policy)
+    for record in records:
+        handler.handle(record)
+    assert drain(handler) == records[kept]
+    assert handler.dropped == 1
+
+
+def test_block_gives_up_after_timeout():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), drop_policy="block", block_timeout=0.01)
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_message_is_not_formatted_on_enqueue():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record(msg="row %s", args=(7,)))
+    queued = handler.queue.get_nowait()
+    assert queued.args == (7,)
+    assert not hasattr(queued, "message")
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), drop_policy="spill")
+
+
+def test_debug_records_are_sampled_per_logger():
+    sampler = SamplingFilter({"service": 0.25})
+    assert sum(sampler.filter(_record("service.catalogue_service")) for _ in range(100)) == 25
+    assert all(sampler.filter(_record("util.cache")) for _ in range(10))
+
+
+def test_higher_levels_are_always_kept():
+    sampler = SamplingFilter({}, default=0.0)
+    assert not sampler.filter(_record())
+    assert sampler.filter(_record(level=logging.INFO))
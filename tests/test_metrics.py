@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+from app import app
+from benchmarks.stand_in import seed_catalogues
+from util import metrics
+
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_counter_sums_shards_from_all_threads():
+    counter = metrics.Counter("test_total", "Test counter.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("a",))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(("b",), 5)
+    assert counter.collect() == {("a",): 8000, ("b",): 5}
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test histogram.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(("/x",), value)
+    assert histogram.render() == [
+        'test_seconds_bucket{route="/x",le="0.1"} 2',
+        'test_seconds_bucket{route="/x",le="1"} 3',
+        'test_seconds_bucket{route="/x",le="+Inf"} 4',
+        'test_seconds_sum{route="/x"} 3.65',
+        'test_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = metrics.Counter("test_escape_total", "Test counter.", ("path",))
+    counter.inc(('a"b\\c',))
+    assert counter.render() == ['test_escape_total{path="a\\"b\\\\c"} 1']
+
+
+def test_statement_name_uses_caller_verb_and_table():
+    assert metrics.statement_name("SELECT * FROM catalogue WHERE catalogue_id = %s", "load") == "load:select_catalogue"
+    assert metrics.statement_name("UPDATE catalogue_version SET version = version + 1", "bump") == \
+        "bump:update_catalogue_version"
+    assert metrics.statement_name("INSERT INTO users (username) VALUES (%s)", "add") == "add:insert_users"
+
+
+def test_metrics_endpoint_reports_requests_and_queries(client, stand_in_db):
+    seed_catalogues(stand_in_db, 3)
+    assert client.get("/catalogues/2").status_code == 200
+    export = client.get("/catalogues/export?format=ndjson")
+    assert export.get_data().count(b"\n") == 3
+    export.close()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{route="/catalogues/<int:catalogue_id>",method="GET",status="200"}' in body
+    assert 'http_request_duration_seconds_count{route="/catalogues/<int:catalogue_id>",method="GET"}' in body
+    assert 'http_response_size_bytes_count{route="/catalogues/export",method="GET"}' in body
+    assert 'db_query_duration_seconds_count{statement="catalogue.select_by_id"}' in body
+    assert 'db_statement_calls{statement="catalogue.select_by_id",phase="prepare"}' in body
+    assert 'db_rows_returned_total{statement="iter_catalogue_chunks:select_catalogue"}' in body
+    assert "db_connection_acquire_seconds_count" in body
+    assert 'db_pool_connections{pool="default",state="in_use"} 0' in body
+
+
+def test_disabled_metrics_skip_recording(client, stand_in_db):
+    before = metrics.HTTP_REQUESTS.collect()
+    metrics.set_enabled(False)
+    try:
+        client.get("/catalogues/1")
+    finally:
+        metrics.set_enabled(True)
+    assert metrics.HTTP_REQUESTS.collect() == before
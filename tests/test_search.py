@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+
+import pytest
+from app import app, search_index, service
+from benchmarks.stand_in import seed_catalogues
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import CATALOGUE_COLUMNS
+from util.search import CatalogueSearch, InvertedIndex, PrefixIndex
+
+
+@pytest.fixture
+def client(stand_in_db):
+    seed_catalogues(stand_in_db, 50)
+    search_index.reset()
+    if service.cache is not None:
+        service.cache.clear()
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+    search_index.reset()
+
+
+def new_catalogue(name, description="Fresh catalogue"):
+    return catalogue(name, description, "2025-01-01", "2025-12-31", "active")
+
+
+def test_name_matches_outrank_description_matches():
+    index = InvertedIndex(name_weight=3)
+    index.add(1, "Garden tools", "Spades and rakes")
+    index.add(2, "Kitchen", "Tools for the kitchen")
+    index.add(3, "Toys", "Board games")
+    assert [catalogue_id for catalogue_id, _ in index.search("tools", 10)] == [1, 2]
+    assert index.search("TOOLS board", 1)[0][0] == 1
+    index.remove(1)
+    assert [catalogue_id for catalogue_id, _ in index.search("tools", 10)] == [2]
+    assert index.search("nothing", 10) == []
+
+
+def test_prefix_index_keeps_order_through_updates():
+    index = PrefixIndex()
+    index.load([(1, "Summer Sale"), (2, "summer styles"), (3, "Winter")])
+    assert [s["catalogue_id"] for s in index.suggest("SUM", 10)] == [1, 2]
+    index.add(4, "Summit")
+    index.add(1, "Autumn Sale")
+    assert [s["catalogue_name"] for s in index.suggest("sum", 10)] == ["summer styles", "Summit"]
+    assert [s["catalogue_id"] for s in index.suggest("su", 1)] == [2]
+    index.remove(2)
+    assert [s["catalogue_id"] for s in index.suggest("sum", 10)] == [4]
+    assert index.suggest("x", 10) == []
+
+
+def test_writes_during_build_are_replayed():
+    search = None
+    rows = [(1, "Alpha", "first", None, None, "active")]
+
+    def loader():
+        # a write committed after the table scan started
+        search.apply("created", [{"catalogue_id": 2, "catalogue_name": "Alpine",
+                                  "catalogue_description": "second"}])
+        search.apply("deleted", [{"catalogue_id": 1}])
+        return iter([rows])
+
+    search = CatalogueSearch(loader, CATALOGUE_COLUMNS)
+    search.apply("created", [{"catalogue_id": 9, "catalogue_name": "Ignored", "catalogue_description": ""}])
+    assert search.suggest("al", 10) == [{"catalogue_id": 2, "catalogue_name": "Alpine"}]
+    assert search.search("ignored", 10) == []
+
+
+def test_concurrent_first_queries_build_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return iter([[(1, "Alpha", "first", None, None, "active")]])
+
+    search = CatalogueSearch(loader, CATALOGUE_COLUMNS)
+    threads = [threading.Thread(target=search.suggest, args=("a", 5)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+
+
+def test_writes_do_not_wait_for_scoring(monkeypatch):
+    search = CatalogueSearch(lambda: iter([[(1, "Alpha", "first", None, None, "active")]]), CATALOGUE_COLUMNS)
+    search.build()
+    scoring, written = threading.Event(), threading.Event()
+    score = InvertedIndex.score
+
+    def slow_score(total, postings, limit):
+        scoring.set()
+        assert written.wait(5)
+        return score(total, postings, limit)
+
+    monkeypatch.setattr(InvertedIndex, "score", staticmethod(slow_score))
+    results = []
+    reader = threading.Thread(target=lambda: results.append(search.search("alpha", 10)))
+    reader.start()
+    assert scoring.wait(5)
+    # the reader is scoring; a write still goes through, and the reader ranks its snapshot
+    search.apply("deleted", [{"catalogue_id": 1}])
+    written.set()
+    reader.join()
+    assert results == [[(1, results[0][0][1])]]
+    monkeypatch.undo()
+    assert search.search("alpha", 10) == []
+
+
+def test_search_endpoint_ranks_and_follows_writes(client):
+    response = client.get("/catalogues/search?q=catalogue 7&limit=3")
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert items[0]["catalogue_name"] == "Catalogue 7"
+    assert items[0]["score"] > items[1]["score"]
+
+    service.create_catalogue(new_catalogue("Orchard picks", "Apples and pears"))
+    items = client.get("/catalogues/search?q=pears").get_json()["items"]
+    assert [item["catalogue_name"] for item in items] == ["Orchard picks"]
+    service.delete_catalogue_by_id(items[0]["catalogue_id"])
+    assert client.get("/catalogues/search?q=pears").get_json()["items"] == []
+
+
+def test_search_endpoints_see_writes_from_other_processes(client, stand_in_db):
+    assert client.get("/catalogues/search?q=quinces").get_json()["items"] == []
+    # as another worker or the importer commits it: the version moves and the change is logged
+    db = sqlite3.connect(stand_in_db)
+    catalogue_id = db.execute("INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, "
+                              "effective_to, status) VALUES ('Quince harvest', 'Quinces', '2025-01-01', "
+                              "'2025-12-31', 'active')").lastrowid
+    db.execute("UPDATE catalogue_version SET version = version + 1 WHERE table_name = 'catalogue'")
+    db.execute("INSERT INTO catalogue_change (catalogue_id, action, changed_at) VALUES (?, 'created', "
+               "datetime('now'))", (catalogue_id,))
+    db.commit()
+    db.close()
+    items = client.get("/catalogues/search?q=quinces").get_json()["items"]
+    assert [item["catalogue_id"] for item in items] == [catalogue_id]
+    suggestions = client.get("/catalogues/suggest?prefix=quince").get_json()["suggestions"]
+    assert suggestions == [{"catalogue_id": catalogue_id, "catalogue_name": "Quince harvest"}]
+
+
+def test_catch_up_applies_the_log_and_rebuilds_when_it_was_pruned():
+    table = {1: (1, "Alpha", "", None, None, "active")}
+    log = {"entries": [], "head": 0, "pruned_through": 0, "version": 1}
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return iter([list(table.values())])
+
+    def changes(since, limit):
+        entries = [(change_id, catalogue_id, "updated", table.get(catalogue_id))
+                   for change_id, catalogue_id in log["entries"] if change_id > since][:limit]
+        return dict(log, entries=entries)
+
+    search = CatalogueSearch(loader, CATALOGUE_COLUMNS, changes=changes)
+    assert search.catch_up(1)
+    table[2] = (2, "Beta", "", None, None, "active")
+    del table[1]
+    log.update(entries=[(1, 2), (2, 1)], head=2, version=3)
+    assert search.catch_up(3)
+    assert [s["catalogue_id"] for s in search.suggest("", 10)] == [2]
+    assert len(loads) == 1
+    table[3] = (3, "Gamma", "", None, None, "active")
+    log.update(entries=[(3, 3)], head=3, pruned_through=3, version=4)
+    search.catch_up(2)
+    assert len(loads) == 1
+    assert search.catch_up(4)
+    assert len(loads) == 2
+    assert [s["catalogue_name"] for s in search.suggest("", 10)] == ["Beta", "Gamma"]
+
+
+def test_suggest_endpoint(client):
+    response = client.get("/catalogues/suggest?prefix=catalogue 1&limit=3")
+    assert response.status_code == 200
+    names = [s["catalogue_name"] for s in response.get_json()["suggestions"]]
+    assert names == ["Catalogue 1", "Catalogue 10", "Catalogue 11"]
+    assert client.get("/catalogues/suggest").status_code == 400
+    assert client.get("/catalogues/suggest?prefix=c&limit=0").status_code == 400
+    assert client.get("/catalogues/search?q=").status_code == 400
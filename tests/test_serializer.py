@@ -0,0 +1,105 @@
+import json
+from datetime import date
+
+import pytest
+from benchmarks.stand_in import seed_catalogues
+from dto.catalogue_dto import COLUMNS, CatalogueRows, catalogue, encoder
+from util import serializer
+
+ROWS = [
+    (1, "Summer", "Seasonal range", date(2025, 6, 1), date(2025, 8, 31), "active"),
+    (2, 'Quote " and \\ and é', None, date(2025, 1, 1), date(2025, 1, 2), "expired"),
+    # legacy rows: dates as strings, a status outside VALID_STATUSES
+    (3, "Legacy", "", "2024-01-01", None, "Archived"),
+]
+
+
+@pytest.fixture(params=["json", "orjson"])
+def backend(request):
+    if request.param == "orjson" and serializer.orjson is None:
+        pytest.skip("orjson is not installed")
+    serializer.set_backend(request.param)
+    yield request.param
+    serializer.set_backend("auto")
+
+
+def as_dict(row):
+    return {key: value.isoformat() if isinstance(value, date) else value for key, value in zip(COLUMNS, row)}
+
+
+def test_row_encoder_matches_dict_encoding(backend):
+    for row in ROWS:
+        assert json.loads(encoder.encode(row)) == as_dict(row)
+    assert json.loads(encoder.encode_many(ROWS)) == [as_dict(row) for row in ROWS]
+    assert encoder.encode_many([]) == "[]"
+
+
+def test_dto_round_trip():
+    item = catalogue.from_row(ROWS[0])
+    assert item.to_row() == ROWS[0]
+    assert item.to_dict() == dict(zip(COLUMNS, ROWS[0]))
+    assert json.loads(item.to_json()) == as_dict(ROWS[0])
+    assert not hasattr(item, "__dict__")
+    with pytest.raises(AttributeError):
+        item.colour = "red"
+
+
+def test_dumps_splices_records_into_payloads(backend):
+    payload = {
+        "items": CatalogueRows(ROWS[:2]),
+        "next_cursor": None,
+        "matches": [catalogue.from_row(ROWS[2]), {"catalogue_id": 9, "not_found": True}],
+        "on": date(2025, 1, 1),
+    }
+    assert json.loads(serializer.dumps(payload)) == {
+        "items": [as_dict(ROWS[0]), as_dict(ROWS[1])],
+        "next_cursor": None,
+        "matches": [as_dict(ROWS[2]), {"catalogue_id": 9, "not_found": True}],
+        "on": "2025-01-01",
+    }
+
+
+def test_backends_write_identical_json():
+    if serializer.orjson is None:
+        pytest.skip("orjson is not installed")
+    payload = {"items": [as_dict(row) for row in ROWS], "count": 3, "on": date(2025, 1, 1)}
+    outputs = set()
+    for name in ("json", "orjson"):
+        serializer.set_backend(name)
+        outputs.add(serializer.dumps(payload))
+    serializer.set_backend("auto")
+    assert len(outputs) == 1
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        serializer.set_backend("ujson")
+
+
+def test_catalogue_list_endpoint_writes_iso_dates(stand_in_db):
+    from app import app
+    seed_catalogues(stand_in_db, 3)
+    with app.test_client() as client:
+        items = client.get("/catalogues?limit=2").get_json()["items"]
+        single = client.get("/catalogues/1").get_json()
+    assert [item["catalogue_id"] for item in items] == [1, 2]
+    assert single == items[0]
+    assert date.fromisoformat(single["effective_from"]) <= date.fromisoformat(single["effective_to"])
+
+
+def test_row_encoder_writes_compact_json_in_column_order():
+    assert encoder.encode(ROWS[2]) == (
+        '{"catalogue_id":3,"catalogue_name":"Legacy","catalogue_description":"",'
+        '"effective_from":"2024-01-01","effective_to":null,"status":"Archived"}')
+    assert serializer.RowEncoder((), {}).encode(()) == "{}"
+
+
+def test_provider_honours_dump_options():
+    from app import app
+    payload = {"b": CatalogueRows(ROWS[:1]), "a": date(2025, 1, 1)}
+    text = app.json.dumps(payload, sort_keys=True, indent=2)
+    assert text.index('"a"') < text.index('"b"')
+    assert "\n  " in text
+    assert json.loads(text) == {"a": "2025-01-01", "b": [as_dict(ROWS[0])]}
+    assert app.json.dumps(payload) == serializer.dumps(payload)
+    assert app.json.loads("1.5", parse_float=str) == "1.5"
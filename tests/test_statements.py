@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+import pytest
+from benchmarks.stand_in import seed_catalogues
+from exception.exception import databaseconnectionerror
+from service.catalogue_service import catalogueService
+from util import db_connection
+from util.statements import STATEMENTS, StatementRegistry
+
+
+def fake_connection():
+    conn = MagicMock()
+    conn.statement_cursors = {}
+    conn.cursor.return_value.fetchall.return_value = [(1,)]
+    return conn
+
+
+def test_statement_is_prepared_once_per_connection():
+    registry = StatementRegistry(prepare=True)
+    statement = registry.register("one", "SELECT 1 FROM t WHERE id = %s", ("one",))
+    first, second = fake_connection(), fake_connection()
+    for value in range(3):
+        assert registry.fetch_one(first, "one", (value,)) == (1,)
+    registry.fetch_all(second, "one", (9,))
+
+    first.cursor.assert_called_once_with(prepared=True)
+    cursor = first.cursor.return_value
+    # the same string object every time, so mysql-connector skips re-preparing
+    assert all(call.args[0] is statement.sql for call in cursor.execute.call_args_list)
+    stats = registry.stats()["one"]
+    assert (stats["prepares"], stats["executes"], stats["errors"]) == (2, 4, 0)
+    assert stats["mean_execute_ms"] is not None
+
+    registry.reset_stats()
+    assert registry.stats()["one"]["executes"] == 0
+
+
+def test_text_mode_uses_plain_cursors():
+    registry = StatementRegistry(prepare=False)
+    registry.register("one", "SELECT 1")
+    conn = fake_connection()
+    registry.execute(conn, "one")
+    conn.cursor.assert_called_once_with()
+
+
+def test_reregistering_a_name_needs_the_same_sql():
+    registry = StatementRegistry(prepare=True)
+    statement = registry.register("one", "SELECT 1")
+    assert registry.register("one", "SELECT 1") is statement
+    assert "one" in registry and registry["one"] is statement
+    with pytest.raises(ValueError):
+        registry.register("one", "SELECT 2")
+
+
+def test_failed_execute_drops_the_cursor():
+    registry = StatementRegistry(prepare=True)
+    registry.register("one", "SELECT 1")
+    conn = fake_connection()
+    broken = conn.cursor.return_value
+    broken.execute.side_effect = RuntimeError("gone away")
+    with pytest.raises(RuntimeError):
+        registry.execute(conn, "one")
+    broken.close.assert_called_once()
+    assert conn.statement_cursors == {}
+    assert registry.stats()["one"]["errors"] == 1
+
+
+def test_service_reuses_statements_on_pooled_connections(stand_in_db):
+    seed_catalogues(stand_in_db, 20)
+    service = catalogueService()
+    STATEMENTS.reset_stats()
+    for catalogue_id in range(1, 11):
+        assert service.get_catalogue_by_id(catalogue_id).catalogue_id == catalogue_id
+    stats = STATEMENTS.stats()["catalogue.select_by_id"]
+    assert stats["executes"] == 10
+    assert 1 <= stats["prepares"] <= db_connection.get_pool().stats()["size"]
+
+
+def test_returned_connection_no_longer_carries_cursors(stand_in_db):
+    conn = db_connection.get_connection()
+    assert conn.statement_cursors == {}
+    conn.close()
+    with pytest.raises(databaseconnectionerror):
+        conn.statement_cursors
@@ -0,0 +1,131 @@
+import random
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+from app import app, catalogue_stats, service
+from benchmarks.stand_in import seed_catalogues
+from dto.catalogue_dto import catalogue
+from service.catalogue_service import CATALOGUE_COLUMNS, catalogueService
+from util.stats import CatalogueStats, summarize, summarize_counts
+
+TODAY = date(2024, 6, 1)
+
+
+def attach(service, **options):
+    stats = CatalogueStats(service.iter_catalogue_chunks, CATALOGUE_COLUMNS, service.get_catalogue_counts,
+                           service.get_data_version, settle=0, **options)
+    service.add_listener(stats.apply)
+    stats.build()
+    return stats
+
+
+def assert_matches_table(stats, service):
+    assert stats.summary(TODAY, 60) == summarize_counts(service.get_catalogue_counts(), TODAY, 60)
+
+
+def test_summarize():
+    day = TODAY.toordinal()
+    result = summarize({"active": 2, "expired": 1, "inactive": 0}, {day: 1, day + 3: 2}, {day: 1, day + 40: 2},
+                       TODAY, 30)
+    assert result == {"total": 3, "by_status": {"active": 2, "expired": 1}, "within_days": 30,
+                      "upcoming": 2, "expiring": 1, "by_month": {"2024-06": 3}}
+
+
+def test_counts_follow_writes(stand_in_db):
+    seed_catalogues(stand_in_db, 300)
+    service = catalogueService()
+    stats = attach(service)
+    assert_matches_table(stats, service)
+
+    service.create_catalogue(catalogue("New", None, TODAY + timedelta(days=5), TODAY + timedelta(days=9), "upcoming"))
+    service.update_catalogue_by_id(7, catalogue("Moved", None, "2030-01-01", "2030-02-01", "inactive"))
+    service.delete_catalogue_by_id(8)
+    service.bulk_delete_catalogues([9, 10, 11])
+    service.apply_status_transitions(TODAY)
+    assert len(stats) == 297
+    assert_matches_table(stats, service)
+
+
+def test_counts_stay_correct_under_concurrent_writes(stand_in_db):
+    seed_catalogues(stand_in_db, 200)
+    service = catalogueService()
+    stats = attach(service)
+    errors = []
+
+    def writer(seed):
+        rng = random.Random(seed)
+        # each thread owns ids seed, seed + 8, ... so no row is written by two threads at once
+        owned = list(range(seed, 201, 8))
+        try:
+            for _ in range(30):
+                start = TODAY + timedelta(days=rng.randrange(-60, 60))
+                item = catalogue(f"T{seed}", None, start, start + timedelta(days=rng.randrange(0, 90)),
+                                 rng.choice(["active", "inactive", "upcoming", "expired"]))
+                action = rng.random()
+                if action < 0.4 or not owned:
+                    service.create_catalogue(item)
+                elif action < 0.8:
+                    service.update_catalogue_by_id(rng.choice(owned), item)
+                else:
+                    service.delete_catalogue_by_id(owned.pop(rng.randrange(len(owned))))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert_matches_table(stats, service)
+    assert stats.reconcile() and stats.rebuilds == 0
+
+
+def test_reconcile_rebuilds_after_out_of_band_writes(stand_in_db):
+    seed_catalogues(stand_in_db, 50)
+    service = catalogueService()
+    stats = attach(service)
+    db = sqlite3.connect(stand_in_db)
+    db.execute("UPDATE catalogue SET status = 'inactive' WHERE catalogue_id <= 10")
+    db.execute("DELETE FROM catalogue WHERE catalogue_id > 40")
+    db.execute("UPDATE catalogue_version SET version = version + 1")
+    db.commit()
+    db.close()
+
+    assert stats.reconcile()
+    assert stats.rebuilds == 1
+    assert len(stats) == 40
+    assert_matches_table(stats, service)
+    assert stats.reconcile() and stats.rebuilds == 1
+
+
+def test_reconcile_defers_while_the_table_changes(stand_in_db):
+    seed_catalogues(stand_in_db, 10)
+    service = catalogueService()
+    stats = attach(service)
+    stats.apply("deleted", [{"catalogue_id": 1}])  # drift
+    versions = iter([(5, None)])
+    stats._version = lambda: next(versions)
+    assert not stats.reconcile()
+    assert stats.rebuilds == 0
+
+
+@pytest.fixture
+def client(stand_in_db):
+    seed_catalogues(stand_in_db, 120)
+    catalogue_stats.reset()
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+    catalogue_stats.reset()
+
+
+def test_stats_endpoint(client):
+    body = client.get("/catalogues/stats?within_days=45").get_json()
+    assert body == summarize_counts(service.get_catalogue_counts(), date.today(), 45)
+    assert body["total"] == 120 == sum(Counter(body["by_month"]).values())
+    assert client.get("/catalogues/stats?within_days=-1").status_code == 400
+    assert client.get("/catalogues/stats?within_days=soon").status_code == 400
@@ -0,0 +1,112 @@
+import sqlite3
+import time
+from datetime import date
+
+import pytest
+from service.catalogue_service import catalogueService
+from service.status_scheduler import LEASE_NAME, StatusScheduler
+from util.lease import Lease
+
+TODAY = date(2025, 6, 15)
+ROWS = [
+    ("Starts today", "2025-06-15", "2025-07-01", "upcoming"),
+    ("Still upcoming", "2025-07-01", "2025-08-01", "upcoming"),
+    ("Missed entirely", "2025-01-01", "2025-02-01", "upcoming"),
+    ("Ends yesterday", "2025-05-01", "2025-06-14", "active"),
+    ("Ends today", "2025-05-01", "2025-06-15", "active"),
+    ("Switched off", "2025-01-01", "2025-02-01", "inactive"),
+]
+
+
+@pytest.fixture
+def db(stand_in_db):
+    conn = sqlite3.connect(stand_in_db)
+    conn.executemany(
+        "INSERT INTO catalogue (catalogue_name, catalogue_description, effective_from, effective_to, status) "
+        "VALUES (?, '', ?, ?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+    return stand_in_db
+
+
+def statuses(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT catalogue_name, status FROM catalogue"))
+    finally:
+        conn.close()
+
+
+def version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT version FROM catalogue_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_transitions_follow_effective_dates(db):
+    service = catalogueService()
+    events = []
+    service.add_listener(lambda action, records: events.extend((action, r["catalogue_name"], r["status"])
+                                                                for r in records))
+    changed = service.apply_status_transitions(TODAY, chunk_size=1)
+    assert changed == {"upcoming->expired": 1, "upcoming->active": 1, "active->expired": 1}
+    assert statuses(db) == {
+        "Starts today": "active",
+        "Still upcoming": "upcoming",
+        "Missed entirely": "expired",
+        "Ends yesterday": "expired",
+        "Ends today": "active",
+        "Switched off": "inactive",
+    }
+    assert ("updated", "Starts today", "active") in events
+    assert version(db) == 3
+    assert service.apply_status_transitions(TODAY) == {"upcoming->expired": 0, "upcoming->active": 0,
+                                                       "active->expired": 0}
+    assert version(db) == 3
+
+
+def test_run_stops_when_told_to(db):
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE catalogue SET status = 'active', effective_to = '2025-01-31'")
+    conn.commit()
+    conn.close()
+    changed = catalogueService().apply_status_transitions(TODAY, chunk_size=2, should_continue=lambda: False)
+    assert changed["active->expired"] == 2
+
+
+def test_lease_keeps_the_job_on_one_owner(db):
+    first, second = Lease(LEASE_NAME, owner="a"), Lease(LEASE_NAME, owner="b")
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.acquire()
+    first.release()
+    time.sleep(0.01)
+    assert second.acquire()
+    assert not first.held
+
+
+def test_expired_lease_is_taken_over(db):
+    # expiry is kept by the database clock, to the second
+    first, second = Lease(LEASE_NAME, duration=1, owner="a"), Lease(LEASE_NAME, owner="b")
+    assert first.acquire()
+    assert not second.acquire()
+    time.sleep(2.1)
+    assert not first.held
+    assert second.acquire()
+    assert not first.acquire()
+
+
+def test_scheduler_skips_while_another_worker_runs(db):
+    scheduler = StatusScheduler(catalogueService(), pause=0)
+    other = Lease(LEASE_NAME, owner="other-worker")
+    assert other.acquire()
+    assert scheduler.run_once(TODAY) is None
+    assert statuses(db)["Starts today"] == "upcoming"
+    other.release()
+    time.sleep(0.01)
+    assert scheduler.run_once(TODAY)["upcoming->active"] == 1
+    assert scheduler.last_result["changed"]["active->expired"] == 1
+    # the lease was released, so another worker may run next
+    assert other.acquire()
@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+from exception.exception import validationerror
+from util.validators import VALID_STATUSES, catalogue_validator
+
+
+def payload(**overrides):
+    data = {"catalogue_name": "  Summer  ", "catalogue_description": "Seasonal",
+            "effective_from": "2025-06-01", "effective_to": "2025-08-31", "status": "Active"}
+    data.update(overrides)
+    return data
+
+
+def test_valid_payload_is_cleaned():
+    assert catalogue_validator.validate(payload()) == {
+        "catalogue_name": "Summer", "catalogue_description": "Seasonal",
+        "effective_from": date(2025, 6, 1), "effective_to": date(2025, 8, 31), "status": "active",
+    }
+    clean = catalogue_validator.validate(payload(catalogue_description=None))
+    assert clean["catalogue_description"] is None
+    without_description = payload()
+    del without_description["catalogue_description"]
+    assert catalogue_validator.validate(without_description)["catalogue_description"] is None
+
+
+def test_description_may_span_lines():
+    description = "Line one\r\nLine two\n\tindented"
+    assert catalogue_validator.validate(payload(catalogue_description=description))["catalogue_description"] == \
+        description
+    with pytest.raises(validationerror, match="catalogue_description must not contain control characters"):
+        catalogue_validator.validate(payload(catalogue_description="bell\x07"))
+    with pytest.raises(validationerror, match="catalogue_name must not contain control characters"):
+        catalogue_validator.validate(payload(catalogue_name="two\nlines"))
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"catalogue_name": "   "}, "catalogue_name must not be empty"),
+    ({"catalogue_name": "x" * 101}, "at most 100 characters"),
+    ({"catalogue_name": "bad\x00name"}, "control characters"),
+    ({"catalogue_name": 5}, "catalogue_name must be a string"),
+    ({"effective_from": "2025-6-1"}, "effective_from must be a date"),
+    ({"effective_to": "2025-02-30"}, "effective_to must be a date"),
+    ({"effective_to": "20250831"}, "effective_to must be a date"),
+    ({"effective_to": "2025-05-31"}, "effective_from must not be after effective_to"),
+    ({"status": "archived"}, "status must be one of: " + ", ".join(VALID_STATUSES)),
+    ({"price": 3}, "unknown field price"),
+])
+def test_invalid_payloads_are_rejected(overrides, message):
+    with pytest.raises(validationerror, match=message):
+        catalogue_validator.validate(payload(**overrides))
+
+
+def test_every_problem_is_reported():
+    clean, errors = catalogue_validator.check({"status": "nope", "effective_from": "x"})
+    assert clean is None
+    assert errors == ["catalogue_name is required", "effective_from must be a date in YYYY-MM-DD format",
+                      "effective_to is required", "status must be one of: " + ", ".join(VALID_STATUSES)]
+
+
+def test_validate_many_reports_per_row():
+    items = [payload(catalogue_name=f"C{i}") for i in range(3000)]
+    items[7] = payload(effective_to="2024-01-01")
+    items[2000] = "not an object"
+    valid, errors = catalogue_validator.validate_many(items)
+    assert errors == {7: "effective_from must not be after effective_to", 2000: "item must be an object"}
+    assert len(valid) == 2998
+    assert valid[0] == (0, catalogue_validator.validate(items[0]))
+
+
+@pytest.fixture
+def client(stand_in_db):
+    from app import app
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_create_rejects_bad_payload_before_the_database(client, monkeypatch):
+    monkeypatch.setattr("service.catalogue_service.get_connection",
+                        lambda: pytest.fail("database touched for an invalid payload"))
+    response = client.post("/catalogues", json=payload(status="archived", effective_to="soon"))
+    assert response.status_code == 400
+    assert "effective_to must be a date" in response.get_json()["error"]
+    assert "status must be one of" in response.get_json()["error"]
+
+
+def test_bulk_update_reports_per_item_errors(client):
+    client.post("/catalogues", json=payload())
+    response = client.put("/catalogues/bulk", json={"mode": "best_effort", "items": [
+        dict(payload(catalogue_name="Renamed"), catalogue_id=1),
+        dict(payload(status="archived"), catalogue_id=1),
+        payload(),
+    ]})
+    results = response.get_json()["results"]
+    assert response.status_code == 207
+    assert results[0]["status"] == "updated"
+    assert results[1]["error"].startswith("status must be one of")
+    assert results[2]["error"] == "catalogue_id must be an integer"
+    assert client.get("/catalogues/1").get_json()["catalogue_name"] == "Renamed"
@@ -0,0 +1,160 @@
+"""
+Utility module for serving the frontend from a precompressed in-memory cache.
+
+At startup :class:`AssetPipeline` reads the stylesheets and scripts,
+gives each a content-hashed name (``style.3f2a9c1b7d4e.css``), rewrites
+the HTML pages to reference those names, and keeps gzip and, when the
+optional ``brotli`` package is installed, brotli copies of everything.
+Hashed files are sent with an immutable one-year ``Cache-Control``, so a
+browser never asks for them again; pages (and the unhashed names, kept
+for old links) are revalidated against an ETag.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Variants smaller than this are not worth a Content-Encoding header
+MIN_COMPRESS_SIZE = 256
+_REFERENCE = re.compile(r'(\b(?:href|src)=["\'])([^"\'?#]+)(["\'])')
+
+
+class Asset:
+    """One servable file and its encoded variants."""
+
+    __slots__ = ("content_type", "etag", "cache_control", "variants")
+
+    def __init__(self, body: bytes, content_type: str, cache_control: str, use_brotli: bool) -> None:
+        self.content_type = content_type
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        self.cache_control = cache_control
+        self.variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if use_brotli and brotli is not None:
+                encoded["br"] = brotli.compress(body, quality=11)
+            for encoding, data in encoded.items():
+                if len(data) < len(body):
+                    self.variants[encoding] = data
+
+
+class AssetPipeline:
+    """
+    Fingerprinted, precompressed copies of files under ``root``.
+
+    :param root: Directory holding the frontend files.
+    :param hashed: Files served under a content-hashed name as well.
+    :param pages: HTML files whose references to ``hashed`` files are rewritten.
+    :param use_brotli: Also keep brotli variants, if the package is installed.
+    """
+
+    def __init__(self, root: str, hashed=("style.css", "login.css", "script.js"),
+                 pages=("index.html", "login.html"), use_brotli: bool = True) -> None:
+        self.root = root
+        self.hashed = tuple(hashed)
+        self.pages = tuple(pages)
+        self.use_brotli = use_brotli
+        self.assets: dict[str, Asset] = {}
+        self.urls: dict[str, str] = {}
+
+    def build(self) -> None:
+        """Read, fingerprint and compress every configured file."""
+        assets, urls = {}, {}
+        for name in self.hashed:
+            body = self._read(name)
+            if body is None:
+                continue
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            stem, extension = os.path.splitext(name)
+            urls[name] = f"{stem}.{digest}{extension}"
+            content_type = self._content_type(name)
+            assets[urls[name]] = Asset(body, content_type, IMMUTABLE, self.use_brotli)
+            assets[name] = Asset(body, content_type, REVALIDATE, self.use_brotli)
+        for name in self.pages:
+            body = self._read(name)
+            if body is None:
+                continue
+            body = _REFERENCE.sub(
+                lambda match: match.group(1) + urls.get(match.group(2), match.group(2)) + match.group(3),
+                body.decode("utf-8")
+            ).encode("utf-8")
+            assets[name] = Asset(body, self._content_type(name), REVALIDATE, self.use_brotli)
+        self.assets, self.urls = assets, urls
+        logger.info("Asset pipeline built %s files (brotli=%s)", len(assets), self.use_brotli and brotli is not None)
+
+    def _read(self, name: str) -> bytes | None:
+        path = os.path.join(self.root, name)
+        try:
+            with open(path, "rb") as fh:
+                return fh.read()
+        except OSError:
+            logger.warning("Asset %s not found under %s", name, self.root)
+            return None
+
+    @staticmethod
+    def _content_type(name: str) -> str:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        return content_type
+
+    def respond(self, name: str, request) -> Response | None:
+        """
+        Answer a GET for ``name``, or None when it is not a pipeline file.
+
+        The variant is chosen from ``Accept-Encoding`` (brotli, then gzip,
+        then identity), and a matching ``If-None-Match`` gets a 304.
+        """
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+        encoding = "identity"
+        accepted = request.accept_encodings
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and accepted[candidate] > 0:
+                encoding = candidate
+                break
+        # one tag per encoding, since the bytes differ
+        etag = asset.etag if encoding == "identity" else f"{asset.etag}-{encoding}"
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(asset.variants[encoding], content_type=asset.content_type)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = asset.cache_control
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+def pipeline_from_config(root: str, settings) -> AssetPipeline | None:
+    """Build the pipeline from an [assets] config section; None when disabled."""
+    if not settings.getboolean("enabled", True):
+        return None
+
+    def names(key, default):
+        return [name.strip() for name in settings.get(key, default).split(",") if name.strip()]
+
+    pipeline = AssetPipeline(
+        root,
+        hashed=names("hashed", "style.css, login.css, script.js"),
+        pages=names("pages", "index.html, login.html"),
+        use_brotli=settings.getboolean("brotli", True),
+    )
+    pipeline.build()
+    return pipeline
@@ -0,0 +1,389 @@
+"""
+Utility module for read-through caching with pluggable backends.
+
+:class:`LRUCache` is the in-process backend. :class:`RemoteCacheBackend`
+adapts any redis-style client (``get``/``set(ex=)``/``delete``/``incr``)
+so several workers can share one cache.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+# class -> (tag, to_json, from_json) and tag -> from_json, for values the shared cache stores
+_CACHED_TYPES = {}
+_CACHED_TAGS = {}
+
+
+def register_cached_type(cls, tag: str, to_json, from_json) -> None:
+    """
+    Let :class:`RemoteCacheBackend` store instances of ``cls``.
+
+    :param to_json: Turns an instance into JSON-compatible values (dates are
+        written as ISO strings).
+    :param from_json: Rebuilds the instance from what ``to_json`` returned.
+    """
+    _CACHED_TYPES[cls] = (tag, to_json)
+    _CACHED_TAGS[tag] = from_json
+
+
+def _iso(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} cannot be cached")
+
+
+def encode_value(value) -> bytes:
+    """JSON for the shared cache: ``{"v": value}``, with ``"t"`` naming a registered type."""
+    entry = _CACHED_TYPES.get(value.__class__)
+    payload = {"t": entry[0], "v": entry[1](value)} if entry is not None else {"v": value}
+    return json.dumps(payload, default=_iso, separators=(",", ":")).encode("utf-8")
+
+
+def decode_value(raw: bytes):
+    """Inverse of :func:`encode_value`; raises ValueError for anything it did not write."""
+    payload = json.loads(raw)
+    if not isinstance(payload, dict) or "v" not in payload:
+        raise ValueError("Not a cache entry")
+    tag = payload.get("t")
+    if tag is None:
+        return payload["v"]
+    if tag not in _CACHED_TAGS:
+        raise ValueError(f"Unknown cached type {tag!r}")
+    return _CACHED_TAGS[tag](payload["v"])
+
+
+class CacheBackend:
+    """Interface every cache backend implements."""
+
+    def get(self, key: str):
+        """Return the cached value, or ``MISSING``."""
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUCache(CacheBackend):
+    """
+    Bounded, thread-safe LRU cache with per-entry expiry.
+
+    :param max_entries: Entries kept before the least recently used is evicted.
+    :param ttl: Default time-to-live in seconds (0 disables expiry).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at = item
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "lru",
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RemoteCacheBackend(CacheBackend):
+    """
+    Backend for a shared cache server reached through a redis-style client.
+
+    Values are stored as JSON (:func:`encode_value`), never pickled: anyone
+    able to write to the cache server could otherwise run code in every
+    worker. Types other than plain JSON values must be registered with
+    :func:`register_cached_type`. ``clear()`` bumps a generation number that is part
+    of every key, so old entries stop being read and expire on their own.
+
+    :param client: Object with ``get``, ``set(key, value, ex=)``, ``delete``
+        and ``incr`` methods.
+    :param prefix: Namespace for this application's keys.
+    :param ttl: Default time-to-live in seconds.
+    """
+
+    def __init__(self, client, prefix: str = "ecommerce", ttl: float = 60.0) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        generation = self.client.get(f"{self.prefix}:generation") or 0
+        if isinstance(generation, bytes):
+            generation = generation.decode()
+        return f"{self.prefix}:{generation}:{key}"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key: str):
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception:
+            logger.warning("Shared cache read failed for %s", key, exc_info=True)
+            self._count("errors")
+            return MISSING
+        if raw is None:
+            self._count("misses")
+            return MISSING
+        try:
+            value = decode_value(raw)
+        except ValueError:
+            logger.warning("Ignoring unreadable shared cache entry for %s", key)
+            self._count("errors")
+            return MISSING
+        self._count("hits")
+        return value
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self.client.set(self._key(key), encode_value(value), ex=int(ttl) or None)
+        except Exception:
+            logger.warning("Shared cache write failed for %s", key, exc_info=True)
+            self._count("errors")
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self.client.delete(*(self._key(key) for key in keys))
+        except Exception:
+            # the write is already committed; entries left behind expire with their TTL
+            logger.warning("Shared cache delete failed for %s", ", ".join(keys), exc_info=True)
+            self._count("errors")
+
+    def clear(self) -> None:
+        try:
+            self.client.incr(f"{self.prefix}:generation")
+        except Exception:
+            logger.warning("Shared cache clear failed", exc_info=True)
+            self._count("errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "remote", "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key: str, fn):
+        """Run ``fn`` once for all callers currently asking for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self.forget(key, call)
+            call.event.set()
+
+    def forget(self, key: str, call: _Call | None = None) -> None:
+        """Stop sharing the in-flight call for ``key`` with new callers."""
+        with self._lock:
+            if call is None or self._calls.get(key) is call:
+                self._calls.pop(key, None)
+
+
+class ReadThroughCache:
+    """
+    Read-through cache on top of a :class:`CacheBackend`.
+
+    Misses are loaded once per key even under concurrency, and a load that
+    overlaps an invalidation is returned to its callers but not stored.
+
+    Callers answering with an ETag made from the data version pass that
+    ``version``; it becomes part of the key, so an entry loaded before a
+    write is not served after it even when the write was made by another
+    process and nothing here was invalidated. A value stored by
+    :meth:`get_or_load` for a newer version replaces the one stored for an
+    older version, so large entries such as the full list are not kept once
+    per write until they expire.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        # key -> (version, versioned key) last stored by get_or_load
+        self._latest = {}
+
+    @staticmethod
+    def _versioned(key: str, version: int | None) -> str:
+        return key if version is None else f"{key}@v{version}"
+
+    def get_or_load(self, key: str, loader, ttl: float | None = None, version: int | None = None):
+        """Return the cached value for ``key`` at data version ``version``, calling ``loader`` on a miss."""
+        if not self.enabled:
+            return loader()
+        base, key = key, self._versioned(key, version)
+        value = self.backend.get(key)
+        if value is not MISSING:
+            return value
+
+        def load():
+            epoch = self._epoch
+            result = loader()
+            with self._lock:
+                if epoch == self._epoch:
+                    self.backend.set(key, result, ttl)
+                    if version is not None:
+                        previous = self._latest.get(base)
+                        if previous is None or previous[0] < version:
+                            self._latest[base] = (version, key)
+                            if previous is not None:
+                                self.backend.delete(previous[1])
+            return result
+
+        return self._flight.do(key, load)
+
+    def get_many_or_load(self, keys: list[str], loader, ttl: float | None = None,
+                         version: int | None = None) -> dict:
+        """
+        Return cached values for ``keys``, loading every miss in one call.
+
+        :param loader: Called with the list of missing keys; returns a dict
+            of key to value. Keys it leaves out are cached as None.
+        :param version: Data version the values must be current for, as in
+            :meth:`get_or_load`.
+        """
+        if not self.enabled:
+            return loader(list(keys))
+        found, missing = {}, []
+        for key in keys:
+            value = self.backend.get(self._versioned(key, version))
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            epoch = self._epoch
+            loaded = loader(missing)
+            with self._lock:
+                if epoch == self._epoch:
+                    for key in missing:
+                        self.backend.set(self._versioned(key, version), loaded.get(key), ttl)
+            for key in missing:
+                found[key] = loaded.get(key)
+        return found
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            self._epoch += 1
+            self.backend.delete(*keys)
+        for key in keys:
+            self._flight.forget(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        stats = dict(self.backend.stats())
+        stats["single_flight_shared"] = self._flight.shared
+        return stats
+
+
+def cache_from_config(settings) -> ReadThroughCache:
+    """Build the in-process catalogue cache from a [cache] config section."""
+    backend = LRUCache(
+        max_entries=settings.getint("max_entries", 10000),
+        ttl=settings.getfloat("ttl", 60.0),
+    )
+    return ReadThroughCache(backend, enabled=settings.getboolean("enabled", True))
@@ -0,0 +1,206 @@
+"""
+Utility module for negotiated compression of API responses.
+
+:class:`ResponseCompressor` is an ``after_request`` hook that gzip- or
+brotli-encodes (brotli when the optional ``brotli`` package is installed
+and the client prefers it) JSON, NDJSON, CSV and text responses. Whole
+bodies below ``min_size`` are left alone; streamed bodies are compressed
+chunk by chunk and flushed after each one, so clients still receive rows
+as they are produced. Responses that already carry a Content-Encoding,
+file responses and views decorated with :func:`no_compression` are
+skipped. Ratio, CPU time and byte counts go to :mod:`util.metrics`.
+"""
+
+import time
+import zlib
+
+from flask import request
+
+from util import metrics
+from util.http_cache import ENCODED_ETAG_SUFFIXES
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+
+def no_compression(view):
+    """Decorator: send this view's responses uncompressed."""
+    view.compress = False
+    return view
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _CompressedBody:
+    """Compress a streamed body as it is sent, recording totals at the end."""
+
+    def __init__(self, body, encoder, labels: tuple, encoding: str) -> None:
+        self._body = body
+        self._encoder = encoder
+        self._labels = labels
+        self._encoding = encoding
+        self._size_in = self._size_out = 0
+        self._cpu = 0.0
+        self._done = False
+
+    def __iter__(self):
+        encoder = self._encoder
+        for chunk in self._body:
+            if not chunk:
+                continue
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            started = time.thread_time()
+            out = encoder.compress(chunk) + encoder.flush()
+            self._cpu += time.thread_time() - started
+            self._size_in += len(chunk)
+            self._size_out += len(out)
+            yield out
+        started = time.thread_time()
+        out = encoder.finish()
+        self._cpu += time.thread_time() - started
+        self._size_out += len(out)
+        yield out
+
+    def close(self) -> None:
+        if not self._done:
+            self._done = True
+            if self._size_in and metrics.ENABLED:
+                _record(self._labels, self._encoding, self._size_in, self._size_out, self._cpu)
+        close = getattr(self._body, "close", None)
+        if close is not None:
+            close()
+
+
+def _record(labels: tuple, encoding: str, size_in: int, size_out: int, cpu: float) -> None:
+    metrics.COMPRESSION_RATIO.observe(labels, size_in / max(size_out, 1))
+    metrics.COMPRESSION_CPU.observe(labels, cpu)
+    metrics.COMPRESSION_BYTES.inc((encoding, "in"), size_in)
+    metrics.COMPRESSION_BYTES.inc((encoding, "out"), size_out)
+
+
+class ResponseCompressor:
+    """
+    Compresses responses for clients that accept it.
+
+    :param min_size: Whole bodies smaller than this many bytes are sent as is.
+    :param gzip_level: zlib level, 1 (fast) to 9 (small).
+    :param brotli_quality: Brotli quality, 0 (fast) to 11 (small).
+    :param use_brotli: Offer brotli when the package is installed.
+    :param types: Mimetypes that are compressed.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 use_brotli: bool = True, types=COMPRESSIBLE_TYPES) -> None:
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.use_brotli = use_brotli and brotli is not None
+        self.types = frozenset(types)
+        self._app = None
+
+    def init_app(self, app) -> None:
+        """Register the hook; call after other after_request hooks so it runs first."""
+        self._app = app
+        app.after_request(self.after_request)
+
+    def _encoding(self, req) -> str | None:
+        accepted = req.accept_encodings
+        if self.use_brotli and accepted["br"] > 0 and accepted["br"] >= accepted["gzip"]:
+            return "br"
+        if accepted["gzip"] > 0:
+            return "gzip"
+        return None
+
+    def _encoder(self, encoding: str):
+        return _BrotliEncoder(self.brotli_quality) if encoding == "br" else _GzipEncoder(self.gzip_level)
+
+    def _skip(self, reason: str, response):
+        if metrics.ENABLED:
+            metrics.COMPRESSION_SKIPPED.inc((reason,))
+        return response
+
+    def after_request(self, response):
+        if response.mimetype not in self.types or response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        req = request._get_current_object()
+        response.vary.add("Accept-Encoding")
+        if "Content-Encoding" in response.headers or response.direct_passthrough:
+            return self._skip("encoded", response)
+        view = self._app.view_functions.get(req.endpoint) if req.endpoint else None
+        if view is not None and getattr(view, "compress", True) is False:
+            return self._skip("opt_out", response)
+        encoding = self._encoding(req)
+        if encoding is None:
+            return self._skip("not_accepted", response)
+        rule = req.url_rule
+        labels = (rule.rule if rule is not None else "<unmatched>", encoding)
+
+        if response.is_streamed:
+            length = response.headers.get("Content-Length")
+            if length is not None and int(length) < self.min_size:
+                return self._skip("small", response)
+            response.response = _CompressedBody(response.response, self._encoder(encoding), labels, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return self._skip("small", response)
+            started = time.thread_time()
+            encoder = self._encoder(encoding)
+            compressed = encoder.compress(body) + encoder.finish()
+            cpu = time.thread_time() - started
+            if len(compressed) >= len(body):
+                return self._skip("incompressible", response)
+            response.set_data(compressed)
+            if metrics.ENABLED:
+                _record(labels, encoding, len(body), len(compressed), cpu)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + ENCODED_ETAG_SUFFIXES[encoding], weak)
+        return response
+
+
+def compression_from_config(app, settings) -> ResponseCompressor | None:
+    """Register compression from a [compression] config section; None when disabled."""
+    if not settings.getboolean("enabled", True):
+        return None
+    compressor = ResponseCompressor(
+        min_size=settings.getint("min_size", 1024),
+        gzip_level=settings.getint("gzip_level", 6),
+        brotli_quality=settings.getint("brotli_quality", 4),
+        use_brotli=settings.getboolean("brotli", True),
+    )
+    compressor.init_app(app)
+    return compressor
@@ -0,0 +1,321 @@
+"""
+Bounded database connection pool used behind util.db_connection.get_connection.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from exception.exception import databaseconnectionerror
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolEntry:
+    """Book-keeping for one raw connection owned by the pool."""
+
+    __slots__ = ("raw", "created_at", "last_used", "statement_cursors")
+
+    def __init__(self, raw) -> None:
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+        # cursors of util.statements, living as long as the raw connection
+        self.statement_cursors = {}
+
+
+class PooledConnection:
+    """
+    Proxy handed out by :class:`ConnectionPool`.
+
+    Behaves like the underlying connection, except that ``close()`` returns
+    it to the pool instead of closing the socket.
+    """
+
+    __slots__ = ("_pool", "_entry")
+
+    def __init__(self, pool: "ConnectionPool", entry: _PoolEntry) -> None:
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def raw(self):
+        """The underlying driver connection."""
+        if self._entry is None:
+            raise databaseconnectionerror("Connection already returned to the pool")
+        return self._entry.raw
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    @property
+    def statement_cursors(self) -> dict:
+        """Cursors kept for this raw connection by :mod:`util.statements`."""
+        if self._entry is None:
+            raise databaseconnectionerror("Connection already returned to the pool")
+        return self._entry.statement_cursors
+
+    def cursor(self, *args, **kwargs):
+        """Open a cursor, passing it through the pool's ``cursor_wrapper``."""
+        cursor = self.raw.cursor(*args, **kwargs)
+        wrapper = self._pool.cursor_wrapper
+        return wrapper(cursor) if wrapper is not None else cursor
+
+    def close(self) -> None:
+        """Return the connection to the pool. Safe to call more than once."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry)
+
+    def invalidate(self) -> None:
+        """Close the underlying connection instead of returning it to the pool."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._discard(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections.
+
+    :param factory: Callable returning a new driver connection.
+    :param min_size: Connections kept open even when idle.
+    :param max_size: Connections kept in the pool once returned.
+    :param max_overflow: Extra connections allowed under load; closed on return.
+    :param timeout: Seconds to wait for a free connection before giving up.
+    :param recycle: Maximum lifetime of a connection in seconds (0 disables).
+    :param idle_timeout: Idle seconds after which a connection above
+        ``min_size`` is closed (0 disables).
+    :param pre_ping: Check a connection is alive before handing it out.
+    :param ping_interval: Skip the liveness check for connections used
+        within this many seconds.
+    :param name: Label used in log messages.
+    :param cursor_wrapper: Optional callable applied to every cursor opened
+        through a pooled connection, e.g. for instrumentation.
+    """
+
+    def __init__(self, factory, min_size: int = 1, max_size: int = 10, max_overflow: int = 0,
+                 timeout: float = 10.0, recycle: float = 3600.0, idle_timeout: float = 300.0,
+                 pre_ping: bool = True, ping_interval: float = 5.0, name: str = "default",
+                 cursor_wrapper=None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.ping_interval = ping_interval
+        self.name = name
+        self.cursor_wrapper = cursor_wrapper
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._warmed = False
+
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._failed_checks = 0
+
+    # -- borrowing -------------------------------------------------------
+
+    def acquire(self, timeout: float | None = None) -> PooledConnection:
+        """
+        Borrow a connection, waiting up to ``timeout`` seconds for one.
+
+        :raises databaseconnectionerror: If the pool is closed or no
+            connection became free in time.
+        """
+        if not self._warmed:
+            self._warm()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            entry, create = self._checkout(deadline)
+            if create:
+                return PooledConnection(self, self._create())
+            if self._is_healthy(entry):
+                return PooledConnection(self, entry)
+            with self._cond:
+                self._failed_checks += 1
+            self._discard(entry)
+            logger.warning("Pool %s dropped a dead connection; retrying", self.name)
+
+    def _checkout(self, deadline: float):
+        """Take an idle entry or a slot to create one. Returns ``(entry, create)``."""
+        stale = []
+        waited_from = None
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise databaseconnectionerror(f"Pool {self.name} is closed")
+                    now = time.monotonic()
+                    while self._idle:
+                        entry = self._idle.pop()
+                        if self._expired(entry, now):
+                            self._size -= 1
+                            self._recycled += 1
+                            stale.append(entry)
+                            continue
+                        self._in_use += 1
+                        return entry, False
+                    if self._size < self.max_size + self.max_overflow:
+                        self._size += 1
+                        self._in_use += 1
+                        return None, True
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise databaseconnectionerror(
+                            f"Timed out waiting for a connection from pool {self.name}"
+                        )
+                    if waited_from is None:
+                        waited_from = now
+                        self._waits += 1
+                    self._cond.wait(remaining)
+        finally:
+            if waited_from is not None:
+                with self._cond:
+                    self._wait_time += time.monotonic() - waited_from
+            for entry in stale:
+                self._close_raw(entry)
+
+    def _create(self) -> _PoolEntry:
+        """Open a new connection for a slot already reserved by ``_checkout``."""
+        try:
+            raw = self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        logger.debug("Pool %s opened a new connection", self.name)
+        return _PoolEntry(raw)
+
+    def _is_healthy(self, entry: _PoolEntry) -> bool:
+        if not self.pre_ping or time.monotonic() - entry.last_used < self.ping_interval:
+            return True
+        try:
+            return bool(entry.raw.is_connected())
+        except Exception:
+            return False
+
+    def _expired(self, entry: _PoolEntry, now: float) -> bool:
+        if self.recycle and now - entry.created_at > self.recycle:
+            return True
+        if self.idle_timeout and now - entry.last_used > self.idle_timeout:
+            return self._size > self.min_size
+        return False
+
+    # -- returning -------------------------------------------------------
+
+    def _release(self, entry: _PoolEntry) -> None:
+        """Return a borrowed entry, resetting any open transaction."""
+        raw = entry.raw
+        try:
+            if getattr(raw, "in_transaction", False):
+                raw.rollback()
+        except Exception:
+            logger.warning("Pool %s could not reset a connection; discarding it", self.name)
+            self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            keep = not self._closed and self._size <= self.max_size
+            if keep:
+                self._idle.append(entry)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not keep:
+            self._close_raw(entry)
+
+    def _discard(self, entry: _PoolEntry) -> None:
+        """Drop a borrowed entry and free its slot."""
+        with self._cond:
+            self._in_use -= 1
+            self._size -= 1
+            self._cond.notify()
+        self._close_raw(entry)
+
+    def _close_raw(self, entry: _PoolEntry) -> None:
+        try:
+            entry.raw.close()
+        except Exception:
+            logger.debug("Ignoring error while closing a pooled connection", exc_info=True)
+
+    # -- lifecycle -------------------------------------------------------
+
+    def _warm(self) -> None:
+        """Open ``min_size`` connections on first use."""
+        with self._cond:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = self.min_size - self._size
+            self._size += max(0, missing)
+        for _ in range(max(0, missing)):
+            try:
+                raw = self._factory()
+            except Exception:
+                logger.warning("Pool %s could not pre-open a connection", self.name, exc_info=True)
+                with self._cond:
+                    self._size -= 1
+                continue
+            with self._cond:
+                self._created += 1
+                self._idle.append(_PoolEntry(raw))
+                self._cond.notify()
+
+    def close(self) -> None:
+        """Close idle connections and refuse new borrows. Borrowed ones close on return."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_raw(entry)
+
+    def stats(self) -> dict:
+        """Return a snapshot of pool usage counters."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "overflow": max(0, self._size - self.max_size),
+                "max_size": self.max_size,
+                "max_overflow": self.max_overflow,
+                "created": self._created,
+                "recycled": self._recycled,
+                "failed_health_checks": self._failed_checks,
+                "waits": self._waits,
+                "wait_time": self._wait_time,
+                "timeouts": self._timeouts,
+            }
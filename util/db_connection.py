@@ -1,30 +1,240 @@
 """
 Utility module to provide database connection.
+
+Connections are borrowed from a shared :class:`util.connection_pool.ConnectionPool`;
+calling ``close()`` on them returns them to the pool. Reads that a replica
+may serve use :func:`get_read_connection`, which goes through the shared
+:class:`util.db_router.ReplicaRouter` built from the [replicas] section.
 """
 
 import logging
+import threading
+import time
 import mysql.connector
 from mysql.connector import Error
 
+from config.settings import get_section
+from util import metrics
+from util.connection_pool import ConnectionPool
+from util.db_router import ReplicaRouter
+
 logger = logging.getLogger(__name__)
 
+_pool = None
+_router = None
+_pool_lock = threading.Lock()
+
+
+def _connect(host: str | None = None, port: int | None = None, **options):
+    """
+    Open a new MySQL connection using the [mysql] settings.
+
+    :param host: Server to connect to instead of [mysql] host, e.g. a replica.
+    :param port: Its port; defaults to [mysql] hostport.
+    :param options: Further ``mysql.connector.connect`` arguments.
+    """
+    settings = get_section("mysql")
+    return mysql.connector.connect(
+        host=host or settings.get("host", "localhost"),
+        port=port or settings.getint("hostport", 3306),
+        user=settings.get("user", "root"),
+        password=settings.get("password", ""),
+        database=settings.get("database", "catalogue_dbms"),
+        **options
+    )
+
+
+def open_connection(**options):
+    """
+    Open a connection to the primary outside the pool; the caller closes it.
+
+    For sessions that need driver options the shared pool must not have,
+    e.g. ``allow_local_infile=True`` for the bulk importer's LOAD DATA LOCAL.
+    """
+    return _connect(**options)
+
+
+def _pool_options() -> dict:
+    """Read pool settings from the [pool] section of config.ini."""
+    settings = get_section("pool")
+    return {
+        "min_size": settings.getint("min_size", 1),
+        "max_size": settings.getint("max_size", 10),
+        "max_overflow": settings.getint("max_overflow", 5),
+        "timeout": settings.getfloat("timeout", 10.0),
+        "recycle": settings.getfloat("recycle", 3600.0),
+        "idle_timeout": settings.getfloat("idle_timeout", 300.0),
+        "pre_ping": settings.getboolean("pre_ping", True),
+        "ping_interval": settings.getfloat("ping_interval", 5.0),
+        "cursor_wrapper": metrics.instrument_cursor,
+    }
+
+
+def configure_pool(factory=None, **options) -> ConnectionPool:
+    """
+    Replace the shared pool, closing the previous one.
+
+    :param factory: Callable returning a new connection; defaults to MySQL.
+    :param options: Overrides for the config.ini pool settings.
+    """
+    global _pool
+    settings = _pool_options()
+    settings.update(options)
+    new_pool = ConnectionPool(factory or _connect, **settings)
+    with _pool_lock:
+        old, _pool = _pool, new_pool
+    if old is not None:
+        old.close()
+    logger.info("Connection pool configured (max_size=%s, max_overflow=%s)",
+                new_pool.max_size, new_pool.max_overflow)
+    return new_pool
+
+
+def get_pool() -> ConnectionPool:
+    """Return the shared pool, creating it from config.ini on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_connect, **_pool_options())
+    return _pool
+
+
+def discard_pool() -> None:
+    """
+    Forget the shared pool and replica router without closing their connections.
+
+    Called in a forked worker: the inherited sockets belong to the parent,
+    and closing them here would end the parent's sessions. The next
+    :func:`get_pool` call opens fresh ones.
+    """
+    global _pool, _router, _pool_lock
+    # a thread of the parent may have held the lock when it forked
+    _pool_lock = threading.Lock()
+    _pool = None
+    _router = None
+
+
+def _replica_endpoints(hosts: str) -> list[tuple[str, int | None]]:
+    """Parse ``host[:port], ...`` from [replicas] hosts."""
+    endpoints = []
+    for entry in hosts.split(","):
+        entry = entry.strip()
+        if entry:
+            host, _, port = entry.partition(":")
+            endpoints.append((host, int(port) if port else None))
+    return endpoints
+
+
+def _router_options(settings) -> dict:
+    return {
+        "sticky_seconds": settings.getfloat("sticky_seconds", 5.0),
+        "eject_after": settings.getint("eject_after", 3),
+        "eject_seconds": settings.getfloat("eject_seconds", 30.0),
+        "max_lag_seconds": settings.getfloat("max_lag_seconds", 5.0),
+        "lag_check_interval": settings.getfloat("lag_check_interval", 1.0),
+    }
+
+
+def _build_router(factories=None, **options) -> ReplicaRouter:
+    settings = get_section("replicas")
+    if factories is None:
+        factories = {}
+        for host, port in _replica_endpoints(settings.get("hosts", "")):
+            name = f"replica-{host}:{port}" if port else f"replica-{host}"
+            factories[name] = lambda host=host, port=port: _connect(host, port)
+    router_options = _router_options(settings)
+    router_options.update(options)
+    pools = [ConnectionPool(factory, **dict(_pool_options(), name=name)) for name, factory in factories.items()]
+    if pools:
+        logger.info("Routing reads to %s replica(s): %s", len(pools), ", ".join(factories))
+    router = ReplicaRouter(get_connection, pools, **router_options)
+    router.start()
+    return router
+
+
+def configure_replicas(factories=None, **options) -> ReplicaRouter:
+    """
+    Replace the replica router, closing the previous replicas' pools.
+
+    :param factories: ``{name: factory}`` with one connection factory per
+        replica; defaults to [replicas] hosts. Each gets a pool sized by [pool].
+    :param options: Overrides for the [replicas] settings (``sticky_seconds``,
+        ``eject_after``, ``eject_seconds``, ``max_lag_seconds``,
+        ``lag_check_interval``).
+    """
+    global _router
+    new_router = _build_router(factories, **options)
+    with _pool_lock:
+        old, _router = _router, new_router
+    if old is not None:
+        old.close()
+    return new_router
+
+
+def get_router() -> ReplicaRouter:
+    """Return the shared replica router, creating it from config.ini on first use."""
+    global _router
+    if _router is None:
+        with _pool_lock:
+            if _router is None:
+                _router = _build_router()
+    return _router
+
+
+def record_write() -> None:
+    """Note a write, so the current read scope keeps reading from the primary for a while."""
+    get_router().record_write()
+
+
 def get_connection():
-    """Establish and return a database connection."""
+    """Borrow a database connection from the shared pool."""
+
+    pool = get_pool()
+    start = time.perf_counter()
+    try:
+        conn = pool.acquire()
+        if metrics.ENABLED:
+            metrics.DB_ACQUIRE_LATENCY.observe((pool.name,), time.perf_counter() - start)
+        return conn
+    except Error as e:
+        logger.exception("Error connecting to database: %s", e)
+        return None
 
+
+def get_read_connection():
+    """Borrow a connection for a read that a replica may serve (see :mod:`util.db_router`)."""
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="Shaa@9846",
-            database="catalogue_dbms"
-        )
-        if conn.is_connected():
-            logger.info("Database connection established successfully.")
-            return conn
-        else:
-            logger.error("Database connection failed.")
-            return None
+        return get_router().read_connection()
     except Error as e:
-        logger.exception(f"Error connecting to database: {e}")
+        logger.exception("Error connecting to database: %s", e)
         return None
 
+
+def pool_stats() -> dict:
+    """Return usage counters for the shared pool."""
+    return get_pool().stats()
+
+
+def _pool_gauges() -> dict:
+    pools = [_pool] if _pool is not None else []
+    if _router is not None:
+        pools.extend(_router.pools)
+    values = {}
+    for pool in pools:
+        stats = pool.stats()
+        values.update({(stats["name"], state): stats[state] for state in ("in_use", "idle", "overflow")})
+    return values
+
+
+def _replica_lag_gauges() -> dict:
+    if _router is None:
+        return {}
+    return {(health["name"],): health["lag"] for health in _router.stats()}
+
+
+metrics.REGISTRY.register(metrics.GaugeFunction(
+    "db_pool_connections", "Pooled connections by state.", ("pool", "state"), _pool_gauges))
+metrics.REGISTRY.register(metrics.GaugeFunction(
+    "db_replica_lag_seconds", "Replication lag of each replica as of its last check.", ("replica",),
+    _replica_lag_gauges))
@@ -0,0 +1,296 @@
+"""
+Utility module for sending reads to replicas and writes to the primary.
+
+Reads are routed only inside a read scope, which the app opens for every
+HTTP request (:func:`begin_scope` / :func:`end_scope`). Everything else --
+writes, background jobs, scripts -- uses the primary, so the indexes and
+counters built from the table stay in step with the listeners that
+maintain them. Within a scope:
+
+* reads stay on the replica picked first, so a response's data version
+  (its ETag) and its body come from the same server;
+* replicas are picked by fewest borrowed connections, rotating between ties;
+* a replica that fails to hand out a connection ``eject_after`` times in
+  a row is left out for ``eject_seconds``, then tried again;
+* a replica more than ``max_lag_seconds`` behind the primary is left out
+  until it catches up. Every ``lag_check_interval`` seconds
+  :meth:`ReplicaRouter.check_lag` reads catalogue_version, which every
+  write transaction bumps, from the primary and each replica. A replica's
+  lag is the time since the primary first showed a version the replica
+  still does not have, so a replica that stopped replicating is left out
+  once that exceeds the limit, even though it still accepts connections;
+* once the scope writes (:meth:`ReplicaRouter.record_write`), its reads go
+  to the primary until ``primary_until``, at least ``max_lag_seconds``
+  later, as replicas in rotation are no further behind than that. The app
+  keeps that time in the session cookie, so a user's next requests see
+  their own edits on whichever worker serves them.
+
+With no replicas, or none available, reads use the primary.
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from exception.exception import databaseconnectionerror
+from util import metrics
+
+logger = logging.getLogger(__name__)
+
+# catalogue_version is bumped by every write transaction, so a replica's
+# copy of it shows how far replication has got
+POSITION_QUERY = "SELECT version FROM catalogue_version WHERE table_name = 'catalogue'"
+
+
+class ReadScope:
+    """Routing state of one request."""
+
+    __slots__ = ("primary_until", "replica")
+
+    def __init__(self, primary_until: float = 0.0) -> None:
+        # wall-clock time, as it travels between workers in the session cookie
+        self.primary_until = primary_until
+        self.replica = None
+
+
+_scope = ContextVar("db_read_scope", default=None)
+
+
+def begin_scope(primary_until: float = 0.0) -> ReadScope:
+    """
+    Route this context's reads until :func:`end_scope`.
+
+    :param primary_until: Read from the primary until this ``time.time()``,
+        e.g. the value a previous request of the same session ended with.
+    """
+    scope = ReadScope(primary_until)
+    _scope.set(scope)
+    return scope
+
+
+def current_scope() -> ReadScope | None:
+    return _scope.get()
+
+
+def end_scope() -> float:
+    """Close the scope and return its ``primary_until``."""
+    scope = _scope.get()
+    # set rather than reset: a streamed response may end the request in another context
+    _scope.set(None)
+    return scope.primary_until if scope is not None else 0.0
+
+
+def _read_position(conn) -> int:
+    cursor = conn.cursor()
+    try:
+        cursor.execute(POSITION_QUERY)
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    finally:
+        cursor.close()
+
+
+class _Replica:
+    __slots__ = ("pool", "failures", "ejected_until", "behind", "lag", "lagging")
+
+    def __init__(self, pool) -> None:
+        self.pool = pool
+        self.failures = 0
+        self.ejected_until = 0.0
+        # (primary position the replica lacks, monotonic time it was seen), or None when caught up
+        self.behind = None
+        self.lag = 0.0
+        self.lagging = False
+
+
+class ReplicaRouter:
+    """
+    Picks the connection each read runs on.
+
+    :param primary: Callable borrowing a connection from the primary.
+    :param replicas: One :class:`util.connection_pool.ConnectionPool` per replica.
+    :param sticky_seconds: Seconds a scope reads from the primary after it
+        writes; raised to ``max_lag_seconds`` if lower.
+    :param eject_after: Consecutive failures before a replica is left out.
+    :param eject_seconds: How long an ejected replica is left out.
+    :param max_lag_seconds: Replication lag above which a replica is left out.
+    :param lag_check_interval: Seconds between :meth:`check_lag` runs once
+        :meth:`start` is called; 0 leaves the checks to the caller.
+    """
+
+    def __init__(self, primary, replicas=(), sticky_seconds: float = 5.0, eject_after: int = 3,
+                 eject_seconds: float = 30.0, max_lag_seconds: float = 5.0,
+                 lag_check_interval: float = 1.0) -> None:
+        self._primary = primary
+        self._replicas = [_Replica(pool) for pool in replicas]
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = max(sticky_seconds, max_lag_seconds)
+        self.eject_after = max(1, eject_after)
+        self.eject_seconds = eject_seconds
+        self.lag_check_interval = lag_check_interval
+        self._lock = threading.Lock()
+        self._turn = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def pools(self) -> list:
+        return [replica.pool for replica in self._replicas]
+
+    def record_write(self) -> None:
+        """Keep the current scope's reads on the primary for ``sticky_seconds``."""
+        scope = _scope.get()
+        if scope is not None:
+            scope.primary_until = max(scope.primary_until, time.time() + self.sticky_seconds)
+
+    def read_connection(self):
+        """Borrow a connection for a read; see the module docstring for where it goes."""
+        scope = _scope.get()
+        if scope is None or not self._replicas:
+            return self._primary()
+        if time.time() < scope.primary_until:
+            self._count("primary", "sticky")
+            return self._primary()
+        for replica in self._candidates(scope.replica):
+            start = time.perf_counter()
+            try:
+                conn = replica.pool.acquire()
+            except databaseconnectionerror:
+                # every connection is busy: the replica is loaded, not unhealthy
+                logger.warning("Replica pool %s has no free connection", replica.pool.name)
+                continue
+            except Exception:
+                self._failed(replica)
+                continue
+            if replica.failures:
+                with self._lock:
+                    replica.failures = 0
+            if metrics.ENABLED:
+                metrics.DB_ACQUIRE_LATENCY.observe((replica.pool.name,), time.perf_counter() - start)
+            scope.replica = replica
+            self._count(replica.pool.name, "balanced")
+            return conn
+        logger.warning("No replica available; reading from the primary")
+        self._count("primary", "fallback")
+        return self._primary()
+
+    def _candidates(self, preferred: _Replica | None) -> list[_Replica]:
+        now = time.monotonic()
+        with self._lock:
+            available = [replica for replica in self._replicas
+                         if replica.ejected_until <= now and not replica.lagging]
+            if preferred in available:
+                available.remove(preferred)
+                return [preferred] + available
+            turn = self._turn
+            self._turn += 1
+        if not available:
+            return []
+        start = turn % len(available)
+        ordered = available[start:] + available[:start]
+        # sort is stable, so replicas equally busy keep the rotation
+        ordered.sort(key=lambda replica: replica.pool.stats()["in_use"])
+        return ordered
+
+    def _failed(self, replica: _Replica) -> None:
+        with self._lock:
+            replica.failures += 1
+            # after the ejection runs out, one more failure ejects the replica again
+            eject = replica.failures >= self.eject_after
+            if eject:
+                replica.ejected_until = time.monotonic() + self.eject_seconds
+        if eject:
+            logger.warning("Replica %s ejected for %ss after %s failed connections", replica.pool.name,
+                           self.eject_seconds, replica.failures, exc_info=True)
+            if metrics.ENABLED:
+                metrics.DB_REPLICA_EJECTIONS.inc((replica.pool.name, "failures"))
+        else:
+            logger.warning("Replica %s failed to connect", replica.pool.name, exc_info=True)
+
+    def check_lag(self) -> None:
+        """Measure each replica's lag behind the primary and leave out those above ``max_lag_seconds``."""
+        if not self._replicas:
+            return
+        conn = self._primary()
+        if conn is None:
+            return
+        try:
+            primary = _read_position(conn)
+        finally:
+            conn.close()
+        for replica in self._replicas:
+            try:
+                conn = replica.pool.acquire()
+            except databaseconnectionerror:
+                continue
+            except Exception:
+                self._failed(replica)
+                continue
+            try:
+                position = _read_position(conn)
+            except Exception:
+                logger.warning("Could not read the replication position of %s", replica.pool.name, exc_info=True)
+                continue
+            finally:
+                conn.close()
+            self._update_lag(replica, position, primary)
+
+    def _update_lag(self, replica: _Replica, position: int, primary: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if position >= primary:
+                replica.behind = None
+            elif replica.behind is None or position >= replica.behind[0]:
+                # it has what it lacked at the last check; time the next gap from now
+                replica.behind = (primary, now)
+            replica.lag = now - replica.behind[1] if replica.behind is not None else 0.0
+            lagging = replica.lag > self.max_lag_seconds
+            changed, replica.lagging = lagging != replica.lagging, lagging
+        if not changed:
+            return
+        if lagging:
+            logger.warning("Replica %s is %.1fs behind the primary (position %s of %s); leaving it out",
+                           replica.pool.name, replica.lag, position, primary)
+            if metrics.ENABLED:
+                metrics.DB_REPLICA_EJECTIONS.inc((replica.pool.name, "lag"))
+        else:
+            logger.info("Replica %s caught up with the primary; reading from it again", replica.pool.name)
+
+    def start(self) -> None:
+        """Run :meth:`check_lag` every ``lag_check_interval`` seconds in a daemon thread."""
+        if self._thread is not None or not self._replicas or self.lag_check_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="replica-lag-check", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.lag_check_interval):
+            try:
+                self.check_lag()
+            except Exception:
+                logger.exception("Replica lag check failed")
+
+    @staticmethod
+    def _count(target: str, reason: str) -> None:
+        if metrics.ENABLED:
+            metrics.DB_READ_ROUTES.inc((target, reason))
+
+    def stats(self) -> list[dict]:
+        """Health of each replica with its pool counters."""
+        now = time.monotonic()
+        with self._lock:
+            health = [(replica.pool, replica.failures, max(0.0, replica.ejected_until - now), replica.lag,
+                       replica.lagging) for replica in self._replicas]
+        return [dict(pool.stats(), failures=failures, ejected_for=round(ejected_for, 3), lag=round(lag, 3),
+                     lagging=lagging)
+                for pool, failures, ejected_for, lag, lagging in health]
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for replica in self._replicas:
+            replica.pool.close()
@@ -0,0 +1,73 @@
+"""
+Utility module for encoding catalogue rows as streamed export formats.
+
+Each encoder takes an iterable of row chunks (lists of tuples in ``columns``
+order) and yields one ``bytes`` block per chunk, so memory use depends on
+the chunk size and not on the number of rows.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_json_encoder = json.JSONEncoder(default=_json_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def _json_rows(chunk, columns):
+    encode = _json_encoder.encode
+    return [encode(dict(zip(columns, row))) for row in chunk]
+
+
+def encode_ndjson(chunks, columns):
+    """Yield newline-delimited JSON, one object per row."""
+    for chunk in chunks:
+        if chunk:
+            yield ("\n".join(_json_rows(chunk, columns)) + "\n").encode("utf-8")
+
+
+def encode_json_array(chunks, columns):
+    """Yield a single JSON array of row objects."""
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        body = ",".join(_json_rows(chunk, columns))
+        yield (body if first else "," + body).encode("utf-8")
+        first = False
+    yield b"]"
+
+
+def encode_csv(chunks, columns):
+    """Yield CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [value.isoformat() if isinstance(value, (date, datetime)) else value for value in row]
+            for row in chunk
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+# format name -> (encoder, mimetype, file extension)
+EXPORT_FORMATS = {
+    "ndjson": (encode_ndjson, "application/x-ndjson", "ndjson"),
+    "json": (encode_json_array, "application/json", "json"),
+    "csv": (encode_csv, "text/csv", "csv"),
+}
@@ -0,0 +1,62 @@
+"""
+Utility module for conditional GET handling (ETag / Last-Modified).
+
+Tags are derived from a cheap data version rather than a hash of the body,
+so a matching ``If-None-Match`` is answered before any rows are read.
+"""
+
+import logging
+import zlib
+from datetime import datetime, timezone
+
+from flask import make_response, request
+
+logger = logging.getLogger(__name__)
+
+# util.compression appends these to the tag of a response it encodes, so a
+# client holding the compressed representation still matches.
+ENCODED_ETAG_SUFFIXES = {"gzip": "-gzip", "br": "-br"}
+
+
+def make_etag(version: int, variant: str) -> str:
+    """Build a strong entity tag from a data version and a representation key."""
+    return f"v{version}-{zlib.crc32(variant.encode('utf-8')):08x}"
+
+
+def etag_matches(etag: str, if_none_match) -> bool:
+    """True when If-None-Match holds ``etag`` itself or an encoded variant of it."""
+    if etag in if_none_match:
+        return True
+    return any(etag + suffix in if_none_match for suffix in ENCODED_ETAG_SUFFIXES.values())
+
+
+def conditional_response(version_info, variant: str, build):
+    """
+    Answer a GET with 304 when the client's copy is current, else build it.
+
+    :param version_info: ``(version, updated_at)`` from the service, or None
+        when no version is available (the response is then built as usual).
+    :param variant: Identifies this representation, e.g. the request path
+        and query string.
+    :param build: Callable returning the full response; only called on a miss.
+    """
+    if version_info is None:
+        return build()
+    version, updated_at = version_info
+    etag = make_etag(version, variant)
+    last_modified = updated_at.replace(tzinfo=timezone.utc) if isinstance(updated_at, datetime) else None
+
+    not_modified = etag_matches(etag, request.if_none_match)
+    if not request.if_none_match and last_modified and request.if_modified_since:
+        not_modified = last_modified.replace(microsecond=0) <= request.if_modified_since
+    if not_modified:
+        response = make_response("", 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,179 @@
+"""
+Utility module for in-memory indexes over the catalogue table.
+
+:class:`TableIndex` holds the loading and bookkeeping they share: a full
+build from a row loader on first use, incremental updates from
+catalogueService write notifications, including writes committed while a
+build is still reading the table, and catching up with writes made
+elsewhere from the catalogue_change log.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Change log entries read per query while catching up.
+CATCH_UP_CHUNK_SIZE = 1000
+
+
+class TableIndex:
+    """
+    Base for indexes built from catalogue rows and kept current by writes.
+
+    The index is built on first use (or by an explicit :meth:`build`) from
+    ``loader``, which returns row chunks in ``columns`` order. Pass
+    :meth:`apply` to ``catalogueService.add_listener`` to keep it current;
+    writes committed while a build is reading the table are replayed once
+    it finishes. Until the first build starts, notifications are ignored.
+
+    Notifications only cover this process's writes. Given ``changes``, the
+    index also records the change log position and data version it was
+    built at, and :meth:`catch_up` brings it to a newer version from the
+    log, so writes by other workers, the importer or plain SQL reach it.
+
+    Subclasses implement :meth:`_load`, :meth:`_install` and :meth:`_apply`;
+    the last two run under ``self._lock``, which queries should hold while
+    they read the index (but not for work they can do on a copy).
+
+    :param loader: Callable returning an iterable of row chunks.
+    :param columns: Column names of the rows ``loader`` yields.
+    :param changes: ``catalogueService.get_changes``, or any callable with
+        its signature whose rows are in ``columns`` order.
+    """
+
+    name = "catalogue"
+
+    def __init__(self, loader, columns, changes=None) -> None:
+        self._loader = loader
+        self._columns = tuple(columns)
+        self._changes = changes
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._pending = None
+        self.ready = False
+        # change_id and data version the index reflects; None until built with a changes source
+        self.change_id = None
+        self.version = None
+
+    def _load(self, chunks):
+        """Build and return fresh index state from an iterable of row chunks."""
+        raise NotImplementedError
+
+    def _install(self, state) -> None:
+        """Swap in state returned by :meth:`_load`."""
+        raise NotImplementedError
+
+    def _apply(self, action: str, records: list[dict]) -> None:
+        """Apply one catalogueService notification to the installed state."""
+        raise NotImplementedError
+
+    def build(self) -> None:
+        """Read the whole table into fresh state, then swap it in."""
+        with self._build_lock:
+            self._build()
+
+    def ensure_ready(self) -> None:
+        """Build the index unless it is already built."""
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self._build()
+
+    def _build(self) -> None:
+        with self._lock:
+            self._pending = []
+        try:
+            # read before the rows, so catching up from it may repeat writes but never misses one
+            position = self._changes(0, 0) if self._changes is not None else None
+            stream = self._loader()
+            try:
+                state = self._load(stream)
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+        except Exception:
+            logger.exception("Failed to build the %s index", self.name)
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._install(state)
+            for action, records in self._pending:
+                self._apply(action, records)
+            self._pending = None
+            if position is not None:
+                self.change_id, self.version = position["head"], position["version"]
+            self.ready = True
+        logger.info("Built the %s index", self.name)
+
+    def reset(self) -> None:
+        """Drop the index; the next query rebuilds it."""
+        empty = self._load([])
+        with self._build_lock, self._lock:
+            self._install(empty)
+            self.ready = False
+            self.change_id = self.version = None
+
+    def catch_up(self, version: int | None) -> bool:
+        """
+        Bring the index up to data version ``version``.
+
+        Applies the change log entries after the index's position, each
+        with its catalogue's current row, and builds the index if it is not
+        built yet. It is rebuilt instead when retention has removed entries
+        it needs, or when the version moved without any new entries (a
+        write that was not logged, so only a full read shows it).
+
+        :return: Whether the index now reflects ``version`` or later; always
+            False without ``changes`` or a version to compare with.
+        """
+        if self._changes is None or version is None:
+            return False
+        if self.version is not None and self.version >= version:
+            return True
+        with self._build_lock:
+            if self.version is None:
+                self._build()
+            elif self.version < version:
+                self._follow_log()
+            return self.version is not None and self.version >= version
+
+    def _follow_log(self) -> None:
+        # called with _build_lock held, so no build runs meanwhile
+        since, applied = self.change_id, 0
+        while True:
+            page = self._changes(since, CATCH_UP_CHUNK_SIZE)
+            if since < page["pruned_through"] or since > page["head"]:
+                logger.info("Change log no longer covers the %s index at %s; rebuilding", self.name, since)
+                self._build()
+                return
+            entries = page["entries"]
+            with self._lock:
+                for _, catalogue_id, _, row in entries:
+                    if row is None:
+                        self._apply("deleted", [{"catalogue_id": catalogue_id}])
+                    else:
+                        self._apply("updated", [dict(zip(self._columns, row))])
+            applied += len(entries)
+            if len(entries) < CATCH_UP_CHUNK_SIZE:
+                break
+            since = entries[-1][0]
+        if not applied and page["version"] != self.version:
+            logger.info("Catalogue version moved without logged changes; rebuilding the %s index", self.name)
+            self._build()
+            return
+        # the last page reached the head, and its version is as of that head
+        with self._lock:
+            self.change_id, self.version = page["head"], page["version"]
+        logger.debug("%s index caught up to version %s with %s changes", self.name, self.version, applied)
+
+    def apply(self, action: str, records: list[dict]) -> None:
+        """Listener for catalogueService writes."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((action, records))
+            elif self.ready:
+                self._apply(action, records)
@@ -0,0 +1,319 @@
+"""
+Utility module for answering "which catalogues are effective on D" in memory.
+
+:class:`IntervalTree` is a static centered interval tree over integer
+intervals. :class:`EffectiveDateIndex` keeps one over every catalogue's
+``effective_from``/``effective_to`` (as date ordinals), with a small delta
+of recent writes in front of it that is folded in by a background rebuild.
+Intervals are closed, matching the ``effective_from <= D AND
+effective_to >= D`` filter of GET /catalogues; rows with either date
+missing never match, as in SQL.
+"""
+
+import heapq
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from itertools import islice
+
+from util.indexing import TableIndex
+
+logger = logging.getLogger(__name__)
+
+# Node fields: center, starts, ids sorted by start, ends, ids sorted by end, left, right
+_CENTER, _STARTS, _START_IDS, _ENDS, _END_IDS, _LEFT, _RIGHT = range(7)
+
+
+def to_ordinal(value) -> int | None:
+    """Turn a date, datetime or YYYY-MM-DD string into a day ordinal."""
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+class IntervalTree:
+    """
+    Centered interval tree over closed ``[start, end]`` integer intervals.
+
+    Each node keeps the intervals containing its center twice, sorted by
+    start and by end, so a query takes a binary search and a list slice per
+    level. Centers split the node's value range in half, so the depth is
+    bounded by log2 of the span (about 17 levels for a century of dates).
+
+    :param intervals: ``(id, start, end)`` triples with ``start <= end``.
+    """
+
+    def __init__(self, intervals) -> None:
+        self.size = 0
+        self._root = self._build(list(intervals))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        self.size += len(intervals)
+        root = None
+        # (intervals, parent node, child slot) still to place
+        stack = [(intervals, None, 0)]
+        while stack:
+            items, parent, slot = stack.pop()
+            low = min(start for _, start, _ in items)
+            high = max(end for _, _, end in items)
+            center = (low + high) // 2
+            left, right, here = [], [], []
+            for item in items:
+                if item[2] < center:
+                    left.append(item)
+                elif item[1] > center:
+                    right.append(item)
+                else:
+                    here.append(item)
+            here.sort(key=lambda item: item[1])
+            by_end = sorted(here, key=lambda item: item[2])
+            node = [center, [item[1] for item in here], [item[0] for item in here],
+                    [item[2] for item in by_end], [item[0] for item in by_end], None, None]
+            if parent is None:
+                root = node
+            else:
+                parent[slot] = node
+            if left:
+                stack.append((left, node, _LEFT))
+            if right:
+                stack.append((right, node, _RIGHT))
+        return root
+
+    def count(self, low: int, high: int) -> int:
+        """Number of intervals overlapping ``[low, high]``, without listing them."""
+        total = 0
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            center = node[_CENTER]
+            if high < center:
+                total += bisect_right(node[_STARTS], high)
+                if node[_LEFT] is not None:
+                    stack.append(node[_LEFT])
+            elif low > center:
+                total += len(node[_ENDS]) - bisect_left(node[_ENDS], low)
+                if node[_RIGHT] is not None:
+                    stack.append(node[_RIGHT])
+            else:
+                total += len(node[_STARTS])
+                if node[_LEFT] is not None:
+                    stack.append(node[_LEFT])
+                if node[_RIGHT] is not None:
+                    stack.append(node[_RIGHT])
+        return total
+
+    def overlapping(self, low: int, high: int) -> list:
+        """Ids of intervals overlapping ``[low, high]``; ``low == high`` is a point query."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            center = node[_CENTER]
+            if high < center:
+                # every interval here contains center, so it overlaps iff it starts by high
+                found.extend(node[_START_IDS][:bisect_right(node[_STARTS], high)])
+                if node[_LEFT] is not None:
+                    stack.append(node[_LEFT])
+            elif low > center:
+                found.extend(node[_END_IDS][bisect_left(node[_ENDS], low):])
+                if node[_RIGHT] is not None:
+                    stack.append(node[_RIGHT])
+            else:
+                found.extend(node[_START_IDS])
+                if node[_LEFT] is not None:
+                    stack.append(node[_LEFT])
+                if node[_RIGHT] is not None:
+                    stack.append(node[_RIGHT])
+        return found
+
+
+class EffectiveDateIndex(TableIndex):
+    """
+    Catalogue ids by effective date window.
+
+    Writes land in a delta of changed intervals and mark the tree's copy of
+    those ids stale; queries combine both. Once ``max_delta`` ids are stale
+    the tree is rebuilt in a background thread, so no write waits for a
+    rebuild. See :class:`~util.indexing.TableIndex` for the initial build
+    and for catching up with writes made by other processes.
+
+    :param max_delta: Changed ids kept outside the tree before a rebuild.
+    """
+
+    name = "effective date"
+
+    def __init__(self, loader, columns, max_delta: int = 4096, changes=None) -> None:
+        super().__init__(loader, columns, changes)
+        self._id = self._columns.index("catalogue_id")
+        self._from = self._columns.index("effective_from")
+        self._to = self._columns.index("effective_to")
+        self.max_delta = max_delta
+        self._generation = 0
+        self._rebuilding = None
+        self.rebuilds = 0
+        self._install(({}, IntervalTree(())))
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def _load(self, chunks):
+        intervals = {}
+        for chunk in chunks:
+            for row in chunk:
+                interval = self._interval(row[self._from], row[self._to])
+                if interval is not None:
+                    intervals[row[self._id]] = interval
+        return intervals, self._tree_from(intervals)
+
+    @staticmethod
+    def _interval(effective_from, effective_to) -> tuple[int, int] | None:
+        start, end = to_ordinal(effective_from), to_ordinal(effective_to)
+        if start is None or end is None or start > end:
+            return None
+        return start, end
+
+    @staticmethod
+    def _tree_from(intervals: dict) -> IntervalTree:
+        return IntervalTree((catalogue_id, start, end) for catalogue_id, (start, end) in intervals.items())
+
+    def _install(self, state) -> None:
+        # _intervals is the current interval per id and _ids its keys in order;
+        # _stale maps ids changed since the tree was built to the tree's copy
+        self._intervals, self._tree = state
+        self._ids = sorted(self._intervals)
+        self._delta = {}
+        self._stale = {}
+        # bumped whenever the tree is replaced, so an older rebuild is discarded
+        self._generation += 1
+
+    def _apply(self, action: str, records: list[dict]) -> None:
+        intervals, ids = self._intervals, self._ids
+        for record in records:
+            catalogue_id = record["catalogue_id"]
+            previous = intervals.get(catalogue_id)
+            if catalogue_id not in self._stale:
+                self._stale[catalogue_id] = previous
+            if self._rebuilding is not None:
+                self._rebuilding.add(catalogue_id)
+            interval = None if action == "deleted" else \
+                self._interval(record["effective_from"], record["effective_to"])
+            if interval is None:
+                if previous is not None:
+                    del intervals[catalogue_id]
+                    del ids[bisect_left(ids, catalogue_id)]
+                self._delta.pop(catalogue_id, None)
+            else:
+                if previous is None:
+                    insort(ids, catalogue_id)
+                intervals[catalogue_id] = interval
+                self._delta[catalogue_id] = interval
+        if len(self._stale) >= self.max_delta and self._rebuilding is None:
+            self._rebuilding = set()
+            threading.Thread(target=self._rebuild, args=(dict(intervals), self._generation),
+                             name="effective-index-rebuild", daemon=True).start()
+
+    def rebuild(self) -> None:
+        """Fold the delta into a new tree now, on the calling thread."""
+        with self._lock:
+            if self._rebuilding is not None:
+                return
+            self._rebuilding = set()
+            snapshot, generation = dict(self._intervals), self._generation
+        self._rebuild(snapshot, generation)
+
+    def _rebuild(self, snapshot: dict, generation: int) -> None:
+        try:
+            tree = self._tree_from(snapshot)
+        except Exception:
+            logger.exception("Failed to rebuild the effective date index")
+            with self._lock:
+                self._rebuilding = None
+            return
+        with self._lock:
+            changed, self._rebuilding = self._rebuilding, None
+            if generation != self._generation:
+                return
+            # ids written since the snapshot stay in the delta over the new tree
+            self._tree = tree
+            self._stale = {i: snapshot.get(i) for i in changed}
+            self._delta = {i: self._intervals[i] for i in changed if i in self._intervals}
+            self.rebuilds += 1
+        logger.debug("Effective date index rebuilt with %s intervals", len(tree))
+
+    def _count(self, low: int, high: int) -> int:
+        total = self._tree.count(low, high)
+        for interval in self._stale.values():
+            if interval is not None and interval[0] <= high and interval[1] >= low:
+                total -= 1
+        for start, end in self._delta.values():
+            if start <= high and end >= low:
+                total += 1
+        return total
+
+    def _overlapping(self, low: int, high: int) -> list[int]:
+        found = self._tree.overlapping(low, high)
+        if self._stale:
+            stale = self._stale
+            found = [catalogue_id for catalogue_id in found if catalogue_id not in stale]
+        for catalogue_id, (start, end) in self._delta.items():
+            if start <= high and end >= low:
+                found.append(catalogue_id)
+        return found
+
+    def overlapping(self, low: date, high: date) -> list[int]:
+        """Ids of catalogues effective on at least one day in ``[low, high]``, unordered."""
+        self.ensure_ready()
+        with self._lock:
+            return self._overlapping(low.toordinal(), high.toordinal())
+
+    def effective_on(self, day: date) -> list[int]:
+        """Ids of catalogues effective on ``day``, unordered."""
+        return self.overlapping(day, day)
+
+    def count(self, low: date, high: date) -> int:
+        self.ensure_ready()
+        with self._lock:
+            return self._count(low.toordinal(), high.toordinal())
+
+    def page(self, low: date, high: date, fetch: int, after_id: int | None = None) -> tuple[list[int], int]:
+        """
+        The lowest ``fetch`` matching ids above ``after_id``, and the total count.
+
+        When matches are dense, walking all ids in order and checking each
+        interval reaches ``fetch`` hits long before listing every match
+        would; when they are sparse the tree lists them and the smallest
+        are picked.
+        """
+        self.ensure_ready()
+        low, high = low.toordinal(), high.toordinal()
+        with self._lock:
+            total = self._count(low, high)
+            if not total:
+                return [], 0
+            ids, intervals = self._ids, self._intervals
+            # checks expected by the walk vs. matches listed by the tree
+            if fetch * len(ids) <= total * total:
+                start = 0 if after_id is None else bisect_right(ids, after_id)
+                found = []
+                for catalogue_id in islice(ids, start, None):
+                    interval = intervals[catalogue_id]
+                    if interval[0] <= high and interval[1] >= low:
+                        found.append(catalogue_id)
+                        if len(found) == fetch:
+                            break
+                return found, total
+            found = self._overlapping(low, high)
+        if after_id is not None:
+            found = [catalogue_id for catalogue_id in found if catalogue_id > after_id]
+        return heapq.nsmallest(fetch, found), total
@@ -0,0 +1,95 @@
+"""
+Utility module for database leases that keep a job on one worker at a time.
+
+Each job has a row in ``job_lease`` (seeded by its migration). A worker
+holds the job while ``owner`` is its id and ``expires_at`` is in the
+future; a crashed worker's lease simply runs out. Expiry is set and
+compared with the database's ``UTC_TIMESTAMP()``, so every worker judges
+it by the same clock however far their own clocks drift apart.
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+
+from util.db_connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+ACQUIRE_QUERY = """
+UPDATE job_lease SET owner = %s, expires_at = UTC_TIMESTAMP() + INTERVAL %s SECOND
+WHERE job_name = %s AND (owner = %s OR expires_at <= UTC_TIMESTAMP())
+"""
+RELEASE_QUERY = "UPDATE job_lease SET expires_at = UTC_TIMESTAMP() WHERE job_name = %s AND owner = %s"
+
+
+class Lease:
+    """
+    A renewable lease on one ``job_lease`` row.
+
+    :param name: The job_name of the row.
+    :param duration: Seconds a lease lasts unless renewed.
+    :param owner: Id recorded in the row; defaults to host, pid and a random suffix.
+    """
+
+    def __init__(self, name: str, duration: float = 120.0, owner: str | None = None) -> None:
+        self.name = name
+        self.duration = duration
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._renewed_at = None
+
+    @property
+    def held(self) -> bool:
+        return self._renewed_at is not None and time.monotonic() - self._renewed_at < self.duration
+
+    def acquire(self) -> bool:
+        """Take or extend the lease; False when another owner holds it."""
+        conn = get_connection()
+        if conn is None:
+            logger.error("No database connection; cannot acquire lease %s", self.name)
+            return False
+        cursor = conn.cursor()
+        try:
+            started = time.monotonic()
+            cursor.execute(ACQUIRE_QUERY, (self.owner, self.duration, self.name, self.owner))
+            acquired = cursor.rowcount == 1
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("Failed to acquire lease %s", self.name)
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+        self._renewed_at = started if acquired else None
+        logger.debug("Lease %s %s by %s", self.name, "acquired" if acquired else "refused", self.owner)
+        return acquired
+
+    def keep_alive(self) -> bool:
+        """Renew once half the lease has passed; False once it is lost."""
+        if self._renewed_at is None:
+            return False
+        if time.monotonic() - self._renewed_at < self.duration / 2:
+            return True
+        return self.acquire()
+
+    def release(self) -> None:
+        """Let the lease run out now, if this owner still holds it."""
+        if self._renewed_at is None:
+            return
+        self._renewed_at = None
+        conn = get_connection()
+        if conn is None:
+            return
+        cursor = conn.cursor()
+        try:
+            cursor.execute(RELEASE_QUERY, (self.name, self.owner))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("Failed to release lease %s", self.name)
+        finally:
+            cursor.close()
+            conn.close()
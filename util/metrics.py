@@ -0,0 +1,480 @@
+"""
+Utility module for in-process metrics exposed in Prometheus text format.
+
+Counters and histograms write into per-thread shards, so recording a value
+never takes a lock; shards are merged only when ``/metrics`` is scraped.
+Shards of finished threads are folded into a retired total so the
+thread-per-request dev server does not grow them without bound.
+"""
+
+import logging
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+RATIO_BUCKETS = (1.25, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 20.0)
+
+ENABLED = True
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn recording on or off; already collected values are kept."""
+    global ENABLED
+    ENABLED = enabled
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _ShardedValues:
+    """
+    Label tuple -> list of numbers, written through per-thread shards.
+
+    Each shard is only written by its own thread; ``collect()`` sums them.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+
+    def values(self, labels: tuple) -> list:
+        try:
+            shard = self.local.shard
+        except AttributeError:
+            shard = self.local.shard = {}
+            with self._lock:
+                if len(self._shards) >= 64:
+                    self._fold_finished()
+                self._shards.append((threading.current_thread(), shard))
+        row = shard.get(labels)
+        if row is None:
+            row = shard[labels] = [0] * self.width
+        return row
+
+    @staticmethod
+    def _merge(into: dict, shard: dict) -> None:
+        for labels, row in list(shard.items()):
+            total = into.get(labels)
+            if total is None:
+                into[labels] = list(row)
+            else:
+                for i, value in enumerate(row):
+                    total[i] += value
+
+    def _fold_finished(self) -> None:
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = live
+
+    def collect(self) -> dict:
+        with self._lock:
+            self._fold_finished()
+            merged = {labels: list(row) for labels, row in self._retired.items()}
+            for _, shard in self._shards:
+                self._merge(merged, shard)
+        return merged
+
+
+class Counter:
+    """Monotonic counter with fixed label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = _ShardedValues(1)
+        self._local = self._values.local
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        try:
+            row = self._local.shard[labels]
+        except (AttributeError, KeyError):
+            row = self._values.values(labels)
+        row[0] += amount
+
+    def row(self, labels: tuple) -> list:
+        """
+        The calling thread's slot list for ``labels``; ``row[0]`` is the count.
+
+        Only that thread may write it. For hot paths that keep it to skip
+        the label lookup on every increment.
+        """
+        return self._values.values(labels)
+
+    def collect(self) -> dict:
+        return {labels: row[0] for labels, row in self._values.collect().items()}
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.collect().items())]
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds and label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # one slot per bound, one for +Inf, then sum and count
+        self._values = _ShardedValues(len(self.buckets) + 3)
+        self._local = self._values.local
+
+    def observe(self, labels: tuple, value: float) -> None:
+        try:
+            row = self._local.shard[labels]
+        except (AttributeError, KeyError):
+            row = self._values.values(labels)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def row(self, labels: tuple) -> list:
+        """
+        The calling thread's slot list for ``labels``: one count per bucket,
+        then +Inf, sum and count, updated as :meth:`observe` does.
+
+        Only that thread may write it; see :meth:`Counter.row`.
+        """
+        return self._values.values(labels)
+
+    def collect(self) -> dict:
+        return self._values.collect()
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, row in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), row):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(float(bound))
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(row[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {row[-1]}")
+        return lines
+
+
+class GaugeFunction:
+    """Gauge whose values are read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, fn) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        try:
+            values = self.fn()
+        except Exception:
+            logger.warning("Metric callback for %s failed", self.name, exc_info=True)
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(values.items())]
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests handled.", ("route", "method", "status")))
+HTTP_ERRORS = REGISTRY.register(Counter(
+    "http_request_errors_total", "HTTP requests answered with a 5xx status.", ("route", "method")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time from request start until the response is returned.",
+    ("route", "method")))
+HTTP_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "http_response_size_bytes", "Response body size.", ("route", "method"), SIZE_BUCKETS))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Time spent in cursor.execute per statement.", ("statement",), QUERY_BUCKETS))
+DB_QUERY_ERRORS = REGISTRY.register(Counter(
+    "db_query_errors_total", "Statements that raised an error.", ("statement",)))
+DB_ROWS = REGISTRY.register(Counter(
+    "db_rows_returned_total", "Rows fetched per statement.", ("statement",)))
+DB_ACQUIRE_LATENCY = REGISTRY.register(Histogram(
+    "db_connection_acquire_seconds", "Time to borrow a connection from the pool.", ("pool",), QUERY_BUCKETS))
+DB_READ_ROUTES = REGISTRY.register(Counter(
+    "db_read_routes_total", "Routed reads by target pool and reason (balanced, sticky, fallback).",
+    ("target", "reason")))
+DB_REPLICA_EJECTIONS = REGISTRY.register(Counter(
+    "db_replica_ejections_total",
+    "Replicas taken out of rotation, by reason (failures: repeated connection failures, lag: replication lag).",
+    ("replica", "reason")))
+COMPRESSION_RATIO = REGISTRY.register(Histogram(
+    "http_compression_ratio", "Uncompressed over compressed size of compressed responses.",
+    ("route", "encoding"), RATIO_BUCKETS))
+COMPRESSION_CPU = REGISTRY.register(Histogram(
+    "http_compression_cpu_seconds", "Thread CPU time spent compressing one response.",
+    ("route", "encoding"), QUERY_BUCKETS))
+COMPRESSION_BYTES = REGISTRY.register(Counter(
+    "http_compression_bytes_total", "Response bytes before (in) and after (out) compression.",
+    ("encoding", "stage")))
+COMPRESSION_SKIPPED = REGISTRY.register(Counter(
+    "http_compression_skipped_total", "Responses sent uncompressed, by reason.", ("reason",)))
+STATUS_TRANSITIONS = REGISTRY.register(Counter(
+    "catalogue_status_transitions_total", "Catalogues moved between statuses by the status job.",
+    ("transition",)))
+STATUS_JOB_RUNS = REGISTRY.register(Counter(
+    "catalogue_status_job_runs_total", "Status job runs by outcome (completed, skipped, failed).",
+    ("outcome",)))
+STATS_RECONCILIATIONS = REGISTRY.register(Counter(
+    "catalogue_stats_reconciliations_total",
+    "Checks of the in-memory stats against the table by outcome (matched, rebuilt, deferred).", ("outcome",)))
+CHANGE_LOG_REMOVED = REGISTRY.register(Counter(
+    "catalogue_change_log_removed_total",
+    "Change log entries deleted by reason (compacted, expired).", ("reason",)))
+CHANGE_FEED_RESYNCS = REGISTRY.register(Counter(
+    "catalogue_change_feed_resyncs_total", "Change feed tokens refused, so the client had to resync."))
+
+
+def render() -> str:
+    """Return every registered metric in Prometheus text format."""
+    return REGISTRY.render()
+
+
+# -- database ---------------------------------------------------------------
+
+_statement_labels = {}
+_STATEMENT_TABLE = re.compile(r"\b(?:from|into|update)\s+`?(\w+)", re.IGNORECASE)
+_now = time.perf_counter
+
+
+def statement_name(sql: str, caller: str) -> str:
+    """
+    Name a statement after the function issuing it and its verb and table,
+    e.g. ``_load_catalogue_by_id:select_catalogue``.
+    """
+    verb = sql.split(None, 1)[0].lower() if sql.strip() else "unknown"
+    match = _STATEMENT_TABLE.search(sql)
+    return f"{caller}:{verb}_{match.group(1).lower()}" if match else f"{caller}:{verb}"
+
+
+def name_statement(sql: str, name: str) -> None:
+    """Label ``sql`` with a fixed name instead of one derived from its caller."""
+    _statement_labels[sql] = (name,)
+
+
+def _labels_for(sql: str) -> tuple:
+    # identical SQL is the same statement, so it keeps its first caller's name
+    labels = (statement_name(sql, sys._getframe(2).f_code.co_name),)
+    if len(_statement_labels) < 10000:
+        _statement_labels[sql] = labels
+    return labels
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy timing ``execute`` calls and counting fetched rows.
+
+    The hot methods are written out rather than shared through a helper;
+    each extra Python call is measurable against a fast query.
+    """
+
+    __slots__ = ("_cursor", "_labels")
+
+    def __init__(self, cursor) -> None:
+        self._cursor = cursor
+        self._labels = ("unknown",)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, operation, params=()):
+        self._labels = labels = _statement_labels.get(operation) or _labels_for(operation)
+        start = _now()
+        try:
+            result = self._cursor.execute(operation, params)
+        except Exception:
+            DB_QUERY_ERRORS.inc(labels)
+            DB_QUERY_LATENCY.observe(labels, _now() - start)
+            raise
+        DB_QUERY_LATENCY.observe(labels, _now() - start)
+        return result
+
+    def executemany(self, operation, seq_params):
+        self._labels = labels = _statement_labels.get(operation) or _labels_for(operation)
+        start = _now()
+        try:
+            result = self._cursor.executemany(operation, seq_params)
+        except Exception:
+            DB_QUERY_ERRORS.inc(labels)
+            DB_QUERY_LATENCY.observe(labels, _now() - start)
+            raise
+        DB_QUERY_LATENCY.observe(labels, _now() - start)
+        return result
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            DB_ROWS.inc(self._labels)
+        return row
+
+    def fetchmany(self, size: int = 1):
+        rows = self._cursor.fetchmany(size)
+        if rows:
+            DB_ROWS.inc(self._labels, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if rows:
+            DB_ROWS.inc(self._labels, len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        return self._cursor.close()
+
+
+def instrument_cursor(cursor):
+    """Cursor wrapper for :class:`util.connection_pool.ConnectionPool`."""
+    return InstrumentedCursor(cursor) if ENABLED else cursor
+
+
+# -- Flask ------------------------------------------------------------------
+
+class _CountingBody:
+    """Wrap a streamed body to record its size once it has been sent."""
+
+    def __init__(self, body, labels: tuple) -> None:
+        self._body = body
+        self._labels = labels
+        self._size = 0
+        self._done = False
+
+    def __iter__(self):
+        for chunk in self._body:
+            self._size += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        if not self._done:
+            self._done = True
+            HTTP_RESPONSE_BYTES.observe(self._labels, self._size)
+        close = getattr(self._body, "close", None)
+        if close is not None:
+            close()
+
+
+_request_start = ContextVar("metrics_request_start", default=None)
+# per thread: (route, method, status) -> (labels, latency row, requests row, size row)
+_request_rows = threading.local()
+
+
+def _rows_for(route: str, method: str, status: int) -> tuple:
+    try:
+        cache = _request_rows.cache
+    except AttributeError:
+        cache = _request_rows.cache = {}
+    key = (route, method, status)
+    rows = cache.get(key)
+    if rows is None:
+        labels = (route, method)
+        if len(cache) >= 1000:
+            cache.clear()
+        rows = cache[key] = (labels, HTTP_LATENCY.row(labels), HTTP_REQUESTS.row(labels + (status,)),
+                             HTTP_RESPONSE_BYTES.row(labels))
+    return rows
+
+
+def _before_request() -> None:
+    if ENABLED:
+        _request_start.set(time.perf_counter())
+
+
+def _after_request(response):
+    start = _request_start.get()
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    _request_start.set(None)
+    # Werkzeug proxies cost more per attribute than resolving them once
+    req = request._get_current_object()
+    rule = req.url_rule
+    status = response.status_code
+    labels, latency, requests, size = _rows_for(rule.rule if rule is not None else "<unmatched>", req.method,
+                                                status)
+    # Histogram.observe and Counter.inc written out on the thread's own rows
+    latency[bisect_left(HTTP_LATENCY.buckets, elapsed)] += 1
+    latency[-2] += elapsed
+    latency[-1] += 1
+    requests[0] += 1
+    if status >= 500:
+        HTTP_ERRORS.inc(labels)
+    length = response.headers.get("Content-Length")
+    if length is not None:
+        length = int(length)
+        size[bisect_left(HTTP_RESPONSE_BYTES.buckets, length)] += 1
+        size[-2] += length
+        size[-1] += 1
+    elif response.is_streamed:
+        response.response = _CountingBody(response.response, labels)
+    return response
+
+
+def instrument_app(app) -> None:
+    """Record request counts, latency and response sizes for every route."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
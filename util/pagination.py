@@ -0,0 +1,46 @@
+"""
+Utility module for opaque keyset pagination cursors.
+"""
+
+import base64
+import binascii
+import json
+import logging
+from datetime import date, datetime
+
+from exception.exception import validationerror
+
+logger = logging.getLogger(__name__)
+
+
+def _plain(value):
+    """Convert a row value to something JSON can carry."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(payload: dict) -> str:
+    """
+    Encode a cursor payload as a URL-safe token.
+
+    :param payload: Sort settings and the key values of the last row served.
+    """
+    raw = json.dumps({k: _plain(v) for k, v in payload.items()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """
+    Decode a token produced by :func:`encode_cursor`.
+
+    :raises validationerror: If the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise validationerror(f"Invalid pagination cursor: {token!r}") from e
+    if not isinstance(payload, dict):
+        raise validationerror(f"Invalid pagination cursor: {token!r}")
+    return payload
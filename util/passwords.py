@@ -0,0 +1,56 @@
+"""
+Utility module for salted password hashing.
+
+Hashes are stored as ``pbkdf2_sha256$<iterations>$<salt>$<digest>`` with
+base64 salt and digest, so the cost can be raised later without
+invalidating existing hashes. Values without that prefix are treated as
+legacy plaintext passwords and flagged for re-hashing.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 200_000
+SALT_BYTES = 16
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+def hash_password(password: str, iterations: int = DEFAULT_ITERATIONS) -> str:
+    """Return a new salted hash of ``password``."""
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{ALGORITHM}${iterations}${_b64(salt)}${_b64(digest)}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(ALGORITHM + "$")
+
+
+def verify_password(password: str, stored: str, iterations: int = DEFAULT_ITERATIONS) -> tuple[bool, bool]:
+    """
+    Check ``password`` against a stored hash.
+
+    :param iterations: The current cost; weaker hashes are flagged.
+    :return: ``(matches, needs_rehash)``. ``needs_rehash`` is only set when
+        the password matched and the stored value is plaintext or was
+        hashed with fewer iterations.
+    """
+    if not is_hashed(stored):
+        matches = hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+        return matches, matches
+    try:
+        _, rounds, salt, expected = stored.split("$")
+        rounds = int(rounds)
+        salt = base64.b64decode(salt)
+        expected = base64.b64decode(expected)
+    except ValueError:
+        return False, False
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, rounds)
+    matches = hmac.compare_digest(digest, expected)
+    return matches, matches and rounds < iterations
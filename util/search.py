@@ -0,0 +1,215 @@
+"""
+Utility module for in-process catalogue search.
+
+:class:`InvertedIndex` ranks catalogues for a free-text query and
+:class:`PrefixIndex` answers name autocomplete. :class:`CatalogueSearch`
+holds both for the whole catalogue table.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right
+
+from util.indexing import TableIndex
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Split ``text`` into lowercase word tokens."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Token -> {catalogue_id: weight} postings over name and description.
+
+    Name tokens count ``name_weight`` times as much as description tokens.
+    Queries match any of their tokens and are scored with TF-IDF, so rare
+    words outrank ones that appear in most catalogues.
+    """
+
+    def __init__(self, name_weight: float = 3.0) -> None:
+        self.name_weight = name_weight
+        self._postings: dict[str, dict[int, float]] = {}
+        self._tokens: dict[int, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, catalogue_id: int, name: str | None, description: str | None) -> None:
+        """Index a catalogue, replacing any previous entry for its id."""
+        if catalogue_id in self._tokens:
+            self.remove(catalogue_id)
+        weights: dict[str, float] = {}
+        for token in tokenize(name):
+            weights[token] = weights.get(token, 0.0) + self.name_weight
+        for token in tokenize(description):
+            weights[token] = weights.get(token, 0.0) + 1.0
+        postings = self._postings
+        for token, weight in weights.items():
+            posting = postings.get(token)
+            if posting is None:
+                posting = postings[token] = {}
+            posting[catalogue_id] = weight
+        self._tokens[catalogue_id] = tuple(weights)
+
+    def remove(self, catalogue_id: int) -> None:
+        for token in self._tokens.pop(catalogue_id, ()):
+            posting = self._postings[token]
+            del posting[catalogue_id]
+            if not posting:
+                del self._postings[token]
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """
+        Return up to ``limit`` ``(catalogue_id, score)`` pairs, best first.
+
+        Ties are broken by the lower id so results are stable.
+        """
+        return self.score(*self.snapshot(query), limit)
+
+    def snapshot(self, query: str) -> tuple[int, list[dict[int, float]]]:
+        """
+        Copy what scoring ``query`` needs: the entry count and the postings of its tokens.
+
+        Copying a posting is much cheaper than scoring it, so a caller that
+        shares the index with writers holds its lock for this only.
+        """
+        postings = []
+        for token in set(tokenize(query)):
+            posting = self._postings.get(token)
+            if posting:
+                postings.append(posting.copy())
+        return len(self._tokens), postings
+
+    @staticmethod
+    def score(total: int, postings: list[dict[int, float]], limit: int) -> list[tuple[int, float]]:
+        """Rank a :meth:`snapshot` with TF-IDF, as :meth:`search` does."""
+        scores: dict[int, float] = {}
+        for posting in postings:
+            idf = math.log(1.0 + total / len(posting))
+            for catalogue_id, weight in posting.items():
+                scores[catalogue_id] = scores.get(catalogue_id, 0.0) + weight * idf
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(catalogue_id, round(score, 4)) for catalogue_id, score in best]
+
+
+class PrefixIndex:
+    """
+    Catalogue names in sorted order for prefix lookups.
+
+    Keys are lowercased names kept in a sorted list alongside their ids, so
+    a lookup is a binary search plus a scan of the ``limit`` matches.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[str] = []
+        self._ids: list[int] = []
+        self._names: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self, entries) -> None:
+        """Replace the contents with ``(catalogue_id, name)`` pairs."""
+        self._names = {catalogue_id: name for catalogue_id, name in entries if name}
+        ordered = sorted((name.lower(), catalogue_id) for catalogue_id, name in self._names.items())
+        self._keys = [key for key, _ in ordered]
+        self._ids = [catalogue_id for _, catalogue_id in ordered]
+
+    def add(self, catalogue_id: int, name: str | None) -> None:
+        if catalogue_id in self._names:
+            self.remove(catalogue_id)
+        if not name:
+            return
+        key = name.lower()
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._ids.insert(position, catalogue_id)
+        self._names[catalogue_id] = name
+
+    def remove(self, catalogue_id: int) -> None:
+        name = self._names.pop(catalogue_id, None)
+        if name is None:
+            return
+        key = name.lower()
+        position = bisect_left(self._keys, key)
+        while self._ids[position] != catalogue_id:
+            position += 1
+        del self._keys[position]
+        del self._ids[position]
+
+    def suggest(self, prefix: str, limit: int) -> list[dict]:
+        """Return up to ``limit`` names starting with ``prefix``, case-insensitively."""
+        prefix = prefix.lower()
+        keys, ids, names = self._keys, self._ids, self._names
+        position = bisect_left(keys, prefix)
+        end = min(position + limit, len(keys))
+        suggestions = []
+        while position < end and keys[position].startswith(prefix):
+            catalogue_id = ids[position]
+            suggestions.append({"catalogue_id": catalogue_id, "catalogue_name": names[catalogue_id]})
+            position += 1
+        return suggestions
+
+
+class CatalogueSearch(TableIndex):
+    """
+    Search and suggest over every catalogue, held in memory.
+
+    See :class:`~util.indexing.TableIndex` for how the indexes are built
+    and kept current, including with writes made by other processes.
+
+    :param name_weight: Relative weight of name tokens over description tokens.
+    """
+
+    name = "catalogue search"
+
+    def __init__(self, loader, columns, name_weight: float = 3.0, changes=None) -> None:
+        super().__init__(loader, columns, changes)
+        self._id = self._columns.index("catalogue_id")
+        self._name = self._columns.index("catalogue_name")
+        self._description = self._columns.index("catalogue_description")
+        self.name_weight = name_weight
+        self._text = InvertedIndex(name_weight)
+        self._prefix = PrefixIndex()
+
+    def _load(self, chunks):
+        text, prefix = InvertedIndex(self.name_weight), PrefixIndex()
+        names = []
+        for chunk in chunks:
+            for row in chunk:
+                catalogue_id = row[self._id]
+                text.add(catalogue_id, row[self._name], row[self._description])
+                names.append((catalogue_id, row[self._name]))
+        prefix.load(names)
+        return text, prefix
+
+    def _install(self, state) -> None:
+        self._text, self._prefix = state
+
+    def _apply(self, action: str, records: list[dict]) -> None:
+        for record in records:
+            catalogue_id = record["catalogue_id"]
+            if action == "deleted":
+                self._text.remove(catalogue_id)
+                self._prefix.remove(catalogue_id)
+            else:
+                self._text.add(catalogue_id, record["catalogue_name"], record["catalogue_description"])
+                self._prefix.add(catalogue_id, record["catalogue_name"])
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        self.ensure_ready()
+        with self._lock:
+            snapshot = self._text.snapshot(query)
+        # scoring can take a while on common words; writers need not wait for it
+        return InvertedIndex.score(*snapshot, limit)
+
+    def suggest(self, prefix: str, limit: int) -> list[dict]:
+        self.ensure_ready()
+        with self._lock:
+            return self._prefix.suggest(prefix, limit)
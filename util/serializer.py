@@ -0,0 +1,220 @@
+"""
+Utility module for writing database rows as JSON without per-row dicts.
+
+:class:`RowEncoder` turns a column list into pairs of pre-encoded key and
+converter that write a row tuple as a JSON object string: dates are
+written with ``isoformat()`` and enum columns are looked up in a table of
+pre-encoded values. :func:`dumps` encodes any payload; containers holding
+registered record types are spliced together from the row encoders and
+everything else goes to the JSON backend, which is ``orjson`` when that
+optional package is installed and the stdlib ``json`` module otherwise.
+:class:`JSONProvider` plugs :func:`dumps` into Flask's ``jsonify``.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from json.encoder import encode_basestring
+
+from flask.json.provider import JSONProvider as _FlaskJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is always available
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_Q = '"'
+
+
+# record class -> function returning its JSON text
+_RECORDS = {}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _StdlibBackend:
+    name = "json"
+
+    def __init__(self) -> None:
+        self._encode = json.JSONEncoder(default=_json_default, separators=(",", ":"), ensure_ascii=False).encode
+
+    def dumps(self, value) -> str:
+        return self._encode(value)
+
+    @staticmethod
+    def loads(text):
+        return json.loads(text)
+
+
+class _OrjsonBackend:
+    name = "orjson"
+
+    @staticmethod
+    def dumps(value) -> str:
+        # orjson writes dates as ISO 8601 itself
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    @staticmethod
+    def loads(text):
+        return orjson.loads(text)
+
+
+BACKENDS = {"json": _StdlibBackend, "orjson": _OrjsonBackend}
+_backend = _StdlibBackend()
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    Choose the JSON backend: ``orjson``, ``json`` or ``auto`` (orjson when installed).
+
+    :return: The backend in use.
+    """
+    global _backend
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}; use auto, {', '.join(BACKENDS)}")
+    if name == "orjson" and orjson is None:
+        logger.warning("orjson is not installed; using the json module")
+        name = "json"
+    _backend = BACKENDS[name]()
+    return name
+
+
+def _any(value) -> str:
+    return _backend.dumps(value)
+
+
+def _str(value) -> str:
+    if value is None:
+        return "null"
+    return encode_basestring(value) if isinstance(value, str) else _any(value)
+
+
+def _date(value) -> str:
+    if isinstance(value, date):
+        return _Q + value.isoformat() + _Q
+    return _str(value)
+
+
+# column kind -> converter; each tests the common type first and hands anything else to a helper
+def _int_value(value) -> str:
+    return "null" if value is None else str(value)
+
+
+def _str_value(value) -> str:
+    return encode_basestring(value) if value.__class__ is str else _str(value)
+
+
+def _date_value(value) -> str:
+    return _Q + value.isoformat() + _Q if value.__class__ is date else _date(value)
+
+
+def _enum_converter(values):
+    get = {value: encode_basestring(value) for value in values}.get
+
+    def convert(value) -> str:
+        return get(value) or _any(value)
+    return convert
+
+
+_CONVERTERS = {"int": _int_value, "str": _str_value, "date": _date_value}
+
+
+class RowEncoder:
+    """
+    JSON encoder for tuples with a fixed column layout.
+
+    :param columns: Column names, in row order; they become the object keys.
+    :param kinds: ``{column: kind}`` with kind ``int``, ``str``, ``date`` or
+        ``enum``. Other columns go through the backend.
+    :param enums: ``{column: values}`` for ``enum`` columns; those values are
+        encoded once, anything else falls back to the backend.
+    """
+
+    def __init__(self, columns, kinds: dict, enums: dict | None = None) -> None:
+        self.columns = tuple(columns)
+        enums = enums or {}
+        converters = [_enum_converter(enums.get(column, ())) if kinds.get(column) == "enum"
+                      else _CONVERTERS.get(kinds.get(column), _any) for column in self.columns]
+        # '{"a":' then ',"b":' ...: each key carries the separator before it
+        keys = [("{" if i == 0 else ",") + encode_basestring(column) + ":" for i, column in enumerate(self.columns)]
+        fields = tuple(zip(keys, converters))
+        empty = "{}"
+
+        def encode(row) -> str:
+            if not fields:
+                return empty
+            return "".join([key + convert(value) for (key, convert), value in zip(fields, row)]) + "}"
+
+        def encode_many(rows) -> str:
+            return "[" + ",".join([encode(row) for row in rows]) + "]"
+
+        self.encode = encode
+        self.encode_many = encode_many
+
+
+def register_record(cls, encode) -> None:
+    """Have :func:`dumps` write instances of ``cls`` with ``encode(instance) -> str``."""
+    _RECORDS[cls] = encode
+
+
+def _holds_records(values) -> bool:
+    for value in values:
+        if value.__class__ in _RECORDS:
+            return True
+        if value.__class__ is list or value.__class__ is dict:
+            if _holds_records(value.values() if value.__class__ is dict else value):
+                return True
+    return False
+
+
+def dumps(value) -> str:
+    """Encode ``value`` as compact JSON, using the record encoders where registered."""
+    encode = _RECORDS.get(value.__class__)
+    if encode is not None:
+        return encode(value)
+    if isinstance(value, dict):
+        if _holds_records(value.values()):
+            return "{" + ",".join(_str(str(key)) + ":" + dumps(item) for key, item in value.items()) + "}"
+    elif isinstance(value, (list, tuple)):
+        if _holds_records(value):
+            return "[" + ",".join(map(dumps, value)) + "]"
+    return _backend.dumps(value)
+
+
+def loads(text):
+    return _backend.loads(text)
+
+
+class JSONProvider(_FlaskJSONProvider):
+    """
+    Flask JSON provider backed by :func:`dumps` and the configured backend.
+
+    Calls with options (``sort_keys``, ``indent``, ...) encode as usual and
+    lay the result out again with the stdlib ``json`` module, as
+    :func:`dumps` writes compact JSON only.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return json.dumps(loads(dumps(obj)), **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+
+def provider_from_config(app, settings) -> JSONProvider:
+    """Select the backend from a [serialization] config section and return a provider for ``app``."""
+    name = set_backend(settings.get("json_backend", "auto"))
+    logger.debug("JSON backend: %s", name)
+    return JSONProvider(app)
@@ -0,0 +1,203 @@
+"""
+Utility module for named SQL statements prepared once per connection.
+
+Fixed-text statements are registered under a name in :data:`STATEMENTS`.
+:meth:`StatementRegistry.execute` runs one through a cursor kept on the
+pooled connection for as long as the connection lives: with
+``[mysql] prepared_statements`` on, a server-side prepared cursor
+(``cursor(prepared=True)``), so MySQL parses and plans the statement once
+per connection and later calls only send the parameters. mysql-connector
+re-prepares only when a cursor is given a different SQL string, so each
+statement gets its own cursor.
+
+Statements whose text varies (``IN (...)`` lists, page queries built from
+filters, multi-row INSERTs) stay as text queries; preparing every variant
+would fill the server's ``max_prepared_stmt_count``.
+
+Cursors are shared by every call on a connection, so results are read
+in full (:meth:`StatementRegistry.fetch_one` / ``fetch_all``) before the
+next statement runs, and callers must not close them.
+"""
+
+import logging
+import threading
+import time
+import weakref
+
+from config.settings import get_section
+from util import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Statement:
+    """A named statement; ``columns`` names the values of each result row."""
+
+    __slots__ = ("name", "sql", "columns")
+
+    def __init__(self, name: str, sql: str, columns: tuple = ()) -> None:
+        self.name = name
+        self.sql = sql
+        self.columns = columns
+
+    def __repr__(self) -> str:
+        return f"Statement({self.name!r})"
+
+
+class _Stats:
+    __slots__ = ("prepares", "executes", "prepare_seconds", "execute_seconds", "errors")
+
+    def __init__(self) -> None:
+        self.prepares = self.executes = self.errors = 0
+        self.prepare_seconds = self.execute_seconds = 0.0
+
+
+class StatementRegistry:
+    """
+    Named statements and the cursors they run on.
+
+    :param prepare: Use server-side prepared cursors; None reads
+        ``[mysql] prepared_statements`` on first use.
+    """
+
+    def __init__(self, prepare: bool | None = None) -> None:
+        self._prepare = prepare
+        self._statements = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        # cursors of connections that are not pooled (pooled ones carry their own)
+        self._unpooled = weakref.WeakKeyDictionary()
+
+    @property
+    def prepare(self) -> bool:
+        if self._prepare is None:
+            self._prepare = get_section("mysql").getboolean("prepared_statements", True)
+        return self._prepare
+
+    def register(self, name: str, sql: str, columns: tuple = ()) -> Statement:
+        """
+        Add a statement; registering the same name again with other SQL is an error.
+
+        :param columns: Names of the selected columns, in order.
+        """
+        existing = self._statements.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Statement {name} is already registered with different SQL")
+            return existing
+        statement = self._statements[name] = Statement(name, sql, tuple(columns))
+        self._stats[name] = _Stats()
+        metrics.name_statement(sql, name)
+        return statement
+
+    def __getitem__(self, name: str) -> Statement:
+        return self._statements[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def _cursors(self, conn) -> dict:
+        cursors = getattr(conn, "statement_cursors", None)
+        if cursors is None:
+            cursors = self._unpooled.get(conn)
+            if cursors is None:
+                cursors = self._unpooled[conn] = {}
+        return cursors
+
+    def execute(self, conn, name: str, params=()):
+        """
+        Run a statement on ``conn`` and return its cursor.
+
+        The first call on a connection opens the statement's cursor (and so
+        prepares it); the SQL string object is passed unchanged afterwards,
+        which is how mysql-connector tells that it is already prepared.
+        """
+        statement = self._statements[name]
+        stats = self._stats[name]
+        cursors = self._cursors(conn)
+        cursor = cursors.get(name)
+        first = cursor is None
+        if first:
+            cursor = cursors[name] = conn.cursor(prepared=True) if self.prepare else conn.cursor()
+        start = time.perf_counter()
+        try:
+            cursor.execute(statement.sql, params)
+        except Exception:
+            # the cursor may be left mid-result or without a statement; start over next time
+            cursors.pop(name, None)
+            try:
+                cursor.close()
+            except Exception:
+                logger.debug("Ignoring error while closing the cursor of %s", name, exc_info=True)
+            with self._lock:
+                stats.errors += 1
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats.executes += 1
+            if first:
+                stats.prepares += 1
+                stats.prepare_seconds += elapsed
+            else:
+                stats.execute_seconds += elapsed
+        return cursor
+
+    def fetch_all(self, conn, name: str, params=()) -> list:
+        return self.execute(conn, name, params).fetchall()
+
+    def fetch_one(self, conn, name: str, params=()):
+        """The first row, or None; the rest of the result is read so the cursor can be reused."""
+        rows = self.execute(conn, name, params).fetchall()
+        return rows[0] if rows else None
+
+    def stats(self) -> dict:
+        """
+        Per statement: ``prepares`` (cursors opened, one per connection),
+        ``executes`` (all calls), ``prepare_seconds`` (calls that prepared,
+        including their execution), ``execute_seconds`` (the other calls),
+        ``mean_execute_ms`` and ``errors``.
+        """
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                reused = stats.executes - stats.prepares
+                result[name] = {
+                    "prepares": stats.prepares,
+                    "executes": stats.executes,
+                    "prepare_seconds": round(stats.prepare_seconds, 6),
+                    "execute_seconds": round(stats.execute_seconds, 6),
+                    "mean_execute_ms": round(stats.execute_seconds * 1000 / reused, 4) if reused else None,
+                    "errors": stats.errors,
+                }
+            return result
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = _Stats()
+
+    def _calls(self) -> dict:
+        with self._lock:
+            values = {}
+            for name, stats in self._stats.items():
+                values[(name, "prepare")] = stats.prepares
+                values[(name, "execute")] = stats.executes - stats.prepares
+            return values
+
+    def _seconds(self) -> dict:
+        with self._lock:
+            values = {}
+            for name, stats in self._stats.items():
+                values[(name, "prepare")] = stats.prepare_seconds
+                values[(name, "execute")] = stats.execute_seconds
+            return values
+
+
+STATEMENTS = StatementRegistry()
+
+metrics.REGISTRY.register(metrics.GaugeFunction(
+    "db_statement_calls", "Calls of registered statements, by whether they prepared the statement.",
+    ("statement", "phase"), lambda: STATEMENTS._calls()))
+metrics.REGISTRY.register(metrics.GaugeFunction(
+    "db_statement_seconds", "Time spent in registered statements, preparing calls apart from the rest.",
+    ("statement", "phase"), lambda: STATEMENTS._seconds()))
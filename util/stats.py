@@ -0,0 +1,235 @@
+"""
+Utility module for catalogue counts kept in memory.
+
+:class:`CatalogueStats` holds counts per status and per effective_from /
+effective_to day, updated from catalogueService write notifications, so
+GET /catalogues/stats never reads the table. :meth:`CatalogueStats.reconcile`
+compares them with the ``GROUP BY`` counts of
+``catalogueService.get_catalogue_counts`` and rebuilds on drift (writes by
+other processes, or notifications of one row applied out of order).
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from util import metrics
+from util.indexing import TableIndex
+from util.intervals import to_ordinal
+
+logger = logging.getLogger(__name__)
+
+
+def summarize(by_status: dict, starts: dict, ends: dict, today: date, within_days: int) -> dict:
+    """
+    Build the stats response from counts per status and per day.
+
+    :param starts: ``{day ordinal: catalogues whose effective_from is that day}``.
+    :param ends: The same for effective_to.
+    :return: ``total``, ``by_status``, ``upcoming`` (starting after today,
+        within ``within_days``), ``expiring`` (ending today or within
+        ``within_days``) and ``by_month``, counts by effective_from month.
+    """
+    first = today.toordinal()
+    last = first + within_days
+    months = Counter()
+    for ordinal, count in starts.items():
+        if count:
+            day = date.fromordinal(ordinal)
+            months[f"{day.year:04d}-{day.month:02d}"] += count
+    return {
+        "total": sum(by_status.values()),
+        "by_status": {status: count for status, count in sorted(by_status.items()) if count},
+        "within_days": within_days,
+        "upcoming": sum(starts.get(ordinal, 0) for ordinal in range(first + 1, last + 1)),
+        "expiring": sum(ends.get(ordinal, 0) for ordinal in range(first, last + 1)),
+        "by_month": dict(sorted(months.items())),
+    }
+
+
+def _days(counts: dict) -> Counter:
+    days = Counter()
+    for value, count in counts.items():
+        ordinal = to_ordinal(value)
+        if ordinal is not None:
+            days[ordinal] += count
+    return days
+
+
+def summarize_counts(counts: dict, today: date, within_days: int) -> dict:
+    """:func:`summarize` for the result of ``catalogueService.get_catalogue_counts()``."""
+    return summarize(counts["by_status"], _days(counts["starts"]), _days(counts["ends"]), today, within_days)
+
+
+class CatalogueStats(TableIndex):
+    """
+    Catalogue counts by status and by effective day.
+
+    Each catalogue's ``(status, from, to)`` is kept per id, so an update or
+    delete can take back what the row counted before. See
+    :class:`~util.indexing.TableIndex` for building and updates.
+
+    :param counter: Callable returning ``catalogueService.get_catalogue_counts()``.
+    :param version: Callable returning ``catalogueService.get_data_version()``.
+    :param interval: Seconds between reconciliations once :meth:`start` is called.
+    :param settle: Seconds to wait before re-checking a mismatch, so
+        notifications of writes just committed can land first.
+    """
+
+    name = "stats"
+
+    def __init__(self, loader, columns, counter=None, version=None,
+                 interval: float = 300.0, settle: float = 0.5) -> None:
+        super().__init__(loader, columns)
+        self._id = self._columns.index("catalogue_id")
+        self._status = self._columns.index("status")
+        self._from = self._columns.index("effective_from")
+        self._to = self._columns.index("effective_to")
+        self._counter = counter
+        self._version = version
+        self.interval = interval
+        self.settle = settle
+        self.last_reconciled = None
+        self.rebuilds = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._install(self._load([]))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load(self, chunks):
+        rows = {}
+        for chunk in chunks:
+            for row in chunk:
+                rows[row[self._id]] = (row[self._status], to_ordinal(row[self._from]), to_ordinal(row[self._to]))
+        by_status, starts, ends = Counter(), Counter(), Counter()
+        for status, start, end in rows.values():
+            by_status[status] += 1
+            starts[start] += 1
+            ends[end] += 1
+        starts.pop(None, None)
+        ends.pop(None, None)
+        return rows, by_status, starts, ends
+
+    def _install(self, state) -> None:
+        self._rows, self._by_status, self._starts, self._ends = state
+
+    def _count(self, entry, delta: int) -> None:
+        status, start, end = entry
+        self._by_status[status] += delta
+        if start is not None:
+            self._starts[start] += delta
+        if end is not None:
+            self._ends[end] += delta
+
+    def _apply(self, action: str, records: list[dict]) -> None:
+        rows = self._rows
+        for record in records:
+            catalogue_id = record["catalogue_id"]
+            previous = rows.pop(catalogue_id, None)
+            if previous is not None:
+                self._count(previous, -1)
+            if action != "deleted":
+                entry = (record["status"], to_ordinal(record["effective_from"]), to_ordinal(record["effective_to"]))
+                rows[catalogue_id] = entry
+                self._count(entry, 1)
+
+    def counts(self) -> tuple[dict, dict, dict]:
+        """Copies of the counts per status, per effective_from and per effective_to ordinal."""
+        self.ensure_ready()
+        with self._lock:
+            return (+self._by_status, +self._starts, +self._ends)
+
+    def summary(self, today: date | None = None, within_days: int = 30) -> dict:
+        """See :func:`summarize`."""
+        by_status, starts, ends = self.counts()
+        return summarize(by_status, starts, ends, today or date.today(), within_days)
+
+    def _differences(self, expected: dict) -> list[str]:
+        by_status, starts, ends = self.counts()
+        found = []
+        for name, ours, theirs in (("status", by_status, Counter(expected["by_status"])),
+                                   ("effective_from", starts, _days(expected["starts"])),
+                                   ("effective_to", ends, _days(expected["ends"]))):
+            if ours != +theirs:
+                keys = {key for key in ours.keys() | theirs.keys() if ours[key] != theirs[key]}
+                found.append(f"{name}: {len(keys)} keys differ")
+        return found
+
+    def reconcile(self) -> bool:
+        """
+        Compare with the table's ``GROUP BY`` counts and rebuild if they differ.
+
+        A mismatch only counts once it survives ``settle`` seconds with the
+        data version unchanged; if other writes land meanwhile, the check is
+        left to the next run.
+
+        :return: True when the counts matched or were rebuilt, False when
+            the check was inconclusive or the stats are not built yet.
+        """
+        if not self.ready:
+            return False
+        expected = self._counter()
+        differences = self._differences(expected)
+        if differences:
+            time.sleep(self.settle)
+            current = self._version()
+            if (current and current[0]) != expected["version"]:
+                logger.debug("Stats reconciliation deferred; the table changed meanwhile")
+                self._count_run("deferred")
+                return False
+            differences = self._differences(expected)
+        if differences:
+            logger.warning("Catalogue stats drifted (%s); rebuilding", "; ".join(differences))
+            self.build()
+            self.rebuilds += 1
+            self._count_run("rebuilt")
+        else:
+            self._count_run("matched")
+        self.last_reconciled = time.time()
+        return True
+
+    @staticmethod
+    def _count_run(outcome: str) -> None:
+        if metrics.ENABLED:
+            metrics.STATS_RECONCILIATIONS.inc((outcome,))
+
+    def start(self) -> None:
+        """Build, then reconcile every ``interval`` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="stats-reconcile", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        try:
+            self.ensure_ready()
+        except Exception:
+            logger.exception("Failed to build catalogue stats")
+        while not self._stop.wait(self.interval):
+            try:
+                if self.ready:
+                    self.reconcile()
+                else:
+                    self.ensure_ready()
+            except Exception:
+                logger.exception("Catalogue stats reconciliation failed")
+
+
+def stats_from_config(service, columns, settings) -> CatalogueStats:
+    """Build the stats from a [stats] config section."""
+    return CatalogueStats(
+        service.iter_catalogue_chunks, columns, service.get_catalogue_counts, service.get_data_version,
+        interval=settings.getfloat("reconcile_interval", 300.0),
+        settle=settings.getfloat("settle", 0.5),
+    )
@@ -3,24 +3,30 @@ Utility module for input validation functions
 """
 
 import logging
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 import re
 
+from exception.exception import validationerror
+
 logger = logging.getLogger(__name__)
 
+# Lifecycle states a catalogue can be in.
+VALID_STATUSES = ('active', 'inactive', 'upcoming', 'expired')
+
 def validate_date(prompt: str) -> str:
     """
     Prompt the user for a date input in YYYY-MM-DD format and validate it.
     """
     while True:
         date_input = input(prompt).strip()
-        logger.debug(f"User entered date: {date_input}")
+        logger.debug("User entered date: %s", date_input)
         try:
             datetime.strptime(date_input, "%Y-%m-%d")
-            logger.info(f"Valid date input received: {date_input}")
+            logger.debug("Valid date input received: %s", date_input)
             return date_input
         except ValueError:
-            logger.warning(f"Invalid date format entered: {date_input}")
+            logger.warning("Invalid date format entered: %s", date_input)
             print("Invalid date format. Use YYYY-MM-DD.")
 
 def validate_int(prompt: str) -> int:
@@ -29,13 +35,13 @@ def validate_int(prompt: str) -> int:
     """
     while True:
         user_input = input(prompt).strip()
-        logger.debug(f"User entered integer: {user_input}")
+        logger.debug("User entered integer: %s", user_input)
         try:
             value = int(user_input)
-            logger.info(f"Valid integer input received: {value}")
+            logger.debug("Valid integer input received: %s", value)
             return value
         except ValueError:
-            logger.warning(f"Invalid integer input: {user_input}")
+            logger.warning("Invalid integer input: %s", user_input)
             print("Invalid input. Please enter a valid integer.")
 
 def validate_alpha_string(prompt: str, field_name: str = "Field") -> str:
@@ -44,29 +50,206 @@ def validate_alpha_string(prompt: str, field_name: str = "Field") -> str:
     """
     while True:
         value = input(prompt).strip()
-        logger.debug(f"User entered string for {field_name}: {value}")
+        logger.debug("User entered string for %s: %s", field_name, value)
         if not value:
-            logger.warning(f"{field_name} is empty.")
+            logger.warning("%s is empty.", field_name)
             print(f"{field_name} cannot be empty.")
         elif not re.match(r'^[A-Za-z ]+$', value):
-            logger.warning(f"{field_name} contains invalid characters: {value}")
+            logger.warning("%s contains invalid characters: %s", field_name, value)
             print(f"{field_name} must contain only letters.")
         else:
-            logger.info(f"Valid alphabetic string for {field_name}: {value}")
+            logger.debug("Valid alphabetic string for %s: %s", field_name, value)
             return value
 
 def validate_status(prompt: str) -> str:
     """
     Prompt the user to enter a status and validate it against allowed values.
     """
-    valid_status = ['active', 'inactive', 'upcoming', 'expired']
+    valid_status = VALID_STATUSES
     while True:
         status = input(prompt).strip().lower()
-        logger.debug(f"User entered status: {status}")
+        logger.debug("User entered status: %s", status)
         if status in valid_status:
-            logger.info(f"Valid status received: {status}")
+            logger.debug("Valid status received: %s", status)
             return status
         else:
-            logger.warning(f"Invalid status entered: {status}")
+            logger.warning("Invalid status entered: %s", status)
             print(f"Status must be one of: {', '.join(valid_status)}")
 
+
+def parse_date(value: str, field_name: str = "date") -> date:
+    """
+    Parse a YYYY-MM-DD string, raising validationerror when it is malformed.
+    """
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise validationerror(f"{field_name} must be a date in YYYY-MM-DD format")
+
+
+# Field rules for catalogue payloads; lengths match the catalogue table.
+CATALOGUE_SCHEMA = {
+    "catalogue_name": {"type": "string", "max_length": 100},
+    "catalogue_description": {"type": "string", "max_length": 255, "required": False, "nullable": True,
+                              "multiline": True},
+    "effective_from": {"type": "date"},
+    "effective_to": {"type": "date"},
+    "status": {"type": "enum", "values": VALID_STATUSES},
+}
+# (earlier, later) date fields that must be in order.
+CATALOGUE_DATE_ORDER = (("effective_from", "effective_to"),)
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# printable text; control characters are rejected
+_TEXT = re.compile(r"[^\x00-\x1f\x7f]*")
+# the same, but tabs and line breaks are allowed ("multiline" fields)
+_MULTILINE_TEXT = re.compile(r"[^\x00-\x08\x0b\x0c\x0e-\x1f\x7f]*")
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_date(value: str) -> date | None:
+    # bulk payloads repeat the same few dates, so parsed values are memoized
+    if not _ISO_DATE.fullmatch(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _compile_field(name: str, rules: dict):
+    """Return ``check(value) -> (clean, error)`` for one schema field."""
+    kind = rules["type"]
+    nullable = rules.get("nullable", False)
+
+    if kind == "string":
+        max_length = rules.get("max_length")
+        blank = f"{name} must not be empty"
+        too_long = f"{name} must be at most {max_length} characters"
+        bad_type = f"{name} must be a string"
+        bad_text = f"{name} must not contain control characters"
+        text = (_MULTILINE_TEXT if rules.get("multiline") else _TEXT).fullmatch
+
+        def check(value):
+            if value is None and nullable:
+                return None, None
+            if value.__class__ is not str:
+                return None, bad_type
+            value = value.strip()
+            if not value and not nullable:
+                return None, blank
+            if max_length is not None and len(value) > max_length:
+                return None, too_long
+            if text(value) is None:
+                return None, bad_text
+            return value, None
+    elif kind == "date":
+        bad_date = f"{name} must be a date in YYYY-MM-DD format"
+
+        def check(value):
+            if value is None and nullable:
+                return None, None
+            if value.__class__ is date:
+                return value, None
+            if value.__class__ is not str:
+                return None, bad_date
+            parsed = _parse_iso_date(value)
+            return (parsed, None) if parsed is not None else (None, bad_date)
+    elif kind == "enum":
+        allowed = {value.lower(): value for value in rules["values"]}
+        bad_value = f"{name} must be one of: {', '.join(rules['values'])}"
+
+        def check(value):
+            if value is None and nullable:
+                return None, None
+            if value.__class__ is not str:
+                return None, bad_value
+            clean = allowed.get(value.strip().lower())
+            return (clean, None) if clean is not None else (None, bad_value)
+    else:
+        raise ValueError(f"Unknown field type {kind!r} for {name}")
+    return check
+
+
+class SchemaValidator:
+    """
+    Validator compiled once from a field schema.
+
+    Each field's rules become a checking closure up front, so validating a
+    payload is one dict lookup and one call per field. Values come back
+    cleaned: strings stripped, dates parsed to :class:`date` and enum
+    values in their canonical case.
+
+    :param schema: ``{field: rules}``; rules take ``type`` (``string``,
+        ``date`` or ``enum``), ``required`` (default True), ``nullable``,
+        ``max_length`` and ``multiline`` (allow tabs and line breaks) for
+        strings, and ``values`` for enums.
+    :param date_order: ``(earlier, later)`` field pairs that must not be
+        reversed.
+    """
+
+    def __init__(self, schema: dict, date_order=()) -> None:
+        self.fields = tuple(schema)
+        self._checks = tuple((name, _compile_field(name, rules), rules.get("required", True))
+                             for name, rules in schema.items())
+        self._known = frozenset(schema)
+        self._order = tuple((earlier, later, f"{earlier} must not be after {later}")
+                            for earlier, later in date_order)
+
+    def check(self, data) -> tuple[dict | None, list[str]]:
+        """
+        Validate one payload without raising.
+
+        :return: ``(clean, [])`` when valid, else ``(None, messages)``.
+        """
+        if not isinstance(data, dict):
+            return None, ["item must be an object"]
+        errors = []
+        clean = {}
+        for name, check, required in self._checks:
+            if name not in data:
+                if required:
+                    errors.append(f"{name} is required")
+                else:
+                    clean[name] = None
+                continue
+            value, error = check(data[name])
+            if error is None:
+                clean[name] = value
+            else:
+                errors.append(error)
+        if not self._known.issuperset(data):
+            errors.extend(f"unknown field {name}" for name in data if name not in self._known)
+        if not errors:
+            for earlier, later, message in self._order:
+                first, last = clean[earlier], clean[later]
+                if first is not None and last is not None and first > last:
+                    errors.append(message)
+        return (None, errors) if errors else (clean, errors)
+
+    def validate(self, data) -> dict:
+        """Return the cleaned payload, or raise validationerror listing every problem."""
+        clean, errors = self.check(data)
+        if errors:
+            raise validationerror("; ".join(errors))
+        return clean
+
+    def validate_many(self, items) -> tuple[list[tuple[int, dict]], dict[int, str]]:
+        """
+        Validate a batch in one pass, without raising per row.
+
+        :return: ``(valid, errors)``: ``(index, clean)`` pairs for the valid
+            items, and ``{index: message}`` for the rest.
+        """
+        valid, errors = [], {}
+        check = self.check
+        for index, item in enumerate(items):
+            clean, problems = check(item)
+            if problems:
+                errors[index] = "; ".join(problems)
+            else:
+                valid.append((index, clean))
+        return valid, errors
+
+
+catalogue_validator = SchemaValidator(CATALOGUE_SCHEMA, CATALOGUE_DATE_ORDER)